@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Measure the per-request overhead of the API metrics middleware.
+
+Drives a minimal ASGI app directly (no server, no network), once bare and
+once wrapped in MetricsMiddleware, and reports the mean cost per request
+of each and the difference. The scope carries a matched route the way
+FastAPI's router leaves it, so the route-template lookup is included.
+
+    python benchmarks/bench_api_middleware.py --requests 200000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "packages", "core", "src"))
+sys.path.insert(0, os.path.join(ROOT, "services", "api", "src"))
+
+from agent_runtime_api.telemetry import MetricsMiddleware
+
+
+class Route:
+    path = "/runs/{run_id}"
+
+
+START = {"type": "http.response.start", "status": 200, "headers": []}
+BODY = {"type": "http.response.body", "body": b"{}"}
+
+
+async def app(scope, receive, send) -> None:
+    scope["route"] = Route
+    await send(START)
+    await send(BODY)
+
+
+async def receive() -> dict:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message) -> None:
+    pass
+
+
+async def measure(target, requests: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/runs/123"}
+    start = time.perf_counter()
+    for _ in range(requests):
+        await target(dict(scope), receive, send)
+    return (time.perf_counter() - start) / requests
+
+
+async def main(requests: int) -> None:
+    wrapped = MetricsMiddleware(app)
+    # Warm up both paths (binds the histogram child)
+    await measure(app, 1000)
+    await measure(wrapped, 1000)
+    bare = await measure(app, requests)
+    instrumented = await measure(wrapped, requests)
+    print(f"{requests} requests")
+    print(f"bare          {bare * 1e6:8.2f} us/request")
+    print(f"instrumented  {instrumented * 1e6:8.2f} us/request")
+    print(f"overhead      {(instrumented - bare) * 1e6:8.2f} us/request")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
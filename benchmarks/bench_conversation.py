@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Benchmark per-turn cost of a long agent conversation: one growing prompt vs Conversation.
+
+Simulates the workflow's side of --turns turns, each an assistant message
+requesting one tool and a --result-kb tool result, and builds the LLM
+call input every turn as AgentRunWorkflow does:
+
+- prompt: the whole conversation in one string that grows every turn,
+  re-tokenized in full for each call.
+- conversation: a Conversation with a --max-tokens budget, tokenizing
+  only new messages and compacting (truncation) when over budget.
+
+For each band of turns it reports the CPU time per turn (token counting
+plus encoding the activity input as a Temporal payload), the tokens and
+payload bytes sent, and how much of each request repeats the previous
+request's start, which is what a provider's prompt cache can reuse.
+
+    python benchmarks/bench_conversation.py --turns 1000 --max-tokens 32000
+    python benchmarks/bench_conversation.py --tokenizer tiktoken:o200k_base
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "packages", "core", "src"))
+sys.path.insert(0, os.path.join(ROOT, "services", "worker", "src"))
+
+from agent_runtime_core.conversation import Conversation, Message, get_tokenizer
+from agent_runtime_core.temporal import OrjsonPayloadConverter
+from agent_runtime_worker.llm import LLMCallInput
+
+WORDS = ["agent", "runtime", "temporal", "payload", "history", "replay", "tool", "result"]
+SYSTEM_PROMPT = "You are a research agent. Use the tools to answer the user's question. " * 20
+
+
+def tool_result(turn: int, kb: int) -> str:
+    rng = random.Random(turn)
+    return json.dumps({"page": turn, "text": " ".join(rng.choices(WORDS, k=kb * 1024 // 8))})
+
+
+def run_prompt(turns: int, result_kb: int, tokenizer_name: str) -> list[tuple[float, int, int, int]]:
+    """Per turn: (seconds, tokens sent, payload bytes, tokens repeated from the previous request)."""
+    tokenizer = get_tokenizer(tokenizer_name)
+    converter = OrjsonPayloadConverter()
+    prompt = f"{SYSTEM_PROMPT}\n\nFind out everything about agent runtimes."
+    previous = 0
+    samples = []
+    for turn in range(turns):
+        result = tool_result(turn, result_kb)
+        start = time.perf_counter()
+        prompt += f"\n\nTool fetch (call-{turn}) returned: {result}"
+        tokens = tokenizer.count(prompt)
+        [payload] = converter.to_payloads([LLMCallInput(prompt=prompt, model="gpt-4o")])
+        elapsed = time.perf_counter() - start
+        # The prompt only ever grows, so the whole previous request is its prefix
+        samples.append((elapsed, tokens, len(payload.data), previous))
+        previous = tokens
+    return samples
+
+
+def run_conversation(
+    turns: int, result_kb: int, tokenizer_name: str, max_tokens: int
+) -> list[tuple[float, int, int, int]]:
+    converter = OrjsonPayloadConverter()
+    conversation = Conversation(max_tokens=max_tokens, tokenizer=tokenizer_name)
+    tokenizer = get_tokenizer(tokenizer_name)
+    conversation.pin(Message(role="system", content=SYSTEM_PROMPT))
+    conversation.pin(Message(role="user", content="Find out everything about agent runtimes."))
+    previous: list[Message] = []
+    samples = []
+    for turn in range(turns):
+        result = tool_result(turn, result_kb)
+        start = time.perf_counter()
+        conversation.append(
+            Message(
+                role="assistant",
+                tool_calls=[{"id": f"call-{turn}", "name": "fetch", "arguments": {"page": turn}}],
+            )
+        )
+        conversation.append(Message(role="tool", content=result, tool_call_id=f"call-{turn}", name="fetch"))
+        if conversation.needs_compaction():
+            conversation.compact(conversation.compaction_size())
+        messages = conversation.messages()
+        [payload] = converter.to_payloads([LLMCallInput(messages=messages, model="gpt-4o")])
+        elapsed = time.perf_counter() - start
+        repeated = 0
+        for before, after in zip(previous, messages):
+            if before is not after:
+                break
+            repeated += after.tokens(tokenizer)
+        samples.append((elapsed, conversation.total_tokens, len(payload.data), repeated))
+        previous = messages
+    return samples
+
+
+def report(name: str, samples: list[tuple[float, int, int, int]], bands: list[int]) -> None:
+    start = 0
+    for end in bands:
+        band = samples[start:end]
+        seconds = sum(s[0] for s in band) / len(band)
+        tokens = sum(s[1] for s in band) / len(band)
+        size = sum(s[2] for s in band) / len(band)
+        reused = sum(s[3] for s in band) / max(sum(s[1] for s in band), 1)
+        print(
+            f"{name:<13} {f'{start + 1}-{end}':>11} {seconds * 1e6:>10.0f} {tokens:>10.0f} "
+            f"{size / 1024:>10.0f} {reused:>8.0%}"
+        )
+        start = end
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=1000)
+    parser.add_argument("--result-kb", type=int, default=2, help="Size of each tool result")
+    parser.add_argument("--max-tokens", type=int, default=32_000, help="Conversation budget")
+    parser.add_argument("--tokenizer", default="approx", help='"approx" or "tiktoken:<encoding>"')
+    args = parser.parse_args()
+
+    bands = sorted({b for b in (10, 100, 500, args.turns) if b <= args.turns})
+    print(f"{args.turns} turns, {args.result_kb} KB tool results, tokenizer {args.tokenizer}\n")
+    print(f"{'mode':<13} {'turns':>11} {'us/turn':>10} {'tokens':>10} {'payload KB':>10} {'reused':>8}")
+    report("prompt", run_prompt(args.turns, args.result_kb, args.tokenizer), bands)
+    report(
+        "conversation",
+        run_conversation(args.turns, args.result_kb, args.tokenizer, args.max_tokens),
+        bands,
+    )
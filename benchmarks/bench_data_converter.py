@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""Benchmark JSON encoding: Temporal payload converters and API run serialization.
+
+Three measurements, each with the standard library path and the orjson one:
+
+- payloads: encode/decode throughput of AgentRunInput, LLMCallOutput and
+  ToolExecOutput through Temporal's default payload converter and
+  OrjsonPayloadConverter. Each carries a --doc-kb JSON document.
+- responses: encoding a page of runs as the API returns it, with
+  JSONResponse and ORJSONResponse, and exporting rows as NDJSON by
+  validating each row into a Run against embedding the stored JSON text
+  (run_row_json).
+- replay (--replay): replay time of an AgentRunWorkflow history with
+  each converter, against a local Temporal dev server.
+
+    python benchmarks/bench_data_converter.py --doc-kb 64
+    python benchmarks/bench_data_converter.py --replay --turns 10
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "packages", "core", "src"))
+sys.path.insert(0, os.path.join(ROOT, "services", "worker", "src"))
+sys.path.insert(0, os.path.join(ROOT, "services", "api", "src"))
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from temporalio.converter import DataConverter, DefaultPayloadConverter
+
+from agent_runtime_api.services.runs import run_row_json
+from agent_runtime_core.models import Run, RunStatus
+from agent_runtime_core.temporal import OrjsonPayloadConverter
+from agent_runtime_worker.activities import LLMCallOutput, ToolCall, ToolExecOutput
+from agent_runtime_worker.workflows import AgentRunInput
+
+WORDS = ["agent", "runtime", "temporal", "payload", "history", "replay", "tool", "result"]
+
+
+def make_document(kb: int, seed: int = 0) -> dict:
+    """A nested document of roughly `kb` KB, like a tool result or run input."""
+    rng = random.Random(seed)
+    items = []
+    size = 0
+    while size < kb * 1024:
+        item = {
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "title": " ".join(rng.choices(WORDS, k=6)),
+            "score": rng.random(),
+            "rank": rng.randrange(1000),
+            "tags": rng.sample(WORDS, 3),
+            "meta": {"source": rng.choice(WORDS), "fresh": rng.random() < 0.5},
+        }
+        size += len(json.dumps(item))
+        items.append(item)
+    return {"query": "benchmark", "items": items}
+
+
+def timed(fn, min_seconds: float = 0.5) -> float:
+    """Seconds per call of fn, averaged over at least min_seconds."""
+    fn()
+    calls, start = 0, time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return elapsed / calls
+
+
+def bench_payloads(doc_kb: int) -> None:
+    doc = make_document(doc_kb)
+    values = [
+        (
+            "AgentRunInput",
+            AgentRunInput(
+                run_id=str(uuid.uuid4()),
+                tenant_id=str(uuid.uuid4()),
+                agent_id=str(uuid.uuid4()),
+                agent_version_id=str(uuid.uuid4()),
+                config={"model": "gpt-4o", "max_turns": 10},
+                input=doc,
+            ),
+        ),
+        (
+            "LLMCallOutput",
+            LLMCallOutput(
+                content="",
+                model="gpt-4o",
+                tool_calls=[ToolCall(id=f"call-{i}", name="search", arguments=item) for i, item in enumerate(doc["items"])],
+            ),
+        ),
+        ("ToolExecOutput", ToolExecOutput(success=True, result=doc)),
+    ]
+    converters = [("json", DefaultPayloadConverter()), ("orjson", OrjsonPayloadConverter())]
+
+    print(f"payloads ({doc_kb} KB documents)\n")
+    print(f"{'type':<15} {'converter':<10} {'bytes':>9} {'encode MB/s':>12} {'decode MB/s':>12}")
+    for name, value in values:
+        for converter_name, converter in converters:
+            [payload] = converter.to_payloads([value])
+            size = len(payload.data)
+            encode = timed(lambda: converter.to_payloads([value]))
+            decode = timed(lambda: converter.from_payloads([payload], [type(value)]))
+            print(
+                f"{name:<15} {converter_name:<10} {size:>9} "
+                f"{size / encode / 1e6:>12.1f} {size / decode / 1e6:>12.1f}"
+            )
+            # Either converter reads what the other wrote
+            [other] = (converters[1] if converter_name == "json" else converters[0])[1].from_payloads(
+                [payload], [type(value)]
+            )
+            assert other == value, f"{name} does not round-trip between converters"
+    print()
+
+
+def bench_responses(doc_kb: int, page: int) -> None:
+    now = datetime.now(timezone.utc)
+    runs = [
+        Run(
+            tenant_id=uuid.uuid4(),
+            agent_id=uuid.uuid4(),
+            agent_version_id=uuid.uuid4(),
+            status=RunStatus.COMPLETED,
+            input=make_document(doc_kb, seed=i),
+            output={"result": "done", "turns": 3},
+            started_at=now,
+            completed_at=now,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(page)
+    ]
+    # A page as FastAPI hands it to the response class: the models dumped to JSON-compatible values
+    content = {"items": [run.model_dump(mode="json") for run in runs], "next_cursor": None}
+    # Rows as the database returns them: JSONB decoded to dicts, or left as text
+    rows = [run.model_dump() | {"status": run.status.value} for run in runs]
+    text_rows = [row | {"input": json.dumps(row["input"]), "output": json.dumps(row["output"])} for row in rows]
+
+    def export_validated() -> bytes:
+        return b"".join(Run.model_validate(row).model_dump_json().encode() + b"\n" for row in rows)
+
+    def export_embedded() -> bytes:
+        return b"".join(run_row_json(row) + b"\n" for row in text_rows)
+
+    print(f"responses ({page} runs of {doc_kb} KB)\n")
+    print(f"{'path':<32} {'KB':>8} {'ms':>8} {'MB/s':>8}")
+    for name, fn in (
+        ("list page, JSONResponse", lambda: JSONResponse(content).body),
+        ("list page, ORJSONResponse", lambda: ORJSONResponse(content).body),
+        ("export, validate + dump", export_validated),
+        ("export, embedded JSONB", export_embedded),
+    ):
+        size = len(fn())
+        elapsed = timed(fn)
+        print(f"{name:<32} {size / 1024:>8.0f} {elapsed * 1000:>8.2f} {size / elapsed / 1e6:>8.1f}")
+    print()
+
+
+async def bench_replay(turns: int, result_kb: int) -> None:
+    from temporalio.testing import WorkflowEnvironment
+    from temporalio.worker import Replayer, Worker
+
+    from agent_runtime_worker.queues import llm_queue, tools_queue
+    from agent_runtime_worker.workflows import AgentRunWorkflow
+    from bench_payload_codec import TASK_QUEUE, make_activities
+
+    print(f"replay ({turns} turns, {result_kb} KB tool results)\n")
+    print(f"{'converter':<10} {'events':>8} {'run s':>8} {'replay ms':>10}")
+    for name, converter in (
+        ("json", DataConverter.default),
+        ("orjson", dataclasses.replace(DataConverter.default, payload_converter_class=OrjsonPayloadConverter)),
+    ):
+        async with await WorkflowEnvironment.start_local(data_converter=converter) as env:
+            call_llm, execute_tool, record_run_status = make_activities(turns, result_kb)
+            async with (
+                Worker(
+                    env.client,
+                    task_queue=TASK_QUEUE,
+                    workflows=[AgentRunWorkflow],
+                    activities=[record_run_status],
+                ),
+                Worker(env.client, task_queue=llm_queue(TASK_QUEUE), activities=[call_llm]),
+                Worker(env.client, task_queue=tools_queue(TASK_QUEUE), activities=[execute_tool]),
+            ):
+                start = time.perf_counter()
+                handle = await env.client.start_workflow(
+                    AgentRunWorkflow.run,
+                    AgentRunInput(
+                        run_id=str(uuid.uuid4()),
+                        tenant_id=str(uuid.uuid4()),
+                        agent_id=str(uuid.uuid4()),
+                        agent_version_id=str(uuid.uuid4()),
+                        config={"max_turns": turns + 1, "max_history_bytes": 1 << 40},
+                        input=make_document(result_kb),
+                    ),
+                    id=f"bench-converter-{uuid.uuid4()}",
+                    task_queue=TASK_QUEUE,
+                )
+                await handle.result()
+                elapsed = time.perf_counter() - start
+
+            history = await handle.fetch_history()
+            replayer = Replayer(workflows=[AgentRunWorkflow], data_converter=converter)
+            replays = []
+            for _ in range(5):
+                start = time.perf_counter()
+                await replayer.replay_workflow(history)
+                replays.append(time.perf_counter() - start)
+            print(f"{name:<10} {len(history.events):>8} {elapsed:>8.2f} {min(replays) * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--doc-kb", type=int, default=64, help="Size of each JSON document")
+    parser.add_argument("--page", type=int, default=50, help="Runs per list page")
+    parser.add_argument("--replay", action="store_true", help="Also measure replay (starts a dev server)")
+    parser.add_argument("--turns", type=int, default=10)
+    args = parser.parse_args()
+    bench_payloads(args.doc_kb)
+    bench_responses(args.doc_kb, args.page)
+    if args.replay:
+        asyncio.run(bench_replay(args.turns, args.doc_kb))
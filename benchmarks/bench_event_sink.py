@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Benchmark run event ingest: row-at-a-time INSERT vs the batching sink.
+
+Requires a migrated Postgres (see scripts/migrate.py):
+
+    DATABASE_URL=... python benchmarks/bench_event_sink.py --events 50000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "packages", "core", "src"))
+
+from sqlalchemy import text
+
+from agent_runtime_core.db import get_engine
+from agent_runtime_core.events import RunEventSink
+from agent_runtime_core.events.sink import EVENT_COLUMNS, INSERT_EVENT, _to_record
+from agent_runtime_core.models import RunEvent
+
+
+async def seed_run(engine) -> tuple[uuid.UUID, uuid.UUID]:
+    """Create a tenant/agent/version/run chain and return (tenant_id, run_id)."""
+    tenant_id, agent_id, version_id, run_id = (uuid.uuid4() for _ in range(4))
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("INSERT INTO tenants (id, name, slug) VALUES (:id, 'bench', :slug)"),
+            {"id": tenant_id, "slug": f"bench-{tenant_id.hex[:12]}"},
+        )
+        await conn.execute(
+            text("INSERT INTO agents (id, tenant_id, name) VALUES (:id, :t, 'bench')"),
+            {"id": agent_id, "t": tenant_id},
+        )
+        await conn.execute(
+            text("INSERT INTO agent_versions (id, agent_id, version) VALUES (:id, :a, '1')"),
+            {"id": version_id, "a": agent_id},
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO runs (id, tenant_id, agent_id, agent_version_id) "
+                "VALUES (:id, :t, :a, :v)"
+            ),
+            {"id": run_id, "t": tenant_id, "a": agent_id, "v": version_id},
+        )
+    return tenant_id, run_id
+
+
+def make_events(run_id: uuid.UUID, count: int) -> list[RunEvent]:
+    return [
+        RunEvent(run_id=run_id, event_type="step", data={"seq": i, "message": "x" * 64})
+        for i in range(count)
+    ]
+
+
+async def row_at_a_time(engine, events: list[RunEvent], producers: int) -> float:
+    """Each producer commits one INSERT per event."""
+
+    async def produce(chunk: list[RunEvent]) -> None:
+        for event in chunk:
+            async with engine.begin() as conn:
+                await conn.execute(INSERT_EVENT, dict(zip(EVENT_COLUMNS, _to_record(event))))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(produce(events[i::producers]) for i in range(producers)))
+    return time.perf_counter() - start
+
+
+async def batched(engine, events: list[RunEvent], producers: int, use_copy: bool) -> float:
+    """Producers emit into a shared sink; time includes the final flush."""
+    sink = RunEventSink(engine, use_copy=use_copy)
+    await sink.start()
+
+    async def produce(chunk: list[RunEvent]) -> None:
+        for event in chunk:
+            await sink.emit(event)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(produce(events[i::producers]) for i in range(producers)))
+    await sink.close()
+    return time.perf_counter() - start
+
+
+async def main(count: int, producers: int) -> None:
+    engine = get_engine()
+    tenant_id, run_id = await seed_run(engine)
+    try:
+        results = {
+            "row-at-a-time": await row_at_a_time(engine, make_events(run_id, count), producers),
+            "sink (multi-row insert)": await batched(
+                engine, make_events(run_id, count), producers, use_copy=False
+            ),
+            "sink (COPY)": await batched(engine, make_events(run_id, count), producers, use_copy=True),
+        }
+        print(f"\n{count:,} events, {producers} producers")
+        print(f"{'mode':<26} {'seconds':>10} {'events/sec':>14}")
+        for mode, elapsed in results.items():
+            print(f"{mode:<26} {elapsed:>10.3f} {count / elapsed:>14,.0f}")
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text("DELETE FROM tenants WHERE id = :id"), {"id": tenant_id})
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=50_000)
+    parser.add_argument("--producers", type=int, default=16)
+    args = parser.parse_args()
+    asyncio.run(main(args.events, args.producers))
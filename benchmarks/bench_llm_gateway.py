@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Benchmark the LLM provider gateway against a local mock provider.
+
+The mock provider serves up to --capacity requests concurrently. Above that
+its latency climbs with load, and beyond twice that it answers 429. The
+benchmark sends the same burst of requests two ways:
+
+- naive: unbounded concurrency, with exponential backoff after each 429
+- gateway: through ProviderGateway (adaptive concurrency, token buckets)
+
+It reports wall time, 429 count and latency percentiles for each.
+
+    python benchmarks/bench_llm_gateway.py --requests 2000 --concurrency 500
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "packages", "core", "src"))
+sys.path.insert(0, os.path.join(ROOT, "services", "worker", "src"))
+
+import httpx
+
+from agent_runtime_worker.llm.gateway import EndpointConfig, ProviderGateway, RateLimitedError
+
+BODY = ("data: " + json.dumps({"choices": [{"delta": {"content": "ok"}}]}) + "\n\ndata: [DONE]\n\n").encode()
+
+
+class MockProvider:
+    """Simulated provider with a fixed concurrency capacity."""
+
+    def __init__(self, capacity: int, base_latency: float) -> None:
+        self.capacity = capacity
+        self.base_latency = base_latency
+        self.in_flight = 0
+        self.rejected = 0
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        if self.in_flight >= self.capacity * 2:
+            self.rejected += 1
+            return httpx.Response(429, headers={"retry-after": "0.2"})
+        self.in_flight += 1
+        try:
+            overload = max(1.0, self.in_flight / self.capacity)
+            await asyncio.sleep(self.base_latency * overload**2)
+            return httpx.Response(200, content=BODY, headers={"content-type": "text/event-stream"})
+        finally:
+            self.in_flight -= 1
+
+
+def percentile(values: list[float], pct: float) -> float:
+    return statistics.quantiles(values, n=100)[pct - 1] if len(values) > 1 else values[0]
+
+
+async def run_naive(provider: MockProvider, requests: int, concurrency: int) -> list[float]:
+    client = httpx.AsyncClient(base_url="http://mock/", transport=httpx.MockTransport(provider.handle))
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            backoff = 0.1
+            while True:
+                response = await client.post("chat/completions", json={})
+                if response.status_code != 429:
+                    break
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 5.0)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    await client.aclose()
+    return latencies
+
+
+async def run_gateway(provider: MockProvider, requests: int, concurrency: int) -> list[float]:
+    gateway = ProviderGateway(
+        EndpointConfig(base_url="http://mock/", initial_concurrency=8, max_concurrency=concurrency),
+        transport=httpx.MockTransport(provider.handle),
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            while True:
+                try:
+                    async with gateway.stream("POST", "chat/completions", json={}) as response:
+                        await response.aread()
+                    break
+                except RateLimitedError:
+                    continue
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    await gateway.close()
+    return latencies
+
+
+async def main(requests: int, concurrency: int, capacity: int, latency: float) -> None:
+    print(f"{requests} requests, client concurrency {concurrency}, provider capacity {capacity}\n")
+    print(f"{'mode':<10} {'wall s':>8} {'429s':>6} {'p50 ms':>9} {'p99 ms':>9}")
+    for name, runner in (("naive", run_naive), ("gateway", run_gateway)):
+        provider = MockProvider(capacity, latency)
+        start = time.perf_counter()
+        latencies = await runner(provider, requests, concurrency)
+        wall = time.perf_counter() - start
+        print(
+            f"{name:<10} {wall:>8.2f} {provider.rejected:>6} "
+            f"{percentile(latencies, 50) * 1000:>9.1f} {percentile(latencies, 99) * 1000:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--capacity", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.05, help="Base provider latency (s)")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.capacity, args.latency))
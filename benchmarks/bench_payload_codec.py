@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Benchmark workflow history size and replay time with and without the payload codec.
+
+Runs AgentRunWorkflow for --turns turns against a local Temporal dev
+server with stub activities. Each tool call returns a --result-kb document
+of compressible text, like a fetched web page. The workflow runs twice:
+with the default data converter, and with OffloadingPayloadCodec backed
+by a LocalObjectStore in a temporary directory. For each run the
+benchmark reports the history size in bytes and the replay time.
+
+    python benchmarks/bench_payload_codec.py --turns 10 --result-kb 64
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "packages", "core", "src"))
+sys.path.insert(0, os.path.join(ROOT, "services", "worker", "src"))
+
+from temporalio import activity
+from temporalio.converter import DataConverter
+from temporalio.testing import WorkflowEnvironment
+from temporalio.worker import Replayer, Worker
+
+from agent_runtime_core.storage import LocalObjectStore
+from agent_runtime_core.temporal import OffloadingPayloadCodec
+from agent_runtime_worker.activities import (
+    LLMCallInput,
+    LLMCallOutput,
+    ToolCall,
+    ToolExecInput,
+    RunStatusInput,
+    ToolExecOutput,
+)
+from agent_runtime_worker.queues import llm_queue, tools_queue
+from agent_runtime_worker.workflows import AgentRunInput, AgentRunWorkflow
+
+TASK_QUEUE = "bench-codec"
+WORDS = ["agent", "runtime", "temporal", "payload", "history", "replay", "tool", "result"]
+
+
+def make_activities(turns: int, result_kb: int) -> list:
+    @activity.defn(name="call_llm")
+    async def call_llm(input: LLMCallInput) -> LLMCallOutput:
+        # Tool call IDs carry the turn; older results may have been compacted away
+        last = next((m for m in reversed(input.messages or []) if m.role == "tool"), None)
+        done = int(last.tool_call_id.split("-")[1]) + 1 if last else 0
+        if done >= turns:
+            return LLMCallOutput(content="finished", model=input.model)
+        return LLMCallOutput(
+            content="",
+            model=input.model,
+            tool_calls=[ToolCall(id=f"call-{done}", name="fetch", arguments={"page": done})],
+        )
+
+    @activity.defn(name="execute_tool")
+    async def execute_tool(input: ToolExecInput) -> ToolExecOutput:
+        rng = random.Random(input.tool_input["page"])
+        words = result_kb * 1024 // 8
+        return ToolExecOutput(success=True, result=" ".join(rng.choices(WORDS, k=words)))
+
+    @activity.defn(name="record_run_status")
+    async def record_run_status(input: RunStatusInput) -> None:
+        pass
+
+    return [call_llm, execute_tool, record_run_status]
+
+
+async def measure(name: str, converter: DataConverter, turns: int, result_kb: int) -> None:
+    async with await WorkflowEnvironment.start_local(data_converter=converter) as env:
+        workflow_id = f"bench-codec-{uuid.uuid4()}"
+        call_llm, execute_tool, record_run_status = make_activities(turns, result_kb)
+        async with (
+            Worker(
+                env.client,
+                task_queue=TASK_QUEUE,
+                workflows=[AgentRunWorkflow],
+                activities=[record_run_status],
+            ),
+            Worker(env.client, task_queue=llm_queue(TASK_QUEUE), activities=[call_llm]),
+            Worker(env.client, task_queue=tools_queue(TASK_QUEUE), activities=[execute_tool]),
+        ):
+            start = time.perf_counter()
+            handle = await env.client.start_workflow(
+                AgentRunWorkflow.run,
+                AgentRunInput(
+                    run_id=str(uuid.uuid4()),
+                    tenant_id=str(uuid.uuid4()),
+                    agent_id=str(uuid.uuid4()),
+                    agent_version_id=str(uuid.uuid4()),
+                    # Keep the whole run in one history so sizes are comparable
+                    config={"max_turns": turns + 1, "max_history_bytes": 1 << 40},
+                    input={"prompt": "benchmark"},
+                ),
+                id=workflow_id,
+                task_queue=TASK_QUEUE,
+            )
+            await handle.result()
+            elapsed = time.perf_counter() - start
+
+        history = await handle.fetch_history()
+        size = sum(event.ByteSize() for event in history.events)
+        replayer = Replayer(workflows=[AgentRunWorkflow], data_converter=converter)
+        start = time.perf_counter()
+        await replayer.replay_workflow(history)
+        replay = time.perf_counter() - start
+        print(
+            f"{name:<8} {len(history.events):>8} {size / 1024:>11.1f} "
+            f"{elapsed:>8.2f} {replay * 1000:>10.1f}"
+        )
+
+
+async def main(turns: int, result_kb: int) -> None:
+    print(f"{turns} turns, {result_kb} KB tool results\n")
+    print(f"{'codec':<8} {'events':>8} {'history KB':>11} {'run s':>8} {'replay ms':>10}")
+    await measure("none", DataConverter.default, turns, result_kb)
+    with tempfile.TemporaryDirectory() as path:
+        codec = OffloadingPayloadCodec(LocalObjectStore(path))
+        await measure(
+            "offload", dataclasses.replace(DataConverter.default, payload_codec=codec), turns, result_kb
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--result-kb", type=int, default=64)
+    args = parser.parse_args()
+    asyncio.run(main(args.turns, args.result_kb))
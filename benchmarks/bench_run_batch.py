@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""Benchmark bulk run submission: row inserts and workflow starts.
+
+Inserts: writes --runs runs one INSERT at a time (as POST /runs does) and
+then as a single unnest INSERT (as POST /runs/batch does), and reports
+rows per second for each. Requires a migrated Postgres (see
+scripts/migrate.py); skip with --skip-db.
+
+Starts: starts --runs workflows one at a time and then with bounded
+concurrency. By default starts go to an in-process fake client that
+sleeps --start-latency-ms per call. With --temporal they go to a local
+Temporal dev server. No worker is needed, because a start only records
+the workflow.
+
+    DATABASE_URL=... python benchmarks/bench_run_batch.py --runs 10000
+    python benchmarks/bench_run_batch.py --skip-db --temporal --concurrency 64
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "packages", "core", "src"))
+sys.path.insert(0, os.path.join(ROOT, "services", "api", "src"))
+
+from sqlalchemy import text
+
+from agent_runtime_core.db import AsyncSessionLocal, get_engine
+from agent_runtime_core.models import Run
+from agent_runtime_api.services.run_batch import PendingStart, start_runs
+from agent_runtime_api.services.runs import insert_run, insert_runs
+
+
+def make_runs(count: int, tenant_id: uuid.UUID, agent_id: uuid.UUID, version_id: uuid.UUID) -> list[Run]:
+    runs = []
+    for i in range(count):
+        run = Run(
+            tenant_id=tenant_id,
+            agent_id=agent_id,
+            agent_version_id=version_id,
+            input={"prompt": f"task {i}"},
+            idempotency_key=f"bench-{i}",
+        )
+        run.workflow_id = f"run-{run.id}"
+        runs.append(run)
+    return runs
+
+
+async def bench_inserts(count: int) -> None:
+    tenant_id, agent_id, version_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    async with AsyncSessionLocal(bind=get_engine()) as session:
+        await session.execute(
+            text("INSERT INTO tenants (id, name, slug) VALUES (:id, 'bench', :slug)"),
+            {"id": tenant_id, "slug": f"bench-{tenant_id.hex[:12]}"},
+        )
+        await session.execute(
+            text("INSERT INTO agents (id, tenant_id, name) VALUES (:id, :tenant_id, 'bench')"),
+            {"id": agent_id, "tenant_id": tenant_id},
+        )
+        await session.execute(
+            text("INSERT INTO agent_versions (id, agent_id, version) VALUES (:id, :agent_id, '1')"),
+            {"id": version_id, "agent_id": agent_id},
+        )
+        await session.commit()
+
+        try:
+            runs = make_runs(count, tenant_id, agent_id, version_id)
+            start = time.perf_counter()
+            for run in runs:
+                await insert_run(session, run)
+            await session.commit()
+            single = time.perf_counter() - start
+            await session.execute(text("DELETE FROM runs WHERE tenant_id = :id"), {"id": tenant_id})
+            await session.commit()
+
+            runs = make_runs(count, tenant_id, agent_id, version_id)
+            start = time.perf_counter()
+            inserted = await insert_runs(session, runs)
+            await session.commit()
+            batch = time.perf_counter() - start
+            assert len(inserted) == count
+
+            # Resubmitting the same keys inserts nothing
+            start = time.perf_counter()
+            again = await insert_runs(session, make_runs(count, tenant_id, agent_id, version_id))
+            await session.rollback()
+            conflict = time.perf_counter() - start
+            assert not again
+
+            print(f"\nInserting {count:,} runs")
+            print(f"{'mode':<24} {'seconds':>10} {'rows/s':>12}")
+            for mode, elapsed in (
+                ("row at a time", single),
+                ("single unnest INSERT", batch),
+                ("resubmit (all conflict)", conflict),
+            ):
+                print(f"{mode:<24} {elapsed:>10.3f} {count / elapsed:>12,.0f}")
+        finally:
+            await session.execute(text("DELETE FROM tenants WHERE id = :id"), {"id": tenant_id})
+            await session.commit()
+
+
+def fake_start(latency: float):
+    """An in-process stand-in for `start_agent_run` with fixed latency."""
+
+    async def start(run: Run, config: dict) -> str:
+        await asyncio.sleep(latency)
+        return str(uuid.uuid4())
+
+    return start
+
+
+async def temporal_start():
+    """Start workflows on a local Temporal dev server (no worker needed)."""
+    from temporalio.testing import WorkflowEnvironment
+
+    env = await WorkflowEnvironment.start_local()
+    task_queue = f"bench-{uuid.uuid4().hex[:8]}"
+
+    async def start(run: Run, config: dict) -> str:
+        handle = await env.client.start_workflow(
+            "AgentRunWorkflow",
+            {"run_id": str(run.id), "config": config, "input": run.input},
+            id=run.workflow_id,
+            task_queue=task_queue,
+        )
+        return handle.result_run_id
+
+    return env, start
+
+
+async def bench_starts(count: int, concurrency: int, latency: float, temporal: bool) -> None:
+    env = None
+    if temporal:
+        env, start = await temporal_start()
+        target = "local Temporal dev server"
+    else:
+        start = fake_start(latency)
+        target = f"fake client, {latency * 1000:.1f} ms per start"
+
+    try:
+        print(f"\nStarting {count:,} workflows ({target})")
+        print(f"{'concurrency':<12} {'seconds':>10} {'starts/s':>12} {'first result ms':>16}")
+        for limit in (1, concurrency):
+            ids = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+            pending = [PendingStart(i, run, {}) for i, run in enumerate(make_runs(count, *ids))]
+            begin = time.perf_counter()
+            first = None
+            failures = 0
+            async for _, _, error in start_runs(pending, start=start, concurrency=limit):
+                if first is None:
+                    first = time.perf_counter() - begin
+                failures += error is not None
+            elapsed = time.perf_counter() - begin
+            print(f"{limit:<12} {elapsed:>10.3f} {count / elapsed:>12,.0f} {first * 1000:>16.2f}")
+            if failures:
+                print(f"  {failures} starts failed")
+    finally:
+        if env is not None:
+            await env.shutdown()
+
+
+async def main(args: argparse.Namespace) -> None:
+    if not args.skip_db:
+        await bench_inserts(args.runs)
+    await bench_starts(args.runs, args.concurrency, args.start_latency_ms / 1000, args.temporal)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--start-latency-ms", type=float, default=5.0)
+    parser.add_argument("--temporal", action="store_true", help="Use a local Temporal dev server")
+    parser.add_argument("--skip-db", action="store_true", help="Skip the Postgres insert benchmark")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Benchmark run listing latency by page depth: keyset cursor vs OFFSET.
+
+Seeds a throwaway tenant with enough runs to reach the deepest page, walks
+the keyset cursor from page 1 to the last page and reports latency at
+checkpoint depths, alongside the equivalent OFFSET query for comparison.
+
+Requires a migrated Postgres (see scripts/migrate.py):
+
+    DATABASE_URL=... python benchmarks/bench_run_pagination.py --pages 10000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "packages", "core", "src"))
+sys.path.insert(0, os.path.join(ROOT, "services", "api", "src"))
+
+from sqlalchemy import text
+
+from agent_runtime_core.db import AsyncSessionLocal, get_engine
+from agent_runtime_api.services.runs import RUN_COLUMNS, list_runs_page
+
+CHECKPOINTS = (1, 10, 100, 1_000, 10_000)
+
+
+async def seed(session, tenant_id: uuid.UUID, rows: int) -> None:
+    """Create a tenant, agent and version and bulk-insert runs for it."""
+    agent_id, version_id = uuid.uuid4(), uuid.uuid4()
+    await session.execute(
+        text("INSERT INTO tenants (id, name, slug) VALUES (:id, 'bench', :slug)"),
+        {"id": tenant_id, "slug": f"bench-{tenant_id.hex[:12]}"},
+    )
+    await session.execute(
+        text("INSERT INTO agents (id, tenant_id, name) VALUES (:id, :tenant_id, 'bench')"),
+        {"id": agent_id, "tenant_id": tenant_id},
+    )
+    await session.execute(
+        text("INSERT INTO agent_versions (id, agent_id, version) VALUES (:id, :agent_id, '1')"),
+        {"id": version_id, "agent_id": agent_id},
+    )
+    await session.execute(
+        text("""
+            INSERT INTO runs (tenant_id, agent_id, agent_version_id, status, created_at)
+            SELECT :tenant_id, :agent_id, :version_id,
+                   (ARRAY['pending','running','completed','failed'])[1 + g % 4],
+                   NOW() - (g || ' seconds')::interval
+            FROM generate_series(1, :rows) AS g
+        """),
+        {"tenant_id": tenant_id, "agent_id": agent_id, "version_id": version_id, "rows": rows},
+    )
+    await session.commit()
+    await session.execute(text("ANALYZE runs"))
+
+
+async def offset_page(session, tenant_id: uuid.UUID, page: int, limit: int) -> float:
+    """Time a single OFFSET-based page fetch."""
+    start = time.perf_counter()
+    await session.execute(
+        text(
+            f"SELECT {RUN_COLUMNS} FROM runs WHERE tenant_id = :tenant_id "
+            "ORDER BY created_at DESC, id DESC LIMIT :limit OFFSET :offset"
+        ),
+        {"tenant_id": tenant_id, "limit": limit, "offset": (page - 1) * limit},
+    )
+    return time.perf_counter() - start
+
+
+async def main(pages: int, limit: int, keep: bool) -> None:
+    tenant_id = uuid.uuid4()
+    checkpoints = [c for c in CHECKPOINTS if c <= pages]
+
+    async with AsyncSessionLocal(bind=get_engine()) as session:
+        print(f"Seeding {pages * limit:,} runs...")
+        await seed(session, tenant_id, pages * limit)
+
+        try:
+            keyset: dict[int, float] = {}
+            cursor = None
+            for page in range(1, pages + 1):
+                start = time.perf_counter()
+                _, cursor = await list_runs_page(
+                    session, tenant_id=tenant_id, cursor=cursor, limit=limit
+                )
+                keyset[page] = time.perf_counter() - start
+                if cursor is None:
+                    break
+
+            print(f"\n{'page':>8} {'keyset ms':>12} {'offset ms':>12}")
+            for page in checkpoints:
+                # Median of a small window around the checkpoint smooths noise
+                window = [keyset[p] for p in range(page, min(page + 5, pages + 1))]
+                offset = statistics.median(
+                    [await offset_page(session, tenant_id, page, limit) for _ in range(5)]
+                )
+                print(
+                    f"{page:>8} {statistics.median(window) * 1000:>12.3f} "
+                    f"{offset * 1000:>12.3f}"
+                )
+        finally:
+            if not keep:
+                await session.execute(
+                    text("DELETE FROM tenants WHERE id = :id"), {"id": tenant_id}
+                )
+                await session.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=10_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--keep", action="store_true", help="Keep seeded rows")
+    args = parser.parse_args()
+    asyncio.run(main(args.pages, args.limit, args.keep))
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Benchmark tool dispatch overhead: warm sandbox pool vs cold spawn.
+
+Runs the built-in `echo` tool --calls times two ways:
+
+- cold: a fresh interpreter per call that imports the tool modules, runs
+  the tool and pickles the result to stdout
+- pool: SandboxPool.run() against warm, pre-forked processes
+
+Because `echo` does no work, the latencies are pure dispatch overhead.
+
+    python benchmarks/bench_sandbox_pool.py --calls 500 --concurrency 4
+"""
+
+import argparse
+import asyncio
+import os
+import pickle
+import statistics
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "packages", "core", "src"))
+sys.path.insert(0, os.path.join(ROOT, "services", "worker", "src"))
+
+from agent_runtime_worker.sandbox import SandboxPool
+
+PRELOAD = ["agent_runtime_worker.tools.builtin"]
+
+COLD_SCRIPT = """
+import pickle, sys
+from agent_runtime_worker.tools import get_tool, load_tool_modules
+load_tool_modules({modules!r})
+tool_input = pickle.loads(sys.stdin.buffer.read())
+sys.stdout.buffer.write(pickle.dumps(get_tool("echo").func(**tool_input)))
+"""
+
+
+def percentile(values: list[float], pct: int) -> float:
+    return statistics.quantiles(values, n=100)[pct - 1] if len(values) > 1 else values[0]
+
+
+async def run_cold(calls: int, concurrency: int, payload: dict) -> list[float]:
+    script = COLD_SCRIPT.format(modules=PRELOAD)
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            proc = await asyncio.create_subprocess_exec(
+                sys.executable, "-c", script,
+                stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, env=env,
+            )
+            out, _ = await proc.communicate(pickle.dumps(payload))
+            pickle.loads(out)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(calls)))
+    return latencies
+
+
+async def run_pool(calls: int, concurrency: int, payload: dict) -> list[float]:
+    pool = SandboxPool(concurrency, preload_modules=PRELOAD)
+    await pool.start()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            result = await pool.run("echo", payload, timeout=10)
+            assert result.success, result.error
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(calls)))
+    await pool.close()
+    return latencies
+
+
+async def main(calls: int, concurrency: int, payload_kb: int) -> None:
+    payload = {"data": "x" * payload_kb * 1024}
+    print(f"{calls} calls, concurrency {concurrency}, {payload_kb} KB payload\n")
+    print(f"{'mode':<6} {'wall s':>8} {'p50 ms':>9} {'p99 ms':>9}")
+    for name, runner in (("cold", run_cold), ("pool", run_pool)):
+        start = time.perf_counter()
+        latencies = await runner(calls, concurrency, payload)
+        wall = time.perf_counter() - start
+        print(
+            f"{name:<6} {wall:>8.2f} "
+            f"{percentile(latencies, 50) * 1000:>9.2f} {percentile(latencies, 99) * 1000:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--payload-kb", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.concurrency, args.payload_kb))
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Benchmark recall and latency of the vector memory IVF index on CPU.
+
+Inserts --vectors clustered random vectors in batches of --batch, as
+incremental inserts into an IVFIndex on local disk (merges and retraining
+included), then searches --queries held-out vectors from the same
+distribution. For each nprobe it reports recall@k against exact search,
+throughput with all queries in one batch, and per-query latency when
+queries are sent one at a time.
+
+    python benchmarks/bench_vector_memory.py --vectors 1000000 --dim 128
+    python benchmarks/bench_vector_memory.py --vectors 100000 --nprobe 1 8 32
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "packages", "core", "src"))
+
+from agent_runtime_core.memory import IVFIndex
+
+
+def clustered(rng: np.random.Generator, count: int, centers: np.ndarray, spread: float) -> np.ndarray:
+    """Vectors scattered around random centers, like embeddings of related texts."""
+    picks = rng.integers(len(centers), size=count)
+    noise = rng.standard_normal((count, centers.shape[1]), dtype=np.float32)
+    return centers[picks] + spread * noise
+
+
+def exact(index_vectors: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """IDs of the true top k by cosine similarity, in chunks of the data."""
+    q = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    best_scores = np.full((len(q), k), -np.inf, dtype=np.float32)
+    best_ids = np.zeros((len(q), k), dtype=np.int64)
+    for start in range(0, len(index_vectors), 100_000):
+        chunk = index_vectors[start : start + 100_000]
+        chunk = chunk / np.linalg.norm(chunk, axis=1, keepdims=True)
+        scores = np.hstack((best_scores, q @ chunk.T))
+        ids = np.hstack((best_ids, np.broadcast_to(np.arange(start, start + len(chunk)), (len(q), len(chunk)))))
+        top = np.argpartition(scores, -k, axis=1)[:, -k:]
+        best_scores = np.take_along_axis(scores, top, axis=1)
+        best_ids = np.take_along_axis(ids, top, axis=1)
+    return best_ids
+
+
+def recall(found: np.ndarray, truth: np.ndarray) -> float:
+    return float(np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vectors", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--batch", type=int, default=10_000, help="Vectors per insert")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--single", type=int, default=200, help="Queries timed one at a time")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32, 64])
+    parser.add_argument("--clusters", type=int, default=10_000, help="Centers the data is drawn around")
+    parser.add_argument("--spread", type=float, default=1.0, help="Noise around each center, relative to it")
+    parser.add_argument("--path", help="Where to create the index (default: the temp directory)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((args.clusters, args.dim), dtype=np.float32)
+    data = clustered(rng, args.vectors, centers, args.spread)
+    queries = clustered(rng, args.queries, centers, args.spread)
+
+    with tempfile.TemporaryDirectory(prefix="bench-memory-", dir=args.path) as path:
+        index = IVFIndex(path, dim=args.dim)
+        slowest = 0.0
+        start = time.perf_counter()
+        for offset in range(0, args.vectors, args.batch):
+            t = time.perf_counter()
+            index.add(data[offset : offset + args.batch])
+            slowest = max(slowest, time.perf_counter() - t)
+        elapsed = time.perf_counter() - start
+        meta = index.meta
+        size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+        print(
+            f"{args.vectors} x {args.dim} vectors in batches of {args.batch}: "
+            f"{args.vectors / elapsed:,.0f} vectors/s, slowest insert {slowest:.2f}s "
+            f"(merges included)"
+        )
+        print(
+            f"{meta.nlist} lists, {meta.main_count} vectors in main, "
+            f"{meta.count - meta.main_count} in tail, {size / 2**20:,.0f} MiB on disk\n"
+        )
+
+        start = time.perf_counter()
+        truth = exact(data, queries, args.k)
+        print(f"exact search of {args.queries} queries: {time.perf_counter() - start:.2f}s\n")
+
+        print(f"{'nprobe':>6} {f'recall@{args.k}':>10} {'batch q/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+        for nprobe in args.nprobe:
+            start = time.perf_counter()
+            _, ids = index.search(queries, args.k, nprobe)
+            batch_qps = args.queries / (time.perf_counter() - start)
+            latencies = []
+            for query in queries[: args.single]:
+                t = time.perf_counter()
+                index.search(query, args.k, nprobe)
+                latencies.append(time.perf_counter() - t)
+            p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+            print(f"{nprobe:>6} {recall(ids, truth):>10.3f} {batch_qps:>10,.0f} {p50:>8.2f} {p99:>8.2f}")
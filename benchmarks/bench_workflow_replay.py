@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Measure AgentRunWorkflow replay cost for long agent loops.
+
+Runs a --turns-turn agent (each turn is one LLM call requesting one tool
+call) against a local Temporal dev server with stub activities. The
+workflow continues as new every --max-history-events events. Each workflow
+run in the resulting chain is then replayed, and its history size and
+replay time are reported.
+
+With continue-as-new, the per-run replay cost (the cost of rebuilding a
+workflow after cache eviction) stays flat as --turns grows; only the
+number of runs grows.
+
+    python benchmarks/bench_workflow_replay.py --turns 1000 --max-history-events 2000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "packages", "core", "src"))
+sys.path.insert(0, os.path.join(ROOT, "services", "worker", "src"))
+
+from temporalio import activity
+from temporalio.testing import WorkflowEnvironment
+from temporalio.worker import Replayer, Worker
+
+from agent_runtime_worker.activities import (
+    LLMCallInput,
+    LLMCallOutput,
+    ToolCall,
+    ToolExecInput,
+    RunStatusInput,
+    ToolExecOutput,
+)
+from agent_runtime_worker.queues import llm_queue, tools_queue
+from agent_runtime_worker.workflows import AgentRunInput, AgentRunWorkflow
+
+TASK_QUEUE = "bench-replay"
+
+
+def make_activities(turns: int) -> list:
+    @activity.defn(name="call_llm")
+    async def call_llm(input: LLMCallInput) -> LLMCallOutput:
+        # Tool call IDs carry the turn; older results may have been compacted away
+        last = next((m for m in reversed(input.messages or []) if m.role == "tool"), None)
+        done = int(last.tool_call_id.split("-")[1]) + 1 if last else 0
+        if done >= turns:
+            return LLMCallOutput(content="finished", model=input.model)
+        return LLMCallOutput(
+            content="",
+            model=input.model,
+            tool_calls=[ToolCall(id=f"call-{done}", name="echo", arguments={"turn": done})],
+        )
+
+    @activity.defn(name="execute_tool")
+    async def execute_tool(input: ToolExecInput) -> ToolExecOutput:
+        return ToolExecOutput(success=True, result=input.tool_input)
+
+    @activity.defn(name="record_run_status")
+    async def record_run_status(input: RunStatusInput) -> None:
+        pass
+
+    return [call_llm, execute_tool, record_run_status]
+
+
+async def main(turns: int, max_history_events: int) -> None:
+    async with await WorkflowEnvironment.start_local() as env:
+        workflow_id = f"bench-replay-{uuid.uuid4()}"
+        call_llm, execute_tool, record_run_status = make_activities(turns)
+        async with (
+            Worker(
+                env.client,
+                task_queue=TASK_QUEUE,
+                workflows=[AgentRunWorkflow],
+                activities=[record_run_status],
+            ),
+            Worker(env.client, task_queue=llm_queue(TASK_QUEUE), activities=[call_llm]),
+            Worker(env.client, task_queue=tools_queue(TASK_QUEUE), activities=[execute_tool]),
+        ):
+            start = time.perf_counter()
+            result = await env.client.execute_workflow(
+                AgentRunWorkflow.run,
+                AgentRunInput(
+                    run_id=str(uuid.uuid4()),
+                    tenant_id=str(uuid.uuid4()),
+                    agent_id=str(uuid.uuid4()),
+                    agent_version_id=str(uuid.uuid4()),
+                    config={"max_turns": turns + 1, "max_history_events": max_history_events},
+                    input={"prompt": "benchmark"},
+                ),
+                id=workflow_id,
+                task_queue=TASK_QUEUE,
+            )
+            elapsed = time.perf_counter() - start
+        print(f"{turns} turns finished with status {result.status} in {elapsed:.1f}s\n")
+
+        runs = [
+            execution
+            async for execution in env.client.list_workflows(f"WorkflowId = '{workflow_id}'")
+        ]
+        runs.sort(key=lambda execution: execution.start_time)
+        replayer = Replayer(workflows=[AgentRunWorkflow])
+
+        print(f"{'run':>4} {'events':>8} {'KB':>8} {'replay ms':>10}")
+        for i, execution in enumerate(runs):
+            history = await env.client.get_workflow_handle(
+                workflow_id, run_id=execution.run_id
+            ).fetch_history()
+            size = sum(event.ByteSize() for event in history.events)
+            start = time.perf_counter()
+            await replayer.replay_workflow(history)
+            replay_ms = (time.perf_counter() - start) * 1000
+            print(f"{i:>4} {len(history.events):>8} {size / 1024:>8.1f} {replay_ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=1000)
+    parser.add_argument("--max-history-events", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.turns, args.max_history_events))
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""Simulate admission control: can a noisy tenant hurt a quiet tenant?
+
+Drives the real admission scripts against Redis with simulated runs. A
+quiet tenant submits one run every --quiet-interval-ms. A noisy tenant
+dumps --noisy-burst runs at once and keeps submitting at --noisy-rate per
+second, far beyond the --capacity runs the deployment may run at once. A
+run takes --run-ms, give or take --run-jitter, then releases its slot. The
+dispatcher polls every --dispatch-interval-ms, like the API's RunDispatcher.
+
+The quiet tenant's start latency (submission to start) is measured in
+three scenarios, leaving out runs submitted in the first --warmup-seconds
+while this process is busy sending the noisy burst:
+
+- alone: the quiet tenant has the deployment to itself.
+- fair: the noisy tenant is active, with per-tenant weighted fair release.
+- fifo: the noisy tenant is active and all runs share one queue, as they
+  would without admission control.
+
+The script exits non-zero if the noisy tenant raises the quiet tenant's
+p99 in the fair scenario by more than the longest run duration plus two
+dispatch intervals. That is the longest a run can wait for the next slot
+to free and be released.
+
+    REDIS_URL=redis://localhost:6379/0 python benchmarks/sim_admission.py
+
+packages/core/tests/test_admission.py runs the same scenarios, shortened,
+and asserts the same target.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "packages", "core", "src"))
+
+from redis.asyncio import Redis
+
+from agent_runtime_core.admission import AdmissionController
+from agent_runtime_core.models import RunPriority
+
+
+async def simulate(redis: Redis, args: argparse.Namespace, *, noisy: bool, fair: bool) -> list[float]:
+    """Run one scenario; returns the quiet tenant's start latencies in seconds."""
+    prefix = f"{{admission-sim-{uuid.uuid4().hex[:8]}}}:"
+    controller = AdmissionController(redis, max_running=args.capacity, prefix=prefix)
+    quiet_tenant, noisy_tenant = uuid.uuid4(), uuid.uuid4()
+    if not fair:
+        # One shared tenant is one shared FIFO queue
+        noisy_tenant = quiet_tenant
+    # Runs last anywhere in run_ms +/- jitter; identical runs would all end
+    # together and turn capacity into synchronized waves
+    rng = random.Random(0)
+    run_seconds = args.run_ms / 1000
+    jitter = args.run_jitter * run_seconds
+    submitted: dict[uuid.UUID, tuple[bool, float]] = {}
+    latencies: list[float] = []
+    tasks: set[asyncio.Task] = set()
+    stop = asyncio.Event()
+
+    async def finish(run_id: uuid.UUID) -> None:
+        await asyncio.sleep(rng.uniform(run_seconds - jitter, run_seconds + jitter))
+        await controller.release(run_id)
+
+    measure_from = time.perf_counter() + args.warmup_seconds
+
+    def start(run_id: uuid.UUID) -> None:
+        is_quiet, submitted_at = submitted.pop(run_id)
+        if is_quiet and submitted_at >= measure_from:
+            latencies.append(time.perf_counter() - submitted_at)
+        task = asyncio.create_task(finish(run_id))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    async def submit(tenant: uuid.UUID, is_quiet: bool, count: int = 1) -> None:
+        run_ids = [uuid.uuid4() for _ in range(count)]
+        now = time.perf_counter()
+        for run_id in run_ids:
+            submitted[run_id] = (is_quiet, now)
+        admitted = await controller.admit(
+            tenant, run_ids, RunPriority.INTERACTIVE, limit=args.tenant_limit
+        )
+        for run_id, ok in zip(run_ids, admitted):
+            if ok:
+                start(run_id)
+
+    async def dispatcher() -> None:
+        while not stop.is_set():
+            released = await controller.dispatch(256)
+            for item in released:
+                start(item.run_id)
+            if len(released) < 256:
+                await asyncio.sleep(args.dispatch_interval_ms / 1000)
+
+    async def quiet() -> None:
+        while not stop.is_set():
+            await submit(quiet_tenant, True)
+            await asyncio.sleep(args.quiet_interval_ms / 1000)
+
+    async def noisy_producer() -> None:
+        await submit(noisy_tenant, False, args.noisy_burst)
+        while not stop.is_set():
+            await asyncio.sleep(0.1)
+            await submit(noisy_tenant, False, max(1, args.noisy_rate // 10))
+
+    producers = [asyncio.create_task(dispatcher()), asyncio.create_task(quiet())]
+    if noisy:
+        producers.append(asyncio.create_task(noisy_producer()))
+    try:
+        await asyncio.sleep(args.seconds)
+    finally:
+        # Loops stop at their next turn; cancelling one mid-pipeline can leave it running
+        stop.set()
+        await asyncio.gather(*producers, return_exceptions=True)
+        for task in list(tasks):
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        keys = [key async for key in redis.scan_iter(match=f"{prefix}*")]
+        if keys:
+            await redis.delete(*keys)
+    return latencies
+
+
+def percentile(values: list[float], q: float) -> float:
+    if len(values) < 2:
+        return values[0] if values else float("nan")
+    return statistics.quantiles(values, n=100, method="inclusive")[int(q) - 1]
+
+
+def budget_seconds(args: argparse.Namespace) -> float:
+    """Longest a quiet run may wait for the next slot to free and be released."""
+    return (args.run_ms * (1 + args.run_jitter) + 2 * args.dispatch_interval_ms) / 1000
+
+
+def check(results: dict[str, list[float]], args: argparse.Namespace) -> str | None:
+    """Why the scenarios miss the fairness target, or None if they meet it."""
+    # Without admission control the quiet tenant may start nothing at all
+    if not results["alone"] or not results["fair"]:
+        return "a scenario with admission control started no quiet runs"
+    budget = budget_seconds(args)
+    increase = percentile(results["fair"], 99) - percentile(results["alone"], 99)
+    if increase > budget:
+        return f"noisy tenant raised quiet p99 by {increase * 1000:.1f} ms (budget {budget * 1000:.0f} ms)"
+    return None
+
+
+async def run_scenarios(redis: Redis, args: argparse.Namespace) -> dict[str, list[float]]:
+    """The quiet tenant's start latencies in each scenario."""
+    results = {}
+    for name, noisy, fair in (("alone", False, True), ("fair", True, True), ("fifo", True, False)):
+        results[name] = await simulate(redis, args, noisy=noisy, fair=fair)
+    return results
+
+
+async def main(args: argparse.Namespace) -> int:
+    redis = Redis.from_url(os.environ.get("REDIS_URL", "redis://localhost:6379/0"))
+    try:
+        results = await run_scenarios(redis, args)
+    finally:
+        await redis.aclose()
+
+    print(
+        f"capacity={args.capacity} run={args.run_ms}ms dispatch={args.dispatch_interval_ms}ms "
+        f"noisy burst={args.noisy_burst} rate={args.noisy_rate}/s"
+    )
+    print(f"\n{'scenario':<10} {'quiet runs':>11} {'p50 ms':>10} {'p99 ms':>10} {'max ms':>10}")
+    for name, latencies in results.items():
+        print(
+            f"{name:<10} {len(latencies):>11} {percentile(latencies, 50) * 1000:>10.1f} "
+            f"{percentile(latencies, 99) * 1000:>10.1f} {max(latencies, default=0) * 1000:>10.1f}"
+        )
+
+    failure = check(results, args)
+    if failure:
+        print(f"\nFAIL: {failure}")
+        return 1
+    increase = percentile(results["fair"], 99) - percentile(results["alone"], 99)
+    print(f"\nOK: quiet p99 rose by {increase * 1000:.1f} ms (budget {budget_seconds(args) * 1000:.0f} ms)")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=20.0, help="Length of each scenario")
+    parser.add_argument("--warmup-seconds", type=float, default=1.0, help="Unmeasured start of each scenario")
+    parser.add_argument("--capacity", type=int, default=50, help="Global concurrent run limit")
+    parser.add_argument("--tenant-limit", type=int, default=0, help="Per-tenant limit (0 = none)")
+    parser.add_argument("--run-ms", type=float, default=200.0)
+    parser.add_argument("--run-jitter", type=float, default=0.5, help="Run length spread, as a fraction of --run-ms")
+    parser.add_argument("--dispatch-interval-ms", type=float, default=20.0)
+    parser.add_argument("--quiet-interval-ms", type=float, default=50.0)
+    parser.add_argument("--noisy-burst", type=int, default=5000)
+    parser.add_argument("--noisy-rate", type=int, default=1000, help="Noisy runs per second")
+    return parser
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(build_parser().parse_args())))
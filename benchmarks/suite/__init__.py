@@ -0,0 +1,30 @@
+"""End-to-end benchmark suite for the API and worker hot paths.
+
+Each benchmark runs the real application code in process, with stand-ins
+for what surrounds it (see fakes.py):
+
+- api: the FastAPI app from main.py through an ASGI client, starting
+  workflows on a fake Temporal frontend. Create-run throughput, run start
+  latency (POST to workflow start) and GET /runs/{id} latency.
+- events: RunEventSink writing into Postgres. Event ingest rate.
+- worker: AgentRunWorkflow and its activities, built by worker.py's
+  build_workers, on Temporal's local test server with a fake model and
+  the bench_work tool in the real sandbox pool. Run latency, per-activity
+  overhead and workflow replay time.
+- e2e: runs submitted to the API and executed by those workers.
+
+Postgres is an embedded PostgreSQL server and Redis is fakeredis, unless
+--database-url / --redis-url point at real ones. Needs httpx, pgserver,
+fakeredis and lupa; the worker benchmarks download the Temporal dev server
+on first use.
+
+Results are JSON (--output). `compare` prints the change of every metric
+and exits non-zero when one is worse than --threshold:
+
+    python -m benchmarks.suite run --output base.json
+    python -m benchmarks.suite run --only api,events --runs 500 --concurrency 32
+    python -m benchmarks.suite compare base.json new.json --threshold 0.1
+
+Compare result sets measured with the same parameters (recorded under
+meta.params) on the same machine.
+"""
@@ -0,0 +1,122 @@
+"""Command line for the benchmark suite; see the package docstring."""
+
+import argparse
+import asyncio
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "packages", "core", "src"))
+sys.path.insert(0, os.path.join(ROOT, "services", "worker", "src"))
+sys.path.insert(0, os.path.join(ROOT, "services", "api", "src"))
+
+from benchmarks.suite.results import ResultSet, compare, environment_meta, print_comparison
+
+BENCHMARKS = ("api", "events", "worker", "e2e")
+
+
+async def run(args: argparse.Namespace) -> ResultSet:
+    # Imported here: the app modules read settings, which the environment sets up first
+    from benchmarks.suite.environment import bench_environment
+
+    only = set(args.only.split(","))
+    unknown = only - set(BENCHMARKS)
+    if unknown:
+        raise SystemExit(f"Unknown benchmarks: {sorted(unknown)}")
+
+    results = ResultSet(
+        meta=environment_meta()
+        | {
+            "params": {
+                key: value
+                for key, value in vars(args).items()
+                if key not in ("command", "output", "database_url", "redis_url")
+            }
+        }
+    )
+    async with bench_environment(
+        database_url=args.database_url, redis_url=args.redis_url, max_turns=args.turns
+    ) as environment:
+        from benchmarks.suite.api import bench_api, bench_end_to_end
+        from benchmarks.suite.events import bench_event_ingest
+        from benchmarks.suite.fakes import FakeLLMProvider
+        from benchmarks.suite.worker import bench_worker, running_workers
+
+        if "api" in only:
+            print("api: creating runs against a fake Temporal frontend", file=sys.stderr)
+            await bench_api(
+                environment,
+                results,
+                runs=args.runs,
+                concurrency=args.concurrency,
+                temporal_latency=args.temporal_latency_ms / 1000,
+            )
+        if "events" in only:
+            print("events: ingesting run events", file=sys.stderr)
+            await bench_event_ingest(environment, results, events=args.events, producers=args.concurrency)
+        if only & {"worker", "e2e"}:
+            provider = FakeLLMProvider(
+                latency=args.llm_latency_ms / 1000,
+                tool_turns=args.turns - 1,
+                tools_per_turn=args.tools_per_turn,
+                tool_sleep_ms=args.tool_latency_ms,
+                tool_result_kb=args.tool_result_kb,
+            )
+            async with running_workers(provider) as client:
+                if "worker" in only:
+                    print("worker: running workflows on the local Temporal server", file=sys.stderr)
+                    await bench_worker(environment, results, client=client, provider=provider, runs=args.runs)
+                if "e2e" in only:
+                    print("e2e: runs from POST /runs/ to workflow result", file=sys.stderr)
+                    await bench_end_to_end(
+                        environment, results, client=client, runs=args.runs, concurrency=args.concurrency
+                    )
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description="Agent runtime benchmark suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run benchmarks and write a result set")
+    run_parser.add_argument("--only", default=",".join(BENCHMARKS), help="Comma-separated subset of " + ", ".join(BENCHMARKS))
+    run_parser.add_argument("--output", help="Write the results as JSON to this file")
+    run_parser.add_argument("--runs", type=int, default=200, help="Runs per benchmark")
+    run_parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients or event producers")
+    run_parser.add_argument("--events", type=int, default=50_000, help="Events to ingest")
+    run_parser.add_argument("--turns", type=int, default=3, help="Model calls per run; all but the last call tools")
+    run_parser.add_argument("--tools-per-turn", type=int, default=1)
+    run_parser.add_argument("--tool-result-kb", type=int, default=1)
+    run_parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Fake model latency per call")
+    run_parser.add_argument("--tool-latency-ms", type=float, default=0.0, help="Fake tool time per call")
+    run_parser.add_argument("--temporal-latency-ms", type=float, default=0.0, help="Fake workflow start latency (api only)")
+    run_parser.add_argument("--database-url", help="Use this Postgres instead of an embedded one")
+    run_parser.add_argument("--redis-url", help="Use this Redis instead of fakeredis")
+
+    compare_parser = commands.add_parser("compare", help="Compare two result sets")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="Relative change flagged as a regression")
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        base, new = ResultSet.load(args.base), ResultSet.load(args.new)
+        if base.meta.get("params") != new.meta.get("params"):
+            print("warning: the result sets were measured with different parameters\n", file=sys.stderr)
+        regressions = print_comparison(compare(base, new), args.threshold)
+        if regressions:
+            print(f"\n{regressions} regression(s) beyond {args.threshold:.0%}")
+        return 1 if regressions else 0
+
+    if args.turns < 1:
+        parser.error("--turns must be at least 1")
+    results = asyncio.run(run(args))
+    results.print_table()
+    if args.output:
+        results.save(args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
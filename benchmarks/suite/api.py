@@ -0,0 +1,138 @@
+"""The FastAPI app from main.py, driven through an in-process ASGI client."""
+
+import asyncio
+import time
+from collections.abc import Callable
+from typing import Any
+
+from .environment import BenchEnvironment
+from .fakes import FakeTemporalClient, TimedTemporalClient, install_temporal_client
+from .results import ResultSet
+
+WARMUP_RUNS = 20
+
+
+async def create_runs(
+    http,
+    environment: BenchEnvironment,
+    count: int,
+    concurrency: int,
+    on_created: Callable[[str], None] | None = None,
+) -> tuple[list[str], dict[str, float]]:
+    """POST `count` runs with `concurrency` in flight; returns the run IDs and when each was submitted."""
+    submitted: dict[str, float] = {}
+    run_ids: list[str] = []
+    pending = iter(range(count))
+
+    async def submit() -> None:
+        for i in pending:
+            start = time.perf_counter()
+            response = await http.post(
+                "/runs/",
+                params={"tenant_id": str(environment.tenant_id)},
+                json={"agent_version_id": str(environment.agent_version_id), "input": {"task": f"bench {i}"}},
+            )
+            if response.status_code != 202:
+                raise RuntimeError(f"POST /runs/ returned {response.status_code}: {response.text}")
+            run_id = response.json()["id"]
+            submitted[run_id] = start
+            run_ids.append(run_id)
+            if on_created is not None:
+                on_created(run_id)
+
+    await asyncio.gather(*(submit() for _ in range(concurrency)))
+    return run_ids, submitted
+
+
+async def bench_api(
+    environment: BenchEnvironment,
+    results: ResultSet,
+    *,
+    runs: int,
+    concurrency: int,
+    temporal_latency: float,
+) -> None:
+    """
+    Create-run throughput and run start latency against a fake Temporal frontend.
+
+    Start latency is from sending POST /runs/ to the workflow start being
+    accepted, which is what a caller waits for before the run can progress.
+    """
+    import httpx
+
+    from agent_runtime_api.main import app
+
+    temporal = TimedTemporalClient(FakeTemporalClient(latency=temporal_latency))
+    install_temporal_client(temporal)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as http:
+            # Fills the agent version cache and the connection pools
+            await create_runs(http, environment, WARMUP_RUNS, concurrency)
+
+            start = time.perf_counter()
+            run_ids, submitted = await create_runs(http, environment, runs, concurrency)
+            elapsed = time.perf_counter() - start
+            results.add("api.create_run.throughput", runs / elapsed, "runs/s", higher_is_better=True)
+            results.add_latencies(
+                "api.run_start.latency",
+                [temporal.started_at[f"run-{run_id}"] - submitted[run_id] for run_id in run_ids],
+            )
+            results.add_latencies("api.get_run.latency", await get_runs(http, run_ids, concurrency))
+
+
+async def get_runs(http, run_ids: list[str], concurrency: int) -> list[float]:
+    """GET each run once; returns the latencies."""
+    latencies: list[float] = []
+    pending = iter(run_ids)
+
+    async def fetch() -> None:
+        for run_id in pending:
+            start = time.perf_counter()
+            response = await http.get(f"/runs/{run_id}")
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(fetch() for _ in range(concurrency)))
+    return latencies
+
+
+async def bench_end_to_end(
+    environment: BenchEnvironment,
+    results: ResultSet,
+    *,
+    client: Any,
+    runs: int,
+    concurrency: int,
+) -> None:
+    """
+    Runs submitted through the API and executed by the workers.
+
+    `client` is a Temporal client whose workers are already running. Latency
+    is from POST /runs/ to the workflow result.
+    """
+    import httpx
+
+    from agent_runtime_api.main import app
+
+    install_temporal_client(client)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as http:
+            finished: dict[str, float] = {}
+            waiting: list[asyncio.Task] = []
+
+            async def wait(run_id: str) -> None:
+                await client.get_workflow_handle(f"run-{run_id}").result()
+                finished[run_id] = time.perf_counter()
+
+            start = time.perf_counter()
+            run_ids, submitted = await create_runs(
+                http,
+                environment,
+                runs,
+                concurrency,
+                on_created=lambda run_id: waiting.append(asyncio.create_task(wait(run_id))),
+            )
+            await asyncio.gather(*waiting)
+            elapsed = time.perf_counter() - start
+            results.add("e2e.run.throughput", runs / elapsed, "runs/s", higher_is_better=True)
+            results.add_latencies("e2e.run.latency", [finished[r] - submitted[r] for r in run_ids])
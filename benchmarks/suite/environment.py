@@ -0,0 +1,136 @@
+"""Settings, stand-in services and seed data for a suite run."""
+
+import os
+import subprocess
+import sys
+import tempfile
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import ExitStack, asynccontextmanager
+from dataclasses import dataclass
+
+from .fakes import embedded_postgres, install_fake_redis
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+@dataclass
+class BenchEnvironment:
+    """What the benchmarks need to know about the prepared environment."""
+
+    tenant_id: uuid.UUID
+    agent_id: uuid.UUID
+    agent_version_id: uuid.UUID
+    task_queue: str
+    # The agent version's config: how many turns a run takes
+    max_turns: int
+
+
+@asynccontextmanager
+async def bench_environment(
+    *,
+    database_url: str | None,
+    redis_url: str | None,
+    max_turns: int,
+) -> AsyncIterator[BenchEnvironment]:
+    """
+    Configure settings, start the stand-ins and seed one tenant's agent.
+
+    Postgres and Redis are the given URLs, or an embedded PostgreSQL and
+    fakeredis. Must run before anything reads settings, because settings,
+    engines and clients are created once per process.
+    """
+    with ExitStack() as stack:
+        if database_url is None:
+            database_url = stack.enter_context(embedded_postgres())
+        objects = stack.enter_context(tempfile.TemporaryDirectory(prefix="bench-objects-"))
+        task_queue = f"bench-{uuid.uuid4().hex[:8]}"
+        os.environ.update(
+            {
+                "DATABASE_URL": database_url,
+                "DATABASE_REPLICA_URL": "",
+                "TEMPORAL_TASK_QUEUE": task_queue,
+                "OBJECT_STORE_BACKEND": "local",
+                "OBJECT_STORE_LOCAL_PATH": objects,
+                "SANDBOX_PRELOAD_MODULES": "agent_runtime_worker.tools.builtin,benchmarks.suite.tools",
+                # Admission still runs, but never queues: with the fake Temporal
+                # client no run ever ends to give its slot back
+                "ADMISSION_DEFAULT_TENANT_LIMIT": "0",
+            }
+        )
+        if redis_url is not None:
+            os.environ["REDIS_URL"] = redis_url
+        else:
+            install_fake_redis()
+
+        from agent_runtime_core.db import dispose_engines, get_engine
+        from agent_runtime_core.utils import get_settings
+
+        get_settings.cache_clear()
+        migrate(database_url)
+        environment = await seed(get_engine(), task_queue, max_turns)
+        try:
+            yield environment
+        finally:
+            await dispose_engines()
+
+
+def migrate(database_url: str) -> None:
+    """Run scripts/migrate.py against the benchmark database."""
+    result = subprocess.run(
+        [sys.executable, os.path.join(ROOT, "scripts", "migrate.py")],
+        env={**os.environ, "DATABASE_URL": database_url},
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Migration failed:\n{result.stdout[-2000:]}\n{result.stderr[-2000:]}")
+
+
+async def seed(engine, task_queue: str, max_turns: int) -> BenchEnvironment:
+    """Create a tenant with one active agent and version."""
+    from sqlalchemy import text
+
+    tenant_id, agent_id, version_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("INSERT INTO tenants (id, name, slug) VALUES (:id, 'bench', :slug)"),
+            {"id": tenant_id, "slug": f"bench-{tenant_id.hex[:12]}"},
+        )
+        await conn.execute(
+            text("INSERT INTO agents (id, tenant_id, name) VALUES (:id, :t, 'bench')"),
+            {"id": agent_id, "t": tenant_id},
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO agent_versions (id, agent_id, version, config, is_published) "
+                "VALUES (:id, :a, '1', CAST(:config AS jsonb), TRUE)"
+            ),
+            {
+                "id": version_id,
+                "a": agent_id,
+                "config": f'{{"model": "bench", "max_turns": {max_turns}, "temperature": 0.7}}',
+            },
+        )
+    return BenchEnvironment(tenant_id, agent_id, version_id, task_queue, max_turns)
+
+
+async def create_run_rows(engine, environment: BenchEnvironment, count: int) -> list[uuid.UUID]:
+    """Insert pending runs for workflows started without the API."""
+    from sqlalchemy import text
+
+    run_ids = [uuid.uuid4() for _ in range(count)]
+    async with engine.begin() as conn:
+        await conn.execute(
+            text(
+                "INSERT INTO runs (id, tenant_id, agent_id, agent_version_id, workflow_id) "
+                "SELECT id, :t, :a, :v, 'run-' || id FROM unnest(CAST(:ids AS uuid[])) AS id"
+            ),
+            {
+                "ids": run_ids,
+                "t": environment.tenant_id,
+                "a": environment.agent_id,
+                "v": environment.agent_version_id,
+            },
+        )
+    return run_ids
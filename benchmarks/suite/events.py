@@ -0,0 +1,61 @@
+"""Run event ingestion through RunEventSink into Postgres."""
+
+import asyncio
+import time
+
+from .environment import BenchEnvironment, create_run_rows
+from .results import ResultSet
+
+
+async def bench_event_ingest(
+    environment: BenchEnvironment,
+    results: ResultSet,
+    *,
+    events: int,
+    producers: int,
+) -> None:
+    """
+    Events per second from `producers` concurrent emitters until all are written.
+
+    Uses its own sink, configured from settings like the process-wide one,
+    and checks that every event reached the table.
+    """
+    from sqlalchemy import text
+
+    from agent_runtime_core.db import get_engine
+    from agent_runtime_core.events import RunEventSink
+    from agent_runtime_core.models import RunEvent
+    from agent_runtime_core.utils import get_settings
+
+    settings = get_settings()
+    engine = get_engine()
+    run_ids = await create_run_rows(engine, environment, producers)
+    sink = RunEventSink(
+        engine,
+        batch_size=settings.event_sink_batch_size,
+        flush_interval=settings.event_sink_flush_interval_ms / 1000,
+        max_queue=settings.event_sink_max_queue,
+        use_copy=settings.event_sink_use_copy,
+    )
+    per_producer = events // producers
+
+    async def produce(run_id) -> None:
+        for i in range(per_producer):
+            await sink.emit(
+                RunEvent(run_id=run_id, event_type="llm_token", data={"turn": i // 50, "text": "token " * 8})
+            )
+
+    await sink.start()
+    start = time.perf_counter()
+    await asyncio.gather(*(produce(run_id) for run_id in run_ids))
+    await sink.close()
+    elapsed = time.perf_counter() - start
+
+    async with engine.connect() as conn:
+        written = await conn.scalar(
+            text("SELECT count(*) FROM run_events WHERE run_id = ANY(:ids)"),
+            {"ids": run_ids},
+        )
+    if written != per_producer * producers:
+        raise RuntimeError(f"Event sink wrote {written} of {per_producer * producers} events")
+    results.add("events.ingest.rate", written / elapsed, "events/s", higher_is_better=True)
@@ -0,0 +1,149 @@
+"""In-process stand-ins for the services around the API and worker.
+
+- FakeLLMProvider replaces the model backend. It asks for the bench_work
+  tool for a set number of turns, then answers.
+- FakeTemporalClient accepts workflow starts without a Temporal server,
+  for benchmarking the API on its own.
+- install_fake_redis points the shared Redis client at fakeredis.
+- embedded_postgres starts a throwaway PostgreSQL server (pgserver).
+  The runtime's queries are PostgreSQL-specific (unnest, ON CONFLICT,
+  JSONB, partitioned tables), so the stand-in is the real engine rather
+  than an imitation.
+"""
+
+import asyncio
+import tempfile
+import time
+import uuid
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+from agent_runtime_worker.llm import LLMCallInput, LLMProvider, StreamChunk, ToolCall
+
+class FakeLLMProvider(LLMProvider):
+    """
+    A model that calls bench_work `tool_turns` times, then answers.
+
+    Each call waits `latency` seconds before streaming. Each tool turn asks
+    for `tools_per_turn` tool calls at once, like a model fanning out.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency: float = 0.0,
+        tool_turns: int = 2,
+        tools_per_turn: int = 1,
+        tool_sleep_ms: float = 0.0,
+        tool_result_kb: int = 1,
+        answer_words: int = 50,
+    ) -> None:
+        self.latency = latency
+        self.tool_turns = tool_turns
+        self.tools_per_turn = tools_per_turn
+        self.tool_sleep_ms = tool_sleep_ms
+        self.tool_result_kb = tool_result_kb
+        self.answer_words = answer_words
+        self.calls = 0
+
+    async def stream(self, input: LLMCallInput, deadline: float | None = None) -> AsyncIterator[StreamChunk]:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        # Tool call IDs carry the turn; older results may have been compacted away
+        last = next((m for m in reversed(input.messages or []) if m.role == "tool"), None)
+        done = int(last.tool_call_id.split("-")[1]) + 1 if last else 0
+        if done < self.tool_turns:
+            yield StreamChunk(
+                tool_calls=[
+                    ToolCall(
+                        id=f"call-{done}-{i}",
+                        name="bench_work",
+                        arguments={"sleep_ms": self.tool_sleep_ms, "result_kb": self.tool_result_kb},
+                    )
+                    for i in range(self.tools_per_turn)
+                ]
+            )
+            return
+        for i in range(self.answer_words):
+            yield StreamChunk(text="word" if i == 0 else " word")
+        yield StreamChunk(usage={"prompt_tokens": len(input.prompt_text()) // 4, "completion_tokens": self.answer_words})
+
+
+def install_fake_llm(provider: LLMProvider) -> None:
+    """Route the call_llm activity to `provider`."""
+    from agent_runtime_worker.activities import llm_call
+
+    llm_call.get_provider = lambda: provider
+
+
+@dataclass
+class FakeWorkflowHandle:
+    id: str
+    result_run_id: str
+
+
+class FakeTemporalClient:
+    """Accepts workflow starts after `latency` seconds, like a Temporal frontend."""
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.started: list[str] = []
+
+    async def start_workflow(self, workflow: Any, arg: Any = None, *, id: str, task_queue: str, **kwargs: Any):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.started.append(id)
+        return FakeWorkflowHandle(id=id, result_run_id=str(uuid.uuid4()))
+
+
+class TimedTemporalClient:
+    """Wraps a Temporal client (real or fake) and records when each workflow was started."""
+
+    def __init__(self, client: Any) -> None:
+        self._client = client
+        self.started_at: dict[str, float] = {}
+
+    async def start_workflow(self, *args: Any, id: str, **kwargs: Any):
+        handle = await self._client.start_workflow(*args, id=id, **kwargs)
+        self.started_at[id] = time.perf_counter()
+        return handle
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+
+def install_temporal_client(client: Any) -> None:
+    """Make the API start workflows through `client`."""
+    from agent_runtime_api.services import temporal
+
+    temporal._client = client
+
+
+def install_fake_redis() -> None:
+    """Point the shared Redis client at an in-process fakeredis server."""
+    import fakeredis
+    import redis.asyncio
+
+    from agent_runtime_core.utils.redis import get_redis
+
+    # Redis 7 for LMOVE and XAUTOCLAIM; Lua scripts need the lupa package
+    server = fakeredis.FakeServer(version=(7,))
+    redis.asyncio.Redis.from_url = classmethod(lambda cls, url, **kwargs: fakeredis.FakeAsyncRedis(server=server))
+    get_redis.cache_clear()
+
+
+@contextmanager
+def embedded_postgres() -> Iterator[str]:
+    """Run a throwaway PostgreSQL server; yields its SQLAlchemy URL."""
+    import pgserver
+
+    with tempfile.TemporaryDirectory(prefix="bench-pg-") as path:
+        server = pgserver.get_server(path, cleanup_mode="stop")
+        try:
+            # postgresql://postgres:@/postgres?host=/socket/dir
+            yield server.get_uri().replace("postgresql://", "postgresql+asyncpg://", 1)
+        finally:
+            server.cleanup()
@@ -0,0 +1,126 @@
+"""Machine-readable benchmark results and regression comparison."""
+
+import json
+import platform
+import statistics
+import subprocess
+import sys
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+
+@dataclass
+class Metric:
+    """One measured value."""
+
+    value: float
+    unit: str
+    # Throughputs go up when things improve; latencies and durations go down
+    higher_is_better: bool = False
+
+
+@dataclass
+class ResultSet:
+    """The metrics of one suite run, with enough context to compare runs."""
+
+    meta: dict[str, Any] = field(default_factory=dict)
+    metrics: dict[str, Metric] = field(default_factory=dict)
+
+    def add(self, name: str, value: float, unit: str, *, higher_is_better: bool = False) -> None:
+        self.metrics[name] = Metric(value, unit, higher_is_better)
+
+    def add_latencies(self, name: str, seconds: list[float]) -> None:
+        """Record p50 and p99 of `seconds`, in milliseconds."""
+        if not seconds:
+            return
+        self.add(f"{name}.p50", percentile(seconds, 50) * 1000, "ms")
+        self.add(f"{name}.p99", percentile(seconds, 99) * 1000, "ms")
+
+    def save(self, path: str | Path) -> None:
+        data = {"meta": self.meta, "metrics": {name: asdict(m) for name, m in self.metrics.items()}}
+        Path(path).write_text(json.dumps(data, indent=2, sort_keys=True) + "\n")
+
+    @classmethod
+    def load(cls, path: str | Path) -> "ResultSet":
+        data = json.loads(Path(path).read_text())
+        return cls(
+            meta=data.get("meta", {}),
+            metrics={name: Metric(**m) for name, m in data["metrics"].items()},
+        )
+
+    def print_table(self) -> None:
+        width = max((len(name) for name in self.metrics), default=10)
+        for name, metric in sorted(self.metrics.items()):
+            print(f"{name:<{width}}  {metric.value:>12.2f} {metric.unit}")
+
+
+@dataclass
+class Comparison:
+    """One metric in two result sets."""
+
+    name: str
+    unit: str
+    base: float
+    new: float
+    # Relative change in the direction of "worse": positive is a slowdown
+    regression: float
+
+    @property
+    def change(self) -> float:
+        return (self.new - self.base) / self.base if self.base else 0.0
+
+
+def compare(base: ResultSet, new: ResultSet) -> list[Comparison]:
+    """Compare the metrics present in both result sets."""
+    comparisons = []
+    for name in sorted(base.metrics.keys() & new.metrics.keys()):
+        before, after = base.metrics[name], new.metrics[name]
+        if before.value == 0:
+            regression = 0.0
+        elif after.higher_is_better:
+            regression = (before.value - after.value) / before.value
+        else:
+            regression = (after.value - before.value) / before.value
+        comparisons.append(Comparison(name, after.unit, before.value, after.value, regression))
+    return comparisons
+
+
+def print_comparison(comparisons: list[Comparison], threshold: float) -> int:
+    """Print a comparison table; returns the number of regressions beyond `threshold`."""
+    width = max((len(c.name) for c in comparisons), default=10)
+    print(f"{'metric':<{width}}  {'base':>12} {'new':>12} {'change':>8}")
+    regressions = 0
+    for c in comparisons:
+        flag = ""
+        if c.regression > threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif c.regression < -threshold:
+            flag = "  improved"
+        print(f"{c.name:<{width}}  {c.base:>12.2f} {c.new:>12.2f} {c.change:>+8.1%}{flag}")
+    return regressions
+
+
+def percentile(values: list[float], q: float) -> float:
+    if len(values) < 2:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(q) - 1]
+
+
+def environment_meta() -> dict[str, Any]:
+    """Where and on what the results were measured."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
@@ -0,0 +1,14 @@
+"""Tools for the benchmark suite; preloaded into the sandbox processes."""
+
+import time
+from typing import Any
+
+from agent_runtime_worker.tools import tool
+
+
+@tool("bench_work")
+def bench_work(sleep_ms: float = 0.0, result_kb: int = 1) -> dict[str, Any]:
+    """Stand-in for an I/O-bound tool: waits `sleep_ms`, then returns a `result_kb` document."""
+    if sleep_ms:
+        time.sleep(sleep_ms / 1000)
+    return {"data": "x" * (result_kb * 1024)}
@@ -0,0 +1,145 @@
+"""The workflows and activities from worker.py, on Temporal's local test server."""
+
+import asyncio
+import statistics
+import time
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import AsyncExitStack, asynccontextmanager
+
+from .environment import BenchEnvironment, create_run_rows
+from .fakes import FakeLLMProvider, install_fake_llm
+from .results import ResultSet
+
+# Histories inspected for per-activity overhead
+SAMPLED_HISTORIES = 20
+REPLAYS = 5
+
+
+@asynccontextmanager
+async def running_workers(provider: FakeLLMProvider) -> AsyncIterator:
+    """
+    Start a local Temporal server and every queue's worker, as worker.main does.
+
+    Yields the Temporal client. Downloads the dev server on first use.
+    """
+    from temporalio.testing import WorkflowEnvironment
+
+    from agent_runtime_core.events import get_event_sink
+    from agent_runtime_core.status import get_run_status_persister
+    from agent_runtime_core.temporal import get_data_converter
+    from agent_runtime_core.utils import get_settings
+    from agent_runtime_worker.llm.gateway import close_gateways
+    from agent_runtime_worker.sandbox import get_sandbox_pool
+    from agent_runtime_worker.worker import QUEUES, build_workers
+
+    install_fake_llm(provider)
+    async with await WorkflowEnvironment.start_local(data_converter=get_data_converter()) as env:
+        event_sink = get_event_sink()
+        status_persister = get_run_status_persister()
+        sandbox_pool = get_sandbox_pool()
+        await event_sink.start()
+        await status_persister.start()
+        await sandbox_pool.start()
+        try:
+            async with AsyncExitStack() as stack:
+                for worker in build_workers(env.client, get_settings(), set(QUEUES)):
+                    await stack.enter_async_context(worker)
+                yield env.client
+        finally:
+            await event_sink.close()
+            await status_persister.close()
+            await close_gateways()
+            await sandbox_pool.close()
+
+
+async def bench_worker(
+    environment: BenchEnvironment,
+    results: ResultSet,
+    *,
+    client,
+    provider: FakeLLMProvider,
+    runs: int,
+) -> None:
+    """
+    Workflow completion, per-activity overhead and replay time.
+
+    Runs start directly on Temporal, without the API. Activity overhead is
+    the time from an activity being scheduled to its completion being
+    recorded, minus the work the fakes were told to do (model latency,
+    tool sleep): the queueing, payload, sandbox and history costs the
+    runtime adds to every call.
+    """
+    from temporalio.worker import Replayer
+
+    from agent_runtime_core.db import get_engine
+    from agent_runtime_core.temporal import get_data_converter
+    from agent_runtime_worker.workflows import AgentRunInput, AgentRunWorkflow
+
+    run_ids = await create_run_rows(get_engine(), environment, runs)
+    config = {"model": "bench", "max_turns": environment.max_turns, "temperature": 0.7}
+    latencies: list[float] = []
+
+    async def execute(run_id: uuid.UUID):
+        submitted = time.perf_counter()
+        handle = await client.start_workflow(
+            AgentRunWorkflow.run,
+            AgentRunInput(
+                run_id=str(run_id),
+                tenant_id=str(environment.tenant_id),
+                agent_id=str(environment.agent_id),
+                agent_version_id=str(environment.agent_version_id),
+                config=config,
+                input={"task": "bench"},
+            ),
+            id=f"run-{run_id}",
+            task_queue=environment.task_queue,
+        )
+        output = await handle.result()
+        if output.status != "completed":
+            raise RuntimeError(f"Run {run_id} ended {output.status}: {output.error}")
+        latencies.append(time.perf_counter() - submitted)
+        return handle
+
+    start = time.perf_counter()
+    handles = await asyncio.gather(*(execute(run_id) for run_id in run_ids))
+    elapsed = time.perf_counter() - start
+    results.add("worker.run.throughput", runs / elapsed, "runs/s", higher_is_better=True)
+    results.add_latencies("worker.run.latency", latencies)
+
+    histories = [await handle.fetch_history() for handle in handles[:SAMPLED_HISTORIES]]
+    work = {"call_llm": provider.latency, "execute_tool": provider.tool_sleep_ms / 1000}
+    for activity, durations in activity_durations(histories).items():
+        if activity in work:
+            results.add_latencies(
+                f"worker.activity.{activity}.overhead",
+                [max(duration - work[activity], 0.0) for duration in durations],
+            )
+
+    history = histories[0]
+    replayer = Replayer(workflows=[AgentRunWorkflow], data_converter=get_data_converter())
+    replays = []
+    for _ in range(REPLAYS):
+        replay_start = time.perf_counter()
+        await replayer.replay_workflow(history)
+        replays.append(time.perf_counter() - replay_start)
+    results.add("worker.replay.duration", statistics.median(replays) * 1000, "ms")
+    results.meta["worker_history_events"] = len(history.events)
+
+
+def activity_durations(histories) -> dict[str, list[float]]:
+    """Seconds from ActivityTaskScheduled to ActivityTaskCompleted, by activity type."""
+    from temporalio.api.enums.v1 import EventType
+
+    durations: dict[str, list[float]] = {}
+    for history in histories:
+        scheduled = {}
+        for event in history.events:
+            if event.event_type == EventType.EVENT_TYPE_ACTIVITY_TASK_SCHEDULED:
+                name = event.activity_task_scheduled_event_attributes.activity_type.name
+                scheduled[event.event_id] = (name, event.event_time.ToNanoseconds())
+            elif event.event_type == EventType.EVENT_TYPE_ACTIVITY_TASK_COMPLETED:
+                attributes = event.activity_task_completed_event_attributes
+                name, at = scheduled[attributes.scheduled_event_id]
+                durations.setdefault(name, []).append((event.event_time.ToNanoseconds() - at) / 1e9)
+    return durations
@@ -0,0 +1,10 @@
+"""Per-tenant run admission control and weighted fair release."""
+
+from .controller import AdmissionController, QueueStats, ReleasedRun, get_admission_controller
+
+__all__ = [
+    "AdmissionController",
+    "QueueStats",
+    "ReleasedRun",
+    "get_admission_controller",
+]
@@ -0,0 +1,311 @@
+"""Per-tenant admission control with weighted fair release.
+
+Every run takes a slot before its workflow starts and gives it back when
+the run ends. A tenant holds at most its limit of slots, and the whole
+deployment at most the global limit. A run that cannot get a slot is
+queued in its tenant's lane (interactive or batch) instead of starting.
+
+Queued runs are released by deficit round robin over the tenants that
+have queued work. Each visit credits a tenant with its weight, and every
+released run costs one. A tenant therefore gets capacity in proportion to
+its weight however many runs it has queued, so a noisy tenant cannot
+starve the others. Within a tenant, interactive runs go before batch runs.
+
+All state lives in Redis and every decision is one Lua script, so any
+number of API processes can admit, release and dispatch concurrently.
+Keys share the `{admission}` hash tag so the scripts stay within one
+cluster slot, and each script is passed every key it touches in KEYS.
+Where those depend on Redis state (the tenants with queued runs, the
+tenant owning a run) the caller reads that state first and the script
+re-checks it.
+"""
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+from uuid import UUID
+
+from ..models import RunPriority
+from ..utils import get_redis, get_settings
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+KEY_PREFIX = "{admission}:"
+
+# KEYS[1] = owner, KEYS[2] = running, KEYS[3] = active, KEYS[4] = active-set,
+# KEYS[5] = limit, KEYS[6] = weight, KEYS[7] = tenant's running set,
+# KEYS[8] = tenant's interactive queue, KEYS[9] = tenant's batch queue
+# ARGV[1] = tenant, ARGV[2] = run ID, ARGV[3] = lane, ARGV[4] = tenant limit,
+# ARGV[5] = weight, ARGV[6] = global limit (0 = none)
+# Returns 1 if the run took a slot, 0 if it was queued
+ADMIT_SCRIPT = """
+local tenant, run_id, lane = ARGV[1], ARGV[2], ARGV[3]
+local limit, global_limit = tonumber(ARGV[4]), tonumber(ARGV[6])
+if redis.call('HEXISTS', KEYS[1], run_id) == 1 then
+    return 1
+end
+local backlog = redis.call('LLEN', KEYS[8]) + redis.call('LLEN', KEYS[9])
+if backlog == 0
+    and (limit == 0 or redis.call('SCARD', KEYS[7]) < limit)
+    and (global_limit == 0 or redis.call('SCARD', KEYS[2]) < global_limit) then
+    redis.call('SADD', KEYS[7], run_id)
+    redis.call('SADD', KEYS[2], run_id)
+    redis.call('HSET', KEYS[1], run_id, tenant)
+    return 1
+end
+local now = redis.call('TIME')
+local now_ms = now[1] * 1000 + math.floor(now[2] / 1000)
+local queue = KEYS[9]
+if lane == 'interactive' then
+    queue = KEYS[8]
+end
+redis.call('RPUSH', queue, run_id .. '|' .. now_ms)
+redis.call('HSET', KEYS[5], tenant, ARGV[4])
+redis.call('HSET', KEYS[6], tenant, ARGV[5])
+if redis.call('SADD', KEYS[4], tenant) == 1 then
+    redis.call('RPUSH', KEYS[3], tenant)
+end
+return 0
+"""
+
+# KEYS[1] = owner, KEYS[2] = running, KEYS[3] = active, KEYS[4] = active-set,
+# KEYS[5] = limit, KEYS[6] = weight, KEYS[7] = deficit, then for each tenant
+# in ARGV[3..]: its running set, interactive queue and batch queue
+# ARGV[1] = max runs to release, ARGV[2] = global limit, ARGV[3..] = tenants
+# Returns {tenant, lane, run ID, wait ms} for each released run. Tenants
+# that became active after the caller listed them wait for the next call.
+DISPATCH_SCRIPT = """
+local max_release, global_limit = tonumber(ARGV[1]), tonumber(ARGV[2])
+local tenant_keys = {}
+for i = 3, #ARGV do
+    local k = 8 + (i - 3) * 3
+    tenant_keys[ARGV[i]] = {KEYS[k], KEYS[k + 1], KEYS[k + 2]}
+end
+local now = redis.call('TIME')
+local now_ms = now[1] * 1000 + math.floor(now[2] / 1000)
+local released = {}
+local tenants = redis.call('LLEN', KEYS[3])
+local idle = 0
+
+local function global_full()
+    return global_limit > 0 and redis.call('SCARD', KEYS[2]) >= global_limit
+end
+
+while #released < max_release and tenants > 0 and idle < tenants and not global_full() do
+    local tenant = redis.call('LMOVE', KEYS[3], KEYS[3], 'LEFT', 'RIGHT')
+    local keys = tenant_keys[tenant]
+    local got = 0
+    if keys then
+        local tenant_running, interactive, batch = keys[1], keys[2], keys[3]
+        local weight = tonumber(redis.call('HGET', KEYS[6], tenant) or '1')
+        local limit = tonumber(redis.call('HGET', KEYS[5], tenant) or '0')
+        local deficit = tonumber(redis.call('HGET', KEYS[7], tenant) or '0') + weight
+        while deficit >= 1 and #released < max_release and not global_full()
+            and (limit == 0 or redis.call('SCARD', tenant_running) < limit) do
+            local lane = 'interactive'
+            local entry = redis.call('LPOP', interactive)
+            if not entry then
+                lane = 'batch'
+                entry = redis.call('LPOP', batch)
+            end
+            if not entry then
+                break
+            end
+            local sep = string.find(entry, '|', 1, true)
+            local run_id = string.sub(entry, 1, sep - 1)
+            redis.call('SADD', tenant_running, run_id)
+            redis.call('SADD', KEYS[2], run_id)
+            redis.call('HSET', KEYS[1], run_id, tenant)
+            released[#released + 1] = {tenant, lane, run_id, tostring(now_ms - tonumber(string.sub(entry, sep + 1)))}
+            deficit = deficit - 1
+            got = got + 1
+        end
+        local backlog = redis.call('LLEN', interactive) + redis.call('LLEN', batch)
+        if backlog == 0 then
+            redis.call('LREM', KEYS[3], -1, tenant)
+            redis.call('SREM', KEYS[4], tenant)
+            redis.call('HDEL', KEYS[7], tenant)
+            redis.call('HDEL', KEYS[5], tenant)
+            redis.call('HDEL', KEYS[6], tenant)
+            tenants = tenants - 1
+        else
+            -- A tenant blocked by its own limit banks at most one visit of credit
+            redis.call('HSET', KEYS[7], tenant, tostring(math.min(deficit, weight)))
+        end
+    end
+    if got == 0 then
+        idle = idle + 1
+    else
+        idle = 0
+    end
+end
+return released
+"""
+
+# KEYS[1] = owner, KEYS[2] = running, KEYS[2 + i] = running set of the
+# tenant owning the i-th run; ARGV = run ID, owning tenant, ... in pairs
+# Returns the number of slots freed
+RELEASE_SCRIPT = """
+local freed = 0
+for i = 1, #ARGV / 2 do
+    local run_id, tenant = ARGV[2 * i - 1], ARGV[2 * i]
+    if redis.call('HGET', KEYS[1], run_id) == tenant then
+        redis.call('SREM', KEYS[2 + i], run_id)
+        redis.call('SREM', KEYS[2], run_id)
+        redis.call('HDEL', KEYS[1], run_id)
+        freed = freed + 1
+    end
+end
+return freed
+"""
+
+
+@dataclass
+class ReleasedRun:
+    """A queued run that has been given a slot."""
+
+    run_id: UUID
+    tenant_id: UUID
+    priority: RunPriority
+    wait_seconds: float
+
+
+@dataclass
+class QueueStats:
+    """Queue state of one tenant lane."""
+
+    tenant_id: UUID
+    priority: RunPriority
+    depth: int
+    oldest_wait_seconds: float
+
+
+class AdmissionController:
+    """Admits, queues and releases runs against per-tenant and global limits."""
+
+    def __init__(self, redis: "Redis", *, max_running: int = 0, prefix: str = KEY_PREFIX) -> None:
+        self._redis = redis
+        self._max_running = max_running
+        self._prefix = prefix
+        self._admit = redis.register_script(ADMIT_SCRIPT)
+        self._dispatch = redis.register_script(DISPATCH_SCRIPT)
+        self._release = redis.register_script(RELEASE_SCRIPT)
+
+    async def admit(
+        self,
+        tenant_id: UUID,
+        run_ids: list[UUID],
+        priority: RunPriority,
+        *,
+        limit: int,
+        weight: int = 1,
+    ) -> list[bool]:
+        """
+        Take a slot for each run, in order, or queue it.
+
+        Returns whether each run was admitted. Admitted runs may start now;
+        queued runs are returned by `dispatch` once they get a slot.
+        Admitting a run that already holds a slot is a no-op that returns True.
+        """
+        if not run_ids:
+            return []
+        tenant = str(tenant_id)
+        keys = [
+            *self._keys("owner", "running", "active", "active-set", "limit", "weight"),
+            *self._tenant_keys(tenant),
+        ]
+        args = [tenant, None, priority.value, limit, weight, self._max_running]
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for run_id in run_ids:
+                args[1] = str(run_id)
+                # Queues EVALSHA on the pipeline; nothing is sent until execute()
+                await self._admit(keys=keys, args=list(args), client=pipe)
+            results = await pipe.execute()
+        return [bool(result) for result in results]
+
+    async def dispatch(self, max_runs: int) -> list[ReleasedRun]:
+        """Give free slots to queued runs by weighted fair queuing."""
+        tenants = [_str(t) for t in await self._redis.lrange(f"{self._prefix}active", 0, -1)]
+        if not tenants:
+            return []
+        keys = self._keys("owner", "running", "active", "active-set", "limit", "weight", "deficit")
+        for tenant in tenants:
+            keys.extend(self._tenant_keys(tenant))
+        released = await self._dispatch(keys=keys, args=[max_runs, self._max_running, *tenants])
+        return [
+            ReleasedRun(
+                run_id=UUID(_str(run_id)),
+                tenant_id=UUID(_str(tenant)),
+                priority=RunPriority(_str(lane)),
+                wait_seconds=int(wait_ms) / 1000,
+            )
+            for tenant, lane, run_id, wait_ms in released
+        ]
+
+    async def release(self, *run_ids: UUID) -> int:
+        """Give back the slots of ended runs; runs without one are ignored."""
+        if not run_ids:
+            return 0
+        ids = [str(run_id) for run_id in run_ids]
+        owners = await self._redis.hmget(f"{self._prefix}owner", ids)
+        keys = self._keys("owner", "running")
+        args = []
+        for run_id, tenant in zip(ids, owners):
+            if tenant is not None:
+                keys.append(f"{self._prefix}running:{_str(tenant)}")
+                args.extend([run_id, _str(tenant)])
+        if not args:
+            return 0
+        return await self._release(keys=keys, args=args)
+
+    async def running(self) -> list[UUID]:
+        """Runs currently holding a slot."""
+        return [UUID(_str(run_id)) for run_id in await self._redis.smembers(f"{self._prefix}running")]
+
+    async def queue_stats(self) -> list[QueueStats]:
+        """Depth and oldest wait of every non-empty tenant lane."""
+        tenants = [_str(t) for t in await self._redis.lrange(f"{self._prefix}active", 0, -1)]
+        lanes = [(tenant, lane) for tenant in tenants for lane in RunPriority]
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.time()
+            for tenant, lane in lanes:
+                key = f"{self._prefix}queue:{tenant}:{lane.value}"
+                pipe.llen(key)
+                pipe.lindex(key, 0)
+            results = await pipe.execute()
+        seconds, micros = results[0]
+        now_ms = seconds * 1000 + micros // 1000
+        stats = []
+        for i, (tenant, lane) in enumerate(lanes):
+            depth, oldest = results[1 + 2 * i], results[2 + 2 * i]
+            if not depth or oldest is None:
+                continue
+            enqueued_ms = int(_str(oldest).rpartition("|")[2])
+            stats.append(QueueStats(UUID(tenant), lane, depth, (now_ms - enqueued_ms) / 1000))
+        return stats
+
+    def _keys(self, *names: str) -> list[str]:
+        return [f"{self._prefix}{name}" for name in names]
+
+    def _tenant_keys(self, tenant: str) -> list[str]:
+        """A tenant's running set and queues, in the order the scripts expect."""
+        return [
+            f"{self._prefix}running:{tenant}",
+            f"{self._prefix}queue:{tenant}:{RunPriority.INTERACTIVE.value}",
+            f"{self._prefix}queue:{tenant}:{RunPriority.BATCH.value}",
+        ]
+
+
+def _str(value: bytes | str) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+_controller: AdmissionController | None = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Get the process-wide admission controller configured from settings."""
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController(get_redis(), max_running=get_settings().admission_max_running)
+    return _controller
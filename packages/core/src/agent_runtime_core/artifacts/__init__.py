@@ -0,0 +1,27 @@
+"""Run artifacts: files stored in the bucket that runs reference by ID."""
+
+from .store import (
+    ArtifactInUseError,
+    ArtifactNotFoundError,
+    ArtifactStore,
+    ArtifactTooLargeError,
+    ArtifactUploadError,
+    PresignedPart,
+    PresignedUpload,
+    artifact_key,
+    get_artifact_store,
+    missing_artifacts,
+)
+
+__all__ = [
+    "ArtifactInUseError",
+    "ArtifactNotFoundError",
+    "ArtifactStore",
+    "ArtifactTooLargeError",
+    "ArtifactUploadError",
+    "PresignedPart",
+    "PresignedUpload",
+    "artifact_key",
+    "get_artifact_store",
+    "missing_artifacts",
+]
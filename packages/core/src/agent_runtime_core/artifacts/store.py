@@ -0,0 +1,506 @@
+"""Artifact store: content in the S3/MinIO bucket, metadata in Postgres."""
+
+import asyncio
+import hashlib
+import math
+from collections.abc import AsyncIterable, AsyncIterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any
+from urllib.parse import quote
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from ..db import get_engine
+from ..models import Artifact, ArtifactStatus
+from ..storage import S3ObjectStore
+from ..utils import get_settings
+
+# S3 multipart limits: every part but the last is at least 5 MiB, at most 10,000 parts
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PARTS = 10_000
+
+# Size of the chunks yielded when reading an artifact
+READ_CHUNK_SIZE = 1024 * 1024
+
+ARTIFACT_COLUMNS = "id, tenant_id, status, filename, content_type, size, sha256, created_at, updated_at"
+
+
+class ArtifactNotFoundError(KeyError):
+    """Raised when an artifact does not exist."""
+
+
+class ArtifactUploadError(ValueError):
+    """Raised when an upload cannot be started or completed as requested."""
+
+
+class ArtifactTooLargeError(ArtifactUploadError):
+    """Raised when an artifact is over the configured size limit."""
+
+
+class ArtifactInUseError(ValueError):
+    """Raised when deleting an artifact that runs still reference."""
+
+
+@dataclass
+class PresignedPart:
+    part_number: int
+    url: str
+
+
+@dataclass
+class PresignedUpload:
+    """Where a client PUTs each part of an artifact, valid until `expires_at`."""
+
+    upload_id: str
+    part_size: int
+    parts: list[PresignedPart]
+    expires_at: datetime
+
+
+def artifact_key(tenant_id: UUID, artifact_id: UUID) -> str:
+    """Object key of an artifact's content."""
+    return f"artifacts/{tenant_id}/{artifact_id}"
+
+
+class ArtifactStore:
+    """
+    Stores artifacts and hands out direct transfer URLs for them.
+
+    Content goes to the bucket as multipart uploads, either from clients
+    through presigned part URLs (create_upload, then complete_upload) or
+    streamed from this process (upload). Reads are ranged and streamed
+    (read), or go straight to the bucket via a presigned URL
+    (download_url). Neither path holds more than a couple of parts in
+    memory, and the presigned ones never pass the bytes through here.
+
+    Ready artifacts are unique per (tenant, SHA-256): uploading content a
+    tenant already has returns the existing artifact. Clients declare the
+    hash of presigned uploads before sending anything, so duplicates are
+    never transferred; the hash is the client's claim, which is why
+    deduplication never crosses tenants.
+
+    Abandoned presigned uploads are left to the bucket's
+    AbortIncompleteMultipartUpload lifecycle rule.
+    """
+
+    def __init__(
+        self,
+        objects: S3ObjectStore,
+        engine: AsyncEngine | None = None,
+        *,
+        presigner: S3ObjectStore | None = None,
+        part_size: int = 16 * 1024 * 1024,
+        max_size: int = 5 * 1024**3,
+        url_ttl: int = 900,
+    ) -> None:
+        self._objects = objects
+        self._engine = engine
+        # Signs URLs with the endpoint clients use, when that differs
+        self._presigner = presigner or objects
+        self._part_size = max(part_size, MIN_PART_SIZE)
+        self._max_size = max_size
+        self._url_ttl = url_ttl
+
+    @property
+    def engine(self) -> AsyncEngine:
+        if self._engine is None:
+            self._engine = get_engine()
+        return self._engine
+
+    def part_size_for(self, size: int) -> int:
+        """The part size for an object of `size` bytes."""
+        return max(self._part_size, math.ceil(size / MAX_PARTS))
+
+    async def get(self, artifact_id: UUID) -> Artifact:
+        """Fetch an artifact's metadata."""
+        async with self.engine.connect() as conn:
+            result = await conn.execute(
+                text(f"SELECT {ARTIFACT_COLUMNS} FROM artifacts WHERE id = :id"), {"id": artifact_id}
+            )
+            row = result.mappings().first()
+        if row is None:
+            raise ArtifactNotFoundError(artifact_id)
+        return Artifact.model_validate(dict(row))
+
+    async def create_upload(
+        self,
+        tenant_id: UUID,
+        *,
+        size: int,
+        filename: str | None = None,
+        content_type: str = "application/octet-stream",
+        sha256: str | None = None,
+    ) -> tuple[Artifact, PresignedUpload | None]:
+        """
+        Start a presigned multipart upload of `size` bytes.
+
+        Returns the artifact and the part URLs; with a `sha256` the tenant
+        already has, returns that artifact and no upload.
+        """
+        if size > self._max_size:
+            raise ArtifactTooLargeError(f"Artifact exceeds {self._max_size} bytes")
+        if sha256 is not None:
+            existing = await self._find_ready(tenant_id, sha256)
+            if existing is not None and existing.size == size:
+                return existing, None
+
+        artifact = Artifact(
+            tenant_id=tenant_id, filename=filename, content_type=content_type, size=size, sha256=sha256
+        )
+        key = artifact_key(tenant_id, artifact.id)
+        response = await asyncio.to_thread(
+            self._objects.client.create_multipart_upload,
+            Bucket=self._objects.bucket,
+            Key=key,
+            ContentType=content_type,
+        )
+        upload_id = response["UploadId"]
+        await self._insert(artifact, upload_id)
+
+        part_size = self.part_size_for(size)
+        parts = [
+            PresignedPart(
+                part_number=number,
+                url=self._presigner.client.generate_presigned_url(
+                    "upload_part",
+                    Params={
+                        "Bucket": self._objects.bucket,
+                        "Key": key,
+                        "UploadId": upload_id,
+                        "PartNumber": number,
+                    },
+                    ExpiresIn=self._url_ttl,
+                ),
+            )
+            for number in range(1, max(1, math.ceil(size / part_size)) + 1)
+        ]
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=self._url_ttl)
+        return artifact, PresignedUpload(upload_id, part_size, parts, expires_at)
+
+    async def complete_upload(self, artifact_id: UUID, parts: list[tuple[int, str]]) -> Artifact:
+        """
+        Finish a presigned upload from its (part number, ETag) pairs.
+
+        If the same content was completed for the tenant in the meantime,
+        this upload is discarded and that artifact returned.
+        """
+        from botocore.exceptions import ClientError
+
+        artifact, upload_id = await self._get_with_upload(artifact_id)
+        if artifact.status is ArtifactStatus.READY:
+            return artifact
+        key = artifact_key(artifact.tenant_id, artifact.id)
+        try:
+            await asyncio.to_thread(
+                self._objects.client.complete_multipart_upload,
+                Bucket=self._objects.bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={
+                    "Parts": [{"PartNumber": number, "ETag": etag} for number, etag in sorted(parts)]
+                },
+            )
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code", "error")
+            raise ArtifactUploadError(f"Could not complete the upload ({code})") from e
+
+        head = await asyncio.to_thread(self._objects.client.head_object, Bucket=self._objects.bucket, Key=key)
+        size = head["ContentLength"]
+        if artifact.size is not None and size != artifact.size:
+            await self._discard(artifact)
+            raise ArtifactUploadError(f"Uploaded {size} bytes, expected {artifact.size}")
+        return await self._mark_ready(artifact, size, artifact.sha256)
+
+    async def abort_upload(self, artifact_id: UUID) -> None:
+        """Cancel a pending upload and forget its artifact."""
+        artifact, upload_id = await self._get_with_upload(artifact_id)
+        if artifact.status is not ArtifactStatus.READY:
+            await self._discard(artifact, upload_id)
+
+    async def upload(
+        self,
+        tenant_id: UUID,
+        chunks: AsyncIterable[bytes],
+        *,
+        filename: str | None = None,
+        content_type: str = "application/octet-stream",
+    ) -> Artifact:
+        """
+        Store a stream of bytes as an artifact, hashing it on the way.
+
+        Parts are sent while the next one is being read, so at most two are
+        in memory. Content the tenant already has is discarded after the
+        upload and the existing artifact returned.
+        """
+        artifact = Artifact(tenant_id=tenant_id, filename=filename, content_type=content_type)
+        key = artifact_key(tenant_id, artifact.id)
+        response = await asyncio.to_thread(
+            self._objects.client.create_multipart_upload,
+            Bucket=self._objects.bucket,
+            Key=key,
+            ContentType=content_type,
+        )
+        upload_id = response["UploadId"]
+        await self._insert(artifact, upload_id)
+
+        digest = hashlib.sha256()
+        etags: list[tuple[int, str]] = []
+        sending: asyncio.Task | None = None
+
+        def send(number: int, part: bytes) -> None:
+            # Parts are sent one at a time, so the digest sees them in order
+            digest.update(part)
+            response = self._objects.client.upload_part(
+                Bucket=self._objects.bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=part
+            )
+            etags.append((number, response["ETag"]))
+
+        async def send_next(part: bytes) -> None:
+            nonlocal sending
+            if sending is not None:
+                await sending
+            # Every earlier part has been sent, so this one's number follows theirs
+            sending = asyncio.ensure_future(asyncio.to_thread(send, len(etags) + 1, part))
+
+        size = 0
+        buffer = bytearray()
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > self._max_size:
+                    raise ArtifactTooLargeError(f"Artifact exceeds {self._max_size} bytes")
+                buffer += chunk
+                while len(buffer) >= self._part_size:
+                    part = bytes(buffer[: self._part_size])
+                    del buffer[: self._part_size]
+                    await send_next(part)
+            if buffer or size == 0:
+                await send_next(bytes(buffer))
+            await sending
+            await asyncio.to_thread(
+                self._objects.client.complete_multipart_upload,
+                Bucket=self._objects.bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": [{"PartNumber": n, "ETag": e} for n, e in sorted(etags)]},
+            )
+        except BaseException:
+            if sending is not None and not sending.done():
+                sending.cancel()
+            await asyncio.shield(self._discard(artifact, upload_id))
+            raise
+        return await self._mark_ready(artifact, size, digest.hexdigest())
+
+    async def read(
+        self, artifact: Artifact, offset: int = 0, length: int | None = None
+    ) -> AsyncIterator[bytes]:
+        """Stream an artifact's content, or `length` bytes of it starting at `offset`."""
+        if artifact.status is not ArtifactStatus.READY:
+            raise ArtifactNotFoundError(artifact.id)
+        if length == 0 or (artifact.size is not None and offset >= artifact.size):
+            return
+        kwargs: dict[str, Any] = {
+            "Bucket": self._objects.bucket,
+            "Key": artifact_key(artifact.tenant_id, artifact.id),
+        }
+        if offset or length is not None:
+            end = "" if length is None else str(offset + length - 1)
+            kwargs["Range"] = f"bytes={offset}-{end}"
+        try:
+            response = await asyncio.to_thread(self._objects.client.get_object, **kwargs)
+        except self._objects.client.exceptions.NoSuchKey:
+            raise ArtifactNotFoundError(artifact.id) from None
+        body = response["Body"]
+        try:
+            while chunk := await asyncio.to_thread(body.read, READ_CHUNK_SIZE):
+                yield chunk
+        finally:
+            body.close()
+
+    def download_url(self, artifact: Artifact, expires_in: int | None = None) -> tuple[str, datetime]:
+        """
+        A presigned GET URL for the artifact and when it expires.
+
+        The URL honors Range headers, so clients can fetch parts of the
+        content directly from the bucket.
+        """
+        if artifact.status is not ArtifactStatus.READY:
+            raise ArtifactNotFoundError(artifact.id)
+        expires_in = min(expires_in or self._url_ttl, 7 * 24 * 3600)
+        params = {
+            "Bucket": self._objects.bucket,
+            "Key": artifact_key(artifact.tenant_id, artifact.id),
+            "ResponseContentType": artifact.content_type,
+        }
+        if artifact.filename:
+            params["ResponseContentDisposition"] = f"attachment; filename*=UTF-8''{quote(artifact.filename)}"
+        url = self._presigner.client.generate_presigned_url("get_object", Params=params, ExpiresIn=expires_in)
+        return url, datetime.now(timezone.utc) + timedelta(seconds=expires_in)
+
+    async def delete(self, artifact_id: UUID) -> None:
+        """Delete an artifact and its content; refused while any run references it."""
+        async with self.engine.begin() as conn:
+            # Waits out run inserts that have validated this artifact (FOR SHARE
+            # in missing_artifacts), so the check below sees their rows
+            result = await conn.execute(
+                text("SELECT tenant_id, upload_id FROM artifacts WHERE id = :id FOR UPDATE"),
+                {"id": artifact_id},
+            )
+            row = result.first()
+            if row is None:
+                raise ArtifactNotFoundError(artifact_id)
+            referenced = await conn.scalar(
+                text(
+                    "SELECT 1 FROM runs WHERE artifact_ids @> ARRAY[CAST(:id AS uuid)] "
+                    "AND artifact_ids <> '{}' LIMIT 1"
+                ),
+                {"id": artifact_id},
+            )
+            if referenced:
+                raise ArtifactInUseError(f"Artifact {artifact_id} is referenced by runs")
+            await conn.execute(text("DELETE FROM artifacts WHERE id = :id"), {"id": artifact_id})
+        await self._delete_object(artifact_key(row.tenant_id, artifact_id), row.upload_id)
+
+    async def _insert(self, artifact: Artifact, upload_id: str) -> None:
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                text(
+                    "INSERT INTO artifacts (id, tenant_id, status, filename, content_type, size, "
+                    "sha256, upload_id, created_at, updated_at) "
+                    "VALUES (:id, :tenant_id, :status, :filename, :content_type, :size, :sha256, "
+                    ":upload_id, :created_at, :created_at)"
+                ),
+                {
+                    "id": artifact.id,
+                    "tenant_id": artifact.tenant_id,
+                    "status": artifact.status.value,
+                    "filename": artifact.filename,
+                    "content_type": artifact.content_type,
+                    "size": artifact.size,
+                    "sha256": artifact.sha256,
+                    "upload_id": upload_id,
+                    "created_at": artifact.created_at,
+                },
+            )
+
+    async def _get_with_upload(self, artifact_id: UUID) -> tuple[Artifact, str | None]:
+        async with self.engine.connect() as conn:
+            result = await conn.execute(
+                text(f"SELECT {ARTIFACT_COLUMNS}, upload_id FROM artifacts WHERE id = :id"),
+                {"id": artifact_id},
+            )
+            row = result.mappings().first()
+        if row is None:
+            raise ArtifactNotFoundError(artifact_id)
+        row = dict(row)
+        upload_id = row.pop("upload_id")
+        return Artifact.model_validate(row), upload_id
+
+    async def _find_ready(self, tenant_id: UUID, sha256: str) -> Artifact | None:
+        async with self.engine.connect() as conn:
+            result = await conn.execute(
+                text(
+                    f"SELECT {ARTIFACT_COLUMNS} FROM artifacts "
+                    "WHERE tenant_id = :tenant_id AND sha256 = :sha256 AND status = 'ready'"
+                ),
+                {"tenant_id": tenant_id, "sha256": sha256},
+            )
+            row = result.mappings().first()
+        return Artifact.model_validate(dict(row)) if row is not None else None
+
+    async def _mark_ready(self, artifact: Artifact, size: int, sha256: str | None) -> Artifact:
+        """Make an uploaded artifact ready, or return the tenant's existing copy of it."""
+        if sha256 is not None:
+            existing = await self._find_ready(artifact.tenant_id, sha256)
+            if existing is not None:
+                await self._discard(artifact)
+                return existing
+        try:
+            async with self.engine.begin() as conn:
+                result = await conn.execute(
+                    text(
+                        "UPDATE artifacts SET status = 'ready', size = :size, sha256 = :sha256, "
+                        f"upload_id = NULL, updated_at = NOW() WHERE id = :id RETURNING {ARTIFACT_COLUMNS}"
+                    ),
+                    {"id": artifact.id, "size": size, "sha256": sha256},
+                )
+                row = result.mappings().one()
+        except IntegrityError:
+            # The same content finished uploading first under another artifact
+            existing = await self._find_ready(artifact.tenant_id, sha256)
+            await self._discard(artifact)
+            if existing is None:
+                raise ArtifactUploadError("Concurrent upload of the same content failed") from None
+            return existing
+        return Artifact.model_validate(dict(row))
+
+    async def _discard(self, artifact: Artifact, upload_id: str | None = None) -> None:
+        """Delete an artifact that was never made ready, with its content or upload."""
+        async with self.engine.begin() as conn:
+            await conn.execute(text("DELETE FROM artifacts WHERE id = :id"), {"id": artifact.id})
+        await self._delete_object(artifact_key(artifact.tenant_id, artifact.id), upload_id)
+
+    async def _delete_object(self, key: str, upload_id: str | None) -> None:
+        if upload_id is not None:
+            from botocore.exceptions import ClientError
+
+            try:
+                await asyncio.to_thread(
+                    self._objects.client.abort_multipart_upload,
+                    Bucket=self._objects.bucket,
+                    Key=key,
+                    UploadId=upload_id,
+                )
+            except ClientError:
+                # Already completed or aborted; the object itself is deleted below
+                pass
+        await self._objects.delete(key)
+
+
+async def missing_artifacts(
+    conn: AsyncSession | AsyncConnection, tenant_id: UUID, artifact_ids: list[UUID]
+) -> list[UUID]:
+    """
+    The given artifacts that are not ready artifacts of the tenant.
+
+    Locks the rest FOR SHARE, so they cannot be deleted before the caller's
+    transaction (which writes the runs referencing them) commits.
+    """
+    if not artifact_ids:
+        return []
+    result = await conn.execute(
+        text(
+            "SELECT id FROM artifacts WHERE id = ANY(CAST(:ids AS uuid[])) "
+            "AND tenant_id = :tenant_id AND status = 'ready' FOR SHARE"
+        ),
+        {"ids": list(set(artifact_ids)), "tenant_id": tenant_id},
+    )
+    found = set(result.scalars().all())
+    return [artifact_id for artifact_id in artifact_ids if artifact_id not in found]
+
+
+@lru_cache
+def get_artifact_store() -> ArtifactStore:
+    """Get the process-wide artifact store configured from settings."""
+    settings = get_settings()
+
+    def bucket(endpoint: str) -> S3ObjectStore:
+        return S3ObjectStore(
+            bucket=settings.s3_bucket,
+            endpoint_url=endpoint,
+            access_key=settings.s3_access_key,
+            secret_key=settings.s3_secret_key,
+        )
+
+    return ArtifactStore(
+        bucket(settings.s3_endpoint),
+        presigner=bucket(settings.s3_public_endpoint) if settings.s3_public_endpoint else None,
+        part_size=settings.artifact_part_size_mb * 1024 * 1024,
+        max_size=settings.artifact_max_size_mb * 1024 * 1024,
+        url_ttl=settings.artifact_url_ttl_seconds,
+    )
@@ -0,0 +1,17 @@
+"""Token-aware conversation state for multi-turn agent runs."""
+
+from .tokens import ApproxTokenizer, TiktokenTokenizer, Tokenizer, get_tokenizer
+from .context import Conversation, Message, render_text
+from .compaction import CompactionPolicy, summary_request
+
+__all__ = [
+    "ApproxTokenizer",
+    "TiktokenTokenizer",
+    "Tokenizer",
+    "get_tokenizer",
+    "Conversation",
+    "Message",
+    "render_text",
+    "CompactionPolicy",
+    "summary_request",
+]
@@ -0,0 +1,31 @@
+"""How conversations that outgrow their budget are compacted."""
+
+from enum import Enum
+
+from .context import Conversation, Message, render_text
+
+SUMMARY_INSTRUCTIONS = (
+    "Summarize the conversation below for an agent that will continue it without seeing it. "
+    "Keep the facts, decisions, tool results and open tasks it still needs; drop the rest. "
+    "Write plain text and be brief."
+)
+
+
+class CompactionPolicy(str, Enum):
+    """What happens to the oldest turns of a conversation over budget."""
+
+    # Drop them; costs nothing, but the model forgets them entirely
+    TRUNCATE = "truncate"
+    # Replace them with a model-written summary; one extra LLM call per compaction
+    SUMMARIZE = "summarize"
+
+
+def summary_request(conversation: Conversation, count: int) -> list[Message]:
+    """Messages asking a model to summarize the earlier summary plus the oldest `count` turns."""
+    compacted = conversation.turns[:count]
+    if conversation.summary is not None:
+        compacted = [conversation.summary, *compacted]
+    return [
+        Message(role="system", content=SUMMARY_INSTRUCTIONS),
+        Message(role="user", content=render_text(compacted)),
+    ]
@@ -0,0 +1,142 @@
+"""Conversation state for multi-turn runs, kept within a token budget."""
+
+import json
+from dataclasses import dataclass, field
+from typing import Any
+
+from .tokens import MESSAGE_OVERHEAD_TOKENS, Tokenizer, get_tokenizer
+
+
+@dataclass
+class Message:
+    """One chat message. Its token count is computed once per tokenizer and cached."""
+
+    role: str
+    content: str = ""
+    # Assistant messages: the tools requested, as {"id", "name", "arguments"}
+    tool_calls: list[dict[str, Any]] = field(default_factory=list)
+    # Tool messages: the call answered and the tool that answered it
+    tool_call_id: str | None = None
+    name: str | None = None
+    token_counts: dict[str, int] = field(default_factory=dict)
+
+    def tokens(self, tokenizer: Tokenizer) -> int:
+        """Tokens this message takes up in a request, counted on first use."""
+        count = self.token_counts.get(tokenizer.name)
+        if count is None:
+            text = self.content
+            if self.tool_calls:
+                text += json.dumps(self.tool_calls, separators=(",", ":"), default=str)
+            count = tokenizer.count(text) + MESSAGE_OVERHEAD_TOKENS
+            self.token_counts[tokenizer.name] = count
+        return count
+
+    def render(self) -> str:
+        """The message as plain prompt text, for completion-style backends."""
+        if self.role == "assistant":
+            return f"Assistant: {self.content}" if self.content else ""
+        if self.role == "tool":
+            return f"Tool {self.name} ({self.tool_call_id}) returned: {self.content}"
+        return self.content
+
+
+def render_text(messages: list[Message]) -> str:
+    """Join messages into a single prompt string."""
+    return "\n\n".join(text for text in (m.render() for m in messages) if text)
+
+
+@dataclass
+class Conversation:
+    """
+    The messages of a run, appended turn by turn and sent in three parts.
+
+    - prefix: pinned messages (system prompt, task) that never change, so
+      a provider's prompt cache always covers them.
+    - summary: stands in for the turns compacted so far.
+    - turns: every message appended since.
+
+    Between compactions each request only extends the previous one, so the
+    cached prefix grows with it. Once the total passes `max_tokens`, the
+    oldest turns are compacted in one go down to `target_tokens`, rather
+    than one turn per request, which would move the cache boundary on
+    every call. Each message is tokenized once; the running total is kept
+    in `total_tokens`.
+    """
+
+    max_tokens: int
+    # Where compaction brings the total back to; half of max_tokens if unset
+    target_tokens: int | None = None
+    tokenizer: str = "approx"
+    prefix: list[Message] = field(default_factory=list)
+    summary: Message | None = None
+    turns: list[Message] = field(default_factory=list)
+    # Turn messages removed by compaction so far
+    compacted: int = 0
+    total_tokens: int = 0
+
+    def _tokenizer(self) -> Tokenizer:
+        return get_tokenizer(self.tokenizer)
+
+    def pin(self, message: Message) -> None:
+        """Add a message to the stable prefix; only before the first turn."""
+        if self.turns or self.summary is not None:
+            raise ValueError("Messages can only be pinned before the first turn")
+        self.prefix.append(message)
+        self.total_tokens += message.tokens(self._tokenizer())
+
+    def append(self, message: Message) -> None:
+        """Add a message to the turns."""
+        self.turns.append(message)
+        self.total_tokens += message.tokens(self._tokenizer())
+
+    def messages(self) -> list[Message]:
+        """Everything to send, in order."""
+        summary = [self.summary] if self.summary is not None else []
+        return [*self.prefix, *summary, *self.turns]
+
+    def needs_compaction(self) -> bool:
+        """Whether the conversation is over budget and has turns that can go."""
+        return self.total_tokens > self.max_tokens and self.compaction_size() > 0
+
+    def compaction_size(self) -> int:
+        """
+        How many of the oldest turn messages to compact to get back to the target.
+
+        The latest exchange is always kept, since the model has to see what
+        it is answering, and tool results go together with the assistant
+        message that requested them.
+        """
+        keep_from = next(
+            (i for i in range(len(self.turns) - 1, -1, -1) if self.turns[i].role != "tool"), 0
+        )
+        target = self.target_tokens if self.target_tokens is not None else self.max_tokens // 2
+        excess = self.total_tokens - target
+        tokenizer = self._tokenizer()
+        count = removed = 0
+        while count < keep_from and removed < excess:
+            removed += self.turns[count].tokens(tokenizer)
+            count += 1
+        while count < keep_from and self.turns[count].role == "tool":
+            count += 1
+        return count
+
+    def compact(self, count: int, summary: str | None = None) -> None:
+        """
+        Replace the oldest `count` turn messages.
+
+        With `summary` (written from summary_request), it stands in for
+        them and any earlier summary. Without one they are dropped, leaving
+        a note that they were.
+        """
+        tokenizer = self._tokenizer()
+        self.total_tokens -= sum(m.tokens(tokenizer) for m in self.turns[:count])
+        del self.turns[:count]
+        self.compacted += count
+        if self.summary is not None:
+            self.total_tokens -= self.summary.tokens(tokenizer)
+        if summary is None:
+            content = f"[{self.compacted} earlier messages were removed to fit the context window.]"
+        else:
+            content = f"Summary of the earlier conversation:\n{summary}"
+        self.summary = Message(role="system", content=content)
+        self.total_tokens += self.summary.tokens(tokenizer)
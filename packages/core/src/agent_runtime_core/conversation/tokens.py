@@ -0,0 +1,71 @@
+"""Token counting for conversation messages."""
+
+from abc import ABC, abstractmethod
+from typing import Any
+
+# Tokens each chat message costs for its role and framing, on top of its content
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+class Tokenizer(ABC):
+    """Counts the tokens of a text under one model family's vocabulary."""
+
+    # Identifies the tokenizer in cached counts; two tokenizers that count
+    # differently must not share a name
+    name: str
+
+    @abstractmethod
+    def count(self, text: str) -> int:
+        """Number of tokens in `text`."""
+
+
+class ApproxTokenizer(Tokenizer):
+    """About 4 characters per token; the same estimate the LLM gateway budgets with."""
+
+    name = "approx"
+
+    def count(self, text: str) -> int:
+        return (len(text) + 3) // 4
+
+
+class TiktokenTokenizer(Tokenizer):
+    """
+    Exact counts for OpenAI models, using tiktoken.
+
+    tiktoken is an optional dependency (the `tokens` extra); the encoding is
+    loaded on first use so importing this module does not require it.
+    """
+
+    def __init__(self, encoding: str) -> None:
+        self.name = f"tiktoken:{encoding}"
+        self._encoding_name = encoding
+        self._encoding: Any = None
+
+    def count(self, text: str) -> int:
+        if self._encoding is None:
+            import tiktoken
+
+            self._encoding = tiktoken.get_encoding(self._encoding_name)
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+
+_tokenizers: dict[str, Tokenizer] = {}
+
+
+def get_tokenizer(name: str = "approx") -> Tokenizer:
+    """
+    Get the process-wide tokenizer called `name`.
+
+    "approx" is the character estimate; "tiktoken:<encoding>" (for example
+    "tiktoken:o200k_base") counts exactly with that encoding.
+    """
+    tokenizer = _tokenizers.get(name)
+    if tokenizer is None:
+        if name == ApproxTokenizer.name:
+            tokenizer = ApproxTokenizer()
+        elif name.startswith("tiktoken:"):
+            tokenizer = TiktokenTokenizer(name.removeprefix("tiktoken:"))
+        else:
+            raise ValueError(f"Unknown tokenizer: {name}")
+        _tokenizers[name] = tokenizer
+    return tokenizer
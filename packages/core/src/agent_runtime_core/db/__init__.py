@@ -1,11 +1,21 @@
 """Database utilities and SQLAlchemy models."""
 
-from .session import get_engine, get_session, AsyncSessionLocal
+from .session import (
+    AsyncSessionLocal,
+    dispose_engines,
+    get_engine,
+    get_read_engine,
+    get_read_session,
+    get_session,
+)
 from .base import Base
 
 __all__ = [
     "get_engine",
+    "get_read_engine",
     "get_session",
+    "get_read_session",
+    "dispose_engines",
     "AsyncSessionLocal",
     "Base",
 ]
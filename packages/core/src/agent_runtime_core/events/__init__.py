@@ -0,0 +1,26 @@
+"""Run event ingestion and storage."""
+
+from .sink import RunEventSink, get_event_sink
+from .partitions import (
+    ensure_default_partition,
+    ensure_partitions,
+    ensure_upcoming_partitions,
+    partitions_older_than,
+    split_default_partition,
+)
+from .archive import archive_partition, fetch_run_events
+from .publisher import RunEventPublisher, get_event_publisher
+
+__all__ = [
+    "RunEventSink",
+    "get_event_sink",
+    "ensure_default_partition",
+    "ensure_partitions",
+    "ensure_upcoming_partitions",
+    "partitions_older_than",
+    "split_default_partition",
+    "archive_partition",
+    "fetch_run_events",
+    "RunEventPublisher",
+    "get_event_publisher",
+]
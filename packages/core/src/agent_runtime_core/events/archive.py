@@ -0,0 +1,206 @@
+"""Cold-tier archival of run_events partitions to object storage.
+
+An archived partition becomes one segment object plus a small index:
+
+- the segment is a concatenation of gzip members, one per run, each
+  holding that run's events as JSONL ordered by timestamp
+- the index maps run_id to the (offset, length) of its gzip member
+
+Concatenated gzip members are still a valid gzip file, so a segment can be
+read whole with standard tools, while the read path uses the index to fetch
+a single run's events with one range read.
+"""
+
+import gzip
+import json
+import logging
+import tempfile
+from collections import OrderedDict
+from typing import BinaryIO
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from ..models import RunEvent
+from ..storage import ObjectNotFoundError, ObjectStore, get_object_store
+from .partitions import partition_bounds, partition_day
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_PREFIX = "run-events"
+
+# Archived segments are immutable, so their indexes can be cached forever;
+# a missing one is not cached, as it may yet be uploaded
+INDEX_CACHE_SIZE = 256
+_index_cache: OrderedDict[str, dict[str, list[int]]] = OrderedDict()
+
+
+def segment_key(name: str) -> str:
+    """Object key of the archived segment for a partition."""
+    return f"{ARCHIVE_PREFIX}/{partition_day(name):%Y/%m/%d}/{name}.jsonl.gz"
+
+
+def index_key(segment: str) -> str:
+    """Object key of the run index for a segment."""
+    return f"{segment}.index.json"
+
+
+async def _export_partition(conn, name: str, out: BinaryIO) -> tuple[dict[str, list[int]], int]:
+    """Write a partition's rows to `out` as per-run gzip members."""
+    index: dict[str, list[int]] = {}
+    count = 0
+    current_run: str | None = None
+    lines: list[bytes] = []
+
+    def flush_run() -> None:
+        if current_run is None:
+            return
+        member = gzip.compress(b"".join(lines))
+        index[current_run] = [out.tell(), len(member)]
+        out.write(member)
+
+    result = await conn.stream(text(
+        f"SELECT id::text, run_id::text, event_type, data::text, timestamp "
+        f"FROM {name} ORDER BY run_id, timestamp"
+    ))
+    async for event_id, run_id, event_type, data, timestamp in result:
+        if run_id != current_run:
+            flush_run()
+            current_run, lines = run_id, []
+        # data is already JSON text, so it is spliced in without re-parsing
+        head = json.dumps({
+            "id": event_id,
+            "run_id": run_id,
+            "event_type": event_type,
+            "timestamp": timestamp.isoformat(),
+        })
+        lines.append(head[:-1].encode() + b', "data": ' + (data or "{}").encode() + b"}\n")
+        count += 1
+    flush_run()
+    return index, count
+
+
+async def archive_partition(engine: AsyncEngine, store: ObjectStore, name: str) -> int:
+    """
+    Export a partition to object storage, then detach and drop it.
+
+    The partition is recorded in run_event_archives in the same transaction
+    that detaches and drops it, so readers find each event in one tier or
+    the other, never both. Safe to re-run after a failure: the export is
+    repeated if nothing was recorded, and a partition already recorded is
+    only dropped. Returns the number of events archived (0 if the archive
+    had already been recorded).
+    """
+    segment = segment_key(name)
+    range_start, range_end = partition_bounds(partition_day(name))
+    count = 0
+
+    async with engine.connect() as conn:
+        archived = await conn.scalar(
+            text("SELECT 1 FROM run_event_archives WHERE partition_name = :name"),
+            {"name": name},
+        )
+        if archived is None:
+            with tempfile.TemporaryFile() as spool:
+                index, count = await _export_partition(conn, name, spool)
+                spool.seek(0)
+                await store.put(segment, spool, content_type="application/gzip")
+            await store.put(
+                index_key(segment), json.dumps(index).encode(), content_type="application/json"
+            )
+            # Ends the export's server-side cursor, which would otherwise
+            # keep the partition in use and block the DROP below
+            await conn.commit()
+            await conn.execute(
+                text("""
+                    INSERT INTO run_event_archives
+                        (partition_name, range_start, range_end, object_key, event_count)
+                    VALUES (:name, :range_start, :range_end, :object_key, :event_count)
+                """),
+                {
+                    "name": name,
+                    "range_start": range_start,
+                    "range_end": range_end,
+                    "object_key": segment,
+                    "event_count": count,
+                },
+            )
+        await conn.execute(text(f"ALTER TABLE run_events DETACH PARTITION {name}"))
+        await conn.execute(text(f"DROP TABLE {name}"))
+        await conn.commit()
+
+    logger.info("Archived partition %s (%d events) to %s", name, count, segment)
+    return count
+
+
+async def _get_index(store: ObjectStore, segment: str) -> dict[str, list[int]]:
+    index = _index_cache.get(segment)
+    if index is None:
+        try:
+            index = json.loads(await store.get(index_key(segment)))
+        except ObjectNotFoundError:
+            logger.warning("Missing index for archived segment %s", segment)
+            return {}
+        _index_cache[segment] = index
+        if len(_index_cache) > INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    else:
+        _index_cache.move_to_end(segment)
+    return index
+
+
+async def read_archived_events(store: ObjectStore, segment: str, run_id: UUID) -> list[RunEvent]:
+    """Read one run's events from an archived segment."""
+    entry = (await _get_index(store, segment)).get(str(run_id))
+    if entry is None:
+        return []
+    offset, length = entry
+    member = gzip.decompress(await store.get(segment, offset=offset, length=length))
+    return [RunEvent.model_validate_json(line) for line in member.splitlines()]
+
+
+async def fetch_run_events(
+    session: AsyncSession,
+    run_id: UUID,
+    store: ObjectStore | None = None,
+) -> list[RunEvent]:
+    """
+    Get all events of a run, oldest first.
+
+    Reads hot partitions from Postgres and transparently merges in events
+    from any archived segments overlapping the run's lifetime. Events are
+    deduplicated by ID, in case a partition was archived between the two
+    reads.
+    """
+    result = await session.execute(
+        text(
+            "SELECT id, run_id, event_type, data, timestamp FROM run_events "
+            "WHERE run_id = :run_id ORDER BY timestamp"
+        ).columns(data=JSONB),
+        {"run_id": run_id},
+    )
+    events = [RunEvent.model_validate(dict(row)) for row in result.mappings()]
+
+    segments = (await session.execute(
+        text("""
+            SELECT a.object_key
+            FROM run_event_archives a
+            JOIN runs r ON r.id = :run_id
+            WHERE a.range_end > r.created_at
+              AND a.range_start <= COALESCE(r.completed_at, NOW()) + INTERVAL '1 hour'
+            ORDER BY a.range_start
+        """),
+        {"run_id": run_id},
+    )).scalars().all()
+
+    if segments:
+        store = store or get_object_store()
+        seen = {event.id for event in events}
+        for segment in segments:
+            events.extend(
+                event for event in await read_archived_events(store, segment, run_id) if event.id not in seen
+            )
+        events.sort(key=lambda event: event.timestamp)
+    return events
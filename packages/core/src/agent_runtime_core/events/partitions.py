@@ -0,0 +1,138 @@
+"""Daily range partitions of the run_events table."""
+
+from datetime import date, datetime, time, timedelta, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+PARTITION_PREFIX = "run_events_p"
+# Catches rows with no daily partition yet, so an insert never fails on its
+# timestamp; maintenance moves them into daily partitions later
+DEFAULT_PARTITION = "run_events_default"
+
+
+def partition_name(day: date) -> str:
+    """Name of the partition holding events for `day` (UTC)."""
+    return f"{PARTITION_PREFIX}{day:%Y%m%d}"
+
+
+def partition_day(name: str) -> date:
+    """Inverse of `partition_name`."""
+    return datetime.strptime(name.removeprefix(PARTITION_PREFIX), "%Y%m%d").date()
+
+
+def partition_bounds(day: date) -> tuple[datetime, datetime]:
+    """Half-open [start, end) timestamp range covered by a day's partition."""
+    start = datetime.combine(day, time.min, tzinfo=timezone.utc)
+    return start, start + timedelta(days=1)
+
+
+async def ensure_partitions(conn: AsyncConnection, start: date, end: date) -> list[str]:
+    """
+    Create any missing daily partitions for days in [start, end].
+
+    Returns the names of the partitions that were created.
+    """
+    existing = set(await list_partitions(conn))
+    has_default = await _has_default_partition(conn)
+    created = []
+    day = start
+    while day <= end:
+        name = partition_name(day)
+        if name not in existing:
+            await _create_partition(conn, day, has_default)
+            created.append(name)
+        day += timedelta(days=1)
+    return created
+
+
+async def _create_partition(conn: AsyncConnection, day: date, has_default: bool) -> None:
+    name = partition_name(day)
+    lower, upper = partition_bounds(day)
+    bounds = f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+    stray = None
+    if has_default:
+        stray = await conn.scalar(
+            text(
+                f"SELECT 1 FROM {DEFAULT_PARTITION} "
+                f"WHERE timestamp >= :lower AND timestamp < :upper LIMIT 1"
+            ),
+            {"lower": lower, "upper": upper},
+        )
+    if stray is None:
+        await conn.execute(text(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF run_events {bounds}"))
+        return
+    # Postgres refuses a new partition whose range has rows in the default
+    # one, so move them into a standalone table and attach that instead
+    await conn.execute(text(
+        f"CREATE TABLE {name} (LIKE run_events INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    ))
+    await conn.execute(
+        text(f"""
+            WITH moved AS (
+                DELETE FROM {DEFAULT_PARTITION}
+                WHERE timestamp >= :lower AND timestamp < :upper
+                RETURNING *
+            )
+            INSERT INTO {name} SELECT * FROM moved
+        """),
+        {"lower": lower, "upper": upper},
+    )
+    await conn.execute(text(f"ALTER TABLE run_events ATTACH PARTITION {name} {bounds}"))
+
+
+async def _has_default_partition(conn: AsyncConnection) -> bool:
+    return await conn.scalar(
+        text("SELECT to_regclass(:name) IS NOT NULL"), {"name": DEFAULT_PARTITION}
+    )
+
+
+async def ensure_default_partition(conn: AsyncConnection) -> None:
+    """Create the DEFAULT partition that takes rows outside every daily range."""
+    await conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF run_events DEFAULT"
+    ))
+
+
+async def split_default_partition(conn: AsyncConnection) -> list[str]:
+    """
+    Move rows that landed in the default partition into daily partitions.
+
+    Events timestamped before the oldest or after the newest daily partition
+    (clock skew, late backfills, maintenance falling behind) go to the
+    default partition; giving them daily partitions lets them be archived
+    like any other day. Returns the names of the partitions created.
+    """
+    if not await _has_default_partition(conn):
+        return []
+    days = (await conn.execute(text(
+        f"SELECT DISTINCT (timestamp AT TIME ZONE 'UTC')::date FROM {DEFAULT_PARTITION}"
+    ))).scalars().all()
+    for day in days:
+        await _create_partition(conn, day, has_default=True)
+    return [partition_name(day) for day in sorted(days)]
+
+
+async def ensure_upcoming_partitions(conn: AsyncConnection, days_ahead: int) -> list[str]:
+    """Create partitions from today through `days_ahead` days in the future."""
+    today = datetime.now(timezone.utc).date()
+    return await ensure_partitions(conn, today, today + timedelta(days=days_ahead))
+
+
+async def list_partitions(conn: AsyncConnection) -> list[str]:
+    """List the attached daily partitions of run_events, oldest first."""
+    result = await conn.execute(text("""
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = 'run_events'
+    """))
+    names = [row[0] for row in result if row[0].startswith(PARTITION_PREFIX)]
+    return sorted(names)
+
+
+async def partitions_older_than(conn: AsyncConnection, retention_days: int) -> list[str]:
+    """Partitions whose whole range ends before the hot retention window."""
+    cutoff = datetime.now(timezone.utc).date() - timedelta(days=retention_days)
+    return [name for name in await list_partitions(conn) if partition_day(name) < cutoff]
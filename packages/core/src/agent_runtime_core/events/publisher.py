@@ -0,0 +1,71 @@
+"""Live run event publishing through Redis.
+
+Each run has a capped Redis stream holding its recent events, which lets
+clients resume from a Last-Event-ID, and a pub/sub channel that carries the
+same events to API processes for live fan-out. Both are written by one Lua
+script so an event is never visible on one without the other.
+"""
+
+from typing import TYPE_CHECKING
+from uuid import UUID
+
+from ..models import RunEvent
+from ..utils import get_redis, get_settings
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+LIVE_CHANNEL_PREFIX = "run-events-live:"
+LIVE_CHANNEL_PATTERN = f"{LIVE_CHANNEL_PREFIX}*"
+
+# KEYS[1] = stream key
+# ARGV[1] = maxlen, ARGV[2] = ttl seconds, ARGV[3] = channel, ARGV[4] = event JSON
+PUBLISH_SCRIPT = """
+local id = redis.call('XADD', KEYS[1], 'MAXLEN', '~', ARGV[1], '*', 'e', ARGV[4])
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+redis.call('PUBLISH', ARGV[3], id .. '\\n' .. ARGV[4])
+return id
+"""
+
+
+def stream_key(run_id: UUID | str) -> str:
+    """Redis stream key holding a run's recent events."""
+    return f"run-events:{{{run_id}}}"
+
+
+def live_channel(run_id: UUID | str) -> str:
+    """Pub/sub channel carrying a run's live events."""
+    return f"{LIVE_CHANNEL_PREFIX}{run_id}"
+
+
+class RunEventPublisher:
+    """Publishes run events to their live stream."""
+
+    def __init__(self, redis: "Redis", *, maxlen: int = 1000, ttl_seconds: int = 86_400) -> None:
+        self._script = redis.register_script(PUBLISH_SCRIPT)
+        self._maxlen = maxlen
+        self._ttl_seconds = ttl_seconds
+
+    async def publish(self, event: RunEvent) -> str:
+        """Publish an event and return its stream ID (used as the SSE event ID)."""
+        stream_id = await self._script(
+            keys=[stream_key(event.run_id)],
+            args=[self._maxlen, self._ttl_seconds, live_channel(event.run_id), event.model_dump_json()],
+        )
+        return stream_id.decode() if isinstance(stream_id, bytes) else stream_id
+
+
+_publisher: RunEventPublisher | None = None
+
+
+def get_event_publisher() -> RunEventPublisher:
+    """Get the process-wide run event publisher configured from settings."""
+    global _publisher
+    if _publisher is None:
+        settings = get_settings()
+        _publisher = RunEventPublisher(
+            get_redis(),
+            maxlen=settings.event_stream_maxlen,
+            ttl_seconds=settings.event_stream_ttl_seconds,
+        )
+    return _publisher
@@ -0,0 +1,184 @@
+"""Batching writer for run events."""
+
+import asyncio
+import logging
+import time
+from datetime import timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from ..db import get_engine
+from ..models import RunEvent
+from ..utils import get_settings, json_dumps
+
+logger = logging.getLogger(__name__)
+
+EVENT_COLUMNS = ["id", "run_id", "event_type", "data", "timestamp"]
+
+INSERT_EVENT = text(
+    "INSERT INTO run_events (id, run_id, event_type, data, timestamp) "
+    "VALUES (:id, :run_id, :event_type, CAST(:data AS JSONB), :timestamp)"
+)
+
+# Attempts made to write a batch before it is dropped
+WRITE_ATTEMPTS = 3
+
+
+def _to_record(event: RunEvent) -> tuple:
+    """Convert an event to a row tuple in EVENT_COLUMNS order."""
+    timestamp = event.timestamp
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return (
+        event.id,
+        event.run_id,
+        event.event_type,
+        json_dumps(event.data, default=str).decode(),
+        timestamp,
+    )
+
+
+class RunEventSink:
+    """
+    Buffers run events in a bounded queue and writes them in bulk.
+
+    A background task drains the queue and flushes whenever `batch_size`
+    events are pending or `flush_interval` seconds have passed since the
+    first event of the batch arrived. Batches are loaded with COPY (or a
+    pipelined multi-row INSERT when `use_copy` is False).
+
+    `emit` blocks while the queue is full, which pushes back on producers
+    instead of growing memory without bound. `close` stops intake and
+    flushes everything still queued.
+
+    A batch that still fails after WRITE_ATTEMPTS is dropped and counted in
+    `dropped`, which the API and worker export as a metric.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine | None = None,
+        *,
+        batch_size: int = 500,
+        flush_interval: float = 0.05,
+        max_queue: int = 10_000,
+        use_copy: bool = True,
+    ) -> None:
+        self._engine = engine
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._use_copy = use_copy
+        self._queue: asyncio.Queue[RunEvent] = asyncio.Queue(maxsize=max_queue)
+        self._task: asyncio.Task | None = None
+        self._closing = False
+        self._dropped = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of events waiting to be written."""
+        return self._queue.qsize()
+
+    @property
+    def dropped(self) -> int:
+        """Number of events dropped because their batch could not be written."""
+        return self._dropped
+
+    async def start(self) -> None:
+        """Start the background flush task."""
+        if self._task is not None:
+            return
+        if self._engine is None:
+            self._engine = get_engine()
+        self._closing = False
+        self._task = asyncio.create_task(self._run(), name="run-event-sink")
+
+    async def emit(self, event: RunEvent) -> None:
+        """Queue an event, waiting for space if the queue is full."""
+        if self._closing:
+            raise RuntimeError("RunEventSink is closed")
+        await self._queue.put(event)
+
+    def emit_nowait(self, event: RunEvent) -> None:
+        """Queue an event, raising asyncio.QueueFull if there is no space."""
+        if self._closing:
+            raise RuntimeError("RunEventSink is closed")
+        self._queue.put_nowait(event)
+
+    async def close(self) -> None:
+        """Stop accepting events and flush everything still queued."""
+        self._closing = True
+        if self._task is not None:
+            # Every dequeued batch is marked done only once written, so the
+            # flush task is idle on an empty queue when join() returns.
+            await self._queue.join()
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        elif not self._queue.empty():
+            await self._write([self._queue.get_nowait() for _ in range(self._queue.qsize())])
+
+    async def _run(self) -> None:
+        """Collect batches from the queue and write them."""
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self._flush_interval
+            try:
+                while len(batch) < self._batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write(self, batch: list[RunEvent]) -> None:
+        """Write a batch, retrying transient failures."""
+        records = [_to_record(event) for event in batch]
+        for attempt in range(1, WRITE_ATTEMPTS + 1):
+            try:
+                async with self._engine.connect() as conn:
+                    if self._use_copy:
+                        raw = await conn.get_raw_connection()
+                        await raw.driver_connection.copy_records_to_table(
+                            "run_events", records=records, columns=EVENT_COLUMNS
+                        )
+                    else:
+                        await conn.execute(
+                            INSERT_EVENT,
+                            [dict(zip(EVENT_COLUMNS, record)) for record in records],
+                        )
+                    await conn.commit()
+                return
+            except Exception:
+                if attempt == WRITE_ATTEMPTS:
+                    logger.exception("Dropping %d run events after %d attempts", len(batch), attempt)
+                    self._dropped += len(batch)
+                    return
+                logger.warning("Run event write failed (attempt %d), retrying", attempt)
+                await asyncio.sleep(0.1 * 2**attempt)
+
+
+_sink: RunEventSink | None = None
+
+
+def get_event_sink() -> RunEventSink:
+    """Get the process-wide run event sink configured from settings."""
+    global _sink
+    if _sink is None:
+        settings = get_settings()
+        _sink = RunEventSink(
+            batch_size=settings.event_sink_batch_size,
+            flush_interval=settings.event_sink_flush_interval_ms / 1000,
+            max_queue=settings.event_sink_max_queue,
+            use_copy=settings.event_sink_use_copy,
+        )
+    return _sink
@@ -0,0 +1,25 @@
+"""Per-tenant vector memory for agents.
+
+Requires NumPy (the `memory` extra).
+"""
+
+from .embeddings import Embedder, HashingEmbedder, SentenceTransformerEmbedder, get_embedder
+from .index import IndexMeta, IVFIndex
+from .snapshot import MemorySnapshotter, get_memory_snapshotter, restore_snapshot, take_snapshot
+from .store import MemoryHit, VectorMemory, get_vector_memory
+
+__all__ = [
+    "Embedder",
+    "HashingEmbedder",
+    "SentenceTransformerEmbedder",
+    "get_embedder",
+    "IndexMeta",
+    "IVFIndex",
+    "MemorySnapshotter",
+    "get_memory_snapshotter",
+    "restore_snapshot",
+    "take_snapshot",
+    "MemoryHit",
+    "VectorMemory",
+    "get_vector_memory",
+]
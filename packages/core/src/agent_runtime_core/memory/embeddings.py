@@ -0,0 +1,97 @@
+"""Text embeddings for vector memory."""
+
+import hashlib
+import re
+from abc import ABC, abstractmethod
+from typing import Any
+
+import numpy as np
+
+_WORD = re.compile(r"\w+")
+
+
+class Embedder(ABC):
+    """Turns texts into fixed-size float32 vectors."""
+
+    # Stored with each index; vectors from embedders with different names
+    # must not be mixed
+    name: str
+    dim: int
+
+    @abstractmethod
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """One row per text, shape (len(texts), dim)."""
+
+
+class HashingEmbedder(Embedder):
+    """
+    Feature hashing of words and word pairs; needs no model or network.
+
+    Good enough to find memories sharing vocabulary with the query, not
+    paraphrases of it. Deployments that need semantic recall should use a
+    model (see `get_embedder`).
+    """
+
+    def __init__(self, dim: int = 384) -> None:
+        self.name = f"hash:{dim}"
+        self.dim = dim
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = _WORD.findall(text.lower())
+            for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                h = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+                # The top bit picks the sign, so collisions cancel out on average
+                vectors[row, h % self.dim] += 1.0 if h >> 63 else -1.0
+        return vectors
+
+
+class SentenceTransformerEmbedder(Embedder):
+    """
+    Embeddings from a local sentence-transformers model, on CPU.
+
+    sentence-transformers is not a dependency of this package; the model is
+    loaded on first use so importing this module does not require it.
+    """
+
+    def __init__(self, model: str) -> None:
+        self.name = f"sentence-transformers:{model}"
+        self._model_name = model
+        self._model: Any = None
+
+    def _load(self) -> Any:
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+
+            self._model = SentenceTransformer(self._model_name, device="cpu")
+        return self._model
+
+    @property
+    def dim(self) -> int:  # type: ignore[override]
+        return self._load().get_sentence_embedding_dimension()
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        return np.asarray(self._load().encode(texts), dtype=np.float32)
+
+
+_embedders: dict[str, Embedder] = {}
+
+
+def get_embedder(name: str = "hash") -> Embedder:
+    """
+    Get the process-wide embedder called `name`.
+
+    "hash" or "hash:<dim>" is feature hashing (384 dimensions by default);
+    "sentence-transformers:<model>" runs that model locally.
+    """
+    embedder = _embedders.get(name)
+    if embedder is None:
+        if name == "hash" or name.startswith("hash:"):
+            embedder = HashingEmbedder(int(name.removeprefix("hash").removeprefix(":") or 384))
+        elif name.startswith("sentence-transformers:"):
+            embedder = SentenceTransformerEmbedder(name.removeprefix("sentence-transformers:"))
+        else:
+            raise ValueError(f"Unknown embedder: {name}")
+        _embedders[name] = embedder
+    return embedder
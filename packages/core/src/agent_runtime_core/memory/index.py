@@ -0,0 +1,520 @@
+"""IVF approximate nearest neighbour index over memory-mapped files."""
+
+import fcntl
+import json
+import math
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import BinaryIO
+
+import numpy as np
+
+META_FILE = "meta.json"
+LOCK_FILE = ".lock"
+PAYLOAD_DATA_FILE = "payloads.bin"
+PAYLOAD_INDEX_FILE = "payloads.idx"
+
+METRICS = ("cosine", "ip")
+
+# Rows per matrix product when assigning or scanning vectors, to bound temporaries
+CHUNK_ROWS = 65_536
+# k-means trains on this many vectors per list, sampled from the whole index
+TRAIN_POINTS_PER_LIST = 64
+KMEANS_ITERATIONS = 10
+
+
+@dataclass
+class IndexMeta:
+    """The committed state of an index; everything past it on disk is ignored."""
+
+    dim: int
+    metric: str
+    # Name of the embedder the vectors came from, if the owner records one
+    embedder: str = ""
+    # Bumped each time the main segment is rewritten; names its files
+    generation: int = 0
+    count: int = 0
+    # Vectors in the main segment; the rest, up to count, are in the tail
+    main_count: int = 0
+    # Inverted lists, 0 until the first merge trains centroids
+    nlist: int = 0
+    # Vectors in the index when the centroids were last trained
+    trained_count: int = 0
+    payload_bytes: int = 0
+
+
+def main_file(generation: int) -> str:
+    return f"main-{generation}.npy"
+
+
+def ids_file(generation: int) -> str:
+    return f"ids-{generation}.npy"
+
+
+def offsets_file(generation: int) -> str:
+    return f"offsets-{generation}.npy"
+
+
+def centroids_file(generation: int) -> str:
+    return f"centroids-{generation}.npy"
+
+
+def tail_file(generation: int) -> str:
+    return f"tail-{generation}.f32"
+
+
+def tail_lists_file(generation: int) -> str:
+    return f"tail-{generation}.lists"
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Column indexes of the k highest scores in each row, in no particular order."""
+    n = scores.shape[1]
+    if n <= k:
+        return np.broadcast_to(np.arange(n), scores.shape)
+    return np.argpartition(scores, n - k, axis=1)[:, n - k :]
+
+
+def _nearest(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """The centroid each vector scores highest against."""
+    assign = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), CHUNK_ROWS):
+        chunk = np.asarray(vectors[start : start + CHUNK_ROWS])
+        assign[start : start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+    return assign
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+
+def kmeans(sample: np.ndarray, nlist: int, rng: np.random.Generator) -> np.ndarray:
+    """Spherical k-means: `nlist` unit-length centroids for `sample`."""
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assign = _nearest(sample, centroids)
+        counts = np.bincount(assign, minlength=nlist)
+        order = np.argsort(assign, kind="stable")
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        filled = counts > 0
+        centroids[filled] = np.add.reduceat(sample[order], starts[filled], axis=0)
+        # Lists that lost all their vectors restart from a random one
+        centroids[~filled] = sample[rng.choice(len(sample), int((~filled).sum()))]
+        centroids = _normalize(centroids).astype(np.float32)
+    return centroids
+
+
+class IVFIndex:
+    """
+    Inverted-file index over float32 vectors, kept in one directory.
+
+    Vectors are stored in two segments, both memory-mapped:
+
+    - main: grouped by nearest centroid, each inverted list contiguous on
+      disk, so probing a list is one slice and one matrix product.
+    - tail: vectors added since main was last written, in insertion order,
+      each with the list it was assigned to on insert. Searches probe the
+      same lists in the tail as in main (all of it, until there are lists).
+
+    Inserts append to the tail. Once it reaches `merge_fraction` of main
+    (and at least `min_merge` vectors), it is merged: its vectors are
+    assigned to lists and a new main segment is written beside the old one.
+    The centroids are trained on the first merge (about sqrt(n) lists) and
+    retrained whenever the index has grown `retrain_growth` times since.
+
+    Files are replaced, never rewritten, and meta.json is written last, so
+    readers in other processes keep searching what they mapped until they
+    `refresh`. Writers take a file lock. Each vector can carry an opaque
+    payload; IDs are positions in insertion order.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        dim: int | None = None,
+        metric: str = "cosine",
+        *,
+        embedder: str = "",
+        min_merge: int = 10_000,
+        merge_fraction: float = 0.1,
+        retrain_growth: float = 4.0,
+        seed: int = 0,
+    ) -> None:
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric: {metric}")
+        self.path = Path(path)
+        self._min_merge = min_merge
+        self._merge_fraction = merge_fraction
+        self._retrain_growth = retrain_growth
+        self._rng = np.random.default_rng(seed)
+        self._generation: int | None = None
+
+        meta = self._read_meta()
+        if meta is None:
+            if dim is None:
+                raise FileNotFoundError(f"No index at {self.path}")
+            self.path.mkdir(parents=True, exist_ok=True)
+            with self._locked():
+                meta = self._read_meta()
+                if meta is None:
+                    meta = IndexMeta(dim=dim, metric=metric, embedder=embedder)
+                    self._write_meta(meta)
+        if dim is not None and meta.dim != dim:
+            raise ValueError(f"Index at {self.path} has {meta.dim} dimensions, not {dim}")
+        if embedder and meta.embedder and meta.embedder != embedder:
+            raise ValueError(f"Index at {self.path} holds {meta.embedder} vectors, not {embedder}")
+        self._load(meta)
+
+    def __len__(self) -> int:
+        return self.meta.count
+
+    def refresh(self) -> None:
+        """Pick up vectors written since the index was opened or last refreshed."""
+        meta = self._read_meta()
+        if meta is not None and meta != self.meta:
+            self._load(meta)
+
+    def add(self, vectors: np.ndarray, payloads: list[bytes] | None = None) -> np.ndarray:
+        """Append vectors, with one payload each if given; returns their IDs."""
+        vectors = self._prepare(vectors)
+        if payloads is None:
+            payloads = [b""] * len(vectors)
+        elif len(payloads) != len(vectors):
+            raise ValueError("Expected one payload per vector")
+        with self._locked():
+            meta = self._read_meta()
+            row_bytes = meta.dim * 4
+            # Truncating first drops anything a crashed writer left past the committed state
+            tail_rows = meta.count - meta.main_count
+            with open(self.path / tail_file(meta.generation), "ab") as f:
+                f.truncate(tail_rows * row_bytes)
+                f.write(vectors.tobytes())
+            if meta.nlist:
+                centroids = np.load(self.path / centroids_file(meta.generation))
+                with open(self.path / tail_lists_file(meta.generation), "ab") as f:
+                    f.truncate(tail_rows * 4)
+                    f.write(_nearest(vectors, centroids).tobytes())
+            ends = meta.payload_bytes + np.cumsum([len(p) for p in payloads], dtype=np.int64)
+            with open(self.path / PAYLOAD_DATA_FILE, "ab") as data, open(
+                self.path / PAYLOAD_INDEX_FILE, "ab"
+            ) as index:
+                data.truncate(meta.payload_bytes)
+                index.truncate(meta.count * 8)
+                data.write(b"".join(payloads))
+                index.write(ends.tobytes())
+            ids = np.arange(meta.count, meta.count + len(vectors), dtype=np.int64)
+            meta = replace(
+                meta,
+                count=meta.count + len(vectors),
+                payload_bytes=int(ends[-1]) if len(ends) else meta.payload_bytes,
+            )
+            self._write_meta(meta)
+            tail = meta.count - meta.main_count
+            if tail >= max(self._min_merge, self._merge_fraction * meta.main_count):
+                meta = self._merge(meta)
+        self._load(meta)
+        return ids
+
+    def merge(self, retrain: bool = False) -> None:
+        """Merge the tail into the main segment now, retraining the centroids if asked."""
+        with self._locked():
+            meta = self._read_meta()
+            if meta.count > meta.main_count or (retrain and meta.count):
+                meta = self._merge(meta, retrain)
+        self._load(meta)
+
+    def search(self, queries: np.ndarray, k: int = 10, nprobe: int = 16) -> tuple[np.ndarray, np.ndarray]:
+        """
+        The k best matches for each query: (scores, ids), both (len(queries), k).
+
+        Each query scans its `nprobe` nearest lists plus the tail. Queries
+        are batched per list, so a list probed by many queries is read and
+        multiplied once. Rows are sorted best first and padded with id -1.
+        """
+        queries = self._prepare(queries)
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        if not len(queries) or not self.meta.count or k <= 0:
+            return scores, ids
+
+        candidate_scores: list[np.ndarray] = []
+        candidate_ids: list[np.ndarray] = []
+        if self.meta.nlist:
+            nprobe = max(1, min(nprobe, self.meta.nlist))
+            probes = _top_k(queries @ self._centroids.T, nprobe)
+            found_scores = np.full((len(queries), nprobe * k), -np.inf, dtype=np.float32)
+            found_ids = np.full((len(queries), nprobe * k), -1, dtype=np.int64)
+            # (query, slot) pairs grouped by the list they probe
+            flat = probes.ravel()
+            order = np.argsort(flat, kind="stable")
+            lists = flat[order]
+            query_rows, slots = np.divmod(order, nprobe)
+            bounds = np.flatnonzero(np.diff(lists)) + 1
+            for start, end in zip(np.concatenate(([0], bounds)), np.concatenate((bounds, [len(lists)]))):
+                main, tail, vector_ids = self._list(lists[start])
+                if not len(vector_ids):
+                    continue
+                rows = query_rows[start:end]
+                block = queries[rows] @ main.T
+                if len(tail):
+                    block = np.hstack((block, queries[rows] @ tail.T))
+                top = _top_k(block, k)
+                columns = slots[start:end, None] * k + np.arange(top.shape[1])
+                found_scores[rows[:, None], columns] = np.take_along_axis(block, top, axis=1)
+                found_ids[rows[:, None], columns] = vector_ids[top]
+            candidate_scores.append(found_scores)
+            candidate_ids.append(found_ids)
+        # Before the first merge there are no lists, and the tail is searched exhaustively
+        for start in range(0, 0 if self.meta.nlist else len(self._tail), CHUNK_ROWS):
+            block = queries @ self._tail[start : start + CHUNK_ROWS].T
+            top = _top_k(block, k)
+            candidate_scores.append(np.take_along_axis(block, top, axis=1))
+            candidate_ids.append(top + (self.meta.main_count + start))
+
+        all_scores = np.hstack(candidate_scores)
+        all_ids = np.hstack(candidate_ids)
+        top = _top_k(all_scores, k)
+        top_scores = np.take_along_axis(all_scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        found = top.shape[1]
+        scores[:, :found] = np.take_along_axis(top_scores, order, axis=1)
+        ids[:, :found] = np.take_along_axis(np.take_along_axis(all_ids, top, axis=1), order, axis=1)
+        ids[np.isneginf(scores)] = -1
+        return scores, ids
+
+    def payloads(self, ids: list[int] | np.ndarray) -> list[bytes | None]:
+        """The payloads stored with the given vectors; None for unknown IDs."""
+        result: list[bytes | None] = []
+        for i in ids:
+            i = int(i)
+            if not 0 <= i < self.meta.count:
+                result.append(None)
+                continue
+            start = int(self._payload_index[i - 1]) if i else 0
+            result.append(bytes(self._payload_data[start : int(self._payload_index[i])]))
+        return result
+
+    def open_files(self) -> tuple[IndexMeta, dict[str, tuple[BinaryIO, int]]]:
+        """
+        Open every file of the committed state, with the bytes of it in use.
+
+        Taken under the writer lock, so the set is consistent; the open
+        handles keep the files readable after a merge deletes them. The
+        caller closes them.
+        """
+        with self._locked():
+            meta = self._read_meta()
+            row_bytes = meta.dim * 4
+            sizes = {
+                tail_file(meta.generation): (meta.count - meta.main_count) * row_bytes,
+                tail_lists_file(meta.generation): (meta.count - meta.main_count) * 4 if meta.nlist else 0,
+                PAYLOAD_DATA_FILE: meta.payload_bytes,
+                PAYLOAD_INDEX_FILE: meta.count * 8,
+            }
+            if meta.main_count:
+                for name in (
+                    main_file(meta.generation),
+                    ids_file(meta.generation),
+                    offsets_file(meta.generation),
+                    centroids_file(meta.generation),
+                ):
+                    sizes[name] = (self.path / name).stat().st_size
+            files: dict[str, tuple[BinaryIO, int]] = {}
+            try:
+                for name, size in sizes.items():
+                    path = self.path / name
+                    if size or path.exists():
+                        files[name] = (open(path, "rb"), size)
+            except BaseException:
+                for f, _ in files.values():
+                    f.close()
+                raise
+        return meta, files
+
+    def _list(self, number: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """An inverted list: its vectors in main, its vectors in the tail, and all their IDs."""
+        lo, hi = self._offsets[number], self._offsets[number + 1]
+        tail_rows = self._tail_order[self._tail_offsets[number] : self._tail_offsets[number + 1]]
+        if not len(tail_rows):
+            return self._main[lo:hi], self._tail[:0], self._ids[lo:hi]
+        # Scored separately rather than stacked, which would copy the main slice
+        return (
+            self._main[lo:hi],
+            self._tail[tail_rows],
+            np.concatenate((self._ids[lo:hi], tail_rows + self.meta.main_count)),
+        )
+
+    def _prepare(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[None, :]
+        if vectors.ndim != 2 or vectors.shape[1] != self.meta.dim:
+            raise ValueError(f"Expected vectors of {self.meta.dim} dimensions")
+        if self.meta.metric == "cosine":
+            vectors = _normalize(vectors)
+        return np.ascontiguousarray(vectors, dtype=np.float32)
+
+    def _load(self, meta: IndexMeta) -> None:
+        """
+        Map the files of `meta`, or of a later state if a writer replaced them first.
+
+        A merge deletes the previous generation's files once the new meta is
+        written, so they can be gone by the time a reader that read the old
+        meta maps them; it then moves on to the newer state. Nothing is
+        swapped in until every file has been mapped, so a failed load leaves
+        the previous view intact.
+        """
+        while True:
+            try:
+                self._swap_in(meta)
+                return
+            except FileNotFoundError:
+                latest = self._read_meta()
+                if latest is None or latest.generation == meta.generation:
+                    raise
+                meta = latest
+
+    def _swap_in(self, meta: IndexMeta) -> None:
+        """Map the files of `meta`, reusing the main segment if its generation is unchanged."""
+        if meta.generation == self._generation:
+            main, ids, offsets, centroids = self._main, self._ids, self._offsets, self._centroids
+        elif meta.main_count:
+            g = meta.generation
+            main = np.load(self.path / main_file(g), mmap_mode="r")
+            ids = np.load(self.path / ids_file(g), mmap_mode="r")
+            offsets = np.load(self.path / offsets_file(g))
+            centroids = np.load(self.path / centroids_file(g))
+        else:
+            main = np.empty((0, meta.dim), dtype=np.float32)
+            ids = np.empty(0, dtype=np.int64)
+            offsets = np.zeros(1, dtype=np.int64)
+            centroids = np.empty((0, meta.dim), dtype=np.float32)
+        tail_rows = meta.count - meta.main_count
+        tail = self._map(tail_file(meta.generation), np.float32, (tail_rows, meta.dim))
+        # Tail rows grouped by list, like main: list l is _tail_order[_tail_offsets[l]:_tail_offsets[l + 1]]
+        tail_lists = self._map(tail_lists_file(meta.generation), np.int32, (tail_rows if meta.nlist else 0,))
+        tail_offsets = np.zeros(meta.nlist + 1, dtype=np.int64)
+        tail_offsets[1:] = np.cumsum(np.bincount(tail_lists, minlength=meta.nlist))
+        payload_index = self._map(PAYLOAD_INDEX_FILE, np.int64, (meta.count,))
+        payload_data = self._map(PAYLOAD_DATA_FILE, np.uint8, (meta.payload_bytes,))
+
+        self._main, self._ids, self._offsets, self._centroids = main, ids, offsets, centroids
+        self._generation = meta.generation
+        self._tail = tail
+        self._tail_order = np.argsort(tail_lists, kind="stable")
+        self._tail_offsets = tail_offsets
+        self._payload_index = payload_index
+        self._payload_data = payload_data
+        self.meta = meta
+
+    def _map(self, name: str, dtype: type, shape: tuple[int, ...]) -> np.ndarray:
+        # mmap cannot map zero bytes
+        if math.prod(shape) == 0:
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(self.path / name, dtype=dtype, mode="r", shape=shape)
+
+    def _merge(self, meta: IndexMeta, retrain: bool = False) -> IndexMeta:
+        """Write the next generation's main segment from the current one plus the tail."""
+        g = meta.generation
+        if meta.main_count:
+            main = np.load(self.path / main_file(g), mmap_mode="r")
+            ids = np.load(self.path / ids_file(g), mmap_mode="r")
+            offsets = np.load(self.path / offsets_file(g))
+            centroids = np.load(self.path / centroids_file(g))
+        else:
+            main = np.empty((0, meta.dim), dtype=np.float32)
+            ids = np.empty(0, dtype=np.int64)
+        tail = self._map(tail_file(g), np.float32, (meta.count - meta.main_count, meta.dim))
+
+        def gather(rows: np.ndarray) -> np.ndarray:
+            out = np.empty((len(rows), meta.dim), dtype=np.float32)
+            in_main = rows < meta.main_count
+            out[in_main] = main[rows[in_main]]
+            out[~in_main] = tail[rows[~in_main] - meta.main_count]
+            return out
+
+        retrain = retrain or not meta.nlist or meta.count >= self._retrain_growth * meta.trained_count
+        if retrain:
+            nlist = max(1, round(math.sqrt(meta.count)))
+            sample_rows = np.sort(
+                self._rng.choice(meta.count, min(meta.count, nlist * TRAIN_POINTS_PER_LIST), replace=False)
+            )
+            centroids = kmeans(gather(sample_rows), nlist, self._rng)
+            assign = np.concatenate((_nearest(main, centroids), _nearest(tail, centroids)))
+        else:
+            nlist = meta.nlist
+            tail_lists = self._map(tail_lists_file(g), np.int32, (len(tail),))
+            assign = np.concatenate((np.repeat(np.arange(nlist, dtype=np.int32), np.diff(offsets)), tail_lists))
+
+        order = np.argsort(assign, kind="stable")
+        new_offsets = np.zeros(nlist + 1, dtype=np.int64)
+        new_offsets[1:] = np.cumsum(np.bincount(assign, minlength=nlist))
+        all_ids = np.concatenate((ids, np.arange(meta.main_count, meta.count, dtype=np.int64)))
+
+        new = g + 1
+        tmp = self.path / f"{main_file(new)}.tmp"
+        out = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float32, shape=(meta.count, meta.dim))
+        for start in range(0, meta.count, CHUNK_ROWS):
+            rows = order[start : start + CHUNK_ROWS]
+            out[start : start + len(rows)] = gather(rows)
+        out.flush()
+        del out
+        os.replace(tmp, self.path / main_file(new))
+        self._save(ids_file(new), all_ids[order])
+        self._save(offsets_file(new), new_offsets)
+        self._save(centroids_file(new), centroids)
+        (self.path / tail_file(new)).touch()
+        (self.path / tail_lists_file(new)).touch()
+
+        meta = replace(
+            meta,
+            generation=new,
+            main_count=meta.count,
+            nlist=nlist,
+            trained_count=meta.count if retrain else meta.trained_count,
+        )
+        self._write_meta(meta)
+        # Readers that mapped them keep their view until they refresh
+        for name in (
+            main_file(g),
+            ids_file(g),
+            offsets_file(g),
+            centroids_file(g),
+            tail_file(g),
+            tail_lists_file(g),
+        ):
+            (self.path / name).unlink(missing_ok=True)
+        return meta
+
+    def _save(self, name: str, array: np.ndarray) -> None:
+        tmp = self.path / f"{name}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp, self.path / name)
+
+    def _read_meta(self) -> IndexMeta | None:
+        try:
+            with open(self.path / META_FILE) as f:
+                return IndexMeta(**json.load(f))
+        except FileNotFoundError:
+            return None
+
+    def _write_meta(self, meta: IndexMeta) -> None:
+        tmp = self.path / f"{META_FILE}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(asdict(meta), f)
+        os.replace(tmp, self.path / META_FILE)
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        fd = os.open(self.path / LOCK_FILE, os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
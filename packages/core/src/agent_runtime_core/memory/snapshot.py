@@ -0,0 +1,215 @@
+"""Snapshots of vector memory indexes in the object store."""
+
+import asyncio
+import fcntl
+import logging
+import os
+import shutil
+import tempfile
+from dataclasses import asdict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from ..storage import ObjectNotFoundError, ObjectStore, get_object_store
+from ..utils import get_settings, json_dumps, json_loads
+from .index import META_FILE, PAYLOAD_DATA_FILE, PAYLOAD_INDEX_FILE, IVFIndex
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+# The manifest of the last snapshot taken from this directory
+SNAPSHOT_STATE_FILE = "snapshot.json"
+SNAPSHOT_LOCK_FILE = ".snapshot.lock"
+
+# Bytes per ranged read when restoring
+RESTORE_CHUNK_SIZE = 64 * 1024 * 1024
+
+
+def snapshot_prefix(tenant_id: str) -> str:
+    return f"memory/{tenant_id}"
+
+
+def _append_only(name: str) -> bool:
+    # Every other file is written once per generation and never changed
+    return name.startswith("tail-") or name in (PAYLOAD_DATA_FILE, PAYLOAD_INDEX_FILE)
+
+
+class _Slice:
+    """Reads `length` bytes of a file starting at `start`."""
+
+    def __init__(self, f: BinaryIO, start: int, length: int) -> None:
+        f.seek(start)
+        self._f = f
+        self._left = length
+
+    def read(self, size: int = -1) -> bytes:
+        size = self._left if size < 0 else min(size, self._left)
+        data = self._f.read(size)
+        self._left -= len(data)
+        return data
+
+
+async def take_snapshot(path: Path, prefix: str, objects: ObjectStore | None = None) -> bool:
+    """
+    Upload an index's committed state under `prefix` if it changed since the last snapshot.
+
+    Files written once per generation are uploaded once. Files that are
+    only appended to go up as segments holding the bytes added since the
+    previous snapshot. The manifest listing every file's segments is
+    written last, then objects it no longer references are deleted.
+    Returns whether a snapshot was taken; False if unchanged or another
+    process is taking one.
+    """
+    objects = objects or get_object_store()
+    lock = os.open(path / SNAPSHOT_LOCK_FILE, os.O_CREAT | os.O_RDWR, 0o644)
+    try:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        try:
+            with open(path / SNAPSHOT_STATE_FILE, "rb") as f:
+                previous: dict[str, Any] = json_loads(f.read())
+        except FileNotFoundError:
+            previous = {"meta": None, "files": {}}
+
+        meta, files = await asyncio.to_thread(IVFIndex(path).open_files)
+        try:
+            if previous["meta"] == asdict(meta):
+                return False
+            manifest_files: dict[str, list[list[Any]]] = {}
+            for name, (f, size) in files.items():
+                segments = previous["files"].get(name, [])
+                if _append_only(name):
+                    uploaded = sum(length for _, length in segments)
+                    if size > uploaded:
+                        key = f"{prefix}/{name}.{uploaded}"
+                        await objects.put(key, _Slice(f, uploaded, size - uploaded))  # type: ignore[arg-type]
+                        segments = [*segments, [key, size - uploaded]]
+                elif not segments:
+                    key = f"{prefix}/{name}"
+                    await objects.put(key, _Slice(f, 0, size))  # type: ignore[arg-type]
+                    segments = [[key, size]]
+                manifest_files[name] = segments
+        finally:
+            for f, _ in files.values():
+                f.close()
+
+        manifest = {"meta": asdict(meta), "files": manifest_files}
+        await objects.put(f"{prefix}/{MANIFEST_FILE}", json_dumps(manifest), "application/json")
+        _write_state(path, manifest)
+        current = {key for segments in manifest_files.values() for key, _ in segments}
+        for segments in previous["files"].values():
+            for key, _ in segments:
+                if key not in current:
+                    await objects.delete(key)
+        return True
+    finally:
+        os.close(lock)
+
+
+async def restore_snapshot(path: Path, prefix: str, objects: ObjectStore | None = None) -> bool:
+    """
+    Recreate an index at `path` from its latest snapshot; False if there is none.
+
+    Downloads into a staging directory that is renamed into place, so a
+    partial restore is never opened. If another process restores it first,
+    theirs is kept.
+    """
+    objects = objects or get_object_store()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    for attempt in range(2):
+        try:
+            manifest = json_loads(await objects.get(f"{prefix}/{MANIFEST_FILE}"))
+        except ObjectNotFoundError:
+            return False
+        staging = Path(tempfile.mkdtemp(prefix=f".{path.name}.restore-", dir=path.parent))
+        try:
+            for name, segments in manifest["files"].items():
+                with open(staging / name, "wb") as f:
+                    for key, length in segments:
+                        for offset in range(0, length, RESTORE_CHUNK_SIZE):
+                            f.write(await objects.get(key, offset, min(RESTORE_CHUNK_SIZE, length - offset)))
+            with open(staging / META_FILE, "wb") as f:
+                f.write(json_dumps(manifest["meta"]))
+            _write_state(staging, manifest)
+            try:
+                os.rename(staging, path)
+            except OSError:
+                if not (path / META_FILE).exists():
+                    raise
+            return True
+        except ObjectNotFoundError:
+            # A newer snapshot deleted segments of the manifest read above
+            if attempt:
+                raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+    return False
+
+
+def _write_state(path: Path, manifest: dict[str, Any]) -> None:
+    tmp = path / f"{SNAPSHOT_STATE_FILE}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(json_dumps(manifest))
+    os.replace(tmp, path / SNAPSHOT_STATE_FILE)
+
+
+class MemorySnapshotter:
+    """
+    Snapshots every memory under a directory to the object store periodically.
+
+    Each tool worker process on a node runs one; the snapshot lock and the
+    recorded state of the last snapshot keep them from repeating each
+    other's uploads.
+    """
+
+    def __init__(self, root: str | Path, interval: float, objects: ObjectStore | None = None) -> None:
+        self._root = Path(root)
+        self._interval = interval
+        self._objects = objects
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """Start taking snapshots in the background."""
+        if self._task is None and self._interval > 0:
+            self._task = asyncio.create_task(self._run(), name="memory-snapshotter")
+
+    async def close(self) -> None:
+        """Stop, after one last round so recent inserts are not left only on local disk."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.snapshot_all()
+
+    async def snapshot_all(self) -> int:
+        """Snapshot each memory that changed; returns how many were uploaded."""
+        if not self._root.is_dir():
+            return 0
+        taken = 0
+        for path in sorted(self._root.iterdir()):
+            if not (path / META_FILE).exists():
+                continue
+            try:
+                taken += await take_snapshot(path, snapshot_prefix(path.name), self._objects)
+            except Exception:
+                logger.warning("Failed to snapshot memory %s", path.name, exc_info=True)
+        return taken
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            await self.snapshot_all()
+
+
+@lru_cache
+def get_memory_snapshotter() -> MemorySnapshotter:
+    """Get the process-wide snapshotter configured from settings."""
+    settings = get_settings()
+    return MemorySnapshotter(settings.memory_local_path, settings.memory_snapshot_interval_seconds)
@@ -0,0 +1,101 @@
+"""Per-tenant vector memory: texts stored with their embeddings in an IVF index."""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+from uuid import UUID
+
+import numpy as np
+
+from ..utils import get_settings, json_dumps, json_loads
+from .embeddings import Embedder, get_embedder
+from .index import META_FILE, IVFIndex
+from .snapshot import restore_snapshot, snapshot_prefix
+
+
+@dataclass
+class MemoryHit:
+    """A stored text matching a query."""
+
+    id: int
+    score: float
+    text: str
+    metadata: dict[str, Any] = field(default_factory=dict)
+
+
+class VectorMemory:
+    """Texts and their metadata, searchable by similarity to a query."""
+
+    def __init__(self, path: str | Path, embedder: Embedder, *, nprobe: int = 16) -> None:
+        self.index = IVFIndex(path, dim=embedder.dim, metric="cosine", embedder=embedder.name)
+        self.embedder = embedder
+        self.nprobe = nprobe
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def add(
+        self,
+        texts: list[str],
+        metadata: list[dict[str, Any] | None] | None = None,
+        embeddings: np.ndarray | None = None,
+    ) -> list[int]:
+        """Store texts, embedding them unless `embeddings` are given; returns their IDs."""
+        if not texts:
+            return []
+        metadata = metadata or [None] * len(texts)
+        if embeddings is None:
+            embeddings = self.embedder.embed(texts)
+        payloads = [json_dumps({"text": t, "metadata": m or {}}) for t, m in zip(texts, metadata)]
+        return self.index.add(embeddings, payloads).tolist()
+
+    def search(
+        self,
+        queries: list[str],
+        k: int = 5,
+        *,
+        embeddings: np.ndarray | None = None,
+        nprobe: int | None = None,
+    ) -> list[list[MemoryHit]]:
+        """The k best matches for each query, best first."""
+        if not queries:
+            return []
+        self.index.refresh()
+        if embeddings is None:
+            embeddings = self.embedder.embed(queries)
+        scores, ids = self.index.search(embeddings, k, nprobe or self.nprobe)
+        results = []
+        for row_scores, row_ids in zip(scores, ids):
+            found = row_ids >= 0
+            hits = []
+            for i, score, payload in zip(
+                row_ids[found], row_scores[found], self.index.payloads(row_ids[found])
+            ):
+                doc = json_loads(payload)
+                hits.append(MemoryHit(id=int(i), score=float(score), text=doc["text"], metadata=doc["metadata"]))
+            results.append(hits)
+        return results
+
+
+_memories: dict[str, VectorMemory] = {}
+
+
+async def get_vector_memory(tenant_id: str) -> VectorMemory:
+    """
+    Get a tenant's memory, opening it on first use in this process.
+
+    Memories live under MEMORY_LOCAL_PATH, one directory per tenant. One
+    that is missing locally is restored from its latest snapshot in the
+    object store, if there is one, and otherwise created empty.
+    """
+    # Also keeps anything but a tenant ID out of the path
+    tenant_id = str(UUID(tenant_id))
+    memory = _memories.get(tenant_id)
+    if memory is None:
+        settings = get_settings()
+        path = Path(settings.memory_local_path) / tenant_id
+        if not (path / META_FILE).exists():
+            await restore_snapshot(path, snapshot_prefix(tenant_id))
+        memory = VectorMemory(path, get_embedder(settings.memory_embedder), nprobe=settings.memory_nprobe)
+        _memories[tenant_id] = memory
+    return memory
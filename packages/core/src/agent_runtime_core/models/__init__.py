@@ -2,13 +2,17 @@
 
 from .tenant import Tenant
 from .agent import Agent, AgentVersion
-from .run import Run, RunStatus, RunEvent
+from .run import Run, RunPriority, RunStatus, RunEvent
+from .artifact import Artifact, ArtifactStatus
 
 __all__ = [
     "Tenant",
     "Agent",
     "AgentVersion",
     "Run",
+    "RunPriority",
     "RunStatus",
     "RunEvent",
+    "Artifact",
+    "ArtifactStatus",
 ]
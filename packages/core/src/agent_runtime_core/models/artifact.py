@@ -0,0 +1,34 @@
+"""Artifact model - a file stored for runs to reference by ID."""
+
+from datetime import datetime
+from enum import Enum
+from uuid import UUID, uuid4
+
+from pydantic import BaseModel, Field
+
+
+class ArtifactStatus(str, Enum):
+    """Lifecycle of an artifact's content."""
+
+    # Created; the content is still being uploaded
+    PENDING = "pending"
+    READY = "ready"
+
+
+class Artifact(BaseModel):
+    """A stored file (document, dataset, tool output) that runs reference by ID."""
+
+    id: UUID = Field(default_factory=uuid4)
+    tenant_id: UUID
+    status: ArtifactStatus = Field(default=ArtifactStatus.PENDING)
+    filename: str | None = None
+    content_type: str = "application/octet-stream"
+    size: int | None = None
+    # Hex SHA-256 of the content; ready artifacts are unique per tenant and hash
+    sha256: str | None = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    model_config = {
+        "from_attributes": True,
+    }
@@ -19,6 +19,13 @@ class RunStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
+class RunPriority(str, Enum):
+    """Admission lane of a run; interactive runs are released before batch runs."""
+
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
+
+
 class Run(BaseModel):
     """A single execution of an agent version with defined input."""
 
@@ -39,6 +46,12 @@ class Run(BaseModel):
     workflow_id: str | None = None
     workflow_run_id: str | None = None
 
+    # Client-supplied key making submission idempotent per tenant
+    idempotency_key: str | None = None
+
+    # Artifacts given to the run; their content lives in the artifact store
+    artifact_ids: list[UUID] = Field(default_factory=list)
+
     model_config = {
         "from_attributes": True,
     }
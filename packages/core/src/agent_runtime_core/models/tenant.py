@@ -13,6 +13,10 @@ class Tenant(BaseModel):
     name: str = Field(..., min_length=1, max_length=255)
     slug: str = Field(..., min_length=1, max_length=63, pattern=r"^[a-z0-9-]+$")
     is_active: bool = Field(default=True)
+    # Concurrent runs before new ones queue; None uses the deployment default
+    max_concurrent_runs: int | None = Field(default=None, ge=0)
+    # Share of released capacity relative to other tenants with queued runs
+    scheduling_weight: int = Field(default=1, ge=1)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -0,0 +1,14 @@
+"""Run status read model in Redis, persisted asynchronously to Postgres."""
+
+from .store import RunStatusStore, RunStatusUpdate, get_run_status_store, status_key
+from .persister import RunStatusPersister, get_run_status_persister, persist_status_updates
+
+__all__ = [
+    "RunStatusStore",
+    "RunStatusUpdate",
+    "get_run_status_store",
+    "status_key",
+    "RunStatusPersister",
+    "get_run_status_persister",
+    "persist_status_updates",
+]
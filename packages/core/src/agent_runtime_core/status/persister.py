@@ -0,0 +1,214 @@
+"""Persists run status transitions from the Redis stream to Postgres."""
+
+import asyncio
+import logging
+import os
+import socket
+from datetime import datetime
+from typing import TYPE_CHECKING
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from ..db import get_engine
+from ..models import RunStatus
+from ..utils import get_redis, get_settings, json_dumps, json_loads
+from .store import STATUS_STREAM, RunStatusUpdate
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+CONSUMER_GROUP = "run-status-persister"
+
+# Applies a batch in one statement. A transition only lands if it is newer
+# than the one the row already has; started_at keeps its first value.
+UPDATE_STATUSES = text(
+    "UPDATE runs SET status = u.status, status_version = u.version, "
+    "output = COALESCE(CAST(u.output AS jsonb), runs.output), "
+    "error = COALESCE(u.error, runs.error), "
+    "started_at = COALESCE(runs.started_at, u.started_at), "
+    "completed_at = COALESCE(u.completed_at, runs.completed_at), "
+    "updated_at = u.at "
+    "FROM unnest(CAST(:ids AS uuid[]), CAST(:versions AS bigint[]), CAST(:statuses AS text[]), "
+    "CAST(:outputs AS text[]), CAST(:errors AS text[]), CAST(:started_ats AS timestamptz[]), "
+    "CAST(:completed_ats AS timestamptz[]), CAST(:ats AS timestamptz[])) "
+    "AS u(id, version, status, output, error, started_at, completed_at, at) "
+    "WHERE runs.id = u.id AND (runs.status_version IS NULL OR runs.status_version < u.version)"
+)
+
+
+async def persist_status_updates(engine: AsyncEngine, updates: list[RunStatusUpdate]) -> None:
+    """Write status transitions to the runs table in one statement."""
+    # Only the newest transition per run matters, and UPDATE ... FROM
+    # applies an arbitrary one when a row joins several
+    latest: dict[UUID, RunStatusUpdate] = {}
+    for update in updates:
+        current = latest.get(update.run_id)
+        if current is None or update.version > current.version:
+            latest[update.run_id] = update
+    if not latest:
+        return
+    rows = list(latest.values())
+    async with engine.begin() as conn:
+        await conn.execute(
+            UPDATE_STATUSES,
+            {
+                "ids": [u.run_id for u in rows],
+                "versions": [u.version for u in rows],
+                "statuses": [u.status.value for u in rows],
+                "outputs": [
+                    json_dumps(u.output, default=str).decode() if u.output is not None else None
+                    for u in rows
+                ],
+                "errors": [u.error for u in rows],
+                "started_ats": [u.at if u.status == RunStatus.RUNNING else None for u in rows],
+                "completed_ats": [u.at if u.is_terminal else None for u in rows],
+                "ats": [u.at for u in rows],
+            },
+        )
+
+
+def _parse_entry(fields: dict[bytes, bytes]) -> RunStatusUpdate:
+    output = fields.get(b"output", b"")
+    error = fields.get(b"error", b"")
+    return RunStatusUpdate(
+        run_id=UUID(fields[b"run_id"].decode()),
+        status=RunStatus(fields[b"status"].decode()),
+        version=int(fields[b"version"]),
+        at=datetime.fromisoformat(fields[b"at"].decode()),
+        output=json_loads(output) if output else None,
+        error=error.decode() or None,
+    )
+
+
+class RunStatusPersister:
+    """
+    Drains the status stream into Postgres through a consumer group.
+
+    Every worker process runs one consumer; Redis spreads entries across
+    them. Entries are acknowledged only after their batch is committed.
+    Entries left unacknowledged by a consumer that died are claimed by the
+    others once idle for `claim_idle` seconds, so none are lost.
+    """
+
+    def __init__(
+        self,
+        redis: "Redis",
+        engine: AsyncEngine | None = None,
+        *,
+        batch_size: int = 500,
+        block: float = 0.1,
+        claim_idle: float = 60.0,
+    ) -> None:
+        self._redis = redis
+        self._engine = engine
+        self._batch_size = batch_size
+        self._block_ms = int(block * 1000)
+        self._claim_idle_ms = int(claim_idle * 1000)
+        self._consumer = f"{socket.gethostname()}-{os.getpid()}"
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """Join the consumer group and start persisting in the background."""
+        if self._task is not None:
+            return
+        if self._engine is None:
+            self._engine = get_engine()
+        try:
+            await self._redis.xgroup_create(STATUS_STREAM, CONSUMER_GROUP, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._task = asyncio.create_task(self._run(), name="run-status-persister")
+
+    async def close(self) -> None:
+        """Stop persisting and leave the consumer group if nothing is left pending."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        try:
+            pending = await self._redis.xpending_range(
+                STATUS_STREAM, CONSUMER_GROUP, min="-", max="+", count=1, consumername=self._consumer
+            )
+            # Deleting a consumer drops its pending entries, so only an idle one goes
+            if not pending:
+                await self._redis.xgroup_delconsumer(STATUS_STREAM, CONSUMER_GROUP, self._consumer)
+        except Exception:
+            logger.warning("Failed to leave run status consumer group", exc_info=True)
+
+    async def _run(self) -> None:
+        backoff = 0.5
+        next_claim = 0.0
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                if loop.time() >= next_claim:
+                    await self._claim_stale()
+                    next_claim = loop.time() + self._claim_idle_ms / 2000
+                response = await self._redis.xreadgroup(
+                    CONSUMER_GROUP,
+                    self._consumer,
+                    {STATUS_STREAM: ">"},
+                    count=self._batch_size,
+                    block=self._block_ms,
+                )
+                for _, entries in response or ():
+                    await self._persist(entries)
+                backoff = 0.5
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Persisting run statuses failed, retrying")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 10.0)
+
+    async def _claim_stale(self) -> None:
+        """Take over entries another consumer read but never acknowledged."""
+        start = "0-0"
+        while True:
+            start, entries, *_ = await self._redis.xautoclaim(
+                STATUS_STREAM,
+                CONSUMER_GROUP,
+                self._consumer,
+                min_idle_time=self._claim_idle_ms,
+                start_id=start,
+                count=self._batch_size,
+            )
+            if entries:
+                await self._persist(entries)
+            if start in (b"0-0", "0-0"):
+                return
+
+    async def _persist(self, entries: list[tuple[bytes, dict[bytes, bytes]]]) -> None:
+        updates = []
+        for _, fields in entries:
+            try:
+                updates.append(_parse_entry(fields))
+            except (KeyError, ValueError):
+                logger.exception("Skipping malformed run status entry")
+        await persist_status_updates(self._engine, updates)
+        await self._redis.xack(STATUS_STREAM, CONSUMER_GROUP, *(entry_id for entry_id, _ in entries))
+
+
+_persister: RunStatusPersister | None = None
+
+
+def get_run_status_persister() -> RunStatusPersister:
+    """Get the process-wide run status persister configured from settings."""
+    global _persister
+    if _persister is None:
+        settings = get_settings()
+        _persister = RunStatusPersister(
+            get_redis(),
+            batch_size=settings.run_status_persist_batch_size,
+            block=settings.run_status_persist_block_ms / 1000,
+        )
+    return _persister
@@ -0,0 +1,217 @@
+"""Redis read model of run status.
+
+Workflows push status transitions (running, paused, and the terminal
+statuses) through a local activity. Each transition is written to a Redis
+hash per run and appended to a stream, both in one Lua script. The stream
+is drained into the `runs` table by `RunStatusPersister`, so Postgres
+catches up asynchronously.
+
+The hash also holds a snapshot of the run row, cached the first time the
+run is read. Polling a run's status is then served from Redis alone. Row
+writes the API makes around workflow start (the workflow run ID, a failure
+to start) are written to the hash as fields too, so they show through a
+snapshot cached before them or read from a lagging replica after them.
+
+Transitions carry a version (the workflow time in microseconds, strictly
+increasing per run). A transition older than the one already recorded is
+ignored, both in Redis and in Postgres, so retried or reordered activities
+never move a run backwards.
+"""
+
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from ..models import Run, RunStatus
+from ..utils import get_redis, get_settings, json_dumps, json_loads
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+STATUS_STREAM = "run-status-updates"
+TERMINAL_STATUSES = frozenset({RunStatus.COMPLETED, RunStatus.FAILED, RunStatus.CANCELLED})
+# Hash fields overlaid on the cached run snapshot
+STATUS_FIELDS = (
+    "version", "status", "output", "error", "started_at", "completed_at", "updated_at",
+    "workflow_run_id",
+)
+
+# KEYS[1] = status hash, KEYS[2] = update stream
+# ARGV[1] = version, ARGV[2] = status, ARGV[3] = output JSON or "",
+# ARGV[4] = error or "", ARGV[5] = timestamp, ARGV[6] = "1" if terminal,
+# ARGV[7] = ttl seconds, ARGV[8] = stream maxlen, ARGV[9] = run ID
+RECORD_SCRIPT = """
+local current = tonumber(redis.call('HGET', KEYS[1], 'version') or '-1')
+if tonumber(ARGV[1]) <= current then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'version', ARGV[1], 'status', ARGV[2], 'updated_at', ARGV[5])
+if ARGV[3] ~= '' then redis.call('HSET', KEYS[1], 'output', ARGV[3]) end
+if ARGV[4] ~= '' then redis.call('HSET', KEYS[1], 'error', ARGV[4]) end
+if ARGV[2] == 'running' then redis.call('HSETNX', KEYS[1], 'started_at', ARGV[5]) end
+if ARGV[6] == '1' then redis.call('HSET', KEYS[1], 'completed_at', ARGV[5]) end
+redis.call('EXPIRE', KEYS[1], ARGV[7])
+redis.call('XADD', KEYS[2], 'MAXLEN', '~', ARGV[8], '*',
+    'run_id', ARGV[9], 'version', ARGV[1], 'status', ARGV[2],
+    'output', ARGV[3], 'error', ARGV[4], 'at', ARGV[5])
+return 1
+"""
+
+# KEYS[1] = status hash
+# ARGV[1] = error, ARGV[2] = timestamp, ARGV[3] = ttl seconds
+# Recorded at version 0, below any transition the workflow itself records
+FAIL_SCRIPT = """
+if redis.call('HEXISTS', KEYS[1], 'version') == 1 then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'version', '0', 'status', 'failed', 'error', ARGV[1],
+    'completed_at', ARGV[2], 'updated_at', ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+
+class RunStatusUpdate(BaseModel):
+    """A status transition of a run."""
+
+    run_id: UUID
+    status: RunStatus
+    version: int
+    at: datetime
+    output: dict[str, Any] | None = None
+    error: str | None = None
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+
+def status_key(run_id: UUID | str) -> str:
+    """Redis hash holding a run's status and cached snapshot."""
+    return f"run-status:{run_id}"
+
+
+class RunStatusStore:
+    """Writes status transitions to Redis and serves run reads from it."""
+
+    def __init__(
+        self,
+        redis: "Redis",
+        *,
+        ttl_seconds: int = 86_400,
+        stream_maxlen: int = 100_000,
+    ) -> None:
+        self._redis = redis
+        self._script = redis.register_script(RECORD_SCRIPT)
+        self._fail_script = redis.register_script(FAIL_SCRIPT)
+        self._ttl_seconds = ttl_seconds
+        self._stream_maxlen = stream_maxlen
+
+    async def record(self, update: RunStatusUpdate) -> bool:
+        """Record a transition; returns False if a newer one was already recorded."""
+        at = update.at if update.at.tzinfo is not None else update.at.replace(tzinfo=timezone.utc)
+        applied = await self._script(
+            keys=[status_key(update.run_id), STATUS_STREAM],
+            args=[
+                update.version,
+                update.status.value,
+                json_dumps(update.output, default=str) if update.output is not None else "",
+                update.error or "",
+                at.isoformat(),
+                "1" if update.is_terminal else "0",
+                self._ttl_seconds,
+                self._stream_maxlen,
+                str(update.run_id),
+            ],
+        )
+        return bool(applied)
+
+    async def get(self, run_id: UUID) -> Run | None:
+        """Read a run from its cached snapshot, or None if it is not cached."""
+        fields = await self._redis.hgetall(status_key(run_id))
+        snapshot = fields.get(b"run")
+        if snapshot is None:
+            return None
+        return _apply_status(Run.model_validate_json(snapshot), fields)
+
+    async def cache_run(self, run: Run) -> None:
+        """Cache a run snapshot (read from Postgres) for later reads."""
+        key = status_key(run.id)
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.hset(key, "run", run.model_dump_json())
+            pipe.expire(key, self._ttl_seconds)
+            await pipe.execute()
+
+    async def set_workflow_run_ids(self, workflow_run_ids: dict[UUID, str]) -> None:
+        """Overlay the Temporal run IDs of started workflows on their cached runs."""
+        if not workflow_run_ids:
+            return
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for run_id, workflow_run_id in workflow_run_ids.items():
+                key = status_key(run_id)
+                pipe.hset(key, "workflow_run_id", workflow_run_id)
+                pipe.expire(key, self._ttl_seconds)
+            await pipe.execute()
+
+    async def mark_failed(self, errors: dict[UUID, str], at: datetime) -> None:
+        """Overlay failures to start on cached runs whose workflow recorded no status."""
+        if not errors:
+            return
+        at = at if at.tzinfo is not None else at.replace(tzinfo=timezone.utc)
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for run_id, error in errors.items():
+                await self._fail_script(
+                    keys=[status_key(run_id)],
+                    args=[error, at.isoformat(), self._ttl_seconds],
+                    client=pipe,
+                )
+            await pipe.execute()
+
+    async def overlay(self, runs: list[Run]) -> list[Run]:
+        """Apply status transitions not yet persisted to runs read from Postgres."""
+        if not runs:
+            return runs
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for run in runs:
+                pipe.hmget(status_key(run.id), STATUS_FIELDS)
+            rows = await pipe.execute()
+        return [
+            _apply_status(run, {k.encode(): v for k, v in zip(STATUS_FIELDS, values) if v is not None})
+            for run, values in zip(runs, rows)
+        ]
+
+
+def _apply_status(run: Run, fields: dict[bytes, bytes]) -> Run:
+    """Overlay the status fields of a hash on a run."""
+    updates: dict[str, Any] = {}
+    if b"workflow_run_id" in fields:
+        updates["workflow_run_id"] = fields[b"workflow_run_id"].decode()
+    if b"version" in fields:
+        updates["status"] = RunStatus(fields[b"status"].decode())
+    if b"output" in fields:
+        updates["output"] = json_loads(fields[b"output"])
+    if b"error" in fields:
+        updates["error"] = fields[b"error"].decode()
+    for name in ("started_at", "completed_at", "updated_at"):
+        value = fields.get(name.encode())
+        if value is not None:
+            updates[name] = datetime.fromisoformat(value.decode())
+    return run.model_copy(update=updates) if updates else run
+
+
+_store: RunStatusStore | None = None
+
+
+def get_run_status_store() -> RunStatusStore:
+    """Get the process-wide run status store configured from settings."""
+    global _store
+    if _store is None:
+        settings = get_settings()
+        _store = RunStatusStore(
+            get_redis(),
+            ttl_seconds=settings.run_status_ttl_seconds,
+            stream_maxlen=settings.run_status_stream_maxlen,
+        )
+    return _store
@@ -0,0 +1,14 @@
+"""Object storage backends (MinIO/S3 and local filesystem)."""
+
+from .base import ObjectNotFoundError, ObjectStore
+from .local import LocalObjectStore
+from .s3 import S3ObjectStore
+from .factory import get_object_store
+
+__all__ = [
+    "ObjectNotFoundError",
+    "ObjectStore",
+    "LocalObjectStore",
+    "S3ObjectStore",
+    "get_object_store",
+]
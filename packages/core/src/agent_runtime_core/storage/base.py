@@ -0,0 +1,33 @@
+"""Object store interface."""
+
+from abc import ABC, abstractmethod
+from typing import BinaryIO
+
+
+class ObjectNotFoundError(KeyError):
+    """Raised when a requested object does not exist."""
+
+
+class ObjectStore(ABC):
+    """Minimal async interface over a key/value blob store."""
+
+    @abstractmethod
+    async def put(
+        self,
+        key: str,
+        data: bytes | BinaryIO,
+        content_type: str = "application/octet-stream",
+    ) -> None:
+        """Store an object, replacing any existing object with the same key."""
+
+    @abstractmethod
+    async def get(self, key: str, offset: int = 0, length: int | None = None) -> bytes:
+        """Read an object, or `length` bytes of it starting at `offset`."""
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        """Check whether an object exists."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Delete an object if it exists."""
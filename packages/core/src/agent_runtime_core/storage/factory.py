@@ -0,0 +1,22 @@
+"""Object store construction from settings."""
+
+from functools import lru_cache
+
+from ..utils import get_settings
+from .base import ObjectStore
+from .local import LocalObjectStore
+from .s3 import S3ObjectStore
+
+
+@lru_cache
+def get_object_store() -> ObjectStore:
+    """Get the process-wide object store configured from settings."""
+    settings = get_settings()
+    if settings.object_store_backend == "local":
+        return LocalObjectStore(settings.object_store_local_path)
+    return S3ObjectStore(
+        bucket=settings.s3_bucket,
+        endpoint_url=settings.s3_endpoint,
+        access_key=settings.s3_access_key,
+        secret_key=settings.s3_secret_key,
+    )
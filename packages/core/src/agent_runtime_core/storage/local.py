@@ -0,0 +1,65 @@
+"""Local filesystem object store for tests and single-node deployments."""
+
+import asyncio
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import BinaryIO
+
+from .base import ObjectNotFoundError, ObjectStore
+
+
+class LocalObjectStore(ObjectStore):
+    """Stores objects as files under a root directory."""
+
+    def __init__(self, root: str | Path) -> None:
+        self._root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        path = (self._root / key).resolve()
+        if not path.is_relative_to(self._root.resolve()):
+            raise ValueError(f"Invalid object key: {key}")
+        return path
+
+    async def put(
+        self,
+        key: str,
+        data: bytes | BinaryIO,
+        content_type: str = "application/octet-stream",
+    ) -> None:
+        await asyncio.to_thread(self._put, self._path(key), data)
+
+    @staticmethod
+    def _put(path: Path, data: bytes | BinaryIO) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file and rename so readers never see partial objects
+        fd, tmp = tempfile.mkstemp(dir=path.parent)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                if isinstance(data, bytes):
+                    f.write(data)
+                else:
+                    shutil.copyfileobj(data, f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    async def get(self, key: str, offset: int = 0, length: int | None = None) -> bytes:
+        return await asyncio.to_thread(self._get, self._path(key), key, offset, length)
+
+    @staticmethod
+    def _get(path: Path, key: str, offset: int, length: int | None) -> bytes:
+        try:
+            with open(path, "rb") as f:
+                f.seek(offset)
+                return f.read() if length is None else f.read(length)
+        except FileNotFoundError:
+            raise ObjectNotFoundError(key) from None
+
+    async def exists(self, key: str) -> bool:
+        return self._path(key).is_file()
+
+    async def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
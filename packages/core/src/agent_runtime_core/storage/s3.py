@@ -0,0 +1,91 @@
+"""S3/MinIO object store backed by boto3."""
+
+import asyncio
+from typing import Any, BinaryIO
+
+from .base import ObjectNotFoundError, ObjectStore
+
+
+class S3ObjectStore(ObjectStore):
+    """
+    Stores objects in an S3-compatible bucket.
+
+    boto3 is synchronous, so calls run in the default thread pool. The client
+    is created on first use so importing this module does not require boto3.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: str | None = None,
+        access_key: str | None = None,
+        secret_key: str | None = None,
+    ) -> None:
+        self.bucket = bucket
+        self._endpoint_url = endpoint_url
+        self._access_key = access_key
+        self._secret_key = secret_key
+        self._client: Any = None
+
+    @property
+    def client(self) -> Any:
+        """The underlying boto3 S3 client."""
+        if self._client is None:
+            import boto3
+
+            self._client = boto3.client(
+                "s3",
+                endpoint_url=self._endpoint_url,
+                aws_access_key_id=self._access_key,
+                aws_secret_access_key=self._secret_key,
+            )
+        return self._client
+
+    async def put(
+        self,
+        key: str,
+        data: bytes | BinaryIO,
+        content_type: str = "application/octet-stream",
+    ) -> None:
+        if isinstance(data, bytes):
+            await asyncio.to_thread(
+                self.client.put_object,
+                Bucket=self.bucket,
+                Key=key,
+                Body=data,
+                ContentType=content_type,
+            )
+        else:
+            # upload_fileobj switches to multipart uploads for large bodies
+            await asyncio.to_thread(
+                self.client.upload_fileobj,
+                data,
+                self.bucket,
+                key,
+                ExtraArgs={"ContentType": content_type},
+            )
+
+    async def get(self, key: str, offset: int = 0, length: int | None = None) -> bytes:
+        kwargs: dict[str, Any] = {"Bucket": self.bucket, "Key": key}
+        if offset or length is not None:
+            end = "" if length is None else str(offset + length - 1)
+            kwargs["Range"] = f"bytes={offset}-{end}"
+        try:
+            response = await asyncio.to_thread(self.client.get_object, **kwargs)
+        except self.client.exceptions.NoSuchKey:
+            raise ObjectNotFoundError(key) from None
+        return await asyncio.to_thread(response["Body"].read)
+
+    async def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            await asyncio.to_thread(self.client.head_object, Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self.client.delete_object, Bucket=self.bucket, Key=key)
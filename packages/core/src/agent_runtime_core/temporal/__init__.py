@@ -0,0 +1,12 @@
+"""Temporal integration shared by the API and worker (requires the `temporal` extra)."""
+
+from .codec import OffloadingPayloadCodec, PayloadIntegrityError
+from .converter import OrjsonPayloadConverter, OrjsonPlainPayloadConverter, get_data_converter
+
+__all__ = [
+    "OffloadingPayloadCodec",
+    "OrjsonPayloadConverter",
+    "OrjsonPlainPayloadConverter",
+    "PayloadIntegrityError",
+    "get_data_converter",
+]
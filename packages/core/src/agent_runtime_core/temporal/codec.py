@@ -0,0 +1,108 @@
+"""Temporal payload codec: zstd compression with object-store offload."""
+
+import hashlib
+from collections import OrderedDict
+from collections.abc import Sequence
+
+import zstandard
+from temporalio.api.common.v1 import Payload
+from temporalio.converter import PayloadCodec
+
+from ..storage import ObjectStore
+
+ZSTD_ENCODING = b"binary/zstd"
+OFFLOAD_ENCODING = b"binary/object-ref"
+KEY_PREFIX = "temporal-payloads"
+
+
+class PayloadIntegrityError(ValueError):
+    """Raised when an offloaded payload does not match its content address."""
+
+
+class OffloadingPayloadCodec(PayloadCodec):
+    """
+    Keeps large payloads out of workflow history.
+
+    Each payload is serialized and zstd-compressed. If the compressed form
+    is still at least `offload_threshold` bytes, it is written to the
+    object store under its SHA-256 and replaced by a reference; identical
+    payloads (the same document passed to many runs) are stored once.
+    Payloads under `compress_threshold` bytes, or that do not shrink, are
+    left as they are.
+
+    Offloaded payloads are immutable, so recently decoded ones are kept in
+    a small LRU to spare replays a round trip to the store.
+    """
+
+    def __init__(
+        self,
+        store: ObjectStore | None,
+        *,
+        offload_threshold: int = 128 * 1024,
+        compress_threshold: int = 512,
+        level: int = 3,
+        cache_bytes: int = 64 * 1024 * 1024,
+    ) -> None:
+        self._store = store
+        self._offload_threshold = offload_threshold
+        self._compress_threshold = compress_threshold
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._decompressor = zstandard.ZstdDecompressor()
+        self._cache: OrderedDict[str, bytes] = OrderedDict()
+        self._cache_bytes = 0
+        self._max_cache_bytes = cache_bytes
+
+    async def encode(self, payloads: Sequence[Payload]) -> list[Payload]:
+        return [await self._encode(payload) for payload in payloads]
+
+    async def decode(self, payloads: Sequence[Payload]) -> list[Payload]:
+        return [await self._decode(payload) for payload in payloads]
+
+    async def _encode(self, payload: Payload) -> Payload:
+        if payload.ByteSize() < self._compress_threshold:
+            return payload
+        raw = payload.SerializeToString()
+        compressed = self._compressor.compress(raw)
+        if len(compressed) >= len(raw):
+            return payload
+        if self._store is None or len(compressed) < self._offload_threshold:
+            return Payload(metadata={"encoding": ZSTD_ENCODING}, data=compressed)
+
+        digest = hashlib.sha256(raw).hexdigest()
+        key = f"{KEY_PREFIX}/{digest[:2]}/{digest}"
+        if not await self._store.exists(key):
+            await self._store.put(key, compressed)
+        self._remember(key, raw)
+        return Payload(
+            metadata={"encoding": OFFLOAD_ENCODING, "size": str(len(raw)).encode()},
+            data=key.encode(),
+        )
+
+    async def _decode(self, payload: Payload) -> Payload:
+        encoding = payload.metadata.get("encoding")
+        if encoding == ZSTD_ENCODING:
+            return Payload.FromString(self._decompressor.decompress(payload.data))
+        if encoding != OFFLOAD_ENCODING:
+            return payload
+
+        key = payload.data.decode()
+        raw = self._cache.get(key)
+        if raw is not None:
+            self._cache.move_to_end(key)
+            return Payload.FromString(raw)
+        if self._store is None:
+            raise RuntimeError(f"Payload {key} is offloaded but no object store is configured")
+        raw = self._decompressor.decompress(await self._store.get(key))
+        if not key.endswith(hashlib.sha256(raw).hexdigest()):
+            raise PayloadIntegrityError(f"Offloaded payload {key} does not match its digest")
+        self._remember(key, raw)
+        return Payload.FromString(raw)
+
+    def _remember(self, key: str, raw: bytes) -> None:
+        if len(raw) > self._max_cache_bytes // 4 or key in self._cache:
+            return
+        self._cache[key] = raw
+        self._cache_bytes += len(raw)
+        while self._cache_bytes > self._max_cache_bytes:
+            _, evicted = self._cache.popitem(last=False)
+            self._cache_bytes -= len(evicted)
@@ -0,0 +1,95 @@
+"""Data converter shared by the API's Temporal client and the worker."""
+
+import collections.abc
+import dataclasses
+from functools import lru_cache
+from typing import Any
+
+import orjson
+from temporalio.api.common.v1 import Payload
+from temporalio.converter import (
+    CompositePayloadConverter,
+    DataConverter,
+    DefaultPayloadConverter,
+    JSONPlainPayloadConverter,
+    value_to_type,
+)
+
+from ..storage import get_object_store
+from ..utils import get_settings
+from .codec import OffloadingPayloadCodec
+
+
+def _default(value: Any) -> Any:
+    # What Temporal's AdvancedJSONEncoder handles beyond orjson's native types
+    model_dump = getattr(value, "model_dump", None)
+    if callable(model_dump):
+        return model_dump()
+    dict_fn = getattr(value, "dict", None)
+    if callable(dict_fn):
+        return dict_fn()
+    if isinstance(value, collections.abc.Iterable):
+        return list(value)
+    raise TypeError
+
+
+class OrjsonPlainPayloadConverter(JSONPlainPayloadConverter):
+    """
+    `json/plain` payloads encoded and decoded with orjson.
+
+    Writes the same JSON documents as Temporal's default converter, apart
+    from key order and escaping, so payloads written by either can be read
+    by the other and existing histories replay unchanged. Dataclasses,
+    UUIDs, enums and Pydantic models are encoded as the default converter
+    encodes them. Values orjson cannot handle go through the default
+    converter. The one difference is that NaN and infinities are written
+    as null, as strict JSON (and the other Temporal SDKs) requires.
+    """
+
+    def to_payload(self, value: Any) -> Payload | None:
+        try:
+            data = orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            return super().to_payload(value)
+        return Payload(metadata={"encoding": self.encoding.encode()}, data=data)
+
+    def from_payload(self, payload: Payload, type_hint: type | None = None) -> Any:
+        try:
+            obj = orjson.loads(payload.data)
+        except orjson.JSONDecodeError:
+            # NaN or integers beyond 64 bits, as the default converter may write
+            return super().from_payload(payload, type_hint)
+        if type_hint:
+            obj = value_to_type(type_hint, obj, self._custom_type_converters)
+        return obj
+
+
+class OrjsonPayloadConverter(CompositePayloadConverter):
+    """Temporal's default payload converter with JSON handled by orjson."""
+
+    def __init__(self) -> None:
+        super().__init__(
+            *(
+                OrjsonPlainPayloadConverter() if isinstance(converter, JSONPlainPayloadConverter) else converter
+                for converter in DefaultPayloadConverter.default_encoding_payload_converters
+            )
+        )
+
+
+@lru_cache
+def get_data_converter() -> DataConverter:
+    """Get the data converter configured from settings."""
+    settings = get_settings()
+    converter = DataConverter.default
+    if settings.temporal_json_converter == "orjson":
+        converter = dataclasses.replace(converter, payload_converter_class=OrjsonPayloadConverter)
+    if settings.temporal_payload_codec_enabled:
+        converter = dataclasses.replace(
+            converter,
+            payload_codec=OffloadingPayloadCodec(
+                get_object_store(),
+                offload_threshold=settings.temporal_payload_offload_bytes,
+                compress_threshold=settings.temporal_payload_compress_bytes,
+            ),
+        )
+    return converter
@@ -1,7 +1,12 @@
 """Common utilities for Agent Runtime."""
 
 from .config import get_settings
+from .redis import get_redis
+from .serialization import json_dumps, json_loads
 
 __all__ = [
     "get_settings",
+    "get_redis",
+    "json_dumps",
+    "json_loads",
 ]
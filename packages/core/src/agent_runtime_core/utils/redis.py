@@ -0,0 +1,17 @@
+"""Shared Redis client."""
+
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from .config import get_settings
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+
+@lru_cache
+def get_redis() -> "Redis":
+    """Get the process-wide async Redis client (connection pooled)."""
+    from redis.asyncio import Redis
+
+    return Redis.from_url(get_settings().redis_url)
@@ -0,0 +1,29 @@
+"""Fast JSON encoding with orjson, falling back to the standard library."""
+
+import json
+from collections.abc import Callable
+from typing import Any
+
+import orjson
+
+
+def json_dumps(value: Any, *, default: Callable[[Any], Any] | None = None) -> bytes:
+    """
+    Encode a value as compact UTF-8 JSON.
+
+    Dict keys that are not strings are converted as `json.dumps` would.
+    Values orjson rejects (integers beyond 64 bits, for one) go through
+    `json.dumps` instead, which raises if the value is not serializable.
+    """
+    try:
+        return orjson.dumps(value, default=default, option=orjson.OPT_NON_STR_KEYS)
+    except orjson.JSONEncodeError:
+        return json.dumps(value, default=default, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def json_loads(data: bytes | str) -> Any:
+    """Decode JSON, accepting what `json.dumps` may write but orjson rejects (NaN, huge integers)."""
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        return json.loads(data)
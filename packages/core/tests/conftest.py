@@ -0,0 +1,124 @@
+import os
+import uuid
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from agent_runtime_core.events import archive, ensure_default_partition
+from agent_runtime_core.storage import S3ObjectStore
+from agent_runtime_core.storage.local import LocalObjectStore
+
+DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+REDIS_URL = os.environ.get("TEST_REDIS_URL")
+
+
+@pytest.fixture
+async def engine():
+    """An engine on a throwaway schema holding the tables the event and artifact code touch."""
+    if not DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    schema = f"test_{uuid.uuid4().hex}"
+    admin = create_async_engine(DATABASE_URL)
+    async with admin.begin() as conn:
+        await conn.execute(text(f"CREATE SCHEMA {schema}"))
+    engine = create_async_engine(
+        DATABASE_URL, connect_args={"server_settings": {"search_path": schema}}
+    )
+    async with engine.begin() as conn:
+        # The columns of scripts/migrate.py that run events and artifacts use
+        await conn.execute(text("""
+            CREATE TABLE runs (
+                id UUID PRIMARY KEY,
+                created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+                completed_at TIMESTAMP WITH TIME ZONE,
+                artifact_ids UUID[] NOT NULL DEFAULT '{}'
+            )
+        """))
+        await conn.execute(text("""
+            CREATE TABLE run_events (
+                id UUID NOT NULL DEFAULT gen_random_uuid(),
+                run_id UUID NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+                event_type VARCHAR(100) NOT NULL,
+                data JSONB DEFAULT '{}',
+                timestamp TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+                PRIMARY KEY (id, timestamp)
+            ) PARTITION BY RANGE (timestamp)
+        """))
+        await ensure_default_partition(conn)
+        await conn.execute(text("""
+            CREATE TABLE run_event_archives (
+                partition_name VARCHAR(63) PRIMARY KEY,
+                range_start TIMESTAMP WITH TIME ZONE NOT NULL,
+                range_end TIMESTAMP WITH TIME ZONE NOT NULL,
+                object_key TEXT NOT NULL,
+                event_count INTEGER NOT NULL,
+                archived_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+            )
+        """))
+        await conn.execute(text("""
+            CREATE TABLE artifacts (
+                id UUID PRIMARY KEY,
+                tenant_id UUID NOT NULL,
+                status VARCHAR(20) NOT NULL DEFAULT 'pending',
+                filename VARCHAR(1024),
+                content_type VARCHAR(255) NOT NULL DEFAULT 'application/octet-stream',
+                size BIGINT,
+                sha256 CHAR(64),
+                upload_id TEXT,
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+                updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+            )
+        """))
+        await conn.execute(text(
+            "CREATE UNIQUE INDEX ON artifacts(tenant_id, sha256) WHERE status = 'ready'"
+        ))
+    yield engine
+    await engine.dispose()
+    async with admin.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+    await admin.dispose()
+
+
+@pytest.fixture
+def store(tmp_path) -> LocalObjectStore:
+    # Segment keys repeat across tests, each with its own store
+    archive._index_cache.clear()
+    return LocalObjectStore(tmp_path)
+
+
+@pytest.fixture(scope="session")
+def s3_endpoint():
+    """A local S3 stand-in (moto) serving real HTTP, so presigned URLs work."""
+    server_module = pytest.importorskip("moto.server")
+    server = server_module.ThreadedMotoServer(port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    yield f"http://{host}:{port}"
+    server.stop()
+
+
+@pytest.fixture
+def bucket(s3_endpoint, monkeypatch) -> S3ObjectStore:
+    """An empty bucket of its own on the S3 stand-in."""
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    objects = S3ObjectStore(
+        f"test-{uuid.uuid4().hex[:12]}", endpoint_url=s3_endpoint, access_key="test", secret_key="test"
+    )
+    objects.client.create_bucket(Bucket=objects.bucket)
+    return objects
+
+
+@pytest.fixture
+async def redis():
+    """A real Redis from TEST_REDIS_URL, else an in-process one that runs Lua."""
+    if REDIS_URL:
+        from redis.asyncio import Redis
+
+        client = Redis.from_url(REDIS_URL)
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        client = fakeredis.FakeAsyncRedis()
+    yield client
+    await client.aclose()
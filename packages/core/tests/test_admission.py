@@ -0,0 +1,91 @@
+"""Admission control: slots, weighted fair release, and the noisy-neighbour target."""
+
+import os
+import sys
+import uuid
+
+import pytest
+
+from agent_runtime_core.admission import AdmissionController
+from agent_runtime_core.models import RunPriority
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "..", "benchmarks"))
+
+import sim_admission  # noqa: E402
+
+@pytest.fixture
+async def controller(redis):
+    prefix = f"{{admission-test-{uuid.uuid4().hex[:8]}}}:"
+    yield AdmissionController(redis, max_running=4, prefix=prefix)
+    keys = [key async for key in redis.scan_iter(match=f"{prefix}*")]
+    if keys:
+        await redis.delete(*keys)
+
+
+def run_ids(count: int) -> list[uuid.UUID]:
+    return [uuid.uuid4() for _ in range(count)]
+
+
+async def test_runs_over_the_limits_are_queued_until_released(controller):
+    tenant = uuid.uuid4()
+    runs = run_ids(4)
+
+    admitted = await controller.admit(tenant, runs, RunPriority.INTERACTIVE, limit=2)
+
+    assert admitted == [True, True, False, False]
+    assert await controller.dispatch(10) == []
+    assert await controller.release(runs[0], uuid.uuid4()) == 1
+    released = await controller.dispatch(10)
+    assert [(run.run_id, run.tenant_id) for run in released] == [(runs[2], tenant)]
+    assert set(await controller.running()) == {runs[1], runs[2]}
+    assert await controller.release(runs[0]) == 0
+
+
+async def test_interactive_runs_are_released_before_batch_runs(controller):
+    tenant = uuid.uuid4()
+    holders = run_ids(1)
+    await controller.admit(tenant, holders, RunPriority.INTERACTIVE, limit=1)
+    batch, interactive = run_ids(2), run_ids(2)
+    await controller.admit(tenant, batch, RunPriority.BATCH, limit=1)
+    await controller.admit(tenant, interactive, RunPriority.INTERACTIVE, limit=1)
+
+    order = []
+    for _ in range(4):
+        await controller.release(*holders)
+        holders = [run.run_id for run in await controller.dispatch(10)]
+        order.extend(holders)
+
+    assert order == [*interactive, *batch]
+
+
+async def test_queued_runs_are_released_in_proportion_to_weight(redis, controller):
+    controller = AdmissionController(redis, max_running=40, prefix=controller._prefix)
+    holders = run_ids(40)
+    await controller.admit(uuid.uuid4(), holders, RunPriority.BATCH, limit=0)
+    light, heavy = uuid.uuid4(), uuid.uuid4()
+    for tenant, weight in ((light, 1), (heavy, 3)):
+        admitted = await controller.admit(tenant, run_ids(100), RunPriority.BATCH, limit=0, weight=weight)
+        assert not any(admitted)
+
+    await controller.release(*holders)
+    released = await controller.dispatch(100)
+
+    counts = {tenant: sum(run.tenant_id == tenant for run in released) for tenant in (light, heavy)}
+    assert counts == {light: 10, heavy: 30}
+    depths = {stat.tenant_id: stat.depth for stat in await controller.queue_stats()}
+    assert depths == {light: 90, heavy: 70}
+
+
+async def test_noisy_tenant_keeps_quiet_p99_within_budget(redis):
+    # Lighter than the script's defaults so a small CI machine keeps up; the
+    # noisy tenant still submits more than the deployment can run
+    args = sim_admission.build_parser().parse_args(
+        ["--seconds", "4", "--noisy-burst", "1000", "--noisy-rate", "300"]
+    )
+
+    results = await sim_admission.run_scenarios(redis, args)
+
+    assert sim_admission.check(results, args) is None
+    # Without admission control the quiet tenant queues behind the whole backlog
+    fifo = results["fifo"]
+    assert not fifo or sim_admission.percentile(fifo, 99) > sim_admission.budget_seconds(args)
@@ -0,0 +1,158 @@
+"""Artifact store against a local S3 stand-in and Postgres."""
+
+import asyncio
+import hashlib
+import urllib.request
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from agent_runtime_core.artifacts import (
+    ArtifactInUseError,
+    ArtifactNotFoundError,
+    ArtifactStore,
+    ArtifactUploadError,
+    PresignedUpload,
+    artifact_key,
+)
+from agent_runtime_core.models import ArtifactStatus
+from agent_runtime_core.storage import ObjectNotFoundError
+
+CONTENT = b"hello, artifacts"
+SHA256 = hashlib.sha256(CONTENT).hexdigest()
+
+
+@pytest.fixture
+def artifacts(bucket, engine) -> ArtifactStore:
+    return ArtifactStore(bucket, engine)
+
+
+def put_part(url: str, data: bytes) -> str:
+    """PUT a part to its presigned URL as a client would; returns its ETag."""
+    request = urllib.request.Request(
+        url, data=data, method="PUT", headers={"Content-Type": "application/octet-stream"}
+    )
+    opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+    with opener.open(request) as response:
+        return response.headers["ETag"]
+
+
+async def send(upload: PresignedUpload, content: bytes) -> list[tuple[int, str]]:
+    parts = []
+    for part in upload.parts:
+        start = (part.part_number - 1) * upload.part_size
+        etag = await asyncio.to_thread(put_part, part.url, content[start : start + upload.part_size])
+        parts.append((part.part_number, etag))
+    return parts
+
+
+async def read_all(artifacts: ArtifactStore, artifact, **kwargs) -> bytes:
+    return b"".join([chunk async for chunk in artifacts.read(artifact, **kwargs)])
+
+
+async def test_presigned_upload_completes_to_a_ready_artifact(artifacts):
+    tenant_id = uuid.uuid4()
+
+    artifact, upload = await artifacts.create_upload(
+        tenant_id, size=len(CONTENT), filename="notes.txt", sha256=SHA256
+    )
+    assert artifact.status is ArtifactStatus.PENDING
+    assert [part.part_number for part in upload.parts] == [1]
+    ready = await artifacts.complete_upload(artifact.id, await send(upload, CONTENT))
+
+    assert ready.id == artifact.id
+    assert ready.status is ArtifactStatus.READY
+    assert ready.size == len(CONTENT)
+    assert await artifacts.get(artifact.id) == ready
+    assert await read_all(artifacts, ready) == CONTENT
+
+
+async def test_upload_of_the_wrong_size_is_discarded(artifacts, bucket):
+    artifact, upload = await artifacts.create_upload(uuid.uuid4(), size=len(CONTENT) + 1)
+
+    with pytest.raises(ArtifactUploadError, match="expected"):
+        await artifacts.complete_upload(artifact.id, await send(upload, CONTENT))
+
+    with pytest.raises(ArtifactNotFoundError):
+        await artifacts.get(artifact.id)
+    with pytest.raises(ObjectNotFoundError):
+        await bucket.get(artifact_key(artifact.tenant_id, artifact.id))
+
+
+async def test_content_is_deduplicated_per_tenant(artifacts):
+    tenant_id = uuid.uuid4()
+    artifact, upload = await artifacts.create_upload(tenant_id, size=len(CONTENT), sha256=SHA256)
+    first = await artifacts.complete_upload(artifact.id, await send(upload, CONTENT))
+
+    again, no_upload = await artifacts.create_upload(tenant_id, size=len(CONTENT), sha256=SHA256)
+    assert again == first
+    assert no_upload is None
+
+    async def chunks():
+        yield CONTENT
+
+    assert await artifacts.upload(tenant_id, chunks()) == first
+
+    _, other_upload = await artifacts.create_upload(uuid.uuid4(), size=len(CONTENT), sha256=SHA256)
+    assert other_upload is not None
+
+
+async def test_concurrent_upload_of_the_same_content_returns_the_winner(artifacts, monkeypatch):
+    tenant_id = uuid.uuid4()
+    # Both start before either completes, so neither is deduplicated up front
+    first, first_upload = await artifacts.create_upload(tenant_id, size=len(CONTENT), sha256=SHA256)
+    second, second_upload = await artifacts.create_upload(tenant_id, size=len(CONTENT), sha256=SHA256)
+    winner = await artifacts.complete_upload(first.id, await send(first_upload, CONTENT))
+    second_parts = await send(second_upload, CONTENT)
+
+    # The winner commits between the loser's check and its update
+    find_ready = artifacts._find_ready
+    calls = 0
+
+    async def racing_find_ready(tenant_id, sha256):
+        nonlocal calls
+        calls += 1
+        return None if calls == 1 else await find_ready(tenant_id, sha256)
+
+    monkeypatch.setattr(artifacts, "_find_ready", racing_find_ready)
+
+    assert await artifacts.complete_upload(second.id, second_parts) == winner
+    assert calls == 2
+    with pytest.raises(ArtifactNotFoundError):
+        await artifacts.get(second.id)
+
+
+async def test_ranged_reads(artifacts):
+    artifact, upload = await artifacts.create_upload(uuid.uuid4(), size=len(CONTENT))
+    ready = await artifacts.complete_upload(artifact.id, await send(upload, CONTENT))
+
+    assert await read_all(artifacts, ready, offset=7, length=9) == CONTENT[7:16]
+    assert await read_all(artifacts, ready, offset=7) == CONTENT[7:]
+    assert await read_all(artifacts, ready, length=5) == CONTENT[:5]
+    assert await read_all(artifacts, ready, offset=len(CONTENT)) == b""
+    with pytest.raises(ArtifactNotFoundError):
+        await read_all(artifacts, artifact)
+
+
+async def test_delete_is_refused_while_a_run_references_the_artifact(artifacts, engine, bucket):
+    artifact, upload = await artifacts.create_upload(uuid.uuid4(), size=len(CONTENT))
+    ready = await artifacts.complete_upload(artifact.id, await send(upload, CONTENT))
+    run_id = uuid.uuid4()
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("INSERT INTO runs (id, created_at, artifact_ids) VALUES (:id, NOW(), :artifact_ids)"),
+            {"id": run_id, "artifact_ids": [ready.id]},
+        )
+
+    with pytest.raises(ArtifactInUseError):
+        await artifacts.delete(ready.id)
+    assert await artifacts.get(ready.id) == ready
+
+    async with engine.begin() as conn:
+        await conn.execute(text("DELETE FROM runs WHERE id = :id"), {"id": run_id})
+    await artifacts.delete(ready.id)
+    with pytest.raises(ArtifactNotFoundError):
+        await artifacts.get(ready.id)
+    with pytest.raises(ObjectNotFoundError):
+        await bucket.get(artifact_key(ready.tenant_id, ready.id))
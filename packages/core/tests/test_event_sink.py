@@ -0,0 +1,72 @@
+"""Batched run event writes, and counting what could not be written."""
+
+import uuid
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy import text
+
+from agent_runtime_core.events import RunEventSink, ensure_partitions
+from agent_runtime_core.models import RunEvent
+
+DAY = date(2026, 1, 10)
+AT = datetime(2026, 1, 10, 12, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+async def run_id(engine) -> uuid.UUID:
+    run_id = uuid.uuid4()
+    async with engine.begin() as conn:
+        await ensure_partitions(conn, DAY, DAY)
+        await conn.execute(
+            text("INSERT INTO runs (id, created_at) VALUES (:id, :at)"), {"id": run_id, "at": AT}
+        )
+    return run_id
+
+
+def events(run_id: uuid.UUID, count: int) -> list[RunEvent]:
+    return [
+        RunEvent(run_id=run_id, event_type="step", data={"i": i}, timestamp=AT)
+        for i in range(count)
+    ]
+
+
+async def stored(engine, run_id: uuid.UUID) -> list[int]:
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            text("SELECT (data->>'i')::int FROM run_events WHERE run_id = :run_id"),
+            {"run_id": run_id},
+        )
+        return sorted(result.scalars())
+
+
+@pytest.mark.parametrize("use_copy", [True, False])
+async def test_close_writes_every_queued_event(engine, run_id, use_copy):
+    sink = RunEventSink(engine, batch_size=7, use_copy=use_copy)
+    await sink.start()
+    for event in events(run_id, 50):
+        await sink.emit(event)
+    await sink.close()
+
+    assert await stored(engine, run_id) == list(range(50))
+    assert sink.dropped == 0
+    assert sink.pending == 0
+
+
+async def test_batches_that_keep_failing_are_counted_as_dropped(engine, run_id):
+    sink = RunEventSink(engine, batch_size=100)
+    await sink.start()
+    # No such run, so the foreign key fails the whole batch on every attempt
+    for event in events(uuid.uuid4(), 3):
+        await sink.emit(event)
+    await sink.close()
+
+    assert sink.dropped == 3
+
+    await sink.start()
+    for event in events(run_id, 2):
+        await sink.emit(event)
+    await sink.close()
+
+    assert await stored(engine, run_id) == [0, 1]
+    assert sink.dropped == 3
@@ -0,0 +1,144 @@
+"""Temporal payload codec and orjson converter, with a local filesystem store."""
+
+import dataclasses
+import os
+import uuid
+
+import pytest
+
+pytest.importorskip("zstandard")
+pytest.importorskip("temporalio")
+
+from temporalio.api.common.v1 import Payload  # noqa: E402
+from temporalio.converter import DataConverter  # noqa: E402
+
+from agent_runtime_core.storage.local import LocalObjectStore  # noqa: E402
+from agent_runtime_core.temporal import (  # noqa: E402
+    OffloadingPayloadCodec,
+    OrjsonPayloadConverter,
+    PayloadIntegrityError,
+)
+from agent_runtime_core.temporal.codec import OFFLOAD_ENCODING, ZSTD_ENCODING  # noqa: E402
+
+
+class CountingStore(LocalObjectStore):
+    """A local store that counts reads and writes."""
+
+    def __init__(self, root) -> None:
+        super().__init__(root)
+        self.gets = 0
+        self.puts = 0
+
+    async def get(self, key: str, offset: int = 0, length: int | None = None) -> bytes:
+        self.gets += 1
+        return await super().get(key, offset, length)
+
+    async def put(self, key, data, content_type=None) -> None:
+        self.puts += 1
+        await super().put(key, data, content_type=content_type)
+
+
+@dataclasses.dataclass
+class Document:
+    id: uuid.UUID
+    text: str
+
+
+def large_payload() -> Payload:
+    """16 KB of hex digits, about 8 KB compressed: over the offload threshold either way."""
+    return Payload(
+        metadata={"encoding": b"json/plain"}, data=b"".join(uuid.uuid4().hex.encode() for _ in range(500))
+    )
+
+
+@pytest.fixture
+def objects(tmp_path) -> CountingStore:
+    return CountingStore(tmp_path)
+
+
+def codec(objects: CountingStore | None) -> OffloadingPayloadCodec:
+    return OffloadingPayloadCodec(objects, offload_threshold=1024, compress_threshold=64)
+
+
+async def test_mid_sized_payloads_are_compressed_inline(objects):
+    payload = Payload(metadata={"encoding": b"json/plain"}, data=b'"' + b"abc" * 5000 + b'"')
+
+    [encoded] = await codec(objects).encode([payload])
+    [decoded] = await codec(objects).decode([encoded])
+
+    assert encoded.metadata["encoding"] == ZSTD_ENCODING
+    assert encoded.ByteSize() < payload.ByteSize()
+    assert decoded == payload
+    assert objects.puts == 0
+
+
+async def test_small_and_incompressible_payloads_are_left_alone(objects):
+    small = Payload(metadata={"encoding": b"json/plain"}, data=b'"short"')
+    noise = Payload(metadata={"encoding": b"binary/plain"}, data=os.urandom(200))
+
+    assert await codec(objects).encode([small, noise]) == [small, noise]
+
+
+async def test_large_payloads_are_offloaded_and_read_back(objects):
+    payload = large_payload()
+    writer = codec(objects)
+
+    [encoded] = await writer.encode([payload])
+    assert encoded.metadata["encoding"] == OFFLOAD_ENCODING
+    assert encoded.ByteSize() < 200
+    assert objects.puts == 1
+
+    # The encoding process already has it in its LRU
+    assert await writer.decode([encoded]) == [payload]
+    assert objects.gets == 0
+
+    # Another process fetches it once, then serves replays from its LRU
+    reader = codec(objects)
+    assert await reader.decode([encoded]) == [payload]
+    assert await reader.decode([encoded]) == [payload]
+    assert objects.gets == 1
+
+
+async def test_identical_payloads_are_stored_once(objects, tmp_path):
+    payload = large_payload()
+
+    first = await codec(objects).encode([payload])
+    second = await codec(objects).encode([payload, payload])
+
+    assert second == first * 2
+    assert objects.puts == 1
+    assert len([path for path in tmp_path.rglob("*") if path.is_file()]) == 1
+
+
+async def test_tampered_offloaded_payload_is_rejected(objects):
+    payload = large_payload()
+    [encoded] = await codec(objects).encode([payload])
+    other = large_payload()
+    [replacement] = await codec(None).encode([other])
+    await objects.put(encoded.data.decode(), replacement.data)
+
+    with pytest.raises(PayloadIntegrityError):
+        await codec(objects).decode([encoded])
+
+
+async def test_payloads_written_before_the_codec_was_enabled_still_decode(objects):
+    document = Document(id=uuid.uuid4(), text="x" * 5000)
+    before = DataConverter.default
+    after = dataclasses.replace(
+        DataConverter.default,
+        payload_converter_class=OrjsonPayloadConverter,
+        payload_codec=codec(objects),
+    )
+
+    history = await before.encode([document, "short"])
+
+    assert await after.decode(history, [Document, str]) == [document, "short"]
+
+
+async def test_orjson_and_default_converters_read_each_others_payloads():
+    document = Document(id=uuid.uuid4(), text="héllo")
+    orjson_converter = dataclasses.replace(DataConverter.default, payload_converter_class=OrjsonPayloadConverter)
+
+    for writer, reader in [(DataConverter.default, orjson_converter), (orjson_converter, DataConverter.default)]:
+        payloads = await writer.encode([document, {"n": 1}, None])
+        assert await reader.decode(payloads, [Document, dict, type(None)]) == [document, {"n": 1}, None]
@@ -0,0 +1,218 @@
+"""run_events partitioning, archival to object storage, and reads across both tiers."""
+
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from agent_runtime_core.events import (
+    archive_partition,
+    ensure_partitions,
+    fetch_run_events,
+    split_default_partition,
+)
+from agent_runtime_core.events.archive import index_key, segment_key
+from agent_runtime_core.events.partitions import DEFAULT_PARTITION, list_partitions, partition_name
+
+DAY = date(2026, 1, 10)
+
+
+def at(day: date, hour: int) -> datetime:
+    return datetime(day.year, day.month, day.day, hour, tzinfo=timezone.utc)
+
+
+async def create_run(conn, created_at: datetime, completed_at: datetime | None = None) -> uuid.UUID:
+    run_id = uuid.uuid4()
+    await conn.execute(
+        text("INSERT INTO runs (id, created_at, completed_at) VALUES (:id, :created_at, :completed_at)"),
+        {"id": run_id, "created_at": created_at, "completed_at": completed_at},
+    )
+    return run_id
+
+
+async def add_event(conn, run_id: uuid.UUID, event_type: str, timestamp: datetime) -> None:
+    await conn.execute(
+        text("""
+            INSERT INTO run_events (run_id, event_type, data, timestamp)
+            VALUES (:run_id, :event_type, CAST(:data AS JSONB), :timestamp)
+        """),
+        {"run_id": run_id, "event_type": event_type, "data": f'{{"type": "{event_type}"}}', "timestamp": timestamp},
+    )
+
+
+async def rows_in(conn, table: str) -> int:
+    return await conn.scalar(text(f"SELECT COUNT(*) FROM {table}"))
+
+
+async def test_events_without_a_daily_partition_go_to_the_default_one(engine):
+    async with engine.begin() as conn:
+        await ensure_partitions(conn, DAY, DAY)
+        run_id = await create_run(conn, at(DAY, 0))
+        # A day before the oldest partition, as a skewed clock or a backfill would write
+        await add_event(conn, run_id, "run.started", at(DAY - timedelta(days=3), 12))
+        await add_event(conn, run_id, "run.completed", at(DAY, 12))
+
+        assert await rows_in(conn, DEFAULT_PARTITION) == 1
+        assert await rows_in(conn, partition_name(DAY)) == 1
+
+
+async def test_new_partition_takes_its_rows_from_the_default_one(engine):
+    later = DAY + timedelta(days=1)
+    async with engine.begin() as conn:
+        run_id = await create_run(conn, at(DAY, 0))
+        await add_event(conn, run_id, "a", at(DAY, 1))
+        await add_event(conn, run_id, "b", at(later, 1))
+
+        assert await ensure_partitions(conn, DAY, DAY) == [partition_name(DAY)]
+
+        assert await rows_in(conn, partition_name(DAY)) == 1
+        assert await rows_in(conn, DEFAULT_PARTITION) == 1
+        # Still a partition with run_events' constraints
+        await add_event(conn, run_id, "c", at(DAY, 2))
+        assert await rows_in(conn, partition_name(DAY)) == 2
+
+
+async def test_split_default_partition_creates_a_partition_per_day(engine):
+    days = [DAY - timedelta(days=5), DAY + timedelta(days=2)]
+    async with engine.begin() as conn:
+        await ensure_partitions(conn, DAY, DAY)
+        run_id = await create_run(conn, at(days[0], 0))
+        for day in days:
+            await add_event(conn, run_id, "event", at(day, 23))
+
+        created = await split_default_partition(conn)
+
+        assert created == [partition_name(day) for day in days]
+        assert await list_partitions(conn) == sorted([partition_name(DAY), *created])
+        assert await rows_in(conn, DEFAULT_PARTITION) == 0
+        assert await split_default_partition(conn) == []
+
+
+async def test_fetch_merges_hot_and_archived_events(engine, store):
+    later = DAY + timedelta(days=1)
+    async with engine.begin() as conn:
+        await ensure_partitions(conn, DAY, later)
+        run_id = await create_run(conn, at(DAY, 20), at(later, 2))
+        other_id = await create_run(conn, at(DAY, 21))
+        await add_event(conn, run_id, "run.started", at(DAY, 20))
+        await add_event(conn, other_id, "run.started", at(DAY, 21))
+        await add_event(conn, run_id, "llm.called", at(DAY, 23))
+        await add_event(conn, run_id, "run.completed", at(later, 2))
+
+    assert await archive_partition(engine, store, partition_name(DAY)) == 3
+
+    async with engine.connect() as conn:
+        assert await list_partitions(conn) == [partition_name(later)]
+        archived = (await conn.execute(text(
+            "SELECT partition_name, object_key, event_count FROM run_event_archives"
+        ))).all()
+    assert archived == [(partition_name(DAY), segment_key(partition_name(DAY)), 3)]
+    assert await store.exists(segment_key(partition_name(DAY)))
+
+    async with AsyncSession(engine) as session:
+        events = await fetch_run_events(session, run_id, store)
+        other = await fetch_run_events(session, other_id, store)
+
+    assert [event.event_type for event in events] == ["run.started", "llm.called", "run.completed"]
+    assert {event.run_id for event in events} == {run_id}
+    assert events[0].data == {"type": "run.started"}
+    assert events[0].timestamp == at(DAY, 20)
+    assert [event.event_type for event in other] == ["run.started"]
+
+
+async def test_archive_is_safe_to_rerun_after_the_upload(engine, store):
+    async with engine.begin() as conn:
+        await ensure_partitions(conn, DAY, DAY)
+        run_id = await create_run(conn, at(DAY, 0))
+        await add_event(conn, run_id, "run.started", at(DAY, 1))
+        # As if a previous attempt uploaded and recorded the segment, then died
+        await conn.execute(
+            text("""
+                INSERT INTO run_event_archives
+                    (partition_name, range_start, range_end, object_key, event_count)
+                VALUES (:name, :start, :end, :key, 1)
+            """),
+            {
+                "name": partition_name(DAY),
+                "start": at(DAY, 0),
+                "end": at(DAY + timedelta(days=1), 0),
+                "key": segment_key(partition_name(DAY)),
+            },
+        )
+
+    assert await archive_partition(engine, store, partition_name(DAY)) == 0
+    async with engine.connect() as conn:
+        assert await list_partitions(conn) == []
+
+
+async def test_archive_is_recorded_only_once_the_partition_is_dropped(engine, store):
+    async with engine.begin() as conn:
+        await ensure_partitions(conn, DAY, DAY)
+        run_id = await create_run(conn, at(DAY, 0), at(DAY, 2))
+        await add_event(conn, run_id, "run.started", at(DAY, 1))
+        # Makes the DROP fail after the upload
+        await conn.execute(text(f"CREATE VIEW blocker AS SELECT * FROM {partition_name(DAY)}"))
+
+    with pytest.raises(DBAPIError):
+        await archive_partition(engine, store, partition_name(DAY))
+
+    async with engine.connect() as conn:
+        assert await rows_in(conn, "run_event_archives") == 0
+        assert await list_partitions(conn) == [partition_name(DAY)]
+    async with AsyncSession(engine) as session:
+        assert [event.event_type for event in await fetch_run_events(session, run_id, store)] == ["run.started"]
+
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP VIEW blocker"))
+    assert await archive_partition(engine, store, partition_name(DAY)) == 1
+    async with AsyncSession(engine) as session:
+        assert [event.event_type for event in await fetch_run_events(session, run_id, store)] == ["run.started"]
+
+
+async def test_fetch_returns_events_in_both_tiers_once(engine, store):
+    async with engine.begin() as conn:
+        await ensure_partitions(conn, DAY, DAY)
+        run_id = await create_run(conn, at(DAY, 0), at(DAY, 3))
+        await add_event(conn, run_id, "run.started", at(DAY, 1))
+        await add_event(conn, run_id, "run.completed", at(DAY, 2))
+    assert await archive_partition(engine, store, partition_name(DAY)) == 2
+
+    async with AsyncSession(engine) as session:
+        archived = await fetch_run_events(session, run_id, store)
+    # As a read that saw the partition before it was dropped and the archive after
+    async with engine.begin() as conn:
+        await ensure_partitions(conn, DAY, DAY)
+        for event in archived:
+            await conn.execute(
+                text("""
+                    INSERT INTO run_events (id, run_id, event_type, data, timestamp)
+                    VALUES (:id, :run_id, :event_type, CAST(:data AS JSONB), :timestamp)
+                """),
+                {**event.model_dump(), "data": '{"type": "%s"}' % event.event_type},
+            )
+
+    async with AsyncSession(engine) as session:
+        events = await fetch_run_events(session, run_id, store)
+    assert [event.id for event in events] == [event.id for event in archived]
+
+
+async def test_missing_segment_index_is_not_cached(engine, store):
+    async with engine.begin() as conn:
+        await ensure_partitions(conn, DAY, DAY)
+        run_id = await create_run(conn, at(DAY, 0), at(DAY, 2))
+        await add_event(conn, run_id, "run.started", at(DAY, 1))
+    assert await archive_partition(engine, store, partition_name(DAY)) == 1
+
+    key = index_key(segment_key(partition_name(DAY)))
+    index = await store.get(key)
+    await store.delete(key)
+    async with AsyncSession(engine) as session:
+        assert await fetch_run_events(session, run_id, store) == []
+
+    # Found once it is uploaded
+    await store.put(key, index, content_type="application/json")
+    async with AsyncSession(engine) as session:
+        assert [event.event_type for event in await fetch_run_events(session, run_id, store)] == ["run.started"]
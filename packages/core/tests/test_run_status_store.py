@@ -0,0 +1,76 @@
+"""Row writes around workflow start show through cached run snapshots."""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from agent_runtime_core.models import Run, RunStatus
+from agent_runtime_core.status import RunStatusStore, RunStatusUpdate, status_key
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+async def status_store(redis):
+    store = RunStatusStore(redis)
+    run_ids: list[uuid.UUID] = []
+    yield store, run_ids
+    if run_ids:
+        await redis.delete(*(status_key(run_id) for run_id in run_ids))
+
+
+def pending_run(run_ids: list[uuid.UUID]) -> Run:
+    run = Run(tenant_id=uuid.uuid4(), agent_id=uuid.uuid4(), agent_version_id=uuid.uuid4())
+    run_ids.append(run.id)
+    return run
+
+
+async def test_workflow_run_id_shows_through_a_snapshot_cached_before_it(status_store):
+    store, run_ids = status_store
+    run = pending_run(run_ids)
+    await store.cache_run(run)
+
+    await store.set_workflow_run_ids({run.id: "wf-run"})
+
+    assert (await store.get(run.id)).workflow_run_id == "wf-run"
+
+
+async def test_workflow_run_id_shows_through_a_stale_snapshot_cached_after_it(status_store):
+    store, run_ids = status_store
+    run = pending_run(run_ids)
+
+    await store.set_workflow_run_ids({run.id: "wf-run"})
+    # As read from a replica that has not seen the update yet
+    await store.cache_run(run)
+
+    assert (await store.get(run.id)).workflow_run_id == "wf-run"
+    [overlaid] = await store.overlay([run])
+    assert overlaid.workflow_run_id == "wf-run"
+
+
+async def test_failure_to_start_shows_through_a_cached_snapshot(status_store):
+    store, run_ids = status_store
+    run = pending_run(run_ids)
+    await store.cache_run(run)
+
+    await store.mark_failed({run.id: "Failed to start workflow: boom"}, NOW)
+    cached = await store.get(run.id)
+
+    assert cached.status == RunStatus.FAILED
+    assert cached.error == "Failed to start workflow: boom"
+    assert cached.completed_at == NOW
+
+
+async def test_failure_to_start_does_not_override_the_workflows_own_status(status_store):
+    store, run_ids = status_store
+    run = pending_run(run_ids)
+    await store.cache_run(run)
+    await store.record(
+        RunStatusUpdate(run_id=run.id, status=RunStatus.RUNNING, version=1, at=NOW)
+    )
+
+    later = NOW + timedelta(seconds=1)
+    await store.mark_failed({run.id: "Failed to start workflow: timeout"}, later)
+
+    assert (await store.get(run.id)).status == RunStatus.RUNNING
@@ -0,0 +1,178 @@
+import multiprocessing
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from agent_runtime_core.memory import HashingEmbedder, IVFIndex, VectorMemory, restore_snapshot, take_snapshot
+from agent_runtime_core.memory.snapshot import MANIFEST_FILE
+
+DIM = 32
+
+
+def clustered(n: int, seed: int = 0, clusters: int = 50) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, DIM))
+    return (centers[rng.integers(clusters, size=n)] + 0.5 * rng.standard_normal((n, DIM))).astype(np.float32)
+
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    corpus = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    return np.argsort(-(queries @ corpus.T), axis=1)[:, :k]
+
+
+def recall(found: np.ndarray, expected: np.ndarray) -> float:
+    return np.mean([len(set(f) & set(e)) / len(e) for f, e in zip(found, expected)])
+
+
+def payload(i: int) -> bytes:
+    return f"vector {i}".encode()
+
+
+def test_search_matches_brute_force(tmp_path):
+    corpus = clustered(4_000)
+    queries = clustered(100, seed=1)
+    expected = exact_top_k(corpus, queries, 10)
+
+    index = IVFIndex(tmp_path, dim=DIM, min_merge=500)
+    # Before the first merge the tail is searched exhaustively
+    index.add(corpus[:400])
+    _, ids = index.search(queries, k=10)
+    assert recall(ids, exact_top_k(corpus[:400], queries, 10)) == 1
+
+    for start in range(400, len(corpus), 300):
+        index.add(corpus[start : start + 300])
+    assert index.meta.generation > 0
+    assert index.meta.main_count < index.meta.count
+
+    # Probing every list is exact; the default probes trade a little recall
+    _, ids = index.search(queries, k=10, nprobe=index.meta.nlist)
+    assert recall(ids, expected) == 1
+    _, ids = index.search(queries, k=10)
+    assert recall(ids, expected) >= 0.9
+
+    index.merge(retrain=True)
+    _, ids = index.search(queries, k=10, nprobe=index.meta.nlist)
+    assert recall(ids, expected) == 1
+
+
+def test_ids_and_payloads_survive_merges(tmp_path):
+    corpus = clustered(1_000)
+    index = IVFIndex(tmp_path, dim=DIM, min_merge=100)
+    for start in range(0, len(corpus), 70):
+        batch = range(start, min(start + 70, len(corpus)))
+        assert index.add(corpus[batch.start : batch.stop], [payload(i) for i in batch]).tolist() == list(batch)
+
+    reopened = IVFIndex(tmp_path)
+    assert len(reopened) == len(corpus)
+    assert reopened.payloads([0, 999, 1_000, -1]) == [payload(0), payload(999), None, None]
+    _, ids = reopened.search(corpus[::97], k=1, nprobe=reopened.meta.nlist)
+    assert ids[:, 0].tolist() == list(range(0, len(corpus), 97))
+
+
+def test_empty_index_and_short_results(tmp_path):
+    index = IVFIndex(tmp_path, dim=DIM)
+    scores, ids = index.search(clustered(2), k=3)
+    assert ids.tolist() == [[-1] * 3] * 2
+    assert np.isneginf(scores).all()
+
+    index.add(clustered(2))
+    _, ids = index.search(clustered(1, seed=1), k=3)
+    assert sorted(ids[0, :2].tolist()) == [0, 1]
+    assert ids[0, 2] == -1
+
+    with pytest.raises(ValueError):
+        IVFIndex(tmp_path, dim=DIM + 1)
+
+
+def write(path: str, corpus: np.ndarray, start: int, stop: int, batch: int) -> None:
+    index = IVFIndex(path, dim=DIM, min_merge=200)
+    for i in range(start, stop, batch):
+        index.add(corpus[i : i + batch], [payload(j) for j in range(i, min(i + batch, stop))])
+
+
+def test_concurrent_writers_serialize_on_the_lock(tmp_path):
+    corpus = clustered(2_000)
+    context = multiprocessing.get_context("fork")
+    writers = [
+        context.Process(target=write, args=(str(tmp_path), corpus, start, start + 1_000, 25))
+        for start in (0, 1_000)
+    ]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+    assert [writer.exitcode for writer in writers] == [0, 0]
+
+    # Each vector was stored exactly once, under the ID its payload names
+    index = IVFIndex(tmp_path)
+    assert len(index) == len(corpus)
+    stored = sorted(int(p.split()[1]) for p in index.payloads(range(len(corpus))))
+    assert stored == list(range(len(corpus)))
+    _, ids = index.search(corpus, k=1, nprobe=index.meta.nlist)
+    assert index.payloads(ids[:, 0]) == [payload(i) for i in range(len(corpus))]
+
+
+def test_readers_never_see_a_partial_generation(tmp_path):
+    corpus = clustered(3_000)
+    index = IVFIndex(tmp_path, dim=DIM)
+    writer = multiprocessing.get_context("fork").Process(
+        target=write, args=(str(tmp_path), corpus, 0, len(corpus), 20)
+    )
+    writer.start()
+
+    generations = set()
+    try:
+        while len(index) < len(corpus):
+            index.refresh()
+            n = len(index)
+            if not n:
+                continue
+            generations.add(index.meta.generation)
+            # Everything committed is readable, and nothing past it
+            assert index.payloads(range(n + 1)) == [payload(i) for i in range(n)] + [None]
+            sample = np.unique(np.linspace(0, n - 1, 20).astype(int))
+            _, ids = index.search(corpus[sample], k=1, nprobe=max(1, index.meta.nlist))
+            assert ids[:, 0].tolist() == sample.tolist()
+    finally:
+        writer.join()
+    assert writer.exitcode == 0
+    # The reader crossed several merges while the writer was running
+    assert len(generations) > 3
+
+
+async def test_snapshot_restore(tmp_path, store):
+    embedder = HashingEmbedder(64)
+    source = tmp_path / "source"
+    memory = VectorMemory(source, embedder)
+    memory.index._min_merge = 50
+    texts = [f"note {i} about topic {i % 7}" for i in range(120)]
+    memory.add(texts[:80], [{"n": i} for i in range(80)])
+
+    assert await take_snapshot(source, "memory/t", store)
+    assert not await take_snapshot(source, "memory/t", store)
+    # Appends since the last snapshot go up as a new segment
+    memory.add(texts[80:], [{"n": i} for i in range(80, 120)])
+    assert await take_snapshot(source, "memory/t", store)
+
+    restored_path = tmp_path / "restored"
+    assert await restore_snapshot(restored_path, "memory/t", store)
+    restored = VectorMemory(restored_path, embedder)
+    assert len(restored) == len(memory) == 120
+    queries = ["note 3 about topic 3", "note 117 about topic 5"]
+    assert [[(h.id, h.text, h.metadata) for h in hits] for hits in restored.search(queries)] == [
+        [(h.id, h.text, h.metadata) for h in hits] for hits in memory.search(queries)
+    ]
+
+    # A merge replaces the per-generation files; the old ones are deleted from the store
+    memory.index.merge(retrain=True)
+    assert await take_snapshot(source, "memory/t", store)
+    keys = {p.name for p in (tmp_path / "memory/t").iterdir()}
+    generation = memory.index.meta.generation
+    assert MANIFEST_FILE in keys
+    assert f"main-{generation}.npy" in keys
+    assert not any(f"-{generation - 1}." in key for key in keys)
+
+    assert not await restore_snapshot(tmp_path / "missing", "memory/other", store)
+    assert not (tmp_path / "missing").exists()
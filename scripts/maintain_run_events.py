@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Run event partition maintenance for Agent Runtime.
+
+Creates run_events partitions ahead of time, gives events that landed in the
+default partition daily partitions of their own, and moves partitions older
+than the hot retention window to object storage. Run it daily (cron, Kubernetes
+CronJob, or a Temporal schedule); every step is idempotent.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+# Add packages to path for local development
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "packages", "core", "src"))
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from agent_runtime_core.events import (
+    archive_partition,
+    ensure_upcoming_partitions,
+    partitions_older_than,
+    split_default_partition,
+)
+from agent_runtime_core.storage import get_object_store
+from agent_runtime_core.utils import get_settings
+
+
+async def maintain(dry_run: bool) -> None:
+    """Create upcoming partitions, split the default one, and archive expired ones."""
+    settings = get_settings()
+    engine = create_async_engine(settings.database_url)
+
+    async with engine.begin() as conn:
+        created = await ensure_upcoming_partitions(conn, settings.run_events_partition_days_ahead)
+        for name in created:
+            print(f"➕ Created partition {name}")
+        for name in await split_default_partition(conn):
+            print(f"➕ Moved default-partition events into {name}")
+        expired = await partitions_older_than(conn, settings.run_events_hot_retention_days)
+
+    store = get_object_store()
+    for name in expired:
+        if dry_run:
+            print(f"🧊 Would archive {name}")
+            continue
+        count = await archive_partition(engine, store, name)
+        print(f"🧊 Archived {name} ({count} events)")
+
+    print("✅ Run event maintenance complete")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain run_events partitions")
+    parser.add_argument("--dry-run", action="store_true", help="List partitions to archive without archiving")
+    args = parser.parse_args()
+    asyncio.run(maintain(args.dry_run))
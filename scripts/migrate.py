@@ -8,6 +8,7 @@ For production, consider using Alembic for more robust migrations.
 import asyncio
 import os
 import sys
+from datetime import datetime, timedelta, timezone
 
 # Add packages to path for local development
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "packages", "core", "src"))
@@ -15,6 +16,9 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "packages", "co
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine
 
+from agent_runtime_core.events.partitions import ensure_default_partition, ensure_partitions
+from agent_runtime_core.utils import get_settings
+
 
 async def run_migrations() -> None:
     """Run database migrations."""
@@ -29,8 +33,19 @@ async def run_migrations() -> None:
     async with engine.begin() as conn:
         print("📝 Running migrations...")
 
-        # Create extension for UUID generation
-        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS \"uuid-ossp\""))
+        # Create extension for UUID generation. uuid-ossp is a contrib module
+        # that minimal builds (such as embedded test servers) leave out;
+        # there uuid_generate_v4() wraps the built-in gen_random_uuid()
+        has_uuid_ossp = await conn.scalar(text(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'uuid-ossp'"
+        ))
+        if has_uuid_ossp:
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS \"uuid-ossp\""))
+        else:
+            await conn.execute(text(
+                "CREATE OR REPLACE FUNCTION uuid_generate_v4() RETURNS uuid "
+                "LANGUAGE sql VOLATILE AS 'SELECT gen_random_uuid()'"
+            ))
 
         # Tenants table
         await conn.execute(text("""
@@ -90,24 +105,133 @@ async def run_migrations() -> None:
             )
         """))
 
-        # Run events table
+        # Run events table, range-partitioned by day on timestamp. The
+        # primary key has to include the partition key.
+        legacy = await conn.scalar(text(
+            "SELECT 1 FROM pg_class WHERE relname = 'run_events' AND relkind = 'r'"
+        ))
+        if legacy:
+            print("📦 Converting run_events to a partitioned table...")
+            await conn.execute(text("ALTER TABLE run_events RENAME TO run_events_legacy"))
+            await conn.execute(text("ALTER INDEX IF EXISTS run_events_pkey RENAME TO run_events_legacy_pkey"))
+            await conn.execute(text("ALTER INDEX IF EXISTS idx_run_events_run RENAME TO idx_run_events_legacy_run"))
+
         await conn.execute(text("""
             CREATE TABLE IF NOT EXISTS run_events (
-                id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+                id UUID NOT NULL DEFAULT uuid_generate_v4(),
                 run_id UUID NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
                 event_type VARCHAR(100) NOT NULL,
                 data JSONB DEFAULT '{}',
-                timestamp TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+                timestamp TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+                PRIMARY KEY (id, timestamp)
+            ) PARTITION BY RANGE (timestamp)
+        """))
+
+        today = datetime.now(timezone.utc).date()
+        first_day = today
+        if legacy:
+            oldest = await conn.scalar(text("SELECT MIN(timestamp) FROM run_events_legacy"))
+            if oldest is not None:
+                first_day = min(first_day, oldest.astimezone(timezone.utc).date())
+        settings = get_settings()
+        await ensure_partitions(
+            conn, first_day, today + timedelta(days=settings.run_events_partition_days_ahead)
+        )
+        await ensure_default_partition(conn)
+
+        if legacy:
+            await conn.execute(text("""
+                INSERT INTO run_events (id, run_id, event_type, data, timestamp)
+                SELECT id, run_id, event_type, data, COALESCE(timestamp, NOW())
+                FROM run_events_legacy
+            """))
+            await conn.execute(text("DROP TABLE run_events_legacy"))
+
+        # Archived run_events partitions in object storage
+        await conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS run_event_archives (
+                partition_name VARCHAR(63) PRIMARY KEY,
+                range_start TIMESTAMP WITH TIME ZONE NOT NULL,
+                range_end TIMESTAMP WITH TIME ZONE NOT NULL,
+                object_key TEXT NOT NULL,
+                event_count INTEGER NOT NULL,
+                archived_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
             )
         """))
 
         # Indexes
         await conn.execute(text("CREATE INDEX IF NOT EXISTS idx_agents_tenant ON agents(tenant_id)"))
         await conn.execute(text("CREATE INDEX IF NOT EXISTS idx_agent_versions_agent ON agent_versions(agent_id)"))
-        await conn.execute(text("CREATE INDEX IF NOT EXISTS idx_runs_tenant ON runs(tenant_id)"))
         await conn.execute(text("CREATE INDEX IF NOT EXISTS idx_runs_agent ON runs(agent_id)"))
         await conn.execute(text("CREATE INDEX IF NOT EXISTS idx_runs_status ON runs(status)"))
-        await conn.execute(text("CREATE INDEX IF NOT EXISTS idx_run_events_run ON run_events(run_id)"))
+
+        # Composite indexes for keyset pagination of run listings. Each one
+        # matches a filter combination and ends in the (created_at, id) sort
+        # key, so a page is a single index range scan at any depth.
+        await conn.execute(text("DROP INDEX IF EXISTS idx_runs_tenant"))
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_runs_created "
+            "ON runs(created_at DESC, id DESC)"
+        ))
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_runs_tenant_created "
+            "ON runs(tenant_id, created_at DESC, id DESC)"
+        ))
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_runs_tenant_agent_created "
+            "ON runs(tenant_id, agent_id, created_at DESC, id DESC)"
+        ))
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_runs_tenant_status_created "
+            "ON runs(tenant_id, status, created_at DESC, id DESC)"
+        ))
+        await conn.execute(text("CREATE INDEX IF NOT EXISTS idx_run_events_run ON run_events(run_id, timestamp)"))
+        await conn.execute(text("CREATE INDEX IF NOT EXISTS idx_run_event_archives_range ON run_event_archives(range_start, range_end)"))
+
+        # Client-supplied idempotency keys for bulk run submission
+        await conn.execute(text("ALTER TABLE runs ADD COLUMN IF NOT EXISTS idempotency_key VARCHAR(255)"))
+        await conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_runs_tenant_idempotency "
+            "ON runs(tenant_id, idempotency_key) WHERE idempotency_key IS NOT NULL"
+        ))
+
+        # Version of the last status transition persisted from Redis
+        await conn.execute(text("ALTER TABLE runs ADD COLUMN IF NOT EXISTS status_version BIGINT"))
+
+        # Per-tenant admission control
+        await conn.execute(text("ALTER TABLE tenants ADD COLUMN IF NOT EXISTS max_concurrent_runs INTEGER"))
+        await conn.execute(text(
+            "ALTER TABLE tenants ADD COLUMN IF NOT EXISTS scheduling_weight INTEGER NOT NULL DEFAULT 1"
+        ))
+
+        # Run artifacts: content in the bucket, metadata here. Ready
+        # artifacts are deduplicated per tenant by content hash.
+        await conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS artifacts (
+                id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+                tenant_id UUID NOT NULL REFERENCES tenants(id) ON DELETE CASCADE,
+                status VARCHAR(20) NOT NULL DEFAULT 'pending',
+                filename VARCHAR(1024),
+                content_type VARCHAR(255) NOT NULL DEFAULT 'application/octet-stream',
+                size BIGINT,
+                sha256 CHAR(64),
+                upload_id TEXT,
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+                updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+            )
+        """))
+        await conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_artifacts_tenant_sha256 "
+            "ON artifacts(tenant_id, sha256) WHERE status = 'ready'"
+        ))
+        # Artifacts given to each run; the GIN index only covers runs that have any
+        await conn.execute(text(
+            "ALTER TABLE runs ADD COLUMN IF NOT EXISTS artifact_ids UUID[] NOT NULL DEFAULT '{}'"
+        ))
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_runs_artifacts ON runs USING GIN (artifact_ids) "
+            "WHERE artifact_ids <> '{}'"
+        ))
 
         print("✅ Migrations completed successfully!")
 
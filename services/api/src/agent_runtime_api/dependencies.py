@@ -0,0 +1,40 @@
+"""Shared FastAPI dependencies."""
+
+import time
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from agent_runtime_core.db import get_read_session, get_session
+
+from .telemetry import DB_POOL_WAIT_SECONDS, DB_SESSION_SECONDS, span
+
+READ_METHODS = frozenset({"GET", "HEAD"})
+
+primary_session = asynccontextmanager(get_session)
+replica_session = asynccontextmanager(get_read_session)
+
+
+async def db_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Database session for a request, with timing and tracing.
+
+    GET and HEAD requests read from the replica; everything else uses the
+    primary (`get_session`: commit on success, rollback on error). Reads
+    that must see the caller's own recent writes use `primary_session()`.
+    The pool checkout happens up front so its wait is measured on its own.
+    """
+    read_only = request.method in READ_METHODS
+    scope = replica_session if read_only else primary_session
+    start = time.perf_counter()
+    with span("db.session", read_only=read_only):
+        async with scope() as session:
+            with span("db.pool.checkout"):
+                await session.connection()
+            DB_POOL_WAIT_SECONDS.observe(time.perf_counter() - start)
+            try:
+                yield session
+            finally:
+                DB_SESSION_SECONDS.observe(time.perf_counter() - start)
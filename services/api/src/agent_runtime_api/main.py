@@ -5,10 +5,22 @@ from collections.abc import AsyncGenerator
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
+from agent_runtime_core.db import dispose_engines, get_engine, get_read_engine
+from agent_runtime_core.events import get_event_sink
 from agent_runtime_core.utils import get_settings
 
-from .routes import health, runs, agents, tenants
+from .routes import artifacts, health, metrics, runs, agents, tenants
+from .services.admission import get_run_dispatcher
+from .services.agent_cache import get_agent_version_cache
+from .services.event_stream import get_broadcaster
+from .telemetry import (
+    MetricsMiddleware,
+    register_event_sink_collector,
+    register_pool_collector,
+    unregister_collector,
+)
 
 
 @asynccontextmanager
@@ -17,9 +29,31 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     # Startup
     settings = get_settings()
     print(f"Starting Agent Runtime API (debug={settings.debug})")
+    event_sink = get_event_sink()
+    await event_sink.start()
+    # Registered here rather than at import, so importing the app creates no engines
+    engines = {"primary": get_engine()}
+    if get_read_engine() is not get_engine():
+        engines["replica"] = get_read_engine()
+    collectors = [register_pool_collector(engines), register_event_sink_collector(event_sink)]
+    broadcaster = get_broadcaster()
+    await broadcaster.start()
+    agent_cache = get_agent_version_cache()
+    await agent_cache.start()
+    dispatcher = get_run_dispatcher() if settings.admission_enabled else None
+    if dispatcher is not None:
+        await dispatcher.start()
     yield
     # Shutdown
     print("Shutting down Agent Runtime API")
+    if dispatcher is not None:
+        await dispatcher.close()
+    await agent_cache.close()
+    await broadcaster.close()
+    await event_sink.close()
+    for collector in collectors:
+        unregister_collector(collector)
+    await dispose_engines()
 
 
 app = FastAPI(
@@ -27,6 +61,8 @@ app = FastAPI(
     description="Control plane API for Agent Runtime",
     version="0.1.0",
     lifespan=lifespan,
+    # Response models are still validated; only the final encoding changes
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
@@ -37,9 +73,13 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Outermost, so latency includes the other middleware
+app.add_middleware(MetricsMiddleware)
 
 # Include routers
 app.include_router(health.router, tags=["health"])
+app.include_router(metrics.router, tags=["metrics"])
 app.include_router(tenants.router, prefix="/tenants", tags=["tenants"])
 app.include_router(agents.router, prefix="/agents", tags=["agents"])
 app.include_router(runs.router, prefix="/runs", tags=["runs"])
+app.include_router(artifacts.router, prefix="/artifacts", tags=["artifacts"])
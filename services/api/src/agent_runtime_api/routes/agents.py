@@ -2,13 +2,24 @@
 
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from agent_runtime_core.models import Agent, AgentVersion
 
+from ..dependencies import db_session
+from ..services.catalog import set_agent_active, set_version_published
+
 router = APIRouter()
 
 
+class AgentUpdate(BaseModel):
+    """Request body for updating an agent."""
+
+    is_active: bool
+
+
 @router.get("/")
 async def list_agents(tenant_id: UUID | None = None) -> list[Agent]:
     """List all agents, optionally filtered by tenant."""
@@ -30,6 +41,15 @@ async def get_agent(agent_id: UUID) -> Agent:
     raise HTTPException(status_code=404, detail="Agent not found")
 
 
+@router.patch("/{agent_id}", status_code=204)
+async def update_agent(
+    agent_id: UUID, update: AgentUpdate, session: AsyncSession = Depends(db_session)
+) -> None:
+    """Activate or deactivate an agent."""
+    if not await set_agent_active(session, agent_id, update.is_active):
+        raise HTTPException(status_code=404, detail="Agent not found")
+
+
 @router.get("/{agent_id}/versions")
 async def list_agent_versions(agent_id: UUID) -> list[AgentVersion]:
     """List all versions of an agent."""
@@ -42,3 +62,21 @@ async def create_agent_version(agent_id: UUID, version: AgentVersion) -> AgentVe
     """Create a new version of an agent."""
     # TODO: Implement database insert
     return version
+
+
+@router.post("/{agent_id}/versions/{version_id}/publish", status_code=204)
+async def publish_agent_version(
+    agent_id: UUID, version_id: UUID, session: AsyncSession = Depends(db_session)
+) -> None:
+    """Publish a version, making it available for new runs."""
+    if not await set_version_published(session, agent_id, version_id, True):
+        raise HTTPException(status_code=404, detail="Agent version not found")
+
+
+@router.post("/{agent_id}/versions/{version_id}/unpublish", status_code=204)
+async def unpublish_agent_version(
+    agent_id: UUID, version_id: UUID, session: AsyncSession = Depends(db_session)
+) -> None:
+    """Unpublish a version; runs already started keep using it."""
+    if not await set_version_published(session, agent_id, version_id, False):
+        raise HTTPException(status_code=404, detail="Agent version not found")
@@ -0,0 +1,229 @@
+"""Artifact endpoints.
+
+Content does not pass through the API unless a client streams it here:
+large uploads go straight to the bucket through presigned part URLs, and
+downloads redirect to a presigned GET, which serves range requests itself.
+"""
+
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import RedirectResponse
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from agent_runtime_core.artifacts import (
+    ArtifactInUseError,
+    ArtifactNotFoundError,
+    ArtifactTooLargeError,
+    ArtifactUploadError,
+    PresignedUpload,
+    get_artifact_store,
+)
+from agent_runtime_core.models import Artifact
+
+from ..dependencies import db_session
+from ..services.agent_cache import get_agent_version_cache
+
+router = APIRouter()
+
+
+class CreateUploadRequest(BaseModel):
+    """Request body for starting a presigned upload."""
+
+    size: int = Field(ge=0)
+    filename: str | None = Field(default=None, max_length=1024)
+    content_type: str = Field(default="application/octet-stream", max_length=255)
+    # Hex SHA-256 of the content; lets an upload the tenant already has be skipped
+    sha256: str | None = Field(default=None, pattern=r"^[0-9a-f]{64}$")
+
+
+class UploadPart(BaseModel):
+    """One uploaded part: its number and the ETag the bucket returned for it."""
+
+    part_number: int = Field(ge=1, le=10_000)
+    etag: str
+
+
+class UploadPartsRequest(BaseModel):
+    """Parts uploaded to the presigned URLs."""
+
+    parts: list[UploadPart] = Field(min_length=1)
+
+
+class PartURL(BaseModel):
+    part_number: int
+    url: str
+
+
+class UploadInfo(BaseModel):
+    """Where to PUT each part of a presigned upload."""
+
+    upload_id: str
+    part_size: int
+    parts: list[PartURL]
+    expires_at: datetime
+
+    @classmethod
+    def from_presigned(cls, upload: PresignedUpload) -> "UploadInfo":
+        return cls(
+            upload_id=upload.upload_id,
+            part_size=upload.part_size,
+            parts=[PartURL(part_number=p.part_number, url=p.url) for p in upload.parts],
+            expires_at=upload.expires_at,
+        )
+
+
+class CreateUploadResponse(BaseModel):
+    """The artifact, and the upload to make unless its content already existed."""
+
+    artifact: Artifact
+    upload: UploadInfo | None = None
+
+
+class DownloadURL(BaseModel):
+    url: str
+    expires_at: datetime
+
+
+async def _check_tenant(session: AsyncSession, tenant_id: UUID) -> None:
+    if not await get_agent_version_cache().is_tenant_active(session, tenant_id):
+        raise HTTPException(status_code=403, detail="Tenant is inactive")
+
+
+async def _get_artifact(artifact_id: UUID) -> Artifact:
+    try:
+        return await get_artifact_store().get(artifact_id)
+    except ArtifactNotFoundError:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+
+
+def _upload_error(e: ArtifactUploadError) -> HTTPException:
+    status_code = 413 if isinstance(e, ArtifactTooLargeError) else 400
+    return HTTPException(status_code=status_code, detail=str(e))
+
+
+@router.post("/uploads", status_code=201)
+async def create_upload(
+    request: CreateUploadRequest,
+    tenant_id: UUID,
+    session: AsyncSession = Depends(db_session),
+) -> CreateUploadResponse:
+    """
+    Start a presigned multipart upload.
+
+    PUT each part to its URL, then POST the ETags to
+    /artifacts/{id}/complete. When `sha256` matches content the tenant
+    already has, that artifact is returned with no upload to make.
+    """
+    await _check_tenant(session, tenant_id)
+    try:
+        artifact, upload = await get_artifact_store().create_upload(
+            tenant_id,
+            size=request.size,
+            filename=request.filename,
+            content_type=request.content_type,
+            sha256=request.sha256,
+        )
+    except ArtifactUploadError as e:
+        raise _upload_error(e) from e
+    return CreateUploadResponse(
+        artifact=artifact, upload=UploadInfo.from_presigned(upload) if upload is not None else None
+    )
+
+
+@router.post("/", status_code=201)
+async def upload_artifact(
+    request: Request,
+    tenant_id: UUID,
+    filename: str | None = Query(default=None, max_length=1024),
+    session: AsyncSession = Depends(db_session),
+) -> Artifact:
+    """
+    Upload an artifact in the request body.
+
+    The body is streamed to the bucket part by part rather than buffered,
+    so its size is bounded only by the artifact size limit.
+    """
+    await _check_tenant(session, tenant_id)
+    # Not held open while the body streams in
+    await session.close()
+    try:
+        return await get_artifact_store().upload(
+            tenant_id,
+            request.stream(),
+            filename=filename,
+            content_type=request.headers.get("content-type", "application/octet-stream"),
+        )
+    except ArtifactUploadError as e:
+        raise _upload_error(e) from e
+
+
+@router.post("/{artifact_id}/complete")
+async def complete_upload(artifact_id: UUID, request: UploadPartsRequest) -> Artifact:
+    """
+    Finish a presigned upload.
+
+    May return a different artifact with the same content, if the tenant
+    completed one while this upload was in progress.
+    """
+    try:
+        return await get_artifact_store().complete_upload(
+            artifact_id, [(part.part_number, part.etag) for part in request.parts]
+        )
+    except ArtifactNotFoundError:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    except ArtifactUploadError as e:
+        raise _upload_error(e) from e
+
+
+@router.delete("/{artifact_id}/upload", status_code=204)
+async def abort_upload(artifact_id: UUID) -> None:
+    """Cancel a presigned upload; completed artifacts are left alone."""
+    try:
+        await get_artifact_store().abort_upload(artifact_id)
+    except ArtifactNotFoundError:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+
+
+@router.get("/{artifact_id}")
+async def get_artifact(artifact_id: UUID) -> Artifact:
+    """Get an artifact's metadata."""
+    return await _get_artifact(artifact_id)
+
+
+@router.get("/{artifact_id}/url")
+async def get_download_url(
+    artifact_id: UUID,
+    expires_in: int | None = Query(default=None, ge=1, le=7 * 24 * 3600),
+) -> DownloadURL:
+    """Get a presigned URL for downloading an artifact; it accepts Range requests."""
+    artifact = await _get_artifact(artifact_id)
+    try:
+        url, expires_at = get_artifact_store().download_url(artifact, expires_in)
+    except ArtifactNotFoundError:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    return DownloadURL(url=url, expires_at=expires_at)
+
+
+@router.get("/{artifact_id}/content", status_code=307)
+async def download_artifact(artifact_id: UUID) -> RedirectResponse:
+    """Redirect to a presigned URL for the artifact's content."""
+    artifact = await _get_artifact(artifact_id)
+    try:
+        url, _ = get_artifact_store().download_url(artifact)
+    except ArtifactNotFoundError:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    return RedirectResponse(url, status_code=307)
+
+
+@router.delete("/{artifact_id}", status_code=204)
+async def delete_artifact(artifact_id: UUID) -> None:
+    """Delete an artifact that no run references."""
+    try:
+        await get_artifact_store().delete(artifact_id)
+    except ArtifactNotFoundError:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    except ArtifactInUseError as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
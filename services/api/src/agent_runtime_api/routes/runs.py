@@ -3,10 +3,33 @@
 from typing import Any
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from agent_runtime_core.models import Run, RunStatus
+from agent_runtime_core.artifacts import missing_artifacts
+from agent_runtime_core.events import fetch_run_events
+from agent_runtime_core.models import Run, RunEvent, RunPriority, RunStatus
+from agent_runtime_core.utils import get_settings
+
+from ..dependencies import db_session
+from ..services.admission import admit_batch, admit_runs
+from ..services.event_stream import format_sse, get_broadcaster, is_stream_id, watch_run_events
+from ..services.agent_cache import VersionNotFoundError, get_agent_version_cache
+from ..services.run_batch import prepare_batch, stream_batch_results
+from ..services.runs import (
+    InvalidCursorError,
+    insert_run,
+    list_runs_page,
+    mark_run_failed,
+    overlay_statuses,
+    read_run,
+    release_slots,
+    set_workflow_run_id,
+    stream_runs_ndjson,
+)
+from ..services.temporal import start_agent_run
 
 router = APIRouter()
 
@@ -16,6 +39,22 @@ class CreateRunRequest(BaseModel):
 
     agent_version_id: UUID
     input: dict[str, Any] = {}
+    # Ready artifacts of the tenant to make available to the run
+    artifact_ids: list[UUID] = Field(default=[], max_length=100)
+
+
+class BatchRunItem(CreateRunRequest):
+    """One item of a bulk submission."""
+
+    # Unique per tenant; resubmitting a key returns the existing run
+    idempotency_key: str | None = Field(default=None, max_length=255)
+
+
+class RunPage(BaseModel):
+    """A page of runs with the cursor for the next page."""
+
+    items: list[Run]
+    next_cursor: str | None = None
 
 
 @router.get("/")
@@ -23,39 +62,206 @@ async def list_runs(
     tenant_id: UUID | None = None,
     agent_id: UUID | None = None,
     status: RunStatus | None = None,
-) -> list[Run]:
-    """List runs with optional filters."""
-    # TODO: Implement database query
-    return []
+    cursor: str | None = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    session: AsyncSession = Depends(db_session),
+) -> RunPage:
+    """List runs with optional filters, newest first, using keyset pagination."""
+    try:
+        items, next_cursor = await list_runs_page(
+            session,
+            tenant_id=tenant_id,
+            agent_id=agent_id,
+            status=status,
+            cursor=cursor,
+            limit=limit,
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # Filtering uses the persisted status, which may lag the read model briefly
+    return RunPage(items=await overlay_statuses(items), next_cursor=next_cursor)
+
+
+@router.get("/export")
+async def export_runs(
+    tenant_id: UUID | None = None,
+    agent_id: UUID | None = None,
+    status: RunStatus | None = None,
+) -> StreamingResponse:
+    """Stream all matching runs as NDJSON without buffering the result set."""
+    return StreamingResponse(
+        stream_runs_ndjson(tenant_id=tenant_id, agent_id=agent_id, status=status),
+        media_type="application/x-ndjson",
+    )
 
 
 @router.post("/", status_code=202)
-async def create_run(request: CreateRunRequest, tenant_id: UUID) -> Run:
+async def create_run(
+    request: CreateRunRequest,
+    tenant_id: UUID,
+    priority: RunPriority = RunPriority.INTERACTIVE,
+    session: AsyncSession = Depends(db_session),
+) -> Run:
     """
     Create and start a new agent run.
 
-    Returns 202 Accepted as the run is started asynchronously.
+    Returns 202 Accepted as the run is started asynchronously. The version,
+    agent and tenant are resolved from the agent version cache, so on a
+    cache hit the only database work is writing the run.
+
+    If the tenant is at its concurrent run limit, the run stays pending in
+    the tenant's `priority` lane and starts once admission releases it.
     """
-    # TODO: Implement:
-    # 1. Validate tenant, agent, version
-    # 2. Create Run record in database
-    # 3. Start Temporal workflow
-    # 4. Return run with workflow IDs
+    cache = get_agent_version_cache()
+    try:
+        version = await cache.resolve(session, request.agent_version_id)
+    except VersionNotFoundError:
+        raise HTTPException(status_code=404, detail="Agent version not found")
+    if version.tenant_id != tenant_id:
+        raise HTTPException(status_code=404, detail="Agent version not found")
+    if not await cache.is_tenant_active(session, tenant_id):
+        raise HTTPException(status_code=403, detail="Tenant is inactive")
+    if not await cache.is_agent_active(session, version.agent_id):
+        raise HTTPException(status_code=409, detail="Agent is inactive")
+
     run = Run(
         tenant_id=tenant_id,
-        agent_id=UUID("00000000-0000-0000-0000-000000000000"),  # Placeholder
-        agent_version_id=request.agent_version_id,
+        agent_id=version.agent_id,
+        agent_version_id=version.version_id,
         input=request.input,
+        artifact_ids=request.artifact_ids,
         status=RunStatus.PENDING,
     )
+    run.workflow_id = f"run-{run.id}"
+    # Locks the artifacts against deletion until the run row is committed
+    if await missing_artifacts(session, tenant_id, run.artifact_ids):
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    await insert_run(session, run)
+    # The row must be visible before the workflow can act on it
+    await session.commit()
+    [admitted] = await admit_runs(session, tenant_id, [run.id], priority)
+    if not admitted:
+        return run
+
+    try:
+        run.workflow_run_id = await start_agent_run(run, version.config)
+    except Exception as e:
+        await mark_run_failed(session, run.id, f"Failed to start workflow: {e}")
+        await session.commit()
+        await release_slots(run.id)
+        raise HTTPException(status_code=503, detail="Failed to start run") from e
+    await set_workflow_run_id(session, run.id, run.workflow_run_id)
     return run
 
 
+@router.post("/batch", status_code=202)
+async def create_runs_batch(
+    items: list[BatchRunItem],
+    tenant_id: UUID,
+    priority: RunPriority = RunPriority.BATCH,
+    session: AsyncSession = Depends(db_session),
+) -> StreamingResponse:
+    """
+    Create and start many runs in one request.
+
+    All new rows are written in a single statement and committed before any
+    workflow starts. Workflows then start with bounded concurrency, and one
+    NDJSON line per item ({index, idempotency_key, run_id, status, error})
+    streams back as each settles; status is "started", "queued" (waiting
+    for the tenant's admission limit), "existing" (the idempotency key was
+    already used) or "error".
+    """
+    settings = get_settings()
+    if len(items) > settings.run_batch_max_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds {settings.run_batch_max_size} items",
+        )
+    if not await get_agent_version_cache().is_tenant_active(session, tenant_id):
+        raise HTTPException(status_code=403, detail="Tenant is inactive")
+
+    prepared = await prepare_batch(session, tenant_id, items)
+    # The rows must be visible before the workflows can act on them
+    await session.commit()
+    await admit_batch(session, tenant_id, prepared, priority)
+    return StreamingResponse(
+        stream_batch_results(prepared, concurrency=settings.run_batch_start_concurrency),
+        status_code=202,
+        media_type="application/x-ndjson",
+    )
+
+
 @router.get("/{run_id}")
 async def get_run(run_id: UUID) -> Run:
-    """Get a run by ID."""
-    # TODO: Implement database query
-    raise HTTPException(status_code=404, detail="Run not found")
+    """Get a run by ID, served from the run status read model when cached."""
+    run = await read_run(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return run
+
+
+@router.get("/{run_id}/events")
+async def list_run_events(
+    run_id: UUID,
+    session: AsyncSession = Depends(db_session),
+) -> list[RunEvent]:
+    """Get the events of a run, including events archived to object storage."""
+    return await fetch_run_events(session, run_id)
+
+
+@router.get("/{run_id}/events/stream")
+async def stream_run_events(
+    run_id: UUID,
+    last_event_id: str | None = Query(default=None),
+    last_event_id_header: str | None = Header(default=None, alias="Last-Event-ID"),
+) -> StreamingResponse:
+    """
+    Stream a run's live events as Server-Sent Events.
+
+    Reconnecting clients send Last-Event-ID (or the `last_event_id` query
+    parameter) and receive only the events they missed.
+    """
+    resume_from = last_event_id_header or last_event_id
+    if resume_from and not is_stream_id(resume_from):
+        raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+    heartbeat = get_settings().event_stream_heartbeat_seconds
+
+    async def frames():
+        yield b"retry: 1000\n\n"
+        async for item in watch_run_events(get_broadcaster(), run_id, resume_from, heartbeat):
+            yield b": keepalive\n\n" if item is None else format_sse(*item)
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/{run_id}/events/ws")
+async def websocket_run_events(
+    websocket: WebSocket,
+    run_id: UUID,
+    last_event_id: str | None = None,
+) -> None:
+    """WebSocket variant of the live event stream; messages are {"id", "event"}."""
+    if last_event_id and not is_stream_id(last_event_id):
+        # Policy violation, sent before the handshake completes
+        await websocket.close(code=1008, reason="Invalid last_event_id")
+        return
+    await websocket.accept()
+    heartbeat = get_settings().event_stream_heartbeat_seconds
+    try:
+        async for item in watch_run_events(get_broadcaster(), run_id, last_event_id, heartbeat):
+            if item is None:
+                await websocket.send_text('{"type":"keepalive"}')
+            else:
+                stream_id, payload = item
+                await websocket.send_text(f'{{"id":"{stream_id}","event":{payload}}}')
+        # Subscription lagged: ask the client to reconnect with its last ID
+        await websocket.close(code=1013)
+    except WebSocketDisconnect:
+        pass
 
 
 @router.post("/{run_id}/cancel", status_code=202)
@@ -2,13 +2,27 @@
 
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from agent_runtime_core.models import Tenant
 
+from ..dependencies import db_session
+from ..services.catalog import set_tenant_settings
+
 router = APIRouter()
 
 
+class TenantUpdate(BaseModel):
+    """Request body for updating a tenant; only the fields given are changed."""
+
+    is_active: bool = True
+    # None uses the deployment default
+    max_concurrent_runs: int | None = Field(default=None, ge=0)
+    scheduling_weight: int = Field(default=1, ge=1)
+
+
 @router.get("/")
 async def list_tenants() -> list[Tenant]:
     """List all tenants."""
@@ -28,3 +42,13 @@ async def get_tenant(tenant_id: UUID) -> Tenant:
     """Get a tenant by ID."""
     # TODO: Implement database query
     raise HTTPException(status_code=404, detail="Tenant not found")
+
+
+@router.patch("/{tenant_id}", status_code=204)
+async def update_tenant(
+    tenant_id: UUID, update: TenantUpdate, session: AsyncSession = Depends(db_session)
+) -> None:
+    """Activate or deactivate a tenant, or change its admission policy."""
+    changes = update.model_dump(include=update.model_fields_set)
+    if not await set_tenant_settings(session, tenant_id, changes):
+        raise HTTPException(status_code=404, detail="Tenant not found")
@@ -0,0 +1,268 @@
+"""Run admission in the API: slot checks on submission and the dispatcher.
+
+New runs are admitted against their tenant's limit before their workflow
+starts. Runs that do not fit stay pending in Postgres and queued in Redis.
+Every API process runs a `RunDispatcher`, which starts queued runs as the
+admission controller releases them. Dispatch is atomic in Redis, so the
+dispatchers never release the same run twice.
+"""
+
+import asyncio
+import logging
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from agent_runtime_core.admission import AdmissionController, get_admission_controller
+from agent_runtime_core.db import AsyncSessionLocal, get_engine
+from agent_runtime_core.models import RunPriority, RunStatus
+from agent_runtime_core.utils import get_settings
+
+from ..telemetry import (
+    ADMISSION_DECISIONS,
+    ADMISSION_OLDEST_WAIT_SECONDS,
+    ADMISSION_QUEUE_DEPTH,
+    ADMISSION_WAIT_SECONDS,
+)
+from .agent_cache import VersionNotFoundError, get_agent_version_cache
+from .run_batch import BatchItemResult, PendingStart, PreparedBatch, record_starts, start_runs
+from .runs import fetch_runs
+
+logger = logging.getLogger(__name__)
+
+# Seconds between samples of the per-tenant queue gauges
+STATS_INTERVAL = 5.0
+ACTIVE_STATUSES = (RunStatus.PENDING.value, RunStatus.RUNNING.value, RunStatus.PAUSED.value)
+
+
+async def admit_runs(
+    session: AsyncSession,
+    tenant_id: UUID,
+    run_ids: list[UUID],
+    priority: RunPriority,
+) -> list[bool]:
+    """
+    Take admission slots for new runs of a tenant, in order.
+
+    Returns whether each run may start now; the rest are queued. If
+    admission control is disabled, or Redis is unavailable, every run is
+    admitted.
+    """
+    settings = get_settings()
+    if not settings.admission_enabled or not run_ids:
+        return [True] * len(run_ids)
+    policy = await get_agent_version_cache().tenant_policy(session, tenant_id)
+    limit = policy.max_concurrent_runs
+    if limit is None:
+        limit = settings.admission_default_tenant_limit
+    try:
+        admitted = await get_admission_controller().admit(
+            tenant_id, run_ids, priority, limit=limit, weight=policy.scheduling_weight
+        )
+    except Exception:
+        logger.warning("Admission control unavailable, admitting runs", exc_info=True)
+        return [True] * len(run_ids)
+    queued = admitted.count(False)
+    ADMISSION_DECISIONS.labels(priority.value, "admitted").inc(len(admitted) - queued)
+    ADMISSION_DECISIONS.labels(priority.value, "queued").inc(queued)
+    return admitted
+
+
+async def admit_batch(
+    session: AsyncSession,
+    tenant_id: UUID,
+    prepared: PreparedBatch,
+    priority: RunPriority,
+) -> None:
+    """Admit a prepared batch, moving runs that must wait into its results as queued."""
+    admitted = await admit_runs(session, tenant_id, [item.run.id for item in prepared.pending], priority)
+    pending = []
+    for item, ok in zip(prepared.pending, admitted):
+        if ok:
+            pending.append(item)
+            continue
+        prepared.results.append(
+            BatchItemResult(
+                index=item.index,
+                idempotency_key=item.run.idempotency_key,
+                run_id=item.run.id,
+                status="existing" if item.existing else "queued",
+            )
+        )
+    prepared.pending = pending
+
+
+class RunDispatcher:
+    """
+    Starts queued runs as admission slots free up.
+
+    Each pass asks the controller for up to `batch` released runs and
+    starts their workflows with bounded concurrency. The dispatcher also
+    publishes per-tenant queue gauges, and reclaims slots still held by
+    runs that ended without releasing them (for example, a workflow
+    terminated from outside).
+    """
+
+    def __init__(
+        self,
+        controller: AdmissionController,
+        *,
+        interval: float = 0.1,
+        batch: int = 256,
+        concurrency: int = 32,
+        reconcile_interval: float = 60.0,
+    ) -> None:
+        self._controller = controller
+        self._interval = interval
+        self._batch = batch
+        self._concurrency = concurrency
+        self._reconcile_interval = reconcile_interval
+        self._task: asyncio.Task | None = None
+        self._gauge_labels: set[tuple[str, str]] = set()
+
+    async def start(self) -> None:
+        """Start dispatching in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="run-dispatcher")
+
+    async def close(self) -> None:
+        """Stop dispatching; runs given a slot but not started are left to reconciliation."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_stats = next_reconcile = loop.time()
+        backoff = 0.5
+        while True:
+            try:
+                released = await self._controller.dispatch(self._batch)
+                for item in released:
+                    ADMISSION_WAIT_SECONDS.labels(item.priority.value).observe(item.wait_seconds)
+                if released:
+                    await self._start([item.run_id for item in released])
+                if loop.time() >= next_stats:
+                    await self._sample_queues()
+                    next_stats = loop.time() + STATS_INTERVAL
+                if loop.time() >= next_reconcile:
+                    await self._reconcile()
+                    next_reconcile = loop.time() + self._reconcile_interval
+                backoff = 0.5
+                # A full pass means more may be waiting for slots already free
+                if len(released) < self._batch:
+                    await asyncio.sleep(self._interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Run dispatch failed, retrying")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 10.0)
+
+    async def _start(self, run_ids: list[UUID]) -> None:
+        """Start the workflows of runs holding a slot."""
+        cache = get_agent_version_cache()
+        pending: list[PendingStart] = []
+        ended: list[UUID] = []
+        failed: dict[UUID, str] = {}
+        async with AsyncSessionLocal(bind=get_engine()) as session:
+            runs = {run.id: run for run in await fetch_runs(session, run_ids)}
+            for index, run_id in enumerate(run_ids):
+                run = runs.get(run_id)
+                if run is None or run.status.value not in ACTIVE_STATUSES:
+                    # Deleted or already over while it waited
+                    ended.append(run_id)
+                    continue
+                if run.status != RunStatus.PENDING or run.workflow_run_id is not None:
+                    # Already started (queued twice by a resubmission); its slot is the same
+                    continue
+                try:
+                    version = await cache.resolve(session, run.agent_version_id)
+                except VersionNotFoundError:
+                    failed[run.id] = "Agent version not found"
+                    continue
+                pending.append(PendingStart(index, run, version.config))
+
+        started: dict[UUID, str] = {}
+        async for item, workflow_run_id, error in start_runs(pending, concurrency=self._concurrency):
+            if error is not None:
+                failed[item.run.id] = error
+            elif workflow_run_id is not None:
+                started[item.run.id] = workflow_run_id
+        # Failed starts give their slots back in record_starts
+        await record_starts(started, failed)
+        await self._controller.release(*ended)
+
+    async def _sample_queues(self) -> None:
+        """Publish queue depth and oldest wait for every tenant lane with queued runs."""
+        labels = set()
+        for stats in await self._controller.queue_stats():
+            key = (str(stats.tenant_id), stats.priority.value)
+            labels.add(key)
+            ADMISSION_QUEUE_DEPTH.labels(*key).set(stats.depth)
+            ADMISSION_OLDEST_WAIT_SECONDS.labels(*key).set(stats.oldest_wait_seconds)
+        # Drained lanes stop being reported rather than sticking at their last value
+        for key in self._gauge_labels - labels:
+            ADMISSION_QUEUE_DEPTH.remove(*key)
+            ADMISSION_OLDEST_WAIT_SECONDS.remove(*key)
+        self._gauge_labels = labels
+
+    async def _reconcile(self) -> None:
+        """
+        Repair slots that fell out of step with the runs holding them.
+
+        Slots held by runs that are no longer active are released. Runs that
+        have held a slot for a whole interval without their workflow being
+        started (their API process died in between) are started now.
+        """
+        holding = await self._controller.running()
+        if not holding:
+            return
+        async with AsyncSessionLocal(bind=get_engine()) as session:
+            result = await session.execute(
+                text(
+                    "SELECT id, status = :pending AND workflow_run_id IS NULL "
+                    "AND updated_at < NOW() - make_interval(secs => :grace) AS stranded "
+                    "FROM runs WHERE id = ANY(CAST(:ids AS uuid[])) "
+                    "AND status = ANY(CAST(:statuses AS text[]))"
+                ),
+                {
+                    "ids": holding,
+                    "statuses": list(ACTIVE_STATUSES),
+                    "pending": RunStatus.PENDING.value,
+                    "grace": self._reconcile_interval,
+                },
+            )
+            rows = result.all()
+        active = {row.id for row in rows}
+        ended = [run_id for run_id in holding if run_id not in active]
+        if ended:
+            freed = await self._controller.release(*ended)
+            logger.info("Reclaimed %d admission slots from ended runs", freed)
+        stranded = [row.id for row in rows if row.stranded]
+        if stranded:
+            logger.info("Starting %d admitted runs whose workflows never started", len(stranded))
+            await self._start(stranded)
+
+
+_dispatcher: RunDispatcher | None = None
+
+
+def get_run_dispatcher() -> RunDispatcher:
+    """Get the process-wide run dispatcher configured from settings."""
+    global _dispatcher
+    if _dispatcher is None:
+        settings = get_settings()
+        _dispatcher = RunDispatcher(
+            get_admission_controller(),
+            interval=settings.admission_dispatch_interval_ms / 1000,
+            batch=settings.admission_dispatch_batch,
+            concurrency=settings.run_batch_start_concurrency,
+            reconcile_interval=settings.admission_reconcile_interval_seconds,
+        )
+    return _dispatcher
@@ -0,0 +1,298 @@
+"""Caches for resolving agent versions on the run creation path.
+
+Published agent versions are immutable, so a resolved version (its config
+plus the agent and tenant it belongs to) is cached in process without
+expiry, behind a shared Redis tier. Entries are invalidated only when a
+version is unpublished or deleted.
+
+Tenant and agent `is_active` flags, and tenant admission policies, can
+change at any time. They are cached in process for a short TTL, and
+changes are broadcast over Redis pub/sub so every API process drops the
+stale entry immediately.
+
+On a hit, resolving a version and checking both flags touches neither
+Postgres nor Redis. Every invalidation bumps a generation counter, and a
+load started before an invalidation is returned but not cached, so it
+cannot put the stale entry back.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
+from uuid import UUID
+
+from pydantic import BaseModel
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from agent_runtime_core.utils import get_redis, get_settings
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY_PREFIX = "agent-version:"
+INVALIDATION_CHANNEL = "agent-cache-invalidate"
+# Redis copies outlive any realistic gap between uses but do not pile up forever
+VERSION_REDIS_TTL_SECONDS = 7 * 86_400
+
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class VersionNotFoundError(LookupError):
+    """Raised when an agent version does not exist or is not published."""
+
+
+class ResolvedVersion(BaseModel):
+    """A published agent version with the agent and tenant it belongs to."""
+
+    version_id: UUID
+    agent_id: UUID
+    tenant_id: UUID
+    version: str
+    config: dict[str, Any]
+
+
+class TenantPolicy(BaseModel):
+    """Admission settings of a tenant."""
+
+    # None uses the deployment default
+    max_concurrent_runs: int | None = None
+    scheduling_weight: int = 1
+
+
+class _ExpiringMap(Generic[K, V]):
+    """Entries that expire `ttl` seconds after being set, at most `max_entries` of them."""
+
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        self._ttl = ttl
+        self._max_entries = max_entries
+        # Every entry lives for the same TTL, so insertion order is expiry order
+        self._entries: OrderedDict[K, tuple[V, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> V | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            del self._entries[key]
+            return None
+        return entry[0]
+
+    def set(self, key: K, value: V) -> None:
+        now = time.monotonic()
+        self._entries.pop(key, None)
+        self._entries[key] = (value, now + self._ttl)
+        while self._entries:
+            _, expires_at = next(iter(self._entries.values()))
+            if len(self._entries) <= self._max_entries and expires_at > now:
+                break
+            self._entries.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class AgentVersionCache:
+    """Two-tier cache of resolved versions plus short-lived active flags."""
+
+    def __init__(
+        self,
+        redis: "Redis",
+        *,
+        max_versions: int = 10_000,
+        active_ttl: float = 30.0,
+        max_flags: int = 100_000,
+    ) -> None:
+        self._redis = redis
+        self._max_versions = max_versions
+        self._versions: OrderedDict[UUID, ResolvedVersion] = OrderedDict()
+        # Keyed by (table, id)
+        self._active: _ExpiringMap[tuple[str, UUID], bool] = _ExpiringMap(active_ttl, max_flags)
+        self._policies: _ExpiringMap[UUID, TenantPolicy] = _ExpiringMap(active_ttl, max_flags)
+        self._generation = 0
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """Start listening for invalidations."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen(), name="agent-cache-invalidation")
+
+    async def close(self) -> None:
+        """Stop listening for invalidations."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def resolve(self, session: AsyncSession, version_id: UUID) -> ResolvedVersion:
+        """Resolve a published version, loading it on a miss in both tiers."""
+        version = self._versions.get(version_id)
+        if version is not None:
+            self._versions.move_to_end(version_id)
+            return version
+
+        generation = self._generation
+        key = f"{VERSION_KEY_PREFIX}{version_id}"
+        try:
+            data = await self._redis.get(key)
+        except Exception:
+            logger.warning("Agent version cache read failed", exc_info=True)
+            data = None
+        if data is not None:
+            version = ResolvedVersion.model_validate_json(data)
+        else:
+            version = await _load_version(session, version_id)
+            if generation != self._generation:
+                return version
+            try:
+                await self._redis.set(key, version.model_dump_json(), ex=VERSION_REDIS_TTL_SECONDS)
+            except Exception:
+                logger.warning("Agent version cache write failed", exc_info=True)
+
+        if generation != self._generation:
+            return version
+        self._versions[version_id] = version
+        if len(self._versions) > self._max_versions:
+            self._versions.popitem(last=False)
+        return version
+
+    async def is_tenant_active(self, session: AsyncSession, tenant_id: UUID) -> bool:
+        """Whether a tenant is active (cached for the active-flag TTL)."""
+        return await self._is_active(session, "tenants", tenant_id)
+
+    async def is_agent_active(self, session: AsyncSession, agent_id: UUID) -> bool:
+        """Whether an agent is active (cached for the active-flag TTL)."""
+        return await self._is_active(session, "agents", agent_id)
+
+    async def tenant_policy(self, session: AsyncSession, tenant_id: UUID) -> TenantPolicy:
+        """A tenant's admission policy (cached for the active-flag TTL)."""
+        cached = self._policies.get(tenant_id)
+        if cached is not None:
+            return cached
+        generation = self._generation
+        result = await session.execute(
+            text("SELECT max_concurrent_runs, scheduling_weight FROM tenants WHERE id = :id"),
+            {"id": tenant_id},
+        )
+        row = result.mappings().first()
+        policy = TenantPolicy.model_validate(dict(row)) if row is not None else TenantPolicy()
+        if generation == self._generation:
+            self._policies.set(tenant_id, policy)
+        return policy
+
+    async def invalidate_version(self, version_id: UUID) -> None:
+        """Drop a version everywhere; call after it is published, unpublished or deleted."""
+        self._generation += 1
+        self._versions.pop(version_id, None)
+        await self._redis.delete(f"{VERSION_KEY_PREFIX}{version_id}")
+        await self._redis.publish(INVALIDATION_CHANNEL, f"version:{version_id}")
+
+    async def invalidate_tenant(self, tenant_id: UUID) -> None:
+        """Drop a tenant's cached active flag and policy in every process."""
+        self._generation += 1
+        self._active.pop(("tenants", tenant_id))
+        self._policies.pop(tenant_id)
+        await self._redis.publish(INVALIDATION_CHANNEL, f"tenants:{tenant_id}")
+
+    async def invalidate_agent(self, agent_id: UUID) -> None:
+        """Drop an agent's cached active flag in every process."""
+        self._generation += 1
+        self._active.pop(("agents", agent_id))
+        await self._redis.publish(INVALIDATION_CHANNEL, f"agents:{agent_id}")
+
+    async def _is_active(self, session: AsyncSession, table: str, entity_id: UUID) -> bool:
+        key = (table, entity_id)
+        cached = self._active.get(key)
+        if cached is not None:
+            return cached
+        generation = self._generation
+        active = await session.scalar(
+            text(f"SELECT is_active FROM {table} WHERE id = :id"), {"id": entity_id}
+        )
+        # A missing row counts as inactive
+        if generation == self._generation:
+            self._active.set(key, bool(active))
+        return bool(active)
+
+    def _apply(self, message: str) -> None:
+        kind, _, raw_id = message.partition(":")
+        entity_id = UUID(raw_id)
+        self._generation += 1
+        if kind == "version":
+            self._versions.pop(entity_id, None)
+        else:
+            self._active.pop((kind, entity_id))
+            if kind == "tenants":
+                self._policies.pop(entity_id)
+
+    async def _listen(self) -> None:
+        """Apply invalidations from other processes, reconnecting on failure."""
+        backoff = 0.5
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                backoff = 0.5
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self._apply(message["data"].decode())
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Agent cache invalidation subscription failed, reconnecting")
+                # Invalidations may have been missed; start from a clean cache
+                self._generation += 1
+                self._versions.clear()
+                self._active.clear()
+                self._policies.clear()
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 10.0)
+            finally:
+                await pubsub.aclose()
+
+
+async def _load_version(session: AsyncSession, version_id: UUID) -> ResolvedVersion:
+    result = await session.execute(
+        text(
+            "SELECT v.id AS version_id, v.agent_id, a.tenant_id, v.version, v.config "
+            "FROM agent_versions v JOIN agents a ON a.id = v.agent_id "
+            "WHERE v.id = :id AND v.is_published"
+        ).columns(config=JSONB),
+        {"id": version_id},
+    )
+    row = result.mappings().first()
+    if row is None:
+        raise VersionNotFoundError(version_id)
+    return ResolvedVersion.model_validate(dict(row))
+
+
+_cache: AgentVersionCache | None = None
+
+
+def get_agent_version_cache() -> AgentVersionCache:
+    """Get the process-wide agent version cache."""
+    global _cache
+    if _cache is None:
+        settings = get_settings()
+        _cache = AgentVersionCache(
+            get_redis(),
+            max_versions=settings.agent_cache_max_versions,
+            active_ttl=settings.agent_cache_active_ttl_seconds,
+        )
+    return _cache
@@ -0,0 +1,63 @@
+"""Writes to tenants, agents and agent versions.
+
+Their rows back the agent version cache, so each write is followed, once
+committed, by an invalidation in every API process. Invalidating earlier
+would let a concurrent read cache the old row again before the commit.
+"""
+
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .agent_cache import get_agent_version_cache
+
+# Tenant columns a tenant update may set
+TENANT_COLUMNS = ("is_active", "max_concurrent_runs", "scheduling_weight")
+
+
+async def set_version_published(
+    session: AsyncSession, agent_id: UUID, version_id: UUID, published: bool
+) -> bool:
+    """Publish or unpublish a version and commit; False if it does not exist."""
+    updated = await session.scalar(
+        text(
+            "UPDATE agent_versions SET is_published = :published "
+            "WHERE id = :id AND agent_id = :agent_id RETURNING id"
+        ),
+        {"id": version_id, "agent_id": agent_id, "published": published},
+    )
+    if updated is None:
+        return False
+    await session.commit()
+    await get_agent_version_cache().invalidate_version(version_id)
+    return True
+
+
+async def set_agent_active(session: AsyncSession, agent_id: UUID, active: bool) -> bool:
+    """Activate or deactivate an agent and commit; False if it does not exist."""
+    updated = await session.scalar(
+        text("UPDATE agents SET is_active = :active, updated_at = NOW() WHERE id = :id RETURNING id"),
+        {"id": agent_id, "active": active},
+    )
+    if updated is None:
+        return False
+    await session.commit()
+    await get_agent_version_cache().invalidate_agent(agent_id)
+    return True
+
+
+async def set_tenant_settings(session: AsyncSession, tenant_id: UUID, changes: dict[str, Any]) -> bool:
+    """Set a tenant's active flag or admission policy and commit; False if it does not exist."""
+    columns = [name for name in TENANT_COLUMNS if name in changes]
+    assignments = "".join(f"{name} = :{name}, " for name in columns)
+    updated = await session.scalar(
+        text(f"UPDATE tenants SET {assignments}updated_at = NOW() WHERE id = :id RETURNING id"),
+        {"id": tenant_id, **{name: changes[name] for name in columns}},
+    )
+    if updated is None:
+        return False
+    await session.commit()
+    await get_agent_version_cache().invalidate_tenant(tenant_id)
+    return True
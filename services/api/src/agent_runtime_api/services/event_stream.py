@@ -0,0 +1,247 @@
+"""Live run event fan-out for SSE and WebSocket watchers."""
+
+import asyncio
+import logging
+import re
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+from uuid import UUID
+
+from agent_runtime_core.events.publisher import LIVE_CHANNEL_PATTERN, LIVE_CHANNEL_PREFIX, stream_key
+from agent_runtime_core.utils import get_redis, get_settings
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+# Entries read per XRANGE call when backfilling after a reconnect
+BACKFILL_PAGE_SIZE = 500
+
+STREAM_ID_PATTERN = re.compile(r"[0-9]+(-[0-9]+)?")
+# Both parts of a stream ID are unsigned 64-bit integers
+MAX_STREAM_ID_PART = 2**64 - 1
+
+
+def parse_stream_id(stream_id: str) -> tuple[int, int]:
+    """
+    Parse a Redis stream ID ("<ms>-<seq>") into a comparable tuple.
+
+    Raises ValueError if it is not one, as a client-supplied Last-Event-ID
+    may not be.
+    """
+    if not STREAM_ID_PATTERN.fullmatch(stream_id):
+        raise ValueError(f"Invalid stream ID: {stream_id!r}")
+    ms, _, seq = stream_id.partition("-")
+    parsed = int(ms), int(seq or 0)
+    if max(parsed) > MAX_STREAM_ID_PART:
+        raise ValueError(f"Invalid stream ID: {stream_id!r}")
+    return parsed
+
+
+def is_stream_id(value: str) -> bool:
+    """Whether `value` is a valid Redis stream ID."""
+    try:
+        parse_stream_id(value)
+    except ValueError:
+        return False
+    return True
+
+
+class Subscription:
+    """
+    A single watcher's bounded buffer of (stream_id, event_json) pairs.
+
+    When the buffer overflows the subscription is marked lagged and stops
+    receiving. The watcher's stream then ends and the client reconnects with
+    its Last-Event-ID, backfilling from the run's Redis stream instead of
+    holding an unbounded backlog in API memory.
+    """
+
+    def __init__(self, run_id: str, max_buffer: int) -> None:
+        self.run_id = run_id
+        self.lagged = False
+        self._max_buffer = max_buffer
+        self._buffer: deque[tuple[str, str]] = deque()
+        self._ready = asyncio.Event()
+
+    def offer(self, stream_id: str, payload: str) -> None:
+        """Buffer an event for delivery (called by the broadcaster)."""
+        if self.lagged:
+            return
+        if len(self._buffer) >= self._max_buffer:
+            self.mark_lagged()
+            return
+        self._buffer.append((stream_id, payload))
+        self._ready.set()
+
+    def mark_lagged(self) -> None:
+        """Drop buffered events and wake the watcher so it disconnects."""
+        self.lagged = True
+        self._buffer.clear()
+        self._ready.set()
+
+    async def next_batch(self, timeout: float) -> list[tuple[str, str]]:
+        """Wait up to `timeout` seconds and return everything buffered."""
+        if not self._buffer and not self.lagged:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        self._ready.clear()
+        batch = list(self._buffer)
+        self._buffer.clear()
+        return batch
+
+
+class RunEventBroadcaster:
+    """
+    Fans live run events out to every watcher in this process.
+
+    Holds one Redis pattern subscription for all runs, whatever the number
+    of connected clients, and routes each message to the subscriptions
+    registered for its run.
+    """
+
+    def __init__(self, redis: "Redis", *, client_buffer: int = 256) -> None:
+        self._redis = redis
+        self._client_buffer = client_buffer
+        self._subscriptions: dict[str, set[Subscription]] = {}
+        self._task: asyncio.Task | None = None
+
+    @property
+    def watcher_count(self) -> int:
+        """Number of connected watchers."""
+        return sum(len(subs) for subs in self._subscriptions.values())
+
+    async def start(self) -> None:
+        """Start the shared subscription."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen(), name="run-event-broadcaster")
+
+    async def close(self) -> None:
+        """Stop the shared subscription and disconnect all watchers."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._lag_all()
+
+    @asynccontextmanager
+    async def subscribe(self, run_id: UUID | str) -> AsyncIterator[Subscription]:
+        """Register a watcher for a run for the duration of the context."""
+        key = str(run_id)
+        subscription = Subscription(key, self._client_buffer)
+        self._subscriptions.setdefault(key, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            subs = self._subscriptions.get(key)
+            if subs is not None:
+                subs.discard(subscription)
+                if not subs:
+                    del self._subscriptions[key]
+
+    async def backfill(self, run_id: UUID | str, after: str) -> AsyncIterator[tuple[str, str]]:
+        """Yield events retained in the run's stream after stream ID `after`."""
+        start = f"({after}"
+        while True:
+            entries = await self._redis.xrange(stream_key(run_id), min=start, count=BACKFILL_PAGE_SIZE)
+            for stream_id, fields in entries:
+                stream_id = stream_id.decode()
+                yield stream_id, fields[b"e"].decode()
+            if len(entries) < BACKFILL_PAGE_SIZE:
+                return
+            start = f"({stream_id}"
+
+    def _lag_all(self) -> None:
+        for subs in self._subscriptions.values():
+            for subscription in subs:
+                subscription.mark_lagged()
+
+    async def _listen(self) -> None:
+        """Route pub/sub messages to subscriptions, reconnecting on failure."""
+        backoff = 0.5
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.psubscribe(LIVE_CHANNEL_PATTERN)
+                backoff = 0.5
+                async for message in pubsub.listen():
+                    if message["type"] != "pmessage":
+                        continue
+                    run_id = message["channel"].decode().removeprefix(LIVE_CHANNEL_PREFIX)
+                    subs = self._subscriptions.get(run_id)
+                    if not subs:
+                        continue
+                    stream_id, _, payload = message["data"].decode().partition("\n")
+                    for subscription in subs:
+                        subscription.offer(stream_id, payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Run event subscription failed, reconnecting")
+                # Messages may have been missed; make watchers resume from their last ID
+                self._lag_all()
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 10.0)
+            finally:
+                await pubsub.aclose()
+
+
+async def watch_run_events(
+    broadcaster: RunEventBroadcaster,
+    run_id: UUID,
+    last_event_id: str | None,
+    heartbeat: float,
+) -> AsyncIterator[tuple[str, str] | None]:
+    """
+    Yield (stream_id, event_json) pairs for a run, or None as a heartbeat.
+
+    Subscribes before backfilling so no event published in between is lost,
+    then skips live events already delivered by the backfill. Returns when
+    the subscription lags so the client reconnects from its last event ID.
+    `last_event_id` must already have been checked with is_stream_id.
+    """
+    async with broadcaster.subscribe(run_id) as subscription:
+        last = parse_stream_id(last_event_id) if last_event_id else None
+        if last_event_id:
+            async for stream_id, payload in broadcaster.backfill(run_id, last_event_id):
+                last = parse_stream_id(stream_id)
+                yield stream_id, payload
+
+        while not subscription.lagged:
+            batch = await subscription.next_batch(heartbeat)
+            if not batch and not subscription.lagged:
+                yield None
+                continue
+            for stream_id, payload in batch:
+                position = parse_stream_id(stream_id)
+                if last is not None and position <= last:
+                    continue
+                last = position
+                yield stream_id, payload
+
+
+def format_sse(stream_id: str, payload: str) -> bytes:
+    """Format an event as a Server-Sent Events frame."""
+    return f"id: {stream_id}\nevent: run_event\ndata: {payload}\n\n".encode()
+
+
+_broadcaster: RunEventBroadcaster | None = None
+
+
+def get_broadcaster() -> RunEventBroadcaster:
+    """Get the process-wide broadcaster configured from settings."""
+    global _broadcaster
+    if _broadcaster is None:
+        _broadcaster = RunEventBroadcaster(
+            get_redis(),
+            client_buffer=get_settings().event_stream_client_buffer,
+        )
+    return _broadcaster
@@ -0,0 +1,320 @@
+"""Bulk run submission.
+
+A batch is written in one transaction with a single multi-row INSERT, and
+its workflows are then started with bounded concurrency. Results stream
+back as NDJSON in completion order, so a client sees each run as soon as
+its workflow has started rather than after the slowest one.
+
+Items may carry an idempotency key, unique per tenant. Resubmitting a key
+returns the existing run instead of creating a new one, and a run that was
+written but never started (for example because the client disconnected
+mid-batch) is started on resubmission. Workflow IDs are derived from run
+IDs, so starting such a run twice is harmless.
+"""
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Literal
+from uuid import UUID
+
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from temporalio.exceptions import WorkflowAlreadyStartedError
+
+from agent_runtime_core.artifacts import missing_artifacts
+from agent_runtime_core.db import AsyncSessionLocal, get_engine
+from agent_runtime_core.models import Run, RunStatus
+
+from .agent_cache import ResolvedVersion, VersionNotFoundError, get_agent_version_cache
+from .runs import (
+    fetch_runs_by_idempotency_key,
+    insert_runs,
+    mark_runs_failed,
+    release_slots,
+    set_workflow_run_ids,
+)
+from .temporal import start_agent_run
+
+if TYPE_CHECKING:
+    from ..routes.runs import BatchRunItem
+
+logger = logging.getLogger(__name__)
+
+# Start outcomes written back to Postgres per statement
+RECORD_BATCH_SIZE = 500
+
+StartRun = Callable[[Run, dict[str, Any]], Awaitable[str]]
+
+
+class BatchItemResult(BaseModel):
+    """Outcome of one item of a batch, streamed back as an NDJSON line."""
+
+    index: int
+    idempotency_key: str | None = None
+    run_id: UUID | None = None
+    status: Literal["started", "queued", "existing", "error"]
+    error: str | None = None
+
+
+@dataclass
+class PendingStart:
+    """A written run whose workflow still has to be started."""
+
+    index: int
+    run: Run
+    config: dict[str, Any]
+    # Runs found by idempotency key report "existing" even when started now
+    existing: bool = False
+
+
+@dataclass
+class PreparedBatch:
+    """A batch after its rows are written: final results plus runs to start."""
+
+    results: list[BatchItemResult] = field(default_factory=list)
+    pending: list[PendingStart] = field(default_factory=list)
+
+
+async def prepare_batch(
+    session: AsyncSession,
+    tenant_id: UUID,
+    items: Sequence["BatchRunItem"],
+) -> PreparedBatch:
+    """
+    Validate a batch and write its new runs in one statement.
+
+    Versions and agent flags are resolved once per distinct version through
+    the agent version cache, and the artifacts of all items are checked in
+    one query. Invalid items become per-item errors rather than failing the
+    batch. The caller commits.
+    """
+    cache = get_agent_version_cache()
+    prepared = PreparedBatch()
+
+    versions: dict[UUID, ResolvedVersion | str] = {}
+    for version_id in {item.agent_version_id for item in items}:
+        try:
+            version = await cache.resolve(session, version_id)
+        except VersionNotFoundError:
+            versions[version_id] = "Agent version not found"
+            continue
+        if version.tenant_id != tenant_id:
+            versions[version_id] = "Agent version not found"
+        elif not await cache.is_agent_active(session, version.agent_id):
+            versions[version_id] = "Agent is inactive"
+        else:
+            versions[version_id] = version
+    missing = set(
+        await missing_artifacts(
+            session, tenant_id, list({a for item in items for a in item.artifact_ids})
+        )
+    )
+
+    runs: list[Run] = []
+    indexes: list[int] = []
+    # Later items repeating a key report the run of the first one
+    duplicates: dict[str, list[int]] = {}
+    for index, item in enumerate(items):
+        version = versions[item.agent_version_id]
+        if isinstance(version, str) or missing.intersection(item.artifact_ids):
+            error = version if isinstance(version, str) else "Artifact not found"
+            prepared.results.append(
+                BatchItemResult(
+                    index=index, idempotency_key=item.idempotency_key, status="error", error=error
+                )
+            )
+            continue
+        key = item.idempotency_key
+        if key is not None:
+            if key in duplicates:
+                duplicates[key].append(index)
+                continue
+            duplicates[key] = []
+        run = Run(
+            tenant_id=tenant_id,
+            agent_id=version.agent_id,
+            agent_version_id=version.version_id,
+            input=item.input,
+            artifact_ids=item.artifact_ids,
+            status=RunStatus.PENDING,
+            idempotency_key=key,
+        )
+        run.workflow_id = f"run-{run.id}"
+        runs.append(run)
+        indexes.append(index)
+
+    inserted = await insert_runs(session, runs)
+    existing = {
+        run.idempotency_key: run
+        for run in await fetch_runs_by_idempotency_key(
+            session,
+            tenant_id,
+            [run.idempotency_key for run in runs if run.id not in inserted],
+        )
+    }
+
+    for index, run in zip(indexes, runs):
+        key = run.idempotency_key
+        if run.id in inserted:
+            config = versions[run.agent_version_id].config
+            prepared.pending.append(PendingStart(index, run, config))
+        elif key in existing:
+            run = existing[key]
+            await _resubmit_existing(session, prepared, index, run, versions)
+        else:
+            # The conflicting row was deleted before it could be read
+            for conflicted in (index, *duplicates[key]):
+                prepared.results.append(
+                    BatchItemResult(
+                        index=conflicted,
+                        idempotency_key=key,
+                        status="error",
+                        error="Idempotency key conflict",
+                    )
+                )
+            continue
+        for duplicate in duplicates.get(key, []):
+            prepared.results.append(
+                BatchItemResult(index=duplicate, idempotency_key=key, run_id=run.id, status="existing")
+            )
+    return prepared
+
+
+async def _resubmit_existing(
+    session: AsyncSession,
+    prepared: PreparedBatch,
+    index: int,
+    run: Run,
+    versions: dict[UUID, ResolvedVersion | str],
+) -> None:
+    """Report a run found by idempotency key, starting it if it never was."""
+    if run.status != RunStatus.PENDING or run.workflow_run_id is not None:
+        prepared.results.append(
+            BatchItemResult(
+                index=index, idempotency_key=run.idempotency_key, run_id=run.id, status="existing"
+            )
+        )
+        return
+    version = versions.get(run.agent_version_id)
+    if version is None:
+        try:
+            version = await get_agent_version_cache().resolve(session, run.agent_version_id)
+        except VersionNotFoundError:
+            version = "Agent version not found"
+    if isinstance(version, str):
+        prepared.results.append(
+            BatchItemResult(
+                index=index,
+                idempotency_key=run.idempotency_key,
+                run_id=run.id,
+                status="error",
+                error=version,
+            )
+        )
+        return
+    prepared.pending.append(PendingStart(index, run, version.config, existing=True))
+
+
+async def start_runs(
+    pending: Sequence[PendingStart],
+    *,
+    start: StartRun = start_agent_run,
+    concurrency: int,
+) -> AsyncIterator[tuple[PendingStart, str | None, str | None]]:
+    """
+    Start workflows with at most `concurrency` in flight.
+
+    Yields (pending, workflow_run_id, error) as each start completes. A
+    workflow that already exists counts as started with an unknown run ID.
+    Starts still in flight when the consumer stops are cancelled.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def start_one(item: PendingStart) -> tuple[PendingStart, str | None, str | None]:
+        async with semaphore:
+            try:
+                return item, await start(item.run, item.config), None
+            except WorkflowAlreadyStartedError:
+                return item, None, None
+            except Exception as e:
+                logger.warning("Failed to start workflow for run %s", item.run.id, exc_info=True)
+                return item, None, f"Failed to start workflow: {e}"
+
+    tasks = [asyncio.create_task(start_one(item)) for item in pending]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def stream_batch_results(
+    prepared: PreparedBatch,
+    *,
+    start: StartRun = start_agent_run,
+    concurrency: int,
+) -> AsyncIterator[bytes]:
+    """
+    Start a prepared batch and stream per-item results as NDJSON lines.
+
+    Items settled while preparing come first; the rest follow in the order
+    their workflows start. Workflow run IDs and start failures are written
+    back in batches on a session of its own, since the response body is
+    produced after the request's session has closed.
+    """
+    for result in prepared.results:
+        yield _ndjson(result)
+
+    started: dict[UUID, str] = {}
+    failed: dict[UUID, str] = {}
+    try:
+        async for item, workflow_run_id, error in start_runs(
+            prepared.pending, start=start, concurrency=concurrency
+        ):
+            run_id = item.run.id
+            if error is not None:
+                failed[run_id] = error
+                result = BatchItemResult(
+                    index=item.index,
+                    idempotency_key=item.run.idempotency_key,
+                    run_id=run_id,
+                    status="error",
+                    error="Failed to start run",
+                )
+            else:
+                if workflow_run_id is not None:
+                    started[run_id] = workflow_run_id
+                result = BatchItemResult(
+                    index=item.index,
+                    idempotency_key=item.run.idempotency_key,
+                    run_id=run_id,
+                    status="existing" if item.existing else "started",
+                )
+            yield _ndjson(result)
+            if len(started) + len(failed) >= RECORD_BATCH_SIZE:
+                await record_starts(started, failed)
+                started, failed = {}, {}
+    finally:
+        await record_starts(started, failed)
+
+
+async def record_starts(started: dict[UUID, str], failed: dict[UUID, str]) -> None:
+    """
+    Write back workflow run IDs and start failures on a session of its own.
+
+    Runs that failed to start also give back their admission slots.
+    """
+    if not started and not failed:
+        return
+    async with AsyncSessionLocal(bind=get_engine()) as session:
+        await set_workflow_run_ids(session, started)
+        await mark_runs_failed(session, failed)
+        await session.commit()
+    await release_slots(*failed)
+
+
+def _ndjson(result: BatchItemResult) -> bytes:
+    return result.model_dump_json().encode() + b"\n"
@@ -0,0 +1,395 @@
+"""Run queries - lookup, writes, keyset pagination and streaming export."""
+
+import base64
+import json
+import logging
+from collections.abc import AsyncIterator, Mapping
+from datetime import datetime, timezone
+from typing import Any
+from uuid import UUID
+
+import orjson
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from agent_runtime_core.admission import get_admission_controller
+from agent_runtime_core.db import AsyncSessionLocal, get_engine, get_read_engine
+from agent_runtime_core.models import Run, RunStatus
+from agent_runtime_core.status import get_run_status_store
+from agent_runtime_core.utils import get_settings, json_dumps
+
+logger = logging.getLogger(__name__)
+
+RUN_COLUMNS = (
+    "id, tenant_id, agent_id, agent_version_id, status, input, output, error, "
+    "workflow_id, workflow_run_id, idempotency_key, artifact_ids, started_at, completed_at, "
+    "created_at, updated_at"
+)
+# The same columns with input and output left as their stored JSON text,
+# for responses that embed them without decoding (see run_row_json)
+RUN_JSON_COLUMNS = RUN_COLUMNS.replace("input, output", "input::text AS input, output::text AS output")
+
+# Rows fetched per round-trip when streaming from a server-side cursor
+EXPORT_BATCH_SIZE = 1000
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(created_at: datetime, run_id: UUID) -> str:
+    """Encode the keyset position of a run as an opaque cursor."""
+    raw = json.dumps({"c": created_at.isoformat(), "i": str(run_id)})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Decode a cursor produced by `encode_cursor`."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(data["c"]), UUID(data["i"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+
+
+def _build_filters(
+    tenant_id: UUID | None,
+    agent_id: UUID | None,
+    status: RunStatus | None,
+) -> tuple[list[str], dict[str, Any]]:
+    """Build WHERE clauses matching the composite run indexes."""
+    clauses: list[str] = []
+    params: dict[str, Any] = {}
+    if tenant_id is not None:
+        clauses.append("tenant_id = :tenant_id")
+        params["tenant_id"] = tenant_id
+    if agent_id is not None:
+        clauses.append("agent_id = :agent_id")
+        params["agent_id"] = agent_id
+    if status is not None:
+        clauses.append("status = :status")
+        params["status"] = status.value
+    return clauses, params
+
+
+INSERT_RUN = text(
+    "INSERT INTO runs (id, tenant_id, agent_id, agent_version_id, status, input, "
+    "workflow_id, artifact_ids, created_at, updated_at) "
+    "VALUES (:id, :tenant_id, :agent_id, :agent_version_id, :status, :input, "
+    ":workflow_id, CAST(:artifact_ids AS uuid[]), :created_at, :updated_at)"
+).bindparams(bindparam("input", type_=JSONB))
+
+
+async def insert_run(session: AsyncSession, run: Run) -> None:
+    """Insert a new run row."""
+    await session.execute(
+        INSERT_RUN,
+        {
+            "id": run.id,
+            "tenant_id": run.tenant_id,
+            "agent_id": run.agent_id,
+            "agent_version_id": run.agent_version_id,
+            "status": run.status.value,
+            "input": run.input,
+            "workflow_id": run.workflow_id,
+            "artifact_ids": run.artifact_ids,
+            "created_at": run.created_at,
+            "updated_at": run.updated_at,
+        },
+    )
+
+
+async def set_workflow_run_id(session: AsyncSession, run_id: UUID, workflow_run_id: str) -> None:
+    """Record the Temporal run ID of a run's started workflow."""
+    await session.execute(
+        text("UPDATE runs SET workflow_run_id = :workflow_run_id, updated_at = NOW() WHERE id = :id"),
+        {"id": run_id, "workflow_run_id": workflow_run_id},
+    )
+    await _update_cached_runs(workflow_run_ids={run_id: workflow_run_id})
+
+
+async def mark_run_failed(session: AsyncSession, run_id: UUID, error: str) -> None:
+    """Mark a run as failed before it ever started."""
+    await session.execute(
+        text(
+            "UPDATE runs SET status = :status, error = :error, completed_at = NOW(), "
+            "updated_at = NOW() WHERE id = :id"
+        ),
+        {"id": run_id, "status": RunStatus.FAILED.value, "error": error},
+    )
+    await _update_cached_runs(errors={run_id: error})
+
+
+# One statement for a whole batch: each column travels as a single array
+# parameter, so the statement (and its prepared plan) is the same for any
+# batch size and stays clear of the bind parameter limit
+INSERT_RUNS = text(
+    "INSERT INTO runs (id, tenant_id, agent_id, agent_version_id, status, input, "
+    "workflow_id, idempotency_key, artifact_ids, created_at, updated_at) "
+    "SELECT r.id, r.tenant_id, r.agent_id, r.agent_version_id, r.status, "
+    "CAST(r.input AS jsonb), r.workflow_id, r.idempotency_key, CAST(r.artifact_ids AS uuid[]), "
+    "r.created_at, r.created_at "
+    "FROM unnest(CAST(:ids AS uuid[]), CAST(:tenant_ids AS uuid[]), "
+    "CAST(:agent_ids AS uuid[]), CAST(:agent_version_ids AS uuid[]), "
+    "CAST(:statuses AS text[]), CAST(:inputs AS text[]), CAST(:workflow_ids AS text[]), "
+    "CAST(:idempotency_keys AS text[]), CAST(:artifact_ids AS text[]), "
+    "CAST(:created_ats AS timestamptz[])) "
+    "AS r(id, tenant_id, agent_id, agent_version_id, status, input, workflow_id, "
+    "idempotency_key, artifact_ids, created_at) "
+    "ON CONFLICT (tenant_id, idempotency_key) WHERE idempotency_key IS NOT NULL DO NOTHING "
+    "RETURNING id"
+)
+
+
+async def insert_runs(session: AsyncSession, runs: list[Run]) -> set[UUID]:
+    """
+    Insert many run rows in one statement.
+
+    Rows whose (tenant_id, idempotency_key) already exists are skipped.
+    Returns the IDs of the rows actually inserted.
+    """
+    if not runs:
+        return set()
+    result = await session.execute(
+        INSERT_RUNS,
+        {
+            "ids": [run.id for run in runs],
+            "tenant_ids": [run.tenant_id for run in runs],
+            "agent_ids": [run.agent_id for run in runs],
+            "agent_version_ids": [run.agent_version_id for run in runs],
+            "statuses": [run.status.value for run in runs],
+            "inputs": [json_dumps(run.input).decode() for run in runs],
+            "workflow_ids": [run.workflow_id for run in runs],
+            "idempotency_keys": [run.idempotency_key for run in runs],
+            # unnest flattens nested arrays, so each run's IDs travel as an array literal
+            "artifact_ids": ["{" + ",".join(map(str, run.artifact_ids)) + "}" for run in runs],
+            "created_ats": [run.created_at for run in runs],
+        },
+    )
+    return set(result.scalars().all())
+
+
+async def fetch_runs_by_idempotency_key(
+    session: AsyncSession, tenant_id: UUID, keys: list[str]
+) -> list[Run]:
+    """Fetch a tenant's runs with any of the given idempotency keys."""
+    if not keys:
+        return []
+    result = await session.execute(
+        text(
+            f"SELECT {RUN_COLUMNS} FROM runs "
+            "WHERE tenant_id = :tenant_id AND idempotency_key = ANY(CAST(:keys AS text[]))"
+        ).columns(input=JSONB, output=JSONB),
+        {"tenant_id": tenant_id, "keys": keys},
+    )
+    return [Run.model_validate(dict(row)) for row in result.mappings()]
+
+
+async def set_workflow_run_ids(session: AsyncSession, workflow_run_ids: dict[UUID, str]) -> None:
+    """Record the Temporal run IDs of many started workflows in one statement."""
+    if not workflow_run_ids:
+        return
+    await session.execute(
+        text(
+            "UPDATE runs SET workflow_run_id = u.workflow_run_id, updated_at = NOW() "
+            "FROM unnest(CAST(:ids AS uuid[]), CAST(:workflow_run_ids AS text[])) "
+            "AS u(id, workflow_run_id) WHERE runs.id = u.id"
+        ),
+        {"ids": list(workflow_run_ids), "workflow_run_ids": list(workflow_run_ids.values())},
+    )
+    await _update_cached_runs(workflow_run_ids=workflow_run_ids)
+
+
+async def mark_runs_failed(session: AsyncSession, errors: dict[UUID, str]) -> None:
+    """Mark many runs as failed before they ever started, in one statement."""
+    if not errors:
+        return
+    await session.execute(
+        text(
+            "UPDATE runs SET status = :status, error = u.error, completed_at = NOW(), "
+            "updated_at = NOW() "
+            "FROM unnest(CAST(:ids AS uuid[]), CAST(:errors AS text[])) AS u(id, error) "
+            "WHERE runs.id = u.id"
+        ),
+        {"ids": list(errors), "errors": list(errors.values()), "status": RunStatus.FAILED.value},
+    )
+    await _update_cached_runs(errors=errors)
+
+
+async def fetch_run(session: AsyncSession, run_id: UUID) -> Run | None:
+    """Fetch a run by ID."""
+    result = await session.execute(
+        text(f"SELECT {RUN_COLUMNS} FROM runs WHERE id = :id").columns(input=JSONB, output=JSONB),
+        {"id": run_id},
+    )
+    row = result.mappings().first()
+    return Run.model_validate(dict(row)) if row is not None else None
+
+
+async def fetch_runs(session: AsyncSession, run_ids: list[UUID]) -> list[Run]:
+    """Fetch the runs with the given IDs that exist, in no particular order."""
+    if not run_ids:
+        return []
+    result = await session.execute(
+        text(f"SELECT {RUN_COLUMNS} FROM runs WHERE id = ANY(CAST(:ids AS uuid[]))").columns(
+            input=JSONB, output=JSONB
+        ),
+        {"ids": run_ids},
+    )
+    return [Run.model_validate(dict(row)) for row in result.mappings()]
+
+
+async def read_run(run_id: UUID) -> Run | None:
+    """
+    Read a run for clients polling its status.
+
+    Served from the Redis status read model when the run is cached there,
+    which needs no database connection at all. Otherwise the run is read
+    from the replica (then the primary, in case it is too new to have
+    replicated), overlaid with any status not yet persisted, and cached.
+    """
+    store = get_run_status_store()
+    try:
+        run = await store.get(run_id)
+    except Exception:
+        logger.warning("Run status read model unavailable", exc_info=True)
+        run = None
+    if run is not None:
+        return run
+
+    async with AsyncSessionLocal(bind=get_read_engine()) as session:
+        run = await fetch_run(session, run_id)
+    if run is None:
+        async with AsyncSessionLocal(bind=get_engine()) as session:
+            run = await fetch_run(session, run_id)
+    if run is None:
+        return None
+    try:
+        [run] = await store.overlay([run])
+        await store.cache_run(run)
+    except Exception:
+        logger.warning("Failed to cache run %s in the status read model", run_id, exc_info=True)
+    return run
+
+
+async def overlay_statuses(runs: list[Run]) -> list[Run]:
+    """Apply statuses from the Redis read model that Postgres has not caught up with."""
+    try:
+        return await get_run_status_store().overlay(runs)
+    except Exception:
+        logger.warning("Run status read model unavailable", exc_info=True)
+        return runs
+
+
+async def _update_cached_runs(
+    *,
+    workflow_run_ids: dict[UUID, str] | None = None,
+    errors: dict[UUID, str] | None = None,
+) -> None:
+    """
+    Overlay rows written directly (not through the status stream) on cached runs.
+
+    Written as fields next to the cached snapshot rather than by dropping
+    it, so a snapshot read from a lagging replica and cached afterwards
+    does not bring back the old row.
+    """
+    try:
+        store = get_run_status_store()
+        await store.set_workflow_run_ids(workflow_run_ids or {})
+        await store.mark_failed(errors or {}, datetime.now(timezone.utc))
+    except Exception:
+        logger.warning("Failed to update cached runs", exc_info=True)
+
+
+async def release_slots(*run_ids: UUID) -> None:
+    """Give back the admission slots of runs that will not run after all."""
+    if not run_ids or not get_settings().admission_enabled:
+        return
+    try:
+        await get_admission_controller().release(*run_ids)
+    except Exception:
+        # The dispatcher reclaims slots of ended runs periodically
+        logger.warning("Failed to release admission slots", exc_info=True)
+
+
+async def list_runs_page(
+    session: AsyncSession,
+    *,
+    tenant_id: UUID | None = None,
+    agent_id: UUID | None = None,
+    status: RunStatus | None = None,
+    cursor: str | None = None,
+    limit: int = 50,
+) -> tuple[list[Run], str | None]:
+    """
+    Fetch one page of runs ordered newest first.
+
+    Uses keyset pagination on (created_at, id) so the cost of a page does not
+    depend on how deep into the result set it is. Returns the runs and the
+    cursor for the next page (None when there are no more rows).
+    """
+    clauses, params = _build_filters(tenant_id, agent_id, status)
+    if cursor is not None:
+        created_at, run_id = decode_cursor(cursor)
+        clauses.append("(created_at, id) < (:cursor_created_at, :cursor_id)")
+        params["cursor_created_at"] = created_at
+        params["cursor_id"] = run_id
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    params["limit"] = limit + 1
+    result = await session.execute(
+        text(
+            f"SELECT {RUN_COLUMNS} FROM runs {where} "
+            "ORDER BY created_at DESC, id DESC LIMIT :limit"
+        ).columns(input=JSONB, output=JSONB),
+        params,
+    )
+    rows = result.mappings().all()
+
+    runs = [Run.model_validate(dict(row)) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = runs[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return runs, next_cursor
+
+
+def run_row_json(row: Mapping[str, Any]) -> bytes:
+    """
+    Serialize a row selected with RUN_JSON_COLUMNS as `Run.model_dump_json` would.
+
+    The stored input and output JSON is copied into the document as is,
+    rather than parsed into dicts, validated and encoded again.
+    """
+    doc = {name: row[name] for name in Run.model_fields}
+    doc["input"] = orjson.Fragment(row["input"])
+    if row["output"] is not None:
+        doc["output"] = orjson.Fragment(row["output"])
+    # default=str covers the driver's own UUID type
+    return orjson.dumps(doc, default=str, option=orjson.OPT_UTC_Z)
+
+
+async def stream_runs_ndjson(
+    *,
+    tenant_id: UUID | None = None,
+    agent_id: UUID | None = None,
+    status: RunStatus | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    Stream matching runs as NDJSON lines from a server-side cursor.
+
+    Opens its own session, on the read replica, because the response body
+    is produced after the request's dependencies have been torn down.
+    """
+    clauses, params = _build_filters(tenant_id, agent_id, status)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    stmt = text(
+        f"SELECT {RUN_JSON_COLUMNS} FROM runs {where} ORDER BY created_at DESC, id DESC"
+    ).execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+    async with AsyncSessionLocal(bind=get_read_engine()) as session:
+        result = await session.stream(stmt, params)
+        async for partition in result.mappings().partitions():
+            yield b"".join(run_row_json(row) + b"\n" for row in partition)
@@ -0,0 +1,66 @@
+"""Temporal client for the API."""
+
+import asyncio
+from typing import Any
+
+from temporalio.client import Client
+
+from agent_runtime_core.models import Run
+from agent_runtime_core.temporal import get_data_converter
+from agent_runtime_core.utils import get_settings
+
+from ..telemetry import TemporalMetricsInterceptor
+
+# Registered by the worker; referenced by name so the API does not import it
+AGENT_RUN_WORKFLOW = "AgentRunWorkflow"
+
+_client: Client | None = None
+_lock = asyncio.Lock()
+
+
+async def get_temporal_client() -> Client:
+    """Get the process-wide Temporal client, connecting on first use."""
+    global _client
+    if _client is None:
+        async with _lock:
+            if _client is None:
+                settings = get_settings()
+                _client = await Client.connect(
+                    settings.temporal_address,
+                    namespace=settings.temporal_namespace,
+                    data_converter=get_data_converter(),
+                    interceptors=_interceptors(),
+                )
+    return _client
+
+
+def _interceptors() -> list:
+    interceptors: list = [TemporalMetricsInterceptor()]
+    try:
+        from temporalio.contrib.opentelemetry import TracingInterceptor
+    except ImportError:  # OpenTelemetry not installed
+        return interceptors
+    # Propagates trace context into workflows and activities
+    interceptors.append(TracingInterceptor())
+    return interceptors
+
+
+async def start_agent_run(run: Run, config: dict[str, Any]) -> str:
+    """Start the AgentRunWorkflow for a run; returns the workflow run ID."""
+    client = await get_temporal_client()
+    handle = await client.start_workflow(
+        AGENT_RUN_WORKFLOW,
+        # Decoded by the worker as AgentRunInput
+        {
+            "run_id": str(run.id),
+            "tenant_id": str(run.tenant_id),
+            "agent_id": str(run.agent_id),
+            "agent_version_id": str(run.agent_version_id),
+            "config": config,
+            "input": run.input,
+            "artifact_ids": [str(artifact_id) for artifact_id in run.artifact_ids],
+        },
+        id=run.workflow_id,
+        task_queue=get_settings().temporal_task_queue,
+    )
+    return handle.result_run_id
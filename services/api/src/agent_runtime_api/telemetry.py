@@ -0,0 +1,225 @@
+"""API metrics and tracing.
+
+Prometheus metrics cover request latency per route, database session and
+pool-wait time, Temporal client calls, SQLAlchemy pool state, the run
+event sink (queued and dropped events), and run admission (decisions,
+queue depth and wait per tenant). When
+OpenTelemetry is installed (the `otel` extra), database sessions and
+Temporal calls are also traced as spans.
+
+The request middleware is pure ASGI rather than BaseHTTPMiddleware. It
+keys latency by the matched route's path template, and caches one bound
+histogram child per (method, route, status) so the hot path is a dict
+lookup and an observe().
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import REGISTRY, Collector
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from temporalio.client import (
+    CancelWorkflowInput,
+    Interceptor,
+    OutboundInterceptor,
+    QueryWorkflowInput,
+    SignalWorkflowInput,
+    StartWorkflowInput,
+    WorkflowHandle,
+)
+
+from agent_runtime_core.events import RunEventSink
+
+try:
+    from opentelemetry import trace
+except ImportError:  # optional dependency
+    trace = None
+
+REQUEST_LATENCY = Histogram(
+    "api_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route", "status"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+DB_SESSION_SECONDS = Histogram(
+    "api_db_session_duration_seconds",
+    "Time a request holds a database session",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+DB_POOL_WAIT_SECONDS = Histogram(
+    "api_db_pool_wait_seconds",
+    "Time waiting to check a connection out of the pool",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5),
+)
+TEMPORAL_CALL_SECONDS = Histogram(
+    "api_temporal_call_duration_seconds",
+    "Temporal client call latency",
+    ["operation"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+ADMISSION_DECISIONS = Counter(
+    "api_admission_decisions_total",
+    "Runs admitted immediately or queued by admission control",
+    ["priority", "outcome"],
+)
+ADMISSION_WAIT_SECONDS = Histogram(
+    "api_admission_wait_seconds",
+    "Time queued runs waited for an admission slot",
+    ["priority"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, 3600),
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "api_admission_queue_depth",
+    "Runs waiting for an admission slot",
+    ["tenant", "priority"],
+)
+ADMISSION_OLDEST_WAIT_SECONDS = Gauge(
+    "api_admission_oldest_wait_seconds",
+    "Wait so far of the oldest queued run",
+    ["tenant", "priority"],
+)
+
+_tracer = trace.get_tracer(__name__) if trace is not None else None
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[None]:
+    """Trace a block as an OpenTelemetry span, if OpenTelemetry is installed."""
+    if _tracer is None:
+        yield
+        return
+    with _tracer.start_as_current_span(name, attributes=attributes):
+        yield
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording request latency per route template."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._children: dict[tuple[str, str, int], Any] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the scope; unmatched
+            # paths share one label so raw URLs never become label values
+            route = scope.get("route")
+            key = (scope["method"], route.path if route is not None else "<unmatched>", status)
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = REQUEST_LATENCY.labels(key[0], key[1], str(status))
+            child.observe(time.perf_counter() - start)
+
+
+class TemporalMetricsInterceptor(Interceptor):
+    """Times Temporal client calls, tracing them when OpenTelemetry is installed."""
+
+    def intercept_client(self, next: OutboundInterceptor) -> OutboundInterceptor:
+        return _TemporalMetricsOutbound(next)
+
+
+class _TemporalMetricsOutbound(OutboundInterceptor):
+    _start = TEMPORAL_CALL_SECONDS.labels("start_workflow")
+    _signal = TEMPORAL_CALL_SECONDS.labels("signal_workflow")
+    _cancel = TEMPORAL_CALL_SECONDS.labels("cancel_workflow")
+    _query = TEMPORAL_CALL_SECONDS.labels("query_workflow")
+
+    async def start_workflow(self, input: StartWorkflowInput) -> WorkflowHandle[Any, Any]:
+        with span("temporal.start_workflow", workflow=input.workflow), self._start.time():
+            return await super().start_workflow(input)
+
+    async def signal_workflow(self, input: SignalWorkflowInput) -> None:
+        with span("temporal.signal_workflow", signal=input.signal), self._signal.time():
+            await super().signal_workflow(input)
+
+    async def cancel_workflow(self, input: CancelWorkflowInput) -> None:
+        with span("temporal.cancel_workflow"), self._cancel.time():
+            await super().cancel_workflow(input)
+
+    async def query_workflow(self, input: QueryWorkflowInput) -> Any:
+        with span("temporal.query_workflow", query=input.query), self._query.time():
+            return await super().query_workflow(input)
+
+
+class PoolStatsCollector(Collector):
+    """Reports SQLAlchemy connection pool state at scrape time."""
+
+    def __init__(self, engines: dict[str, AsyncEngine]) -> None:
+        self._engines = engines
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        gauges = {
+            "size": GaugeMetricFamily("api_db_pool_size", "Configured pool size", labels=["engine"]),
+            "checkedout": GaugeMetricFamily(
+                "api_db_pool_checked_out", "Connections checked out of the pool", labels=["engine"]
+            ),
+            "checkedin": GaugeMetricFamily(
+                "api_db_pool_checked_in", "Idle connections in the pool", labels=["engine"]
+            ),
+            "overflow": GaugeMetricFamily(
+                "api_db_pool_overflow", "Connections open beyond the pool size", labels=["engine"]
+            ),
+        }
+        for name, engine in self._engines.items():
+            pool = engine.sync_engine.pool
+            for stat, gauge in gauges.items():
+                value = getattr(pool, stat, None)
+                if value is not None:
+                    gauge.add_metric([name], value())
+        yield from gauges.values()
+
+
+def register_pool_collector(engines: dict[str, AsyncEngine]) -> Collector:
+    """Expose pool stats for `engines` (keyed by a label such as "primary")."""
+    collector = PoolStatsCollector(engines)
+    REGISTRY.register(collector)
+    return collector
+
+
+class EventSinkCollector(Collector):
+    """Reports the run event sink's queue and dropped events at scrape time."""
+
+    def __init__(self, sink: RunEventSink) -> None:
+        self._sink = sink
+
+    def collect(self) -> Iterator[CounterMetricFamily | GaugeMetricFamily]:
+        yield GaugeMetricFamily(
+            "api_run_events_pending", "Run events queued for writing", value=self._sink.pending
+        )
+        yield CounterMetricFamily(
+            "api_run_events_dropped",
+            "Run events dropped after their batch failed every write attempt",
+            value=self._sink.dropped,
+        )
+
+
+def register_event_sink_collector(sink: RunEventSink) -> Collector:
+    """Expose the queue and dropped-event count of `sink`."""
+    collector = EventSinkCollector(sink)
+    REGISTRY.register(collector)
+    return collector
+
+
+def unregister_collector(collector: Collector) -> None:
+    """Stop exposing a collector registered above."""
+    REGISTRY.unregister(collector)
@@ -0,0 +1,169 @@
+"""Agent version cache: hits, the Redis tier, and invalidation."""
+
+import asyncio
+import os
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from agent_runtime_api.dependencies import db_session
+from agent_runtime_api.routes import agents
+from agent_runtime_api.services import agent_cache, catalog
+from agent_runtime_api.services.agent_cache import AgentVersionCache, ResolvedVersion
+
+REDIS_URL = os.environ.get("TEST_REDIS_URL")
+
+
+@pytest.fixture
+async def redis():
+    """A real Redis from TEST_REDIS_URL, else an in-process one."""
+    if REDIS_URL:
+        from redis.asyncio import Redis
+
+        client = Redis.from_url(REDIS_URL)
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        client = fakeredis.FakeAsyncRedis()
+    yield client
+    await client.aclose()
+
+
+class FakeSession:
+    """Answers is_active lookups, counting the queries and recording commits."""
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.calls: list[str] = []
+
+    async def scalar(self, statement, params):
+        self.queries += 1
+        return True
+
+    async def commit(self) -> None:
+        self.calls.append("commit")
+
+
+class Loader:
+    """Stands in for the version query, counting loads; `gate` holds them until set."""
+
+    def __init__(self) -> None:
+        self.loads = 0
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def __call__(self, session, version_id: uuid.UUID) -> ResolvedVersion:
+        self.loads += 1
+        await self.gate.wait()
+        return ResolvedVersion(
+            version_id=version_id, agent_id=uuid.uuid4(), tenant_id=uuid.uuid4(), version="1", config={}
+        )
+
+
+@pytest.fixture
+def loader(monkeypatch) -> Loader:
+    loader = Loader()
+    monkeypatch.setattr(agent_cache, "_load_version", loader)
+    return loader
+
+
+@pytest.fixture
+async def caches(redis):
+    """Two caches on one Redis, standing in for two API processes."""
+    pair = [AgentVersionCache(redis), AgentVersionCache(redis)]
+    for cache in pair:
+        await cache.start()
+    # Let both subscribe before anything is published
+    await asyncio.sleep(0.1)
+    yield pair
+    for cache in pair:
+        await cache.close()
+
+
+async def test_hits_do_not_query_the_database(redis, loader):
+    cache = AgentVersionCache(redis)
+    session = FakeSession()
+    version_id, tenant_id = uuid.uuid4(), uuid.uuid4()
+
+    first = await cache.resolve(session, version_id)
+    assert await cache.resolve(session, version_id) == first
+    assert await cache.is_tenant_active(session, tenant_id)
+    assert await cache.is_tenant_active(session, tenant_id)
+
+    assert loader.loads == 1
+    assert session.queries == 1
+
+
+async def test_other_processes_resolve_from_redis(redis, loader):
+    version_id = uuid.uuid4()
+    resolved = await AgentVersionCache(redis).resolve(FakeSession(), version_id)
+
+    assert await AgentVersionCache(redis).resolve(FakeSession(), version_id) == resolved
+    assert loader.loads == 1
+
+
+async def test_invalidation_reaches_other_processes(caches, loader):
+    here, there = caches
+    session = FakeSession()
+    version_id, agent_id = uuid.uuid4(), uuid.uuid4()
+    await there.resolve(session, version_id)
+    await there.is_agent_active(session, agent_id)
+
+    await here.invalidate_version(version_id)
+    await here.invalidate_agent(agent_id)
+
+    for _ in range(50):
+        if there._generation >= 2:
+            break
+        await asyncio.sleep(0.02)
+    await there.resolve(session, version_id)
+    await there.is_agent_active(session, agent_id)
+    assert loader.loads == 2
+    assert session.queries == 2
+
+
+async def test_load_overtaken_by_an_invalidation_is_not_cached(redis, loader):
+    cache = AgentVersionCache(redis)
+    version_id = uuid.uuid4()
+    loader.gate.clear()
+    resolving = asyncio.create_task(cache.resolve(FakeSession(), version_id))
+    await asyncio.sleep(0.01)
+
+    await cache.invalidate_version(version_id)
+    loader.gate.set()
+    await resolving
+    await cache.resolve(FakeSession(), version_id)
+
+    assert loader.loads == 2
+
+
+async def test_expired_and_excess_flags_are_dropped(redis):
+    cache = AgentVersionCache(redis, active_ttl=0.05, max_flags=10)
+    session = FakeSession()
+
+    for _ in range(20):
+        await cache.is_agent_active(session, uuid.uuid4())
+    assert len(cache._active) == 10
+    await asyncio.sleep(0.06)
+    await cache.is_agent_active(session, uuid.uuid4())
+    assert len(cache._active) == 1
+
+
+def test_deactivating_an_agent_invalidates_it_after_commit(monkeypatch):
+    session = FakeSession()
+
+    class Cache:
+        async def invalidate_agent(self, agent_id: uuid.UUID) -> None:
+            session.calls.append(f"invalidate {agent_id}")
+
+    monkeypatch.setattr(catalog, "get_agent_version_cache", lambda: Cache())
+    app = FastAPI()
+    app.include_router(agents.router, prefix="/agents")
+    app.dependency_overrides[db_session] = lambda: session
+    agent_id = uuid.uuid4()
+
+    response = TestClient(app).patch(f"/agents/{agent_id}", json={"is_active": False})
+
+    assert response.status_code == 204
+    assert session.calls == ["commit", f"invalidate {agent_id}"]
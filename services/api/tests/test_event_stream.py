@@ -0,0 +1,54 @@
+"""Validation of client-supplied Last-Event-IDs before a run's event stream starts."""
+
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from agent_runtime_api.routes import runs
+from agent_runtime_api.services.event_stream import is_stream_id, parse_stream_id
+
+
+@pytest.fixture
+def client() -> TestClient:
+    app = FastAPI()
+    app.include_router(runs.router, prefix="/runs")
+    return TestClient(app)
+
+
+@pytest.mark.parametrize(
+    ("stream_id", "parsed"),
+    [("1700000000000-0", (1700000000000, 0)), ("1700000000000-12", (1700000000000, 12)), ("5", (5, 0))],
+)
+def test_parse_stream_id(stream_id, parsed):
+    assert parse_stream_id(stream_id) == parsed
+
+
+@pytest.mark.parametrize(
+    "stream_id",
+    ["", "abc", "1-", "-1", "1-2-3", "1.5", " 1", "1\n", "١٢٣", str(2**64), f"1-{2**64}"],
+)
+def test_malformed_stream_ids_are_rejected(stream_id):
+    assert not is_stream_id(stream_id)
+    with pytest.raises(ValueError):
+        parse_stream_id(stream_id)
+
+
+@pytest.mark.parametrize("header", [True, False])
+def test_sse_with_malformed_last_event_id_is_a_bad_request(client, header):
+    url = f"/runs/{uuid.uuid4()}/events/stream"
+    if header:
+        response = client.get(url, headers={"Last-Event-ID": "not-an-id"})
+    else:
+        response = client.get(url, params={"last_event_id": "not-an-id"})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid Last-Event-ID"}
+
+
+def test_websocket_with_malformed_last_event_id_is_closed(client):
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with client.websocket_connect(f"/runs/{uuid.uuid4()}/events/ws?last_event_id=not-an-id"):
+            pass
+    assert closed.value.code == 1008
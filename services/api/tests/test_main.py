@@ -0,0 +1,19 @@
+"""What importing the application does, and what it leaves to the lifespan."""
+
+import subprocess
+import sys
+
+
+def test_importing_the_app_creates_no_engines():
+    # A fresh interpreter, so nothing imported by other tests is counted
+    subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import agent_runtime_api.main\n"
+            "from agent_runtime_core.db import get_engine, get_read_engine\n"
+            "assert not get_engine.cache_info().currsize\n"
+            "assert not get_read_engine.cache_info().currsize\n",
+        ],
+        check=True,
+    )
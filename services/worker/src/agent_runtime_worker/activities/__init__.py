@@ -1,13 +1,17 @@
 """Temporal activity implementations."""
 
-from .llm_call import call_llm, LLMCallInput, LLMCallOutput
+from .llm_call import call_llm, LLMCallInput, LLMCallOutput, ToolCall
 from .tool_exec import execute_tool, ToolExecInput, ToolExecOutput
+from .run_status import record_run_status, RunStatusInput
 
 __all__ = [
     "call_llm",
     "LLMCallInput",
     "LLMCallOutput",
+    "ToolCall",
     "execute_tool",
     "ToolExecInput",
     "ToolExecOutput",
+    "record_run_status",
+    "RunStatusInput",
 ]
@@ -1,27 +1,17 @@
 """LLM call activity - makes calls to language models."""
 
-from dataclasses import dataclass
+import time
+from datetime import datetime, timezone
+from functools import partial
 
 from temporalio import activity
 
+from agent_runtime_core.events import get_event_publisher, get_event_sink
 
-@dataclass
-class LLMCallInput:
-    """Input for the LLM call activity."""
-
-    prompt: str
-    model: str = "gpt-4"
-    temperature: float = 0.7
-    max_tokens: int | None = None
-
-
-@dataclass
-class LLMCallOutput:
-    """Output from the LLM call activity."""
-
-    content: str
-    model: str
-    usage: dict | None = None
+from ..llm import LLMCallInput, LLMCallOutput, ToolCall, get_llm_cache, get_provider
+from ..llm.batching import get_batcher, should_batch
+from ..llm.streaming import TokenRelay
+from ..metrics import get_worker_metrics
 
 
 @activity.defn
@@ -31,20 +21,59 @@ async def call_llm(input: LLMCallInput) -> LLMCallOutput:
 
     This activity handles:
     - Model selection (OpenAI, local via vLLM/Ollama, etc.)
+    - Response caching for deterministic (temperature 0) calls
+    - Streaming tokens to the run's live event stream and event history
+    - Micro-batching for local inference servers (LLM_BATCH_MODELS)
     - LangFuse tracing
     - Token counting and limits
     """
     activity.logger.info(f"Calling LLM: {input.model}")
+    relay = TokenRelay.for_activity(
+        get_event_publisher() if input.run_id else None,
+        input.run_id,
+        get_event_sink() if input.run_id else None,
+    )
+    start = time.monotonic()
+    batched = should_batch(input)
+    if batched:
+        call = partial(get_batcher().submit, input, deadline=_activity_deadline())
+    else:
+        call = partial(_stream_completion, input, relay)
+    # Waiting on a coalesced call or a batch sends no text, so heartbeat regardless
+    async with relay.heartbeating():
+        output = await get_llm_cache().get_or_call(input, call)
+    if not output.cached:
+        get_worker_metrics().record_llm_usage(output.usage, time.monotonic() - start)
+    if output.cached or batched:
+        # Served without streaming; deliver the whole completion at once
+        await relay.push(output.content)
+    await relay.finish()
+    return output
 
-    # TODO: Implement actual LLM call
-    # This is a placeholder that should be replaced with:
-    # - PydanticAI agent call
-    # - Direct OpenAI/Anthropic API call
-    # - Local model via vLLM/Ollama
 
-    # Placeholder response
+async def _stream_completion(input: LLMCallInput, relay: TokenRelay) -> LLMCallOutput:
+    """Stream the completion from the provider, relaying tokens as they arrive."""
+    parts: list[str] = []
+    usage = None
+    tool_calls: list[ToolCall] = []
+    async with relay.heartbeating():
+        async for chunk in get_provider().stream(input, deadline=_activity_deadline()):
+            if chunk.text:
+                parts.append(chunk.text)
+                await relay.push(chunk.text)
+            if chunk.usage:
+                usage = chunk.usage
+            if chunk.tool_calls:
+                tool_calls.extend(chunk.tool_calls)
     return LLMCallOutput(
-        content=f"[Placeholder response for: {input.prompt[:50]}...]",
-        model=input.model,
-        usage={"prompt_tokens": 0, "completion_tokens": 0},
+        content="".join(parts), model=input.model, usage=usage, tool_calls=tool_calls
     )
+
+
+def _activity_deadline() -> float | None:
+    """The activity's start-to-close deadline as a time.monotonic() value."""
+    info = activity.info()
+    if info.start_to_close_timeout is None:
+        return None
+    remaining = info.started_time + info.start_to_close_timeout - datetime.now(timezone.utc)
+    return time.monotonic() + remaining.total_seconds()
@@ -0,0 +1,76 @@
+"""Run status activity - publishes status transitions of a run."""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from temporalio import activity
+
+from agent_runtime_core.admission import get_admission_controller
+from agent_runtime_core.db import get_engine
+from agent_runtime_core.events import get_event_sink
+from agent_runtime_core.models import RunEvent, RunStatus
+from agent_runtime_core.status import RunStatusUpdate, get_run_status_store, persist_status_updates
+from agent_runtime_core.utils import get_settings
+
+
+@dataclass
+class RunStatusInput:
+    """Input for the run status activity."""
+
+    run_id: str
+    status: str
+    # Strictly increasing per run; older transitions are ignored
+    version: int
+    # ISO timestamp of the transition (workflow time)
+    at: str
+    output: dict[str, Any] | None = None
+    error: str | None = None
+
+
+@activity.defn
+async def record_run_status(input: RunStatusInput) -> None:
+    """
+    Record a run's status transition.
+
+    Run as a local activity from the workflow. The transition goes to the
+    Redis read model, from which it is persisted to Postgres in batches. If
+    Redis is unavailable it is written to Postgres directly instead. It is
+    also added to the run's event history as a `run.<status>` event.
+
+    With admission control enabled, a final status also gives the run's
+    slot back, so the next queued run can start.
+    """
+    update = RunStatusUpdate(
+        run_id=UUID(input.run_id),
+        status=RunStatus(input.status),
+        version=input.version,
+        at=datetime.fromisoformat(input.at),
+        output=input.output,
+        error=input.error,
+    )
+    try:
+        await get_run_status_store().record(update)
+    except Exception:
+        activity.logger.warning("Redis status write failed, writing to Postgres", exc_info=True)
+        await persist_status_updates(get_engine(), [update])
+    data: dict[str, Any] = {"version": update.version}
+    if update.output is not None:
+        data["output"] = update.output
+    if update.error is not None:
+        data["error"] = update.error
+    await get_event_sink().emit(
+        RunEvent(
+            run_id=update.run_id,
+            event_type=f"run.{update.status.value}",
+            data=data,
+            timestamp=update.at,
+        )
+    )
+    if update.is_terminal and get_settings().admission_enabled:
+        try:
+            await get_admission_controller().release(update.run_id)
+        except Exception:
+            # The API reclaims slots of ended runs periodically
+            activity.logger.warning("Failed to release admission slot", exc_info=True)
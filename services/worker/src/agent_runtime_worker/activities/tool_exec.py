@@ -5,6 +5,9 @@ from typing import Any
 
 from temporalio import activity
 
+from ..sandbox import SandboxTimeoutError, get_sandbox_pool
+from ..tools import UnknownToolError, get_tool
+
 
 @dataclass
 class ToolExecInput:
@@ -13,6 +16,8 @@ class ToolExecInput:
     tool_name: str
     tool_input: dict[str, Any]
     timeout_seconds: int = 60
+    # Passed to tenant-scoped tools
+    tenant_id: str | None = None
 
 
 @dataclass
@@ -29,24 +34,30 @@ async def execute_tool(input: ToolExecInput) -> ToolExecOutput:
     """
     Execute an agent tool.
 
-    This activity handles:
-    - Tool registry lookup
-    - Sandboxed execution
-    - Timeout enforcement
-    - Result serialization
+    The tool is looked up in the registry and its input checked against
+    the tool's signature, then it runs in a warm sandbox process under the
+    pool's CPU and memory limits. Tool errors and timeouts are returned as
+    unsuccessful results for the agent to see rather than retried.
     """
     activity.logger.info(f"Executing tool: {input.tool_name}")
-
-    # TODO: Implement actual tool execution
-    # This should:
-    # 1. Look up tool in registry
-    # 2. Validate inputs against tool schema
-    # 3. Execute in sandboxed environment
-    # 4. Enforce timeout
-    # 5. Return serialized result
-
-    # Placeholder response
-    return ToolExecOutput(
-        success=True,
-        result=f"[Placeholder result for tool: {input.tool_name}]",
-    )
+    pool = get_sandbox_pool()
+    await pool.start()
+
+    tool_input = input.tool_input
+    try:
+        tool = get_tool(input.tool_name)
+        if tool.tenant_scoped:
+            if input.tenant_id is None:
+                raise ValueError(f"{input.tool_name} needs the run's tenant")
+            tool_input = {**tool_input, "tenant_id": input.tenant_id}
+        tool.validate(tool_input)
+    except UnknownToolError:
+        return ToolExecOutput(success=False, error=f"Unknown tool: {input.tool_name}")
+    except ValueError as e:
+        return ToolExecOutput(success=False, error=str(e))
+
+    try:
+        result = await pool.run(input.tool_name, tool_input, timeout=input.timeout_seconds)
+    except SandboxTimeoutError as e:
+        return ToolExecOutput(success=False, error=str(e))
+    return ToolExecOutput(success=result.success, result=result.result, error=result.error)
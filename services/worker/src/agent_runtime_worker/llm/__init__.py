@@ -0,0 +1,16 @@
+"""LLM provider access for the worker."""
+
+from .types import LLMCallInput, LLMCallOutput, ToolCall
+from .cache import LLMResponseCache, get_llm_cache
+from .providers import LLMProvider, StreamChunk, get_provider
+
+__all__ = [
+    "LLMCallInput",
+    "LLMCallOutput",
+    "ToolCall",
+    "LLMResponseCache",
+    "get_llm_cache",
+    "LLMProvider",
+    "StreamChunk",
+    "get_provider",
+]
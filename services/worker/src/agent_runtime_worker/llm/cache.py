@@ -0,0 +1,246 @@
+"""Two-tier content-addressed cache for LLM responses."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, replace
+from typing import TYPE_CHECKING
+
+from agent_runtime_core.utils import get_redis, get_settings
+
+from ..metrics import get_worker_metrics
+from .types import LLMCallInput, LLMCallOutput, ToolCall
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "llm-cache"
+
+
+@dataclass
+class CacheStats:
+    """
+    Counters describing cache effectiveness.
+
+    Kept per cache instance; the same events are also exported as worker
+    metrics (agent_llm_cache_*).
+    """
+
+    local_hits: int = 0
+    redis_hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    bypassed: int = 0
+    evictions: int = 0
+    provider_seconds: float = 0.0
+    hit_seconds: float = 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        """Snapshot of the counters."""
+        return asdict(self)
+
+
+class LLMResponseCache:
+    """
+    Caches deterministic LLM responses in process and in Redis.
+
+    Entries are keyed by a hash of (model, prompt or messages, temperature,
+    max_tokens, tools) and namespaced per tenant. The in-process tier is an
+    LRU bounded by entry count and total bytes, with a TTL. The Redis tier
+    shares results across workers using the same TTL. Only temperature-0 calls are cached,
+    since sampling makes any other response one of many valid answers.
+
+    Concurrent misses for the same key are coalesced: the first caller goes
+    to the provider and the rest get its result, marked cached like a hit.
+    If the first caller is cancelled, the rest call again.
+    """
+
+    def __init__(
+        self,
+        redis: "Redis | None" = None,
+        *,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: int = 3600,
+    ) -> None:
+        self._redis = redis
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._bytes = 0
+        self._inflight: dict[str, asyncio.Future[LLMCallOutput]] = {}
+        self.stats = CacheStats()
+
+    @staticmethod
+    def is_cacheable(input: LLMCallInput) -> bool:
+        """Whether a call's output is a deterministic function of its input."""
+        return input.temperature == 0
+
+    @staticmethod
+    def cache_key(input: LLMCallInput) -> str:
+        """Content-addressed, tenant-namespaced key for a call."""
+        messages = None
+        if input.messages is not None:
+            # Cached token counts are bookkeeping, not part of the request
+            messages = [[m.role, m.content, m.tool_calls, m.tool_call_id, m.name] for m in input.messages]
+        material = json.dumps(
+            [input.model, input.prompt, messages, input.temperature, input.max_tokens, input.tools],
+            separators=(",", ":"),
+        )
+        digest = hashlib.sha256(material.encode()).hexdigest()
+        return f"{KEY_PREFIX}:{input.tenant_id or '_'}:{digest}"
+
+    async def get_or_call(
+        self,
+        input: LLMCallInput,
+        call: Callable[[], Awaitable[LLMCallOutput]],
+    ) -> LLMCallOutput:
+        """Return the cached output for `input`, calling the provider on a miss."""
+        if not self.is_cacheable(input):
+            self.stats.bypassed += 1
+            get_worker_metrics().record_llm_cache("bypassed")
+            return await call()
+
+        start = time.perf_counter()
+        key = self.cache_key(input)
+
+        cached = self._get_local(key)
+        if cached is not None:
+            self.stats.local_hits += 1
+            self._record_hit("local_hit", start)
+            return self._decode(cached)
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats.coalesced += 1
+            try:
+                output = await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # Only the leader was cancelled: call again, leading or following anew
+                if inflight.cancelled() and not asyncio.current_task().cancelling():
+                    return await self.get_or_call(input, call)
+                raise
+            get_worker_metrics().record_llm_cache("coalesced", time.perf_counter() - start)
+            # Its usage was the leader's, and its content was not streamed here
+            return replace(output, cached=True)
+
+        future: asyncio.Future[LLMCallOutput] = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            output = await self._fill(key, call, start)
+            future.set_result(output)
+            return output
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure does not log a warning
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _fill(
+        self,
+        key: str,
+        call: Callable[[], Awaitable[LLMCallOutput]],
+        start: float,
+    ) -> LLMCallOutput:
+        """Resolve a local miss from Redis or the provider."""
+        data = await self._get_redis(key)
+        if data is not None:
+            self.stats.redis_hits += 1
+            self._put_local(key, data)
+            self._record_hit("redis_hit", start)
+            return self._decode(data)
+
+        self.stats.misses += 1
+        provider_start = time.perf_counter()
+        output = await call()
+        self.stats.provider_seconds += time.perf_counter() - provider_start
+        get_worker_metrics().record_llm_cache("miss", time.perf_counter() - start)
+
+        data = json.dumps(asdict(output)).encode()
+        self._put_local(key, data)
+        await self._set_redis(key, data)
+        return output
+
+    def _record_hit(self, result: str, start: float) -> None:
+        seconds = time.perf_counter() - start
+        self.stats.hit_seconds += seconds
+        get_worker_metrics().record_llm_cache(result, seconds)
+
+    @staticmethod
+    def _decode(data: bytes) -> LLMCallOutput:
+        payload = json.loads(data)
+        payload["tool_calls"] = [ToolCall(**call) for call in payload.get("tool_calls", [])]
+        return replace(LLMCallOutput(**payload), cached=True)
+
+    def _get_local(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, data = entry
+        if expires_at < time.monotonic():
+            self._evict(key)
+            return None
+        self._entries.move_to_end(key)
+        return data
+
+    def _put_local(self, key: str, data: bytes) -> None:
+        if len(data) > self._max_bytes:
+            return
+        if key in self._entries:
+            self._evict(key)
+        self._entries[key] = (time.monotonic() + self._ttl_seconds, data)
+        self._bytes += len(data)
+        while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+            self._evict(next(iter(self._entries)))
+            self.stats.evictions += 1
+            get_worker_metrics().record_llm_cache_eviction()
+
+    def _evict(self, key: str) -> None:
+        _, data = self._entries.pop(key)
+        self._bytes -= len(data)
+
+    async def _get_redis(self, key: str) -> bytes | None:
+        if self._redis is None:
+            return None
+        try:
+            return await self._redis.get(key)
+        except Exception:
+            logger.warning("LLM cache read from Redis failed", exc_info=True)
+            return None
+
+    async def _set_redis(self, key: str, data: bytes) -> None:
+        if self._redis is None:
+            return
+        try:
+            await self._redis.set(key, data, ex=self._ttl_seconds)
+        except Exception:
+            logger.warning("LLM cache write to Redis failed", exc_info=True)
+
+
+_cache: LLMResponseCache | None = None
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Get the worker-wide LLM response cache configured from settings."""
+    global _cache
+    if _cache is None:
+        settings = get_settings()
+        _cache = LLMResponseCache(
+            get_redis() if settings.llm_cache_redis_enabled else None,
+            max_entries=settings.llm_cache_max_entries,
+            max_bytes=settings.llm_cache_max_bytes,
+            ttl_seconds=settings.llm_cache_ttl_seconds,
+        )
+    return _cache
@@ -0,0 +1,278 @@
+"""Worker-wide gateway to LLM provider endpoints.
+
+Every call to a provider endpoint goes through one `ProviderGateway` per
+endpoint. The gateway:
+
+- keeps a pooled HTTP/2 client, so calls reuse connections
+- applies token buckets for requests/minute and estimated tokens/minute
+- queues callers FIFO and rejects those whose deadline would pass first
+- adapts its concurrency limit (AIMD): it grows while latency stays near
+  the observed baseline, shrinks when latency rises, and halves on a 429
+"""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator, Mapping
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+
+from agent_runtime_core.utils import get_settings
+
+
+class DeadlineExceededError(Exception):
+    """Raised when a request cannot be admitted before its deadline."""
+
+
+class RateLimitedError(Exception):
+    """Raised when the provider answers 429 Too Many Requests."""
+
+    def __init__(self, retry_after: float | None) -> None:
+        super().__init__(f"Provider rate limited (retry after {retry_after}s)")
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Continuously refilling token bucket with FIFO waiters.
+
+    `rate` is tokens per second; a rate of 0 disables limiting. Callers
+    reserve their tokens up front, driving the balance negative while a
+    queue builds up, so each caller's wait covers everyone queued ahead of
+    it and is known before it starts waiting. Requests larger than the
+    capacity are charged in full and wait for the difference.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    async def acquire(self, amount: float, deadline: float | None = None) -> None:
+        """Take `amount` tokens, waiting for them unless the deadline would pass."""
+        if self._rate <= 0:
+            return
+        now = time.monotonic()
+        self._refill(now)
+        wait = max(0.0, (amount - self._tokens) / self._rate)
+        if wait and deadline is not None and now + wait > deadline:
+            raise DeadlineExceededError(f"Rate limit wait of {wait:.1f}s exceeds deadline")
+        self._tokens -= amount
+        if wait:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self.refund(amount)
+                raise
+
+    def refund(self, amount: float) -> None:
+        """Give back tokens taken by a caller that did not go on to use them."""
+        if self._rate > 0:
+            self._tokens = min(self._capacity, self._tokens + amount)
+
+    def pause(self, seconds: float) -> None:
+        """Drain the bucket so no tokens are available for `seconds`."""
+        if self._rate > 0:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, 0.0) - seconds * self._rate
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency limit driven by latency and overload signals."""
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int = 1,
+        maximum: int = 256,
+        latency_tolerance: float = 2.0,
+    ) -> None:
+        self.limit = float(initial)
+        self.in_flight = 0
+        self._minimum = minimum
+        self._maximum = maximum
+        self._tolerance = latency_tolerance
+        self._baseline: float | None = None
+        self._condition = asyncio.Condition()
+
+    async def acquire(self, deadline: float | None = None) -> None:
+        """Wait for a concurrency slot."""
+        async with self._condition:
+            # A free slot is taken even past the deadline: wait_for would time
+            # out at once on a timeout <= 0 without checking for one
+            if self.in_flight >= int(self.limit):
+                timeout = None if deadline is None else deadline - time.monotonic()
+                try:
+                    await asyncio.wait_for(
+                        self._condition.wait_for(lambda: self.in_flight < int(self.limit)),
+                        timeout,
+                    )
+                except asyncio.TimeoutError:
+                    raise DeadlineExceededError("No concurrency slot before deadline") from None
+            self.in_flight += 1
+
+    async def release(self) -> None:
+        """Return a slot."""
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def on_latency(self, latency: float) -> None:
+        """Grow the limit while latency stays near baseline, shrink when it rises."""
+        if self._baseline is None or latency < self._baseline:
+            self._baseline = latency
+        else:
+            # Let the baseline drift up slowly so it tracks slower providers
+            self._baseline += (latency - self._baseline) * 0.01
+        if latency > self._baseline * self._tolerance:
+            self.limit = max(self._minimum, self.limit * 0.9)
+        else:
+            self.limit = min(self._maximum, self.limit + 1 / self.limit)
+
+    def on_overload(self) -> None:
+        """Halve the limit after a rate-limit response."""
+        self.limit = max(self._minimum, self.limit / 2)
+
+
+@dataclass
+class EndpointConfig:
+    """Limits for one provider endpoint."""
+
+    base_url: str
+    api_key: str = ""
+    requests_per_minute: float = 0
+    tokens_per_minute: float = 0
+    max_connections: int = 100
+    initial_concurrency: int = 16
+    max_concurrency: int = 256
+    latency_tolerance: float = 2.0
+    timeout_seconds: float = 300.0
+
+
+class ProviderGateway:
+    """Shared client and admission control for one provider endpoint."""
+
+    def __init__(self, config: EndpointConfig, transport: httpx.AsyncBaseTransport | None = None) -> None:
+        self.config = config
+        self._client = httpx.AsyncClient(
+            base_url=config.base_url.rstrip("/") + "/",
+            headers={"Authorization": f"Bearer {config.api_key}"} if config.api_key else None,
+            http2=transport is None,
+            transport=transport,
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_connections,
+            ),
+            timeout=httpx.Timeout(config.timeout_seconds, connect=10.0),
+        )
+        # Burst capacity of one second's worth of budget (at least one request)
+        self._requests = TokenBucket(
+            config.requests_per_minute / 60, max(1.0, config.requests_per_minute / 60)
+        )
+        self._tokens = TokenBucket(config.tokens_per_minute / 60, max(1.0, config.tokens_per_minute / 60))
+        self.limiter = AdaptiveConcurrencyLimiter(
+            config.initial_concurrency,
+            maximum=config.max_concurrency,
+            latency_tolerance=config.latency_tolerance,
+        )
+
+    async def close(self) -> None:
+        """Close pooled connections."""
+        await self._client.aclose()
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        method: str,
+        url: str,
+        *,
+        json: Any = None,
+        estimated_tokens: int = 0,
+        deadline: float | None = None,
+        headers: Mapping[str, str] | None = None,
+    ) -> AsyncIterator[httpx.Response]:
+        """
+        Send a request once admitted and yield the streaming response.
+
+        `deadline` is a time.monotonic() value; callers that cannot be
+        admitted in time fail fast with DeadlineExceededError rather than
+        queueing past the point their activity would time out.
+        """
+        await self._requests.acquire(1, deadline)
+        # Budget reserved by a caller rejected at a later stage goes to whoever queues next
+        try:
+            await self._tokens.acquire(estimated_tokens, deadline)
+        except (DeadlineExceededError, asyncio.CancelledError):
+            self._requests.refund(1)
+            raise
+        try:
+            await self.limiter.acquire(deadline)
+        except (DeadlineExceededError, asyncio.CancelledError):
+            self._requests.refund(1)
+            self._tokens.refund(estimated_tokens)
+            raise
+        try:
+            start = time.monotonic()
+            async with self._client.stream(method, url, json=json, headers=headers) as response:
+                if response.status_code == 429:
+                    retry_after = _retry_after(response)
+                    self.limiter.on_overload()
+                    if retry_after:
+                        self._requests.pause(retry_after)
+                    raise RateLimitedError(retry_after)
+                # Time to response headers: independent of completion length
+                self.limiter.on_latency(time.monotonic() - start)
+                response.raise_for_status()
+                yield response
+        finally:
+            await self.limiter.release()
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    try:
+        return float(response.headers["retry-after"])
+    except (KeyError, ValueError):
+        return None
+
+
+def estimate_tokens(prompt: str, max_tokens: int | None, default_completion: int = 512) -> int:
+    """Rough token estimate (about 4 characters per token) for rate budgeting."""
+    return len(prompt) // 4 + (max_tokens or default_completion)
+
+
+_gateways: dict[str, ProviderGateway] = {}
+
+
+def get_gateway(base_url: str | None = None) -> ProviderGateway:
+    """Get the worker-wide gateway for an endpoint (the configured one by default)."""
+    settings = get_settings()
+    base_url = base_url or settings.llm_base_url
+    gateway = _gateways.get(base_url)
+    if gateway is None:
+        gateway = _gateways[base_url] = ProviderGateway(
+            EndpointConfig(
+                base_url=base_url,
+                api_key=settings.llm_api_key,
+                requests_per_minute=settings.llm_requests_per_minute,
+                tokens_per_minute=settings.llm_tokens_per_minute,
+                max_connections=settings.llm_max_connections,
+                initial_concurrency=settings.llm_initial_concurrency,
+                max_concurrency=settings.llm_max_concurrency,
+                timeout_seconds=settings.llm_request_timeout_seconds,
+            )
+        )
+    return gateway
+
+
+async def close_gateways() -> None:
+    """Close every gateway's connection pool (on worker shutdown)."""
+    for gateway in _gateways.values():
+        await gateway.close()
+    _gateways.clear()
@@ -0,0 +1,150 @@
+"""LLM provider clients."""
+
+import json
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from agent_runtime_core.conversation import Message
+from agent_runtime_core.utils import get_settings
+
+from .gateway import ProviderGateway, estimate_tokens, get_gateway
+from .types import LLMCallInput, ToolCall
+
+
+@dataclass
+class StreamChunk:
+    """A piece of a streamed completion."""
+
+    text: str = ""
+    usage: dict | None = None
+    tool_calls: list[ToolCall] | None = None
+
+
+class LLMProvider(ABC):
+    """A model backend that streams completions."""
+
+    @abstractmethod
+    def stream(self, input: LLMCallInput, deadline: float | None = None) -> AsyncIterator[StreamChunk]:
+        """
+        Stream the completion for `input` as it is generated.
+
+        `deadline` is a time.monotonic() value after which the call is no
+        longer useful to the caller.
+        """
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    """
+    Streams chat completions from an OpenAI-compatible endpoint.
+
+    Covers OpenAI itself and local servers exposing the same API (vLLM,
+    Ollama's /v1 endpoint). Requests go through the endpoint's
+    ProviderGateway for connection pooling and rate limiting.
+    """
+
+    def __init__(self, gateway: ProviderGateway) -> None:
+        self._gateway = gateway
+
+    @staticmethod
+    def request_body(input: LLMCallInput) -> dict[str, Any]:
+        """Build the chat completion request for `input`."""
+        body: dict[str, Any] = {
+            "model": input.model,
+            "messages": (
+                [chat_message(m) for m in input.messages]
+                if input.messages is not None
+                else [{"role": "user", "content": input.prompt}]
+            ),
+            "temperature": input.temperature,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+        }
+        if input.max_tokens is not None:
+            body["max_tokens"] = input.max_tokens
+        if input.tools:
+            body["tools"] = input.tools
+        return body
+
+    async def stream(self, input: LLMCallInput, deadline: float | None = None) -> AsyncIterator[StreamChunk]:
+        # Tool calls arrive as fragments keyed by index; arguments are a JSON
+        # string split across chunks, so they are assembled before yielding
+        tool_calls: dict[int, dict[str, str]] = {}
+        async with self._gateway.stream(
+            "POST",
+            "chat/completions",
+            json=self.request_body(input),
+            estimated_tokens=estimate_tokens(input.prompt_text(), input.max_tokens),
+            deadline=deadline,
+        ) as response:
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                payload = json.loads(data)
+                for choice in payload.get("choices") or []:
+                    delta = choice.get("delta") or {}
+                    if delta.get("content"):
+                        yield StreamChunk(text=delta["content"])
+                    for fragment in delta.get("tool_calls") or []:
+                        call = tool_calls.setdefault(
+                            fragment.get("index", 0), {"id": "", "name": "", "arguments": ""}
+                        )
+                        function = fragment.get("function") or {}
+                        call["id"] = fragment.get("id") or call["id"]
+                        call["name"] = function.get("name") or call["name"]
+                        call["arguments"] += function.get("arguments") or ""
+                if payload.get("usage"):
+                    yield StreamChunk(usage=payload["usage"])
+        if tool_calls:
+            yield StreamChunk(
+                tool_calls=[
+                    ToolCall(
+                        id=call["id"],
+                        name=call["name"],
+                        arguments=json.loads(call["arguments"] or "{}"),
+                    )
+                    for _, call in sorted(tool_calls.items())
+                ]
+            )
+
+
+def chat_message(message: Message) -> dict[str, Any]:
+    """A conversation message in chat completions format."""
+    body: dict[str, Any] = {"role": message.role, "content": message.content}
+    if message.tool_calls:
+        body["content"] = message.content or None
+        body["tool_calls"] = [
+            {
+                "id": call["id"],
+                "type": "function",
+                "function": {"name": call["name"], "arguments": json.dumps(call["arguments"])},
+            }
+            for call in message.tool_calls
+        ]
+    if message.tool_call_id is not None:
+        body["tool_call_id"] = message.tool_call_id
+    return body
+
+
+class EchoProvider(LLMProvider):
+    """Streams the prompt back word by word; for local development without a model."""
+
+    async def stream(self, input: LLMCallInput, deadline: float | None = None) -> AsyncIterator[StreamChunk]:
+        words = input.prompt_text().split(" ")
+        for i, word in enumerate(words):
+            yield StreamChunk(text=word if i == 0 else f" {word}")
+        yield StreamChunk(usage={"prompt_tokens": len(words), "completion_tokens": len(words)})
+
+
+@lru_cache
+def get_provider() -> LLMProvider:
+    """Get the worker-wide provider configured from settings."""
+    settings = get_settings()
+    if settings.llm_provider == "echo":
+        return EchoProvider()
+    return OpenAICompatibleProvider(get_gateway(settings.llm_base_url))
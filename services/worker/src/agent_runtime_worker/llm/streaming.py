@@ -0,0 +1,199 @@
+"""Relaying streamed tokens to a run's live event stream and event history."""
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from uuid import UUID
+
+from temporalio import activity
+
+from agent_runtime_core.events import RunEventPublisher, RunEventSink
+from agent_runtime_core.models import RunEvent
+
+logger = logging.getLogger(__name__)
+
+DELTA_EVENT = "llm.delta"
+RESET_EVENT = "llm.reset"
+DONE_EVENT = "llm.done"
+
+
+class TokenRelay:
+    """
+    Publishes completion text to a run's event stream as it is generated.
+
+    Small chunks are coalesced and published every `flush_interval`
+    seconds. After each publish the activity heartbeats how many characters
+    clients have seen, plus a hash of that text. Within `heartbeating()` it
+    also heartbeats every `heartbeat_interval` seconds, so a slow first
+    token or a response with only tool calls does not time the activity out.
+    Once the completion is done, one done event carries its length.
+
+    On a retry the relay reads those heartbeat details back. It withholds
+    the new stream until it has passed the already-published text, then
+    publishes only the remainder. Clients therefore never see a chunk
+    twice. If the retried completion diverges from what was already sent,
+    which is possible when sampling, a single reset event carries the full
+    text so far and clients replace what they have.
+
+    Every event published is also queued on `sink`, if given, so the run's
+    stored events match what live clients saw.
+    """
+
+    def __init__(
+        self,
+        publisher: RunEventPublisher | None,
+        run_id: str | None,
+        *,
+        sink: RunEventSink | None = None,
+        flush_interval: float = 0.05,
+        heartbeat_interval: float | None = None,
+        published_chars: int = 0,
+        published_digest: str | None = None,
+        attempt: int = 1,
+    ) -> None:
+        self._publisher = publisher if run_id else None
+        self._sink = sink if run_id else None
+        self._run_id = UUID(run_id) if run_id else None
+        self._flush_interval = flush_interval
+        self._heartbeat_interval = heartbeat_interval
+        self._attempt = attempt
+        # What clients already have from earlier attempts
+        self._resume_chars = published_chars
+        self._resume_digest = published_digest
+        # Text generated by this attempt
+        self._text: list[str] = []
+        self._length = 0
+        self._published = 0
+        self._hash = hashlib.sha256()
+        self._last_flush = time.monotonic()
+        self._finished = False
+        self._heartbeat_task: asyncio.Task | None = None
+
+    @classmethod
+    def for_activity(
+        cls,
+        publisher: RunEventPublisher | None,
+        run_id: str | None,
+        sink: RunEventSink | None = None,
+    ) -> "TokenRelay":
+        """Create a relay that resumes from the current activity's heartbeat details."""
+        info = activity.info()
+        published_chars, published_digest = 0, None
+        if info.heartbeat_details:
+            published_chars, published_digest = info.heartbeat_details[0]
+        heartbeat_interval = None
+        if info.heartbeat_timeout:
+            heartbeat_interval = info.heartbeat_timeout.total_seconds() / 4
+        return cls(
+            publisher,
+            run_id,
+            sink=sink,
+            heartbeat_interval=heartbeat_interval,
+            published_chars=published_chars,
+            published_digest=published_digest,
+            attempt=info.attempt,
+        )
+
+    @asynccontextmanager
+    async def heartbeating(self) -> AsyncIterator[None]:
+        """
+        Heartbeat on a timer while the body runs, whether or not text arrives.
+
+        Nested uses share the outermost timer.
+        """
+        interval = self._heartbeat_interval
+        if interval is None or self._heartbeat_task is not None or not activity.in_activity():
+            yield
+            return
+        self._heartbeat_task = asyncio.create_task(self._heartbeat_periodically(interval))
+        try:
+            yield
+        finally:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+
+    async def push(self, text: str) -> None:
+        """Add generated text, publishing if the flush interval has passed."""
+        self._text.append(text)
+        self._length += len(text)
+        if time.monotonic() - self._last_flush >= self._flush_interval:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Publish any text clients have not seen yet."""
+        self._last_flush = time.monotonic()
+        if self._length <= max(self._published, self._resume_chars):
+            return
+
+        full = "".join(self._text)
+        self._text = [full]
+
+        if self._resume_chars:
+            # First flush of a retried attempt that has caught up with what
+            # clients already saw: check it is the same text before continuing.
+            self._hash.update(full[: self._resume_chars].encode())
+            if self._hash.hexdigest() == self._resume_digest:
+                self._published = self._resume_chars
+            else:
+                self._hash = hashlib.sha256(full.encode())
+                self._published = len(full)
+                await self._publish(RESET_EVENT, {"text": full})
+                self._resume_chars = 0
+                self._heartbeat()
+                return
+            self._resume_chars = 0
+
+        delta = full[self._published :]
+        self._hash.update(delta.encode())
+        await self._publish(DELTA_EVENT, {"text": delta, "offset": self._published})
+        self._published = len(full)
+        self._heartbeat()
+
+    async def finish(self) -> None:
+        """Publish the remaining text, then the done event; later calls do nothing."""
+        if self._finished:
+            return
+        self._finished = True
+        await self.flush()
+        full = "".join(self._text)
+        if self._resume_chars:
+            # A retried attempt that never got past what clients already saw
+            if len(full) != self._resume_chars or (
+                hashlib.sha256(full.encode()).hexdigest() != self._resume_digest
+            ):
+                await self._publish(RESET_EVENT, {"text": full})
+            self._resume_chars = 0
+        await self._publish(DONE_EVENT, {"length": len(full)})
+
+    def _heartbeat(self) -> None:
+        if activity.in_activity():
+            activity.heartbeat(self._progress())
+
+    def _progress(self) -> tuple[int, str | None]:
+        """Characters clients have seen and their hash, as heartbeat details."""
+        if self._resume_chars:
+            # Not caught up with an earlier attempt yet; keep its progress
+            return self._resume_chars, self._resume_digest
+        return self._published, self._hash.hexdigest()
+
+    async def _heartbeat_periodically(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            self._heartbeat()
+
+    async def _publish(self, event_type: str, data: dict) -> None:
+        if self._publisher is None and self._sink is None:
+            return
+        data["attempt"] = self._attempt
+        event = RunEvent(run_id=self._run_id, event_type=event_type, data=data)
+        if self._publisher is not None:
+            try:
+                await self._publisher.publish(event)
+            except Exception:
+                # Live streaming is best effort; the activity result stays authoritative
+                logger.warning("Failed to publish %s for run %s", event_type, self._run_id, exc_info=True)
+        if self._sink is not None:
+            await self._sink.emit(event)
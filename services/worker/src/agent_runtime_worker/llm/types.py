@@ -0,0 +1,48 @@
+"""Request and response types shared by the LLM activity and providers."""
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from agent_runtime_core.conversation import Message, render_text
+
+
+@dataclass
+class ToolCall:
+    """A tool invocation requested by the model."""
+
+    id: str
+    name: str
+    arguments: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class LLMCallInput:
+    """Input for the LLM call activity; either a single `prompt` or chat `messages`."""
+
+    prompt: str = ""
+    model: str = "gpt-4"
+    temperature: float = 0.7
+    max_tokens: int | None = None
+    tenant_id: str | None = None
+    run_id: str | None = None
+    # Tool definitions offered to the model, in OpenAI function-calling format
+    tools: list[dict[str, Any]] | None = None
+    # The conversation so far; replaces `prompt` when set
+    messages: list[Message] | None = None
+
+    def prompt_text(self) -> str:
+        """The input as one prompt string, for backends that take plain text."""
+        if self.messages is None:
+            return self.prompt
+        return render_text(self.messages)
+
+
+@dataclass
+class LLMCallOutput:
+    """Output from the LLM call activity."""
+
+    content: str
+    model: str
+    usage: dict | None = None
+    cached: bool = False
+    tool_calls: list[ToolCall] = field(default_factory=list)
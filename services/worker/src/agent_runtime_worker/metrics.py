@@ -0,0 +1,208 @@
+"""Worker metrics.
+
+Metrics are recorded through the Temporal runtime's metric meter, so they
+are served from the same Prometheus endpoint as the SDK's own metrics
+(poller, task slot, sticky cache and schedule-to-start metrics).
+
+Instruments are bound to their labels once, when this module sets them
+up; recording a value is then a dict lookup and a call, with no label
+dicts built per call.
+"""
+
+import asyncio
+import time
+from datetime import timedelta
+from typing import Any
+
+from temporalio import activity
+from temporalio.common import MetricCounter, MetricHistogram, MetricHistogramFloat, MetricMeter
+from temporalio.runtime import PrometheusConfig, Runtime, TelemetryConfig
+from temporalio.worker import (
+    ActivityInboundInterceptor,
+    ExecuteActivityInput,
+    Interceptor,
+)
+
+from agent_runtime_core.events import RunEventSink
+from agent_runtime_core.utils import get_settings
+
+from .sandbox import SandboxPool
+
+ACTIVITIES = ("call_llm", "execute_tool")
+# How LLMResponseCache answered a lookup
+CACHE_RESULTS = ("local_hit", "redis_hit", "coalesced", "miss", "bypassed")
+
+
+class WorkerMetrics:
+    """Pre-bound instruments for the worker's own metrics."""
+
+    def __init__(self, meter: MetricMeter) -> None:
+        self._latency_base = meter.create_histogram(
+            "agent_activity_latency", "Activity attempt execution time", "ms"
+        )
+        self._lag_base = meter.create_histogram(
+            "agent_activity_schedule_to_start",
+            "Time from an activity attempt being scheduled to a worker starting it",
+            "ms",
+        )
+        self._failures_base = meter.create_counter(
+            "agent_activity_failures", "Activity attempts that raised"
+        )
+        self._latency: dict[str, MetricHistogram] = {}
+        self._lag: dict[str, MetricHistogram] = {}
+        self._failures: dict[str, MetricCounter] = {}
+        for name in ACTIVITIES:
+            self._bind(name)
+
+        tokens = meter.create_counter("agent_llm_tokens", "Tokens processed by LLM calls")
+        self._prompt_tokens = tokens.with_additional_attributes({"kind": "prompt"})
+        self._completion_tokens = tokens.with_additional_attributes({"kind": "completion"})
+        self._tokens_per_second = meter.create_histogram(
+            "agent_llm_tokens_per_second", "Completion tokens per second of LLM call time"
+        )
+
+        lookups = meter.create_counter("agent_llm_cache_lookups", "LLM response cache lookups by result")
+        lookup_latency = meter.create_histogram_float(
+            "agent_llm_cache_latency",
+            "Time to answer an LLM call through the response cache, provider call included on a miss",
+            "ms",
+        )
+        self._cache_lookups: dict[str, MetricCounter] = {}
+        self._cache_latency: dict[str, MetricHistogramFloat] = {}
+        for result in CACHE_RESULTS:
+            self._cache_lookups[result] = lookups.with_additional_attributes({"result": result})
+            self._cache_latency[result] = lookup_latency.with_additional_attributes({"result": result})
+        self._cache_evictions = meter.create_counter(
+            "agent_llm_cache_evictions", "Entries evicted from the in-process LLM response cache"
+        )
+
+        self._sandbox_processes = meter.create_gauge(
+            "agent_sandbox_processes", "Processes in the tool sandbox pool"
+        )
+        self._sandbox_busy = meter.create_gauge(
+            "agent_sandbox_busy", "Sandbox processes running a tool or being replaced"
+        )
+
+        self._events_pending = meter.create_gauge(
+            "agent_run_events_pending", "Run events queued for writing"
+        )
+        self._events_dropped = meter.create_counter(
+            "agent_run_events_dropped", "Run events dropped after their batch failed every write attempt"
+        )
+        self._events_dropped_seen = 0
+
+    def _bind(self, activity_type: str) -> None:
+        attributes = {"activity": activity_type}
+        self._latency[activity_type] = self._latency_base.with_additional_attributes(attributes)
+        self._lag[activity_type] = self._lag_base.with_additional_attributes(attributes)
+        self._failures[activity_type] = self._failures_base.with_additional_attributes(attributes)
+
+    def record_activity(
+        self, activity_type: str, seconds: float, schedule_to_start: timedelta, failed: bool
+    ) -> None:
+        """Record one activity attempt."""
+        if activity_type not in self._latency:
+            self._bind(activity_type)
+        self._latency[activity_type].record(int(seconds * 1000))
+        self._lag[activity_type].record(max(0, int(schedule_to_start.total_seconds() * 1000)))
+        if failed:
+            self._failures[activity_type].add(1)
+
+    def record_llm_usage(self, usage: dict | None, seconds: float) -> None:
+        """Record token counts and throughput for one LLM call."""
+        if not usage:
+            return
+        prompt = usage.get("prompt_tokens") or 0
+        completion = usage.get("completion_tokens") or 0
+        if prompt:
+            self._prompt_tokens.add(prompt)
+        if completion:
+            self._completion_tokens.add(completion)
+            if seconds > 0:
+                self._tokens_per_second.record(int(completion / seconds))
+
+    def record_llm_cache(self, result: str, seconds: float | None = None) -> None:
+        """Record one LLM response cache lookup and, if timed, how long it took."""
+        self._cache_lookups[result].add(1)
+        if seconds is not None:
+            self._cache_latency[result].record(seconds * 1000)
+
+    def record_llm_cache_eviction(self) -> None:
+        """Count an entry evicted from the in-process cache tier."""
+        self._cache_evictions.add(1)
+
+    def record_sandbox_pool(self, pool: SandboxPool) -> None:
+        """Sample the sandbox pool's size and utilization."""
+        self._sandbox_processes.set(pool.size)
+        self._sandbox_busy.set(max(0, pool.size - pool.idle_count))
+
+    def record_event_sink(self, sink: RunEventSink) -> None:
+        """Sample the run event sink's queue, and count events dropped since the last sample."""
+        self._events_pending.set(sink.pending)
+        dropped = sink.dropped
+        if dropped > self._events_dropped_seen:
+            self._events_dropped.add(dropped - self._events_dropped_seen)
+            self._events_dropped_seen = dropped
+
+
+_metrics = WorkerMetrics(MetricMeter.noop)
+
+
+def get_worker_metrics() -> WorkerMetrics:
+    """Get the process's worker metrics (no-ops until a runtime is created)."""
+    return _metrics
+
+
+def create_runtime(process_index: int = 0) -> Runtime:
+    """
+    Create the Temporal runtime, serving Prometheus metrics if enabled.
+
+    Worker metrics are bound to the runtime's meter.
+    """
+    global _metrics
+    settings = get_settings()
+    if not settings.worker_metrics_port:
+        return Runtime.default()
+    address = f"{settings.worker_metrics_host}:{settings.worker_metrics_port + process_index}"
+    runtime = Runtime(telemetry=TelemetryConfig(metrics=PrometheusConfig(bind_address=address)))
+    _metrics = WorkerMetrics(runtime.metric_meter)
+    return runtime
+
+
+class MetricsInterceptor(Interceptor):
+    """Records latency, schedule-to-start lag and failures of every activity attempt."""
+
+    def intercept_activity(self, next: ActivityInboundInterceptor) -> ActivityInboundInterceptor:
+        return _ActivityMetricsInterceptor(next)
+
+
+class _ActivityMetricsInterceptor(ActivityInboundInterceptor):
+    async def execute_activity(self, input: ExecuteActivityInput) -> Any:
+        info = activity.info()
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = await super().execute_activity(input)
+            failed = False
+            return result
+        finally:
+            _metrics.record_activity(
+                info.activity_type,
+                time.perf_counter() - start,
+                info.started_time - info.current_attempt_scheduled_time,
+                failed,
+            )
+
+
+async def sample_sandbox_pool(pool: SandboxPool, interval: float = 5.0) -> None:
+    """Publish sandbox pool gauges every `interval` seconds until cancelled."""
+    while True:
+        _metrics.record_sandbox_pool(pool)
+        await asyncio.sleep(interval)
+
+
+async def sample_event_sink(sink: RunEventSink, interval: float = 5.0) -> None:
+    """Publish run event sink metrics every `interval` seconds until cancelled."""
+    while True:
+        _metrics.record_event_sink(sink)
+        await asyncio.sleep(interval)
@@ -0,0 +1,18 @@
+"""Task queue names.
+
+Workflows run on the base task queue. Activities run on queues derived
+from it, so each kind of work can be scaled and limited separately.
+"""
+
+LLM_SUFFIX = "-llm"
+TOOLS_SUFFIX = "-tools"
+
+
+def llm_queue(task_queue: str) -> str:
+    """Queue for call_llm activities."""
+    return task_queue + LLM_SUFFIX
+
+
+def tools_queue(task_queue: str) -> str:
+    """Queue for execute_tool activities."""
+    return task_queue + TOOLS_SUFFIX
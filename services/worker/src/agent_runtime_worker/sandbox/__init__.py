@@ -0,0 +1,10 @@
+"""Sandboxed tool execution."""
+
+from .pool import SandboxPool, SandboxResult, SandboxTimeoutError, get_sandbox_pool
+
+__all__ = [
+    "SandboxPool",
+    "SandboxResult",
+    "SandboxTimeoutError",
+    "get_sandbox_pool",
+]
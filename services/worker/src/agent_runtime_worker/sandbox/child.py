@@ -0,0 +1,111 @@
+"""Request loop run inside each sandbox process."""
+
+import asyncio
+import inspect
+import math
+import os
+import pickle
+import resource
+import signal
+from multiprocessing.connection import Connection
+from typing import Any
+
+from ..tools import get_tool, load_tool_modules
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+class CPULimitExceeded(Exception):
+    """Raised inside a tool when it exhausts its CPU time budget."""
+
+
+def _on_cpu_limit(signum: int, frame: Any) -> None:
+    raise CPULimitExceeded("CPU time limit exceeded")
+
+
+def memory_usage() -> tuple[int, int]:
+    """Return (virtual size, resident size) of this process in bytes."""
+    try:
+        with open("/proc/self/statm") as f:
+            vsize, rss = f.read().split()[:2]
+    except OSError:
+        return 0, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return int(vsize) * _PAGE_SIZE, int(rss) * _PAGE_SIZE
+
+
+def _set_limits(cpu_seconds: float | None, memory_bytes: int | None) -> None:
+    # Limits are relative to what the process already uses, so a long-lived
+    # worker gets the same budget on every call.
+    if cpu_seconds:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        soft = math.ceil(usage.ru_utime + usage.ru_stime + cpu_seconds)
+        resource.setrlimit(resource.RLIMIT_CPU, (soft if hard < 0 else min(soft, hard), hard))
+    vsize, _ = memory_usage()
+    if memory_bytes and vsize:
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        soft = vsize + memory_bytes
+        resource.setrlimit(resource.RLIMIT_AS, (soft if hard < 0 else min(soft, hard), hard))
+
+
+def _restore_limits(limits: dict[int, tuple[int, int]]) -> None:
+    for limit, value in limits.items():
+        resource.setrlimit(limit, value)
+
+
+def _call(tool_name: str, tool_input: dict[str, Any]) -> Any:
+    func = get_tool(tool_name).func
+    if inspect.iscoroutinefunction(func):
+        return asyncio.run(func(**tool_input))
+    return func(**tool_input)
+
+
+def serve(conn: Connection, preload_modules: list[str]) -> None:
+    """
+    Execute tool calls sent over `conn` until it closes or receives None.
+
+    Each request is a pickled (tool_name, tool_input, cpu_seconds,
+    memory_bytes) tuple; each reply is a pickled (success, result, error,
+    rss_bytes) tuple.
+    """
+    # Interrupts are for the parent; it decides when sandboxes stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGXCPU, _on_cpu_limit)
+    load_tool_modules(preload_modules)
+    base_limits = {
+        limit: resource.getrlimit(limit) for limit in (resource.RLIMIT_CPU, resource.RLIMIT_AS)
+    }
+
+    while True:
+        try:
+            request = pickle.loads(conn.recv_bytes())
+        except EOFError:
+            return
+        if request is None:
+            return
+        tool_name, tool_input, cpu_seconds, memory_bytes = request
+
+        result, error = None, None
+        try:
+            _set_limits(cpu_seconds, memory_bytes)
+            try:
+                result = _call(tool_name, tool_input)
+            finally:
+                _restore_limits(base_limits)
+        except MemoryError:
+            error = "Memory limit exceeded"
+        except CPULimitExceeded as e:
+            error = str(e)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+
+        try:
+            reply = pickle.dumps(
+                (error is None, result, error, memory_usage()[1]), pickle.HIGHEST_PROTOCOL
+            )
+        except Exception as e:
+            reply = pickle.dumps(
+                (False, None, f"Tool result is not serializable: {e}", memory_usage()[1]),
+                pickle.HIGHEST_PROTOCOL,
+            )
+        conn.send_bytes(reply)
@@ -0,0 +1,229 @@
+"""Pre-forked pool of sandbox processes for tool execution.
+
+Starting an interpreter and importing tool dependencies costs far more
+than most tool calls, so tools run in long-lived worker processes instead:
+
+- processes fork from a forkserver that has already imported the tool
+  modules, so starting or replacing one is cheap
+- each call runs under CPU and address-space rlimits set in the child
+- a call that overruns its timeout kills only its own process, which is
+  replaced in the background
+- processes are recycled after `max_calls_per_process` calls, or once
+  their resident memory has grown by `max_rss_growth` bytes
+- requests and results cross a pipe as pickles
+"""
+
+import asyncio
+import multiprocessing
+import pickle
+from collections.abc import Iterable
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from typing import Any
+
+from agent_runtime_core.utils import get_settings
+
+from ..tools import load_tool_modules
+from .child import serve
+
+
+class SandboxTimeoutError(Exception):
+    """Raised when a tool call does not finish within its timeout."""
+
+
+@dataclass
+class SandboxResult:
+    """Outcome of one tool call in the sandbox."""
+
+    success: bool
+    result: Any = None
+    error: str | None = None
+
+
+class _SandboxProcess:
+    """One sandbox process and the parent end of its pipe."""
+
+    def __init__(self, context: multiprocessing.context.BaseContext, preload_modules: list[str]) -> None:
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=serve, args=(child_conn, preload_modules), name="tool-sandbox", daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.calls = 0
+        self.baseline_rss: int | None = None
+
+    def stop(self) -> None:
+        """Ask the process to exit, killing it if it does not."""
+        try:
+            self.conn.send_bytes(pickle.dumps(None))
+        except OSError:
+            pass
+        self.process.join(timeout=1)
+        self.kill()
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+async def _wait_readable(conn: Connection) -> None:
+    if conn.poll():
+        return
+    loop = asyncio.get_running_loop()
+    ready = loop.create_future()
+    fd = conn.fileno()
+    loop.add_reader(fd, lambda: ready.done() or ready.set_result(None))
+    try:
+        await ready
+    finally:
+        loop.remove_reader(fd)
+
+
+class SandboxPool:
+    """Runs registered tools in a fixed-size pool of warm sandbox processes."""
+
+    def __init__(
+        self,
+        size: int,
+        *,
+        preload_modules: Iterable[str] = (),
+        max_calls_per_process: int = 500,
+        max_rss_growth: int = 256 * 1024 * 1024,
+        memory_limit: int | None = None,
+        cpu_limit_seconds: float | None = None,
+    ) -> None:
+        self.size = size
+        self._preload = [__name__.rsplit(".", 1)[0] + ".child", *preload_modules]
+        self._max_calls = max_calls_per_process
+        self._max_rss_growth = max_rss_growth
+        self._memory_limit = memory_limit
+        self._cpu_limit = cpu_limit_seconds
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            self._context = multiprocessing.get_context("forkserver")
+            self._context.set_forkserver_preload(self._preload)
+        else:
+            self._context = multiprocessing.get_context("spawn")
+        self._idle: asyncio.Queue[_SandboxProcess] = asyncio.Queue()
+        self._processes: set[_SandboxProcess] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self._start_lock = asyncio.Lock()
+        self._started = False
+        self._closed = False
+
+    async def start(self) -> None:
+        """Load the tool modules and start the pool's processes."""
+        async with self._start_lock:
+            if self._started:
+                return
+            # The parent validates tool inputs against the same registry
+            load_tool_modules(self._preload[1:])
+            processes = await asyncio.gather(*(self._spawn() for _ in range(self.size)))
+            for process in processes:
+                self._idle.put_nowait(process)
+            self._started = True
+
+    async def close(self) -> None:
+        """Stop every process, including replacements still starting."""
+        self._closed = True
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        await asyncio.gather(*(asyncio.to_thread(p.stop) for p in list(self._processes)))
+        self._processes.clear()
+
+    @property
+    def idle_count(self) -> int:
+        return self._idle.qsize()
+
+    async def run(
+        self,
+        tool_name: str,
+        tool_input: dict[str, Any],
+        *,
+        timeout: float,
+        cpu_seconds: float | None = None,
+        memory_bytes: int | None = None,
+    ) -> SandboxResult:
+        """
+        Run a tool in an idle sandbox process.
+
+        Raises SandboxTimeoutError if the call overruns `timeout`; the
+        process running it is killed and replaced.
+        """
+        if not self._started:
+            await self.start()
+        request = pickle.dumps(
+            (
+                tool_name,
+                tool_input,
+                cpu_seconds if cpu_seconds is not None else self._cpu_limit,
+                memory_bytes if memory_bytes is not None else self._memory_limit,
+            ),
+            pickle.HIGHEST_PROTOCOL,
+        )
+
+        process = await self._idle.get()
+        reusable = False
+        try:
+            process.conn.send_bytes(request)
+            await asyncio.wait_for(_wait_readable(process.conn), timeout)
+            success, result, error, rss = pickle.loads(process.conn.recv_bytes())
+        except asyncio.TimeoutError:
+            raise SandboxTimeoutError(f"Tool {tool_name} timed out after {timeout}s") from None
+        except (EOFError, OSError):
+            return SandboxResult(success=False, error=f"Sandbox process for {tool_name} exited")
+        else:
+            process.calls += 1
+            if process.baseline_rss is None:
+                process.baseline_rss = rss
+            reusable = (
+                process.calls < self._max_calls and rss - process.baseline_rss < self._max_rss_growth
+            )
+            return SandboxResult(success=success, result=result, error=error)
+        finally:
+            if reusable and not self._closed:
+                self._idle.put_nowait(process)
+            else:
+                self._replace(process)
+
+    async def _spawn(self) -> _SandboxProcess:
+        # Starting a process blocks, so it runs in a thread; the pool's own
+        # state is only touched here on the event loop
+        process = await asyncio.to_thread(_SandboxProcess, self._context, self._preload)
+        self._processes.add(process)
+        return process
+
+    def _replace(self, process: _SandboxProcess) -> None:
+        # Also reached on cancellation, with the child possibly mid-call, so kill it
+        self._processes.discard(process)
+
+        async def replace() -> None:
+            await asyncio.to_thread(process.kill)
+            if not self._closed:
+                self._idle.put_nowait(await self._spawn())
+
+        task = asyncio.create_task(replace())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+_pool: SandboxPool | None = None
+
+
+def get_sandbox_pool() -> SandboxPool:
+    """Get the worker-wide sandbox pool configured from settings."""
+    global _pool
+    if _pool is None:
+        settings = get_settings()
+        modules = settings.sandbox_preload_modules.split(",")
+        _pool = SandboxPool(
+            settings.sandbox_pool_size,
+            preload_modules=[m.strip() for m in modules if m.strip()],
+            max_calls_per_process=settings.sandbox_max_calls_per_process,
+            max_rss_growth=settings.sandbox_max_rss_growth_mb * 1024 * 1024,
+            memory_limit=settings.sandbox_memory_limit_mb * 1024 * 1024,
+            cpu_limit_seconds=settings.sandbox_cpu_limit_seconds,
+        )
+    return _pool
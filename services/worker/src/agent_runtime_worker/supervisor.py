@@ -0,0 +1,80 @@
+"""Multi-process worker supervisor.
+
+Workflow replay is CPU-bound and one Python process uses one core, so a
+node runs several worker processes. The supervisor starts
+WORKER_PROCESSES of them (one per CPU by default), restarts any that exit
+unexpectedly, and forwards SIGINT/SIGTERM so each drains before exiting.
+
+    python -m agent_runtime_worker.supervisor
+"""
+
+import asyncio
+import multiprocessing
+import os
+import signal
+import time
+
+from agent_runtime_core.utils import get_settings
+
+# Seconds to wait for workers to drain before killing them
+SHUTDOWN_TIMEOUT = 60
+# Minimum seconds between restarts of the same slot
+RESTART_BACKOFF = 5
+
+
+def _run_worker(process_index: int) -> None:
+    from .worker import main
+
+    asyncio.run(main(process_index))
+
+
+def main() -> None:
+    """Start the worker processes and supervise them until signalled."""
+    settings = get_settings()
+    count = settings.worker_processes or os.cpu_count() or 1
+    context = multiprocessing.get_context("spawn")
+    processes: dict[int, multiprocessing.Process] = {}
+    started: dict[int, float] = {}
+    stopping = False
+
+    def start(index: int) -> None:
+        process = context.Process(target=_run_worker, args=(index,), name=f"worker-{index}")
+        process.start()
+        processes[index] = process
+        started[index] = time.monotonic()
+
+    def stop(signum: int, frame: object) -> None:
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    print(f"Starting {count} worker processes")
+    for index in range(count):
+        start(index)
+
+    while not stopping:
+        for index, process in processes.items():
+            if process.is_alive() or stopping:
+                continue
+            if time.monotonic() - started[index] < RESTART_BACKOFF:
+                continue
+            print(f"Worker {index} exited with code {process.exitcode}; restarting")
+            start(index)
+        time.sleep(1)
+
+    print("Stopping worker processes")
+    for process in processes.values():
+        if process.is_alive():
+            process.terminate()
+    deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+    for process in processes.values():
+        process.join(max(0.0, deadline - time.monotonic()))
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+"""Agent tool registry and built-in tools."""
+
+from .registry import Tool, UnknownToolError, get_tool, load_tool_modules, tool
+
+__all__ = [
+    "Tool",
+    "UnknownToolError",
+    "get_tool",
+    "load_tool_modules",
+    "tool",
+]
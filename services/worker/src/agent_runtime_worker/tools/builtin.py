@@ -0,0 +1,11 @@
+"""Built-in tools available to every agent."""
+
+from typing import Any
+
+from .registry import tool
+
+
+@tool()
+def echo(**kwargs: Any) -> dict[str, Any]:
+    """Return the input unchanged; useful for testing agent wiring."""
+    return kwargs
@@ -0,0 +1,40 @@
+"""Built-in tools giving agents a per-tenant vector memory."""
+
+from typing import Any
+
+from .registry import tool
+
+# agent_runtime_core.memory (and NumPy) is imported on first call, so the
+# sandbox can preload this module where the memory extra is not installed.
+# A tenant's index is memory-mapped by each sandbox process that uses it,
+# so SANDBOX_MEMORY_LIMIT_MB has to leave room for the mapping (about
+# 4 bytes per dimension per vector, twice that during a merge).
+
+
+@tool(tenant_scoped=True)
+async def memory_store(tenant_id: str, text: str, metadata: dict[str, Any] | None = None) -> dict[str, Any]:
+    """Remember a text, with optional metadata, for later memory_search calls."""
+    from agent_runtime_core.memory import get_vector_memory
+
+    memory = await get_vector_memory(tenant_id)
+    [memory_id] = memory.add([text], [metadata])
+    return {"id": memory_id}
+
+
+@tool(tenant_scoped=True)
+async def memory_search(tenant_id: str, query: str | list[str], k: int = 5) -> list[Any]:
+    """
+    Find the stored texts most similar to a query.
+
+    Returns the hits ({id, score, text, metadata}, best first); for a list
+    of queries, one such list per query.
+    """
+    from agent_runtime_core.memory import get_vector_memory
+
+    memory = await get_vector_memory(tenant_id)
+    queries = [query] if isinstance(query, str) else query
+    results = [
+        [{"id": h.id, "score": h.score, "text": h.text, "metadata": h.metadata} for h in hits]
+        for hits in memory.search(queries, k=max(1, min(k, 100)))
+    ]
+    return results[0] if isinstance(query, str) else results
@@ -0,0 +1,77 @@
+"""Tool registry - tools register themselves when their module is imported."""
+
+import importlib
+import inspect
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+
+class UnknownToolError(KeyError):
+    """Raised when a tool name is not registered."""
+
+
+@dataclass(frozen=True)
+class Tool:
+    """A registered tool: a function called with the tool input as keyword arguments."""
+
+    name: str
+    func: Callable[..., Any]
+    required: frozenset[str]
+    accepted: frozenset[str] | None
+    # Called with the run's tenant as `tenant_id`, whatever the model passed
+    tenant_scoped: bool = False
+
+    def validate(self, tool_input: dict[str, Any]) -> None:
+        """Check `tool_input` against the function signature."""
+        missing = self.required - tool_input.keys()
+        if missing:
+            raise ValueError(f"Missing required input for {self.name}: {sorted(missing)}")
+        if self.accepted is not None:
+            unexpected = tool_input.keys() - self.accepted
+            if unexpected:
+                raise ValueError(f"Unexpected input for {self.name}: {sorted(unexpected)}")
+
+
+_registry: dict[str, Tool] = {}
+
+
+def tool(
+    name: str | None = None, *, tenant_scoped: bool = False
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Register a function as a tool under `name` (defaults to the function name).
+
+    A `tenant_scoped` tool takes a `tenant_id` argument, which is always
+    the tenant of the calling run.
+    """
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        params = inspect.signature(func).parameters.values()
+        keyword = [p for p in params if p.kind in (p.POSITIONAL_OR_KEYWORD, p.KEYWORD_ONLY)]
+        takes_kwargs = any(p.kind is p.VAR_KEYWORD for p in params)
+        tool_name = name or func.__name__
+        _registry[tool_name] = Tool(
+            name=tool_name,
+            func=func,
+            required=frozenset(p.name for p in keyword if p.default is p.empty),
+            accepted=None if takes_kwargs else frozenset(p.name for p in keyword),
+            tenant_scoped=tenant_scoped,
+        )
+        return func
+
+    return decorator
+
+
+def get_tool(name: str) -> Tool:
+    """Look up a registered tool."""
+    try:
+        return _registry[name]
+    except KeyError:
+        raise UnknownToolError(name) from None
+
+
+def load_tool_modules(modules: Iterable[str]) -> None:
+    """Import tool modules so their tools register."""
+    for module in modules:
+        importlib.import_module(module)
@@ -1,34 +1,165 @@
-"""Temporal worker entry point."""
+"""Temporal worker entry point.
+
+A worker process polls up to three task queues, each with its own
+`Worker` and concurrency limits: workflow tasks (CPU-bound replay) on the
+base queue, LLM calls (I/O-bound, high concurrency) on "<queue>-llm", and
+sandboxed tool calls (bounded by the sandbox pool) on "<queue>-tools".
+Run several processes per node with `agent_runtime_worker.supervisor`.
+"""
 
 import asyncio
+import signal
+from concurrent.futures import ThreadPoolExecutor
 
 from temporalio.client import Client
 from temporalio.worker import Worker
 
+from agent_runtime_core.db import dispose_engines
+from agent_runtime_core.events import get_event_sink
+from agent_runtime_core.status import get_run_status_persister
+from agent_runtime_core.temporal import get_data_converter
 from agent_runtime_core.utils import get_settings
+from agent_runtime_core.utils.config import Settings
 
 from .workflows.agent_run import AgentRunWorkflow
 from .activities.llm_call import call_llm
+from .activities.run_status import record_run_status
 from .activities.tool_exec import execute_tool
+from .llm.gateway import close_gateways
+from .metrics import MetricsInterceptor, create_runtime, sample_event_sink, sample_sandbox_pool
+from .queues import llm_queue, tools_queue
+from .sandbox import get_sandbox_pool
 
+QUEUES = ("workflows", "llm", "tools")
 
-async def main() -> None:
-    """Start the Temporal worker."""
-    settings = get_settings()
 
-    print(f"Connecting to Temporal at {settings.temporal_address}")
-    client = await Client.connect(settings.temporal_address)
+def build_workers(
+    client: Client,
+    settings: Settings,
+    queues: set[str],
+    activity_executor: ThreadPoolExecutor | None = None,
+) -> list[Worker]:
+    """Create one Worker per enabled queue with its configured limits."""
+    task_queue = settings.temporal_task_queue
+    workers = []
+    if "workflows" in queues:
+        workers.append(
+            Worker(
+                client,
+                task_queue=task_queue,
+                workflows=[AgentRunWorkflow],
+                # Local activities run on the workflow's own worker
+                activities=[record_run_status],
+                max_concurrent_workflow_tasks=settings.worker_max_concurrent_workflow_tasks,
+                max_cached_workflows=settings.worker_max_cached_workflows,
+            )
+        )
+    if "llm" in queues:
+        workers.append(
+            Worker(
+                client,
+                task_queue=llm_queue(task_queue),
+                activities=[call_llm],
+                interceptors=[MetricsInterceptor()],
+                activity_executor=activity_executor,
+                max_concurrent_activities=settings.worker_max_concurrent_llm_activities,
+            )
+        )
+    if "tools" in queues:
+        workers.append(
+            Worker(
+                client,
+                task_queue=tools_queue(task_queue),
+                activities=[execute_tool],
+                interceptors=[MetricsInterceptor()],
+                activity_executor=activity_executor,
+                max_concurrent_activities=settings.worker_max_concurrent_tool_activities,
+            )
+        )
+    return workers
+
 
-    # Create worker with registered workflows and activities
-    worker = Worker(
-        client,
-        task_queue="agent-runtime",
-        workflows=[AgentRunWorkflow],
-        activities=[call_llm, execute_tool],
+def _memory_snapshotter():
+    """The vector memory snapshotter, if the memory extra is installed."""
+    try:
+        from agent_runtime_core.memory import get_memory_snapshotter
+    except ImportError:  # NumPy not installed
+        return None
+    return get_memory_snapshotter()
+
+
+async def main(process_index: int = 0) -> None:
+    """Start the Temporal workers for this process and run until signalled."""
+    settings = get_settings()
+    queues = {q.strip() for q in settings.worker_queues.split(",") if q.strip()}
+    unknown = queues - set(QUEUES)
+    if unknown:
+        raise ValueError(f"Unknown WORKER_QUEUES entries: {sorted(unknown)}")
+
+    print(f"[worker {process_index}] Connecting to Temporal at {settings.temporal_address}")
+    client = await Client.connect(
+        settings.temporal_address,
+        namespace=settings.temporal_namespace,
+        data_converter=get_data_converter(),
+        runtime=create_runtime(process_index),
     )
 
-    print("Starting worker, listening on task queue: agent-runtime")
-    await worker.run()
+    activity_executor = None
+    if settings.worker_activity_executor_threads:
+        activity_executor = ThreadPoolExecutor(settings.worker_activity_executor_threads)
+    workers = build_workers(client, settings, queues, activity_executor)
+
+    event_sink = get_event_sink()
+    await event_sink.start()
+    sink_sampler = asyncio.create_task(sample_event_sink(event_sink))
+    # Workflow processes drain status transitions from Redis into Postgres
+    status_persister = get_run_status_persister() if "workflows" in queues else None
+    if status_persister is not None:
+        await status_persister.start()
+    sandbox_pool = get_sandbox_pool() if "tools" in queues else None
+    sampler = None
+    memory_snapshotter = None
+    if sandbox_pool is not None:
+        await sandbox_pool.start()
+        sampler = asyncio.create_task(sample_sandbox_pool(sandbox_pool))
+        memory_snapshotter = _memory_snapshotter()
+    if memory_snapshotter is not None:
+        await memory_snapshotter.start()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    print(
+        f"[worker {process_index}] Listening on task queues: "
+        + ", ".join(w.task_queue for w in workers)
+    )
+    runs = asyncio.gather(*(w.run() for w in workers))
+    stopped = asyncio.create_task(stop.wait())
+    try:
+        await asyncio.wait([runs, stopped], return_when=asyncio.FIRST_COMPLETED)
+        # Finish in-flight tasks, then stop polling on every queue
+        await asyncio.gather(*(w.shutdown() for w in workers))
+        await runs
+    finally:
+        stopped.cancel()
+        sink_sampler.cancel()
+        if sampler is not None:
+            sampler.cancel()
+        # Flush buffered run events before the process exits
+        await event_sink.close()
+        if status_persister is not None:
+            await status_persister.close()
+        await dispose_engines()
+        await close_gateways()
+        if sandbox_pool is not None:
+            await sandbox_pool.close()
+        # After the pool, so the last snapshot has every insert
+        if memory_snapshotter is not None:
+            await memory_snapshotter.close()
+        if activity_executor is not None:
+            activity_executor.shutdown()
 
 
 if __name__ == "__main__":
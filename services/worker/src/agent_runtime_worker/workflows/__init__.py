@@ -1,5 +1,5 @@
 """Temporal workflow definitions."""
 
-from .agent_run import AgentRunWorkflow
+from .agent_run import AgentRunInput, AgentRunOutput, AgentRunState, AgentRunWorkflow
 
-__all__ = ["AgentRunWorkflow"]
+__all__ = ["AgentRunInput", "AgentRunOutput", "AgentRunState", "AgentRunWorkflow"]
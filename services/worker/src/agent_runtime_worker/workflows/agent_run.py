@@ -1,15 +1,43 @@
 """Agent Run Workflow - durable execution of an agent."""
 
-from dataclasses import dataclass
+import asyncio
+import json
+from dataclasses import dataclass, field, replace
 from datetime import timedelta
-from typing import Any
+from typing import Any, NoReturn
 from uuid import UUID
 
 from temporalio import workflow
+from temporalio.common import RetryPolicy
+from temporalio.exceptions import ActivityError
 
 with workflow.unsafe.imports_passed_through():
-    from ..activities.llm_call import call_llm, LLMCallInput, LLMCallOutput
+    from agent_runtime_core.conversation import (
+        CompactionPolicy,
+        Conversation,
+        Message,
+        summary_request,
+    )
+    from ..activities.llm_call import call_llm, LLMCallInput, LLMCallOutput, ToolCall
+    from ..activities.run_status import record_run_status, RunStatusInput
     from ..activities.tool_exec import execute_tool, ToolExecInput, ToolExecOutput
+    from ..queues import llm_queue, tools_queue
+
+
+@dataclass
+class AgentRunState:
+    """
+    Agent state carried across continue-as-new.
+
+    Only this compacted state moves to the next workflow run; the event
+    history of earlier runs is not replayed again.
+    """
+
+    conversation: Conversation
+    turn: int = 0
+    pending_tool_calls: list[ToolCall] = field(default_factory=list)
+    is_paused: bool = False
+    should_cancel: bool = False
 
 
 @dataclass
@@ -22,6 +50,10 @@ class AgentRunInput:
     agent_version_id: str
     config: dict[str, Any]
     input: dict[str, Any]
+    # Set when continuing from an earlier workflow run
+    state: AgentRunState | None = None
+    # Artifacts attached to the run, stored in the artifact store by ID
+    artifact_ids: list[str] = field(default_factory=list)
 
 
 @dataclass
@@ -50,48 +82,103 @@ class AgentRunWorkflow:
     def __init__(self) -> None:
         self._is_paused = False
         self._should_cancel = False
+        self._signalled = False
+        self._run_id = ""
+        self._status_version = 0
 
     @workflow.run
     async def run(self, input: AgentRunInput) -> AgentRunOutput:
-        """Execute the agent run workflow."""
+        """
+        Execute the agent run workflow.
+
+        Status transitions (running, paused, and the final status) are
+        published to the run status read model as they happen.
+        """
+        self._run_id = input.run_id
+        if input.state is None:
+            await self._record_status("running")
+        output = await self._execute(input)
+        await self._record_status(output.status, output=output.output, error=output.error)
+        return output
+
+    async def _execute(self, input: AgentRunInput) -> AgentRunOutput:
+        """
+        Run the agent loop until it finishes, fails or is cancelled.
+
+        Each turn calls the LLM. If it requests tools, they run concurrently
+        (up to `max_parallel_tools` at a time) and their results are fed
+        into the next turn. The run completes once the LLM answers without
+        requesting tools.
+
+        The conversation is kept within `max_context_tokens` (agent
+        config) by compacting its oldest turns before an LLM call, as set
+        by `context_compaction` ("truncate" or "summarize").
+
+        Once the history passes `max_history_events` or `max_history_bytes`
+        (agent config), or Temporal suggests it, the workflow continues as
+        new with only its AgentRunState.
+        """
         workflow.logger.info(f"Starting agent run: {input.run_id}")
+        max_turns = input.config.get("max_turns", 10)
+        max_parallel = input.config.get("max_parallel_tools", 4)
+        state = input.state or AgentRunState(conversation=_new_conversation(input))
+        conversation = state.conversation
+        self._restore_flags(state)
 
         try:
-            # Wait if paused
-            await workflow.wait_condition(lambda: not self._is_paused)
+            while state.turn < max_turns:
+                # Check for pause/cancel between steps
+                if not await self._proceed():
+                    return AgentRunOutput(run_id=input.run_id, status="cancelled")
 
-            if self._should_cancel:
-                return AgentRunOutput(
-                    run_id=input.run_id,
-                    status="cancelled",
-                )
+                if state.pending_tool_calls:
+                    tool_results = await self._execute_tools(
+                        input.tenant_id, state.pending_tool_calls, max_parallel
+                    )
+                    if tool_results is None:
+                        return AgentRunOutput(run_id=input.run_id, status="cancelled")
+                    _append_tool_results(conversation, state.pending_tool_calls, tool_results)
+                    state.pending_tool_calls = []
+                    state.turn += 1
+                    await self._maybe_continue_as_new(input, state)
+                    continue
 
-            # Example: Simple agent loop
-            # In practice, this would be driven by agent config/type
-            llm_result = await workflow.execute_activity(
-                call_llm,
-                LLMCallInput(
-                    prompt=str(input.input.get("prompt", "Hello")),
-                    model=input.config.get("model", "gpt-4"),
-                ),
-                start_to_close_timeout=timedelta(minutes=5),
-                retry_policy=workflow.RetryPolicy(
-                    maximum_attempts=3,
-                    initial_interval=timedelta(seconds=1),
-                    backoff_coefficient=2.0,
-                ),
-            )
+                if conversation.needs_compaction():
+                    await self._compact(input, conversation)
+                llm_result = await self._call_llm(
+                    LLMCallInput(
+                        model=input.config.get("model", "gpt-4"),
+                        temperature=input.config.get("temperature", 0.7),
+                        tenant_id=input.tenant_id,
+                        run_id=input.run_id,
+                        tools=input.config.get("tools"),
+                        messages=conversation.messages(),
+                    )
+                )
+                if not llm_result.tool_calls:
+                    return AgentRunOutput(
+                        run_id=input.run_id,
+                        status="completed",
+                        output={"response": llm_result.content},
+                    )
 
-            # Check for pause/cancel between steps
-            await workflow.wait_condition(lambda: not self._is_paused)
-            if self._should_cancel:
-                return AgentRunOutput(run_id=input.run_id, status="cancelled")
+                conversation.append(
+                    Message(
+                        role="assistant",
+                        content=llm_result.content,
+                        tool_calls=[
+                            {"id": call.id, "name": call.name, "arguments": call.arguments}
+                            for call in llm_result.tool_calls
+                        ],
+                    )
+                )
+                state.pending_tool_calls = llm_result.tool_calls
+                await self._maybe_continue_as_new(input, state)
 
-            # Return successful result
             return AgentRunOutput(
                 run_id=input.run_id,
-                status="completed",
-                output={"response": llm_result.content},
+                status="failed",
+                error=f"Agent did not finish within {max_turns} turns",
             )
 
         except Exception as e:
@@ -102,22 +189,183 @@ class AgentRunWorkflow:
                 error=str(e),
             )
 
+    async def _call_llm(self, call: LLMCallInput) -> LLMCallOutput:
+        """Run the LLM activity on the LLM task queue."""
+        return await workflow.execute_activity(
+            call_llm,
+            call,
+            task_queue=llm_queue(workflow.info().task_queue),
+            start_to_close_timeout=timedelta(minutes=5),
+            heartbeat_timeout=timedelta(minutes=2),
+            retry_policy=RetryPolicy(
+                maximum_attempts=3,
+                initial_interval=timedelta(seconds=1),
+                backoff_coefficient=2.0,
+            ),
+        )
+
+    async def _compact(self, input: AgentRunInput, conversation: Conversation) -> None:
+        """
+        Bring the conversation back under its target before the next LLM call.
+
+        With the "summarize" policy the oldest turns are replaced by a summary
+        from `summary_model` (default: the run's model); if that call fails
+        they are truncated instead.
+        """
+        count = conversation.compaction_size()
+        summary = None
+        policy = CompactionPolicy(input.config.get("context_compaction", CompactionPolicy.TRUNCATE))
+        if policy is CompactionPolicy.SUMMARIZE:
+            try:
+                result = await self._call_llm(
+                    LLMCallInput(
+                        model=input.config.get("summary_model") or input.config.get("model", "gpt-4"),
+                        temperature=0,
+                        max_tokens=max(conversation.max_tokens // 8, 256),
+                        tenant_id=input.tenant_id,
+                        messages=summary_request(conversation, count),
+                    )
+                )
+                summary = result.content
+            except ActivityError as e:
+                workflow.logger.warning(f"Summarizing run {input.run_id} failed, truncating: {e}")
+        conversation.compact(count, summary)
+        workflow.logger.info(
+            f"Compacted {count} messages of run {input.run_id} ({policy.value}); "
+            f"{conversation.total_tokens} tokens remain"
+        )
+
+    def _restore_flags(self, state: AgentRunState) -> None:
+        """Apply carried-over pause/cancel flags unless a signal already updated them."""
+        if self._signalled:
+            # Signals delivered to this run before it started are newer
+            self._should_cancel = self._should_cancel or state.should_cancel
+        else:
+            self._is_paused = state.is_paused
+            self._should_cancel = state.should_cancel
+
+    async def _maybe_continue_as_new(self, input: AgentRunInput, state: AgentRunState) -> None:
+        """Continue as new with `state` if the history has grown past its limits."""
+        info = workflow.info()
+        if not (
+            info.is_continue_as_new_suggested()
+            or info.get_current_history_length() >= input.config.get("max_history_events", 10_000)
+            or info.get_current_history_size() >= input.config.get("max_history_bytes", 10 * 1024 * 1024)
+        ):
+            return
+        await self._continue_as_new(input, state)
+
+    async def _continue_as_new(self, input: AgentRunInput, state: AgentRunState) -> NoReturn:
+        # Let running signal handlers finish, then snapshot the flags they set.
+        # A signal that arrives after this point fails the continue-as-new
+        # command and is delivered to this run first, so none are lost.
+        await workflow.wait_condition(workflow.all_handlers_finished)
+        state = replace(state, is_paused=self._is_paused, should_cancel=self._should_cancel)
+        workflow.logger.info(
+            f"Continuing agent run {input.run_id} as new at turn {state.turn} "
+            f"({workflow.info().get_current_history_length()} history events)"
+        )
+        workflow.continue_as_new(replace(input, state=state))
+
+    async def _proceed(self) -> bool:
+        """Wait while paused; return False if the run should cancel."""
+        if self._is_paused:
+            await self._record_status("paused")
+            await workflow.wait_condition(lambda: not self._is_paused)
+            if not self._should_cancel:
+                await self._record_status("running")
+        return not self._should_cancel
+
+    async def _record_status(
+        self,
+        status: str,
+        *,
+        output: dict[str, Any] | None = None,
+        error: str | None = None,
+    ) -> None:
+        """Publish a status transition; failing to do so never fails the run."""
+        now = workflow.now()
+        # Workflow time keeps versions increasing across continue-as-new
+        self._status_version = max(self._status_version + 1, int(now.timestamp() * 1_000_000))
+        try:
+            await workflow.execute_local_activity(
+                record_run_status,
+                RunStatusInput(
+                    run_id=self._run_id,
+                    status=status,
+                    version=self._status_version,
+                    at=now.isoformat(),
+                    output=output,
+                    error=error,
+                ),
+                start_to_close_timeout=timedelta(seconds=10),
+                retry_policy=RetryPolicy(
+                    maximum_attempts=5,
+                    initial_interval=timedelta(milliseconds=200),
+                ),
+            )
+        except ActivityError as e:
+            workflow.logger.warning(f"Failed to record status {status} for run {self._run_id}: {e}")
+
+    async def _execute_tools(
+        self, tenant_id: str, calls: list[ToolCall], max_parallel: int
+    ) -> list[ToolExecOutput] | None:
+        """
+        Run tool calls in batches of concurrent activities.
+
+        Results are returned in call order. A call that fails becomes an
+        unsuccessful result without affecting the rest of its batch. Pause
+        and cancel are honored between batches; None means cancelled.
+        """
+        results: list[ToolExecOutput] = []
+        for start in range(0, len(calls), max(1, max_parallel)):
+            if start and not await self._proceed():
+                return None
+            batch = calls[start : start + max(1, max_parallel)]
+            outcomes = await asyncio.gather(
+                *(
+                    workflow.execute_activity(
+                        execute_tool,
+                        ToolExecInput(
+                            tool_name=call.name, tool_input=call.arguments, tenant_id=tenant_id
+                        ),
+                        task_queue=tools_queue(workflow.info().task_queue),
+                        # Tool timeouts are enforced by the sandbox and reported in the result
+                        start_to_close_timeout=timedelta(seconds=ToolExecInput.timeout_seconds + 30),
+                        retry_policy=RetryPolicy(maximum_attempts=3),
+                    )
+                    for call in batch
+                ),
+                return_exceptions=True,
+            )
+            for outcome in outcomes:
+                if isinstance(outcome, Exception):
+                    results.append(ToolExecOutput(success=False, error=str(outcome)))
+                elif isinstance(outcome, BaseException):
+                    raise outcome
+                else:
+                    results.append(outcome)
+        return results
+
     @workflow.signal
     async def pause(self) -> None:
         """Signal to pause the workflow."""
         workflow.logger.info("Received pause signal")
+        self._signalled = True
         self._is_paused = True
 
     @workflow.signal
     async def resume(self) -> None:
         """Signal to resume the workflow."""
         workflow.logger.info("Received resume signal")
+        self._signalled = True
         self._is_paused = False
 
     @workflow.signal
     async def cancel(self) -> None:
         """Signal to cancel the workflow."""
         workflow.logger.info("Received cancel signal")
+        self._signalled = True
         self._should_cancel = True
         self._is_paused = False  # Unblock if paused
 
@@ -125,3 +373,35 @@ class AgentRunWorkflow:
     def is_paused(self) -> bool:
         """Query whether the workflow is paused."""
         return self._is_paused
+
+
+def _new_conversation(input: AgentRunInput) -> Conversation:
+    """Start the conversation with the system prompt and task pinned as its prefix."""
+    conversation = Conversation(
+        max_tokens=input.config.get("max_context_tokens", 32_000),
+        tokenizer=input.config.get("tokenizer", "approx"),
+    )
+    if input.config.get("system_prompt"):
+        conversation.pin(Message(role="system", content=input.config["system_prompt"]))
+    conversation.pin(Message(role="user", content=str(input.input.get("prompt", "Hello"))))
+    if input.artifact_ids:
+        conversation.pin(
+            Message(role="user", content=f"Attached artifacts: {', '.join(input.artifact_ids)}")
+        )
+    return conversation
+
+
+def _append_tool_results(
+    conversation: Conversation, calls: list[ToolCall], results: list[ToolExecOutput]
+) -> None:
+    """Add a turn's tool results to the conversation, one message per call."""
+    for call, result in zip(calls, results):
+        outcome = result.result if result.success else {"error": result.error}
+        conversation.append(
+            Message(
+                role="tool",
+                content=json.dumps(outcome, default=str),
+                tool_call_id=call.id,
+                name=call.name,
+            )
+        )
@@ -0,0 +1,111 @@
+"""
+AgentRunWorkflow test harness.
+
+Workflows run against Temporal's time-skipping test server (downloaded on
+first use) with stand-ins for the activities, on the same task queues as
+in production. Each test's histories can then be replayed to check that
+the workflow code is deterministic.
+"""
+
+import dataclasses
+import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import AsyncExitStack
+from typing import Any
+
+import pytest
+from temporalio.client import WorkflowHandle, WorkflowHistory
+from temporalio.converter import DataConverter
+from temporalio.testing import WorkflowEnvironment
+from temporalio.worker import Replayer, Worker
+
+from agent_runtime_core.temporal import OffloadingPayloadCodec, OrjsonPayloadConverter
+from agent_runtime_worker.queues import llm_queue, tools_queue
+from agent_runtime_worker.workflows import AgentRunInput, AgentRunOutput, AgentRunWorkflow
+
+from harness import StubActivities
+
+TASK_QUEUE = "test-agent-run"
+
+# As the worker configures it, minus an object store to offload to
+DATA_CONVERTER = dataclasses.replace(
+    DataConverter.default,
+    payload_converter_class=OrjsonPayloadConverter,
+    payload_codec=OffloadingPayloadCodec(None),
+)
+
+
+@pytest.fixture
+async def env() -> AsyncIterator[WorkflowEnvironment]:
+    async with await WorkflowEnvironment.start_time_skipping(data_converter=DATA_CONVERTER) as env:
+        yield env
+
+
+@pytest.fixture
+async def start_run(
+    env: WorkflowEnvironment,
+) -> AsyncIterator[Callable[..., Awaitable[WorkflowHandle[Any, AgentRunOutput]]]]:
+    """
+    Start an agent run served by the given stubs.
+
+    Workers for the workflow, LLM and tools queues run until the end of
+    the test.
+    """
+    async with AsyncExitStack() as stack:
+
+        async def start(
+            stubs: StubActivities, config: dict[str, Any] | None = None
+        ) -> WorkflowHandle[Any, AgentRunOutput]:
+            for worker in (
+                Worker(
+                    env.client,
+                    task_queue=TASK_QUEUE,
+                    workflows=[AgentRunWorkflow],
+                    activities=[stubs.record_run_status],
+                ),
+                Worker(env.client, task_queue=llm_queue(TASK_QUEUE), activities=[stubs.call_llm]),
+                Worker(env.client, task_queue=tools_queue(TASK_QUEUE), activities=[stubs.execute_tool]),
+            ):
+                await stack.enter_async_context(worker)
+            return await env.client.start_workflow(
+                AgentRunWorkflow.run,
+                AgentRunInput(
+                    run_id=str(uuid.uuid4()),
+                    tenant_id=str(uuid.uuid4()),
+                    agent_id=str(uuid.uuid4()),
+                    agent_version_id=str(uuid.uuid4()),
+                    config=config or {},
+                    input={"prompt": "test"},
+                ),
+                id=f"test-run-{uuid.uuid4()}",
+                task_queue=TASK_QUEUE,
+            )
+
+        yield start
+
+
+@pytest.fixture
+def replay(
+    env: WorkflowEnvironment,
+) -> Callable[[WorkflowHandle[Any, Any]], Awaitable[list[WorkflowHistory]]]:
+    """
+    Replay every run of a finished workflow, following continue-as-new.
+
+    Fails on any nondeterminism; returns the histories, oldest run first.
+    """
+    replayer = Replayer(workflows=[AgentRunWorkflow], data_converter=DATA_CONVERTER)
+
+    async def replay(handle: WorkflowHandle[Any, Any]) -> list[WorkflowHistory]:
+        histories = []
+        run_id = handle.first_execution_run_id or handle.result_run_id
+        while run_id:
+            history = await env.client.get_workflow_handle(handle.id, run_id=run_id).fetch_history()
+            await replayer.replay_workflow(history)
+            histories.append(history)
+            last = history.events[-1]
+            run_id = None
+            if last.HasField("workflow_execution_continued_as_new_event_attributes"):
+                run_id = last.workflow_execution_continued_as_new_event_attributes.new_execution_run_id
+        return histories
+
+    return replay
@@ -0,0 +1,59 @@
+"""Activity stand-ins, served under their real names, and helpers for workflow tests."""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+
+from temporalio import activity
+
+from agent_runtime_worker.activities import (
+    LLMCallInput,
+    LLMCallOutput,
+    RunStatusInput,
+    ToolExecInput,
+    ToolExecOutput,
+)
+
+
+async def echo(input: ToolExecInput) -> ToolExecOutput:
+    return ToolExecOutput(success=True, result=input.tool_input)
+
+
+class StubActivities:
+    """
+    Stand-ins for call_llm, execute_tool and record_run_status.
+
+    `llm` and `tool` decide what each call returns; every call is recorded,
+    and the run's status transitions are kept in order.
+    """
+
+    def __init__(
+        self,
+        llm: Callable[[LLMCallInput], Awaitable[LLMCallOutput]],
+        tool: Callable[[ToolExecInput], Awaitable[ToolExecOutput]] = echo,
+    ) -> None:
+        self.llm = llm
+        self.tool = tool
+        self.llm_calls: list[LLMCallInput] = []
+        self.tool_calls: list[ToolExecInput] = []
+        self.statuses: list[str] = []
+
+    @activity.defn(name="call_llm")
+    async def call_llm(self, input: LLMCallInput) -> LLMCallOutput:
+        self.llm_calls.append(input)
+        return await self.llm(input)
+
+    @activity.defn(name="execute_tool")
+    async def execute_tool(self, input: ToolExecInput) -> ToolExecOutput:
+        self.tool_calls.append(input)
+        return await self.tool(input)
+
+    @activity.defn(name="record_run_status")
+    async def record_run_status(self, input: RunStatusInput) -> None:
+        self.statuses.append(input.status)
+
+
+async def wait_for(condition: Callable[[], Awaitable[bool]], timeout: float = 10) -> None:
+    """Poll `condition` until it holds."""
+    async with asyncio.timeout(timeout):
+        while not await condition():
+            await asyncio.sleep(0.05)
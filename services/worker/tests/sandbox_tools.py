@@ -0,0 +1,49 @@
+"""Tools for the sandbox pool tests, loaded into the sandbox processes."""
+
+import os
+import resource
+import time
+
+from agent_runtime_worker.tools import tool
+
+# Kept alive so a process's resident memory stays grown between calls
+_held: list[bytes] = []
+
+
+@tool()
+def sandbox_pid(sleep: float = 0) -> int:
+    """The process running the call, optionally after sleeping."""
+    time.sleep(sleep)
+    return os.getpid()
+
+
+@tool()
+def sandbox_hold(megabytes: int) -> int:
+    """Grow resident memory by `megabytes` and keep it."""
+    _held.append(b"x" * (megabytes * 1024 * 1024))
+    return os.getpid()
+
+
+@tool()
+def sandbox_allocate(megabytes: int) -> int:
+    """Allocate `megabytes` for the length of the call."""
+    return len(b"x" * (megabytes * 1024 * 1024))
+
+
+@tool()
+def sandbox_limits() -> tuple[int, int]:
+    """The soft CPU and address-space limits the call runs under."""
+    return resource.getrlimit(resource.RLIMIT_CPU)[0], resource.getrlimit(resource.RLIMIT_AS)[0]
+
+
+@tool()
+def sandbox_spin() -> None:
+    """Burn CPU until stopped."""
+    while True:
+        pass
+
+
+@tool(tenant_scoped=True)
+def sandbox_tenant(tenant_id: str) -> str:
+    """The tenant the call was made for."""
+    return tenant_id
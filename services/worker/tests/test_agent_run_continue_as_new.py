@@ -0,0 +1,141 @@
+"""Continue-as-new in AgentRunWorkflow: bounded history per run, and no lost signals."""
+
+from temporalio import activity
+
+from agent_runtime_worker.activities import (
+    LLMCallInput,
+    LLMCallOutput,
+    ToolCall,
+    ToolExecInput,
+    ToolExecOutput,
+)
+from agent_runtime_worker.workflows import AgentRunWorkflow
+
+from harness import StubActivities, echo, wait_for
+
+MAX_HISTORY_EVENTS = 200
+MAX_HISTORY_BYTES = 256 * 1024
+# The limits are checked after each LLM call and each tool batch, so a run
+# can pass them by one step's events, plus its continue-as-new
+STEP_EVENTS = 10
+
+
+def tool_loop(turns: int):
+    """An LLM that requests one tool call per turn, and answers after `turns` of them."""
+
+    async def llm(input: LLMCallInput) -> LLMCallOutput:
+        # Tool call IDs carry the turn; older results may have been compacted away
+        last = next((m for m in reversed(input.messages or []) if m.role == "tool"), None)
+        done = int(last.tool_call_id.split("-")[1]) + 1 if last else 0
+        if done >= turns:
+            return LLMCallOutput(content="finished", model=input.model)
+        return LLMCallOutput(
+            content=f"turn {done}",
+            model=input.model,
+            tool_calls=[ToolCall(id=f"call-{done}", name="echo", arguments={"turn": done})],
+        )
+
+    return llm
+
+
+async def test_history_stays_bounded_over_1000_turns(start_run, replay):
+    turns = 1000
+    stubs = StubActivities(tool_loop(turns))
+    handle = await start_run(
+        stubs,
+        {
+            "max_turns": turns + 1,
+            "max_history_events": MAX_HISTORY_EVENTS,
+            "max_history_bytes": MAX_HISTORY_BYTES,
+            "max_context_tokens": 2000,
+        },
+    )
+    result = await handle.result()
+
+    assert result.status == "completed"
+    assert result.output == {"response": "finished"}
+    assert [call.tool_input["turn"] for call in stubs.tool_calls] == list(range(turns))
+
+    histories = await replay(handle)
+    # Each run replays a few hundred events, however many turns came before
+    assert len(histories) >= 10
+    for history in histories:
+        assert len(history.events) <= MAX_HISTORY_EVENTS + STEP_EVENTS
+        assert sum(event.ByteSize() for event in history.events) <= MAX_HISTORY_BYTES
+
+
+def signal_on_turn(turn: int, signal, signalled_runs: list[str], client):
+    """A tool that sends `signal` to the workflow while running `turn`."""
+
+    async def tool(input: ToolExecInput) -> ToolExecOutput:
+        if input.tool_input["turn"] == turn:
+            info = activity.info()
+            signalled_runs.append(info.workflow_run_id)
+            # Not addressed to a run, as the API sends it; recorded before this result
+            await client.get_workflow_handle(info.workflow_id).signal(signal)
+        return await echo(input)
+
+    return tool
+
+
+async def test_cancel_is_carried_into_the_next_run(env, start_run, replay):
+    signalled_runs: list[str] = []
+    stubs = StubActivities(
+        tool_loop(5), signal_on_turn(2, AgentRunWorkflow.cancel, signalled_runs, env.client)
+    )
+    # Every step continues as new, right after the signal is handled
+    handle = await start_run(stubs, {"max_history_events": 1})
+    result = await handle.result()
+
+    assert result.status == "cancelled"
+    assert [call.tool_input["turn"] for call in stubs.tool_calls] == [0, 1, 2]
+    assert (await handle.describe()).run_id != signalled_runs[0]
+    assert stubs.statuses == ["running", "cancelled"]
+    await replay(handle)
+
+
+async def test_pause_is_carried_into_the_next_run(env, start_run, replay):
+    signalled_runs: list[str] = []
+    stubs = StubActivities(
+        tool_loop(5), signal_on_turn(2, AgentRunWorkflow.pause, signalled_runs, env.client)
+    )
+    handle = await start_run(stubs, {"max_history_events": 1})
+
+    async def paused() -> bool:
+        return "paused" in stubs.statuses and await handle.query(AgentRunWorkflow.is_paused)
+
+    await wait_for(paused)
+    assert (await handle.describe()).run_id != signalled_runs[0]
+    assert len(stubs.tool_calls) == 3
+
+    await handle.signal(AgentRunWorkflow.resume)
+    result = await handle.result()
+
+    assert result.status == "completed"
+    assert [call.tool_input["turn"] for call in stubs.tool_calls] == list(range(5))
+    assert stubs.statuses == ["running", "paused", "running", "completed"]
+    await replay(handle)
+
+
+async def test_signal_sent_while_continuing_as_new_is_not_lost(start_run, replay):
+    stubs = StubActivities(tool_loop(30))
+    handle = await start_run(stubs, {"max_turns": 31, "max_history_events": 1})
+
+    async def started() -> bool:
+        return len(stubs.tool_calls) >= 5
+
+    # Runs continue as new after every step, so the signal races one
+    await wait_for(started)
+    await handle.signal(AgentRunWorkflow.pause)
+
+    async def paused() -> bool:
+        return "paused" in stubs.statuses
+
+    await wait_for(paused)
+    assert await handle.query(AgentRunWorkflow.is_paused)
+    await handle.signal(AgentRunWorkflow.resume)
+    result = await handle.result()
+
+    assert result.status == "completed"
+    assert [call.tool_input["turn"] for call in stubs.tool_calls] == list(range(30))
+    await replay(handle)
@@ -0,0 +1,136 @@
+"""Tool call fan-out in AgentRunWorkflow, and that it replays deterministically."""
+
+import asyncio
+import json
+
+from temporalio import activity
+from temporalio.exceptions import ApplicationError
+
+from agent_runtime_worker.activities import (
+    LLMCallInput,
+    LLMCallOutput,
+    ToolCall,
+    ToolExecInput,
+    ToolExecOutput,
+)
+from agent_runtime_worker.workflows import AgentRunWorkflow
+
+from harness import StubActivities, echo, wait_for
+
+
+def request_tools(calls: list[ToolCall]):
+    """An LLM that requests `calls` on its first turn and answers on the next."""
+
+    async def llm(input: LLMCallInput) -> LLMCallOutput:
+        if any(m.role == "tool" for m in input.messages or []):
+            return LLMCallOutput(content="done", model=input.model)
+        return LLMCallOutput(content="", model=input.model, tool_calls=calls)
+
+    return llm
+
+
+def tool_results(stubs: StubActivities) -> list[tuple[str, dict]]:
+    """The tool messages the LLM was given on its last call, in order."""
+    return [
+        (m.tool_call_id, json.loads(m.content))
+        for m in stubs.llm_calls[-1].messages
+        if m.role == "tool"
+    ]
+
+
+async def test_parallel_tool_results_keep_call_order(start_run, replay):
+    calls = [ToolCall(id=f"call-{i}", name="echo", arguments={"i": i}) for i in range(5)]
+    running = peak = 0
+
+    async def tool(input: ToolExecInput) -> ToolExecOutput:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        # Later calls in a batch finish first
+        await asyncio.sleep(0.1 * (5 - input.tool_input["i"]))
+        running -= 1
+        return await echo(input)
+
+    stubs = StubActivities(request_tools(calls), tool)
+    handle = await start_run(stubs, {"max_parallel_tools": 2})
+    result = await handle.result()
+
+    assert result.status == "completed"
+    assert peak == 2
+    assert tool_results(stubs) == [(f"call-{i}", {"i": i}) for i in range(5)]
+    await replay(handle)
+
+
+async def test_failing_tool_does_not_fail_the_others(start_run, replay):
+    calls = [
+        ToolCall(id="call-0", name="echo", arguments={"i": 0}),
+        ToolCall(id="call-1", name="broken", arguments={"i": 1}),
+        ToolCall(id="call-2", name="echo", arguments={"i": 2}),
+    ]
+
+    async def tool(input: ToolExecInput) -> ToolExecOutput:
+        if input.tool_name == "broken":
+            raise ApplicationError("tool crashed", non_retryable=True)
+        await asyncio.sleep(0.2)
+        return await echo(input)
+
+    stubs = StubActivities(request_tools(calls), tool)
+    handle = await start_run(stubs)
+    result = await handle.result()
+
+    assert result.status == "completed"
+    assert sorted(call.tool_name for call in stubs.tool_calls) == ["broken", "echo", "echo"]
+    results = tool_results(stubs)
+    assert [call_id for call_id, _ in results] == ["call-0", "call-1", "call-2"]
+    assert results[0][1] == {"i": 0}
+    assert set(results[1][1]) == {"error"}
+    assert results[2][1] == {"i": 2}
+    await replay(handle)
+
+
+async def test_cancel_between_tool_batches(env, start_run, replay):
+    calls = [ToolCall(id=f"call-{i}", name="echo", arguments={"i": i}) for i in range(3)]
+
+    async def tool(input: ToolExecInput) -> ToolExecOutput:
+        # Recorded in history before this batch's result
+        await env.client.get_workflow_handle(activity.info().workflow_id).signal(AgentRunWorkflow.cancel)
+        return await echo(input)
+
+    stubs = StubActivities(request_tools(calls), tool)
+    handle = await start_run(stubs, {"max_parallel_tools": 1})
+    result = await handle.result()
+
+    assert result.status == "cancelled"
+    assert [call.tool_input["i"] for call in stubs.tool_calls] == [0]
+    assert len(stubs.llm_calls) == 1
+    assert stubs.statuses == ["running", "cancelled"]
+    await replay(handle)
+
+
+async def test_pause_between_tool_batches(env, start_run, replay):
+    calls = [ToolCall(id=f"call-{i}", name="echo", arguments={"i": i}) for i in range(3)]
+
+    async def tool(input: ToolExecInput) -> ToolExecOutput:
+        if input.tool_input["i"] == 0:
+            await env.client.get_workflow_handle(activity.info().workflow_id).signal(AgentRunWorkflow.pause)
+        return await echo(input)
+
+    stubs = StubActivities(request_tools(calls), tool)
+    handle = await start_run(stubs, {"max_parallel_tools": 1})
+
+    async def paused() -> bool:
+        return "paused" in stubs.statuses and await handle.query(AgentRunWorkflow.is_paused)
+
+    await wait_for(paused)
+    # Give the workflow the chance to (wrongly) start the next batch
+    await asyncio.sleep(0.5)
+    assert [call.tool_input["i"] for call in stubs.tool_calls] == [0]
+
+    await handle.signal(AgentRunWorkflow.resume)
+    result = await handle.result()
+
+    assert result.status == "completed"
+    assert [call.tool_input["i"] for call in stubs.tool_calls] == [0, 1, 2]
+    assert tool_results(stubs) == [(f"call-{i}", {"i": i}) for i in range(3)]
+    assert stubs.statuses == ["running", "paused", "running", "completed"]
+    await replay(handle)
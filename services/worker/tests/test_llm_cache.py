@@ -0,0 +1,129 @@
+"""Coalescing of concurrent misses in the LLM response cache, and its metrics."""
+
+import asyncio
+import socket
+
+import httpx
+import pytest
+from temporalio.runtime import PrometheusConfig, Runtime, TelemetryConfig
+
+from agent_runtime_worker import metrics
+from agent_runtime_worker.llm import LLMCallInput, LLMCallOutput, LLMResponseCache
+
+CALL = LLMCallInput(prompt="hello", temperature=0, tenant_id="tenant")
+
+
+async def test_followers_get_the_leaders_output_as_cached():
+    cache = LLMResponseCache()
+    release = asyncio.Event()
+    calls = 0
+
+    async def call() -> LLMCallOutput:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return LLMCallOutput(content="hi", model="gpt-4", usage={"total_tokens": 3})
+
+    leader = asyncio.create_task(cache.get_or_call(CALL, call))
+    await asyncio.sleep(0)
+    followers = [asyncio.create_task(cache.get_or_call(CALL, call)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert not (await leader).cached
+    for output in await asyncio.gather(*followers):
+        assert output.cached
+        assert output.content == "hi"
+    assert calls == 1
+    assert cache.stats.coalesced == 3
+
+
+async def test_followers_call_again_when_the_leader_is_cancelled():
+    cache = LLMResponseCache()
+    started = asyncio.Event()
+    calls = 0
+
+    async def call() -> LLMCallOutput:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            started.set()
+            await asyncio.Event().wait()
+        return LLMCallOutput(content="hi", model="gpt-4")
+
+    leader = asyncio.create_task(cache.get_or_call(CALL, call))
+    await started.wait()
+    followers = [asyncio.create_task(cache.get_or_call(CALL, call)) for _ in range(2)]
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    outputs = await asyncio.gather(*followers)
+    assert [output.content for output in outputs] == ["hi", "hi"]
+    # One follower took over as leader; the other coalesced onto it
+    assert sorted(output.cached for output in outputs) == [False, True]
+    assert calls == 2
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+
+async def test_cancelled_follower_does_not_cancel_the_leader():
+    cache = LLMResponseCache()
+    release = asyncio.Event()
+
+    async def call() -> LLMCallOutput:
+        await release.wait()
+        return LLMCallOutput(content="hi", model="gpt-4")
+
+    leader = asyncio.create_task(cache.get_or_call(CALL, call))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(cache.get_or_call(CALL, call))
+    await asyncio.sleep(0)
+    follower.cancel()
+    release.set()
+
+    with pytest.raises(asyncio.CancelledError):
+        await follower
+    assert (await leader).content == "hi"
+
+
+@pytest.fixture
+def metrics_url(monkeypatch):
+    """Worker metrics bound to a runtime serving Prometheus on a free local port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    address = f"127.0.0.1:{port}"
+    runtime = Runtime(telemetry=TelemetryConfig(metrics=PrometheusConfig(bind_address=address)))
+    monkeypatch.setattr(metrics, "_metrics", metrics.WorkerMetrics(runtime.metric_meter))
+    # The endpoint is served only while the runtime is alive
+    yield f"http://{address}/metrics"
+    del runtime
+
+
+def sample(exported: str, name: str, **labels: str) -> float:
+    """Value of the exported series `name` carrying `labels`, among any others."""
+    for line in exported.splitlines():
+        series, _, value = line.rpartition(" ")
+        if series.split("{")[0] == name and all(f'{k}="{v}"' in series for k, v in labels.items()):
+            return float(value)
+    raise AssertionError(f"{name} {labels} not exported")
+
+
+async def test_lookups_are_exported_as_worker_metrics(metrics_url):
+    cache = LLMResponseCache(max_entries=1)
+
+    async def call() -> LLMCallOutput:
+        return LLMCallOutput(content="hi", model="gpt-4")
+
+    await cache.get_or_call(CALL, call)
+    await cache.get_or_call(CALL, call)
+    await cache.get_or_call(LLMCallInput(prompt="other", temperature=0), call)
+    await cache.get_or_call(LLMCallInput(prompt="hello", temperature=0.7), call)
+
+    async with httpx.AsyncClient(trust_env=False) as client:
+        exported = (await client.get(metrics_url)).text
+    assert sample(exported, "agent_llm_cache_lookups", result="miss") == 2
+    assert sample(exported, "agent_llm_cache_lookups", result="local_hit") == 1
+    assert sample(exported, "agent_llm_cache_lookups", result="bypassed") == 1
+    assert sample(exported, "agent_llm_cache_latency_count", result="local_hit") == 1
+    assert sample(exported, "agent_llm_cache_evictions") == 1
@@ -0,0 +1,69 @@
+"""call_llm heartbeats while it waits on a batch or a coalesced call."""
+
+import asyncio
+import dataclasses
+from datetime import timedelta
+
+import pytest
+from temporalio.testing import ActivityEnvironment
+
+from agent_runtime_worker.activities import llm_call
+from agent_runtime_worker.llm import LLMCallInput, LLMCallOutput, LLMResponseCache
+
+
+class SlowBatcher:
+    """Answers each call after `delay`, as a batch that waits for a full window would."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+
+    async def submit(self, input: LLMCallInput, deadline: float | None = None) -> LLMCallOutput:
+        await asyncio.sleep(self.delay)
+        return LLMCallOutput(content="batched", model=input.model)
+
+
+@pytest.fixture
+def cache(monkeypatch) -> LLMResponseCache:
+    cache = LLMResponseCache()
+    monkeypatch.setattr(llm_call, "get_llm_cache", lambda: cache)
+    return cache
+
+
+def activity_env(heartbeats: list) -> ActivityEnvironment:
+    env = ActivityEnvironment()
+    env.info = dataclasses.replace(
+        env.info, heartbeat_timeout=timedelta(seconds=0.2), start_to_close_timeout=None
+    )
+    env.on_heartbeat = lambda *details: heartbeats.append(details)
+    return env
+
+
+async def test_heartbeats_while_waiting_for_a_batch(monkeypatch, cache):
+    monkeypatch.setattr(llm_call, "should_batch", lambda input: True)
+    monkeypatch.setattr(llm_call, "get_batcher", lambda: SlowBatcher(0.5))
+    heartbeats: list = []
+
+    output = await activity_env(heartbeats).run(llm_call.call_llm, LLMCallInput(prompt="hi"))
+
+    assert output.content == "batched"
+    # Every 50ms with the call parked on the batcher
+    assert len(heartbeats) >= 5
+
+
+async def test_heartbeats_while_following_a_coalesced_call(cache):
+    input = LLMCallInput(prompt="hi", temperature=0)
+
+    async def slow_call() -> LLMCallOutput:
+        await asyncio.sleep(0.5)
+        return LLMCallOutput(content="shared", model=input.model)
+
+    leader = asyncio.create_task(cache.get_or_call(input, slow_call))
+    await asyncio.sleep(0)
+    heartbeats: list = []
+
+    output = await activity_env(heartbeats).run(llm_call.call_llm, input)
+
+    assert output.content == "shared"
+    assert output.cached
+    assert len(heartbeats) >= 5
+    await leader
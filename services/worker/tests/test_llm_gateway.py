@@ -0,0 +1,125 @@
+"""Admission in the provider gateway: token buckets and the concurrency limiter."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from agent_runtime_worker.llm.gateway import (
+    AdaptiveConcurrencyLimiter,
+    DeadlineExceededError,
+    EndpointConfig,
+    ProviderGateway,
+    TokenBucket,
+)
+
+
+@pytest.fixture
+async def gateway():
+    """One request and one token per second, one concurrent call, answered locally."""
+    config = EndpointConfig(
+        base_url="http://provider.test",
+        requests_per_minute=60,
+        tokens_per_minute=60,
+        initial_concurrency=1,
+    )
+    gateway = ProviderGateway(config, transport=httpx.MockTransport(lambda request: httpx.Response(200)))
+    yield gateway
+    await gateway.close()
+
+
+async def call(gateway: ProviderGateway, estimated_tokens: int = 0, within: float = 0.05) -> int:
+    deadline = time.monotonic() + within
+    async with gateway.stream("POST", "chat", estimated_tokens=estimated_tokens, deadline=deadline) as response:
+        return response.status_code
+
+
+async def test_limiter_takes_a_free_slot_past_the_deadline():
+    limiter = AdaptiveConcurrencyLimiter(1)
+
+    await limiter.acquire(deadline=time.monotonic() - 1)
+
+    assert limiter.in_flight == 1
+
+
+async def test_limiter_rejects_a_waiter_whose_deadline_passes():
+    limiter = AdaptiveConcurrencyLimiter(1)
+    await limiter.acquire()
+
+    with pytest.raises(DeadlineExceededError):
+        await limiter.acquire(deadline=time.monotonic() + 0.05)
+    await limiter.release()
+    await limiter.acquire(deadline=time.monotonic() - 1)
+
+
+async def test_bucket_rejects_callers_behind_a_queue_longer_than_their_deadline():
+    bucket = TokenBucket(rate=10, capacity=1)
+    await bucket.acquire(1)
+    start = time.monotonic()
+    # Reserves the next token, due 0.1s from now
+    first = asyncio.create_task(bucket.acquire(1))
+    await asyncio.sleep(0)
+
+    # Would get its token 0.2s from now, after the one queued ahead of it
+    with pytest.raises(DeadlineExceededError):
+        await bucket.acquire(1, deadline=start + 0.15)
+    assert time.monotonic() - start < 0.05
+
+    await bucket.acquire(1, deadline=start + 0.3)
+    assert first.done()
+    assert 0.15 < time.monotonic() - start < 0.3
+
+
+async def test_bucket_rejects_without_waiting_behind_a_sleeping_caller():
+    bucket = TokenBucket(rate=1, capacity=1)
+    await bucket.acquire(1)
+    sleeper = asyncio.create_task(bucket.acquire(1))
+    await asyncio.sleep(0)
+
+    with pytest.raises(DeadlineExceededError):
+        await asyncio.wait_for(bucket.acquire(1, deadline=time.monotonic() + 0.5), 0.1)
+    sleeper.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await sleeper
+
+
+async def test_cancelled_waiter_gives_back_its_tokens():
+    bucket = TokenBucket(rate=10, capacity=1)
+    await bucket.acquire(1)
+    waiter = asyncio.create_task(bucket.acquire(1))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    start = time.monotonic()
+    await bucket.acquire(1)
+    assert time.monotonic() - start < 0.15
+
+
+async def test_bucket_charges_requests_larger_than_its_capacity_in_full():
+    bucket = TokenBucket(rate=1000, capacity=10)
+    start = time.monotonic()
+
+    for _ in range(3):
+        await bucket.acquire(100)
+
+    # 300 tokens at 1000/s, less the 10 the bucket started with
+    assert time.monotonic() - start >= 0.27
+
+
+async def test_request_budget_is_refunded_when_the_token_budget_misses_the_deadline(gateway):
+    with pytest.raises(DeadlineExceededError):
+        await call(gateway, estimated_tokens=5)
+
+    assert await call(gateway) == 200
+
+
+async def test_budgets_are_refunded_when_no_concurrency_slot_frees_in_time(gateway):
+    await gateway.limiter.acquire()
+    with pytest.raises(DeadlineExceededError):
+        await call(gateway, estimated_tokens=1)
+    await gateway.limiter.release()
+
+    assert await call(gateway, estimated_tokens=1) == 200
@@ -0,0 +1,233 @@
+"""Token streaming from call_llm, against a local fake streaming provider."""
+
+import asyncio
+import dataclasses
+import hashlib
+import uuid
+from collections.abc import AsyncIterator
+from datetime import timedelta
+
+import pytest
+from temporalio.testing import ActivityEnvironment
+
+from agent_runtime_core.models import RunEvent
+from agent_runtime_worker.activities import llm_call
+from agent_runtime_worker.llm import LLMCallInput, LLMProvider, StreamChunk, ToolCall
+from agent_runtime_worker.llm.streaming import DELTA_EVENT, DONE_EVENT, RESET_EVENT, TokenRelay
+
+RUN_ID = str(uuid.uuid4())
+CALL = LLMCallInput(prompt="hello", run_id=RUN_ID)
+
+
+class ProviderFailed(Exception):
+    pass
+
+
+class FakeProvider(LLMProvider):
+    """Streams scripted chunks with a pause before each, failing after `fail_after` if set."""
+
+    def __init__(
+        self, chunks: list[StreamChunk], *, delay: float = 0.06, fail_after: int | None = None
+    ) -> None:
+        self.chunks = chunks
+        self.delay = delay
+        self.fail_after = fail_after
+
+    async def stream(self, input: LLMCallInput, deadline: float | None = None) -> AsyncIterator[StreamChunk]:
+        for i, chunk in enumerate(self.chunks):
+            if i == self.fail_after:
+                raise ProviderFailed
+            # Longer than the relay's flush interval, so each chunk is published on its own
+            await asyncio.sleep(self.delay)
+            yield chunk
+
+
+def text_chunks(*parts: str) -> list[StreamChunk]:
+    return [StreamChunk(text=part) for part in parts]
+
+
+class FakePublisher:
+    def __init__(self) -> None:
+        self.events: list[RunEvent] = []
+
+    async def publish(self, event: RunEvent) -> str:
+        self.events.append(event)
+        return f"{len(self.events)}-0"
+
+    def of_attempt(self, attempt: int) -> list[tuple[str, dict]]:
+        return [
+            (event.event_type, {k: v for k, v in event.data.items() if k != "attempt"})
+            for event in self.events
+            if event.data["attempt"] == attempt
+        ]
+
+
+class FakeSink:
+    def __init__(self) -> None:
+        self.events: list[RunEvent] = []
+
+    async def emit(self, event: RunEvent) -> None:
+        self.events.append(event)
+
+
+class BrokenPublisher:
+    async def publish(self, event: RunEvent) -> str:
+        raise ConnectionError("redis is down")
+
+
+class Attempt:
+    """One activity attempt of call_llm's streaming path, recording its heartbeats."""
+
+    def __init__(self, attempt: int = 1, heartbeat_details: list | None = None) -> None:
+        self.env = ActivityEnvironment()
+        self.env.info = dataclasses.replace(
+            self.env.info,
+            attempt=attempt,
+            heartbeat_details=heartbeat_details or [],
+            start_to_close_timeout=None,
+        )
+        self.heartbeats: list = []
+        self.env.on_heartbeat = lambda *details: self.heartbeats.append(details)
+
+    async def run(self, publisher: FakePublisher, sink: FakeSink | None = None):
+        async def stream():
+            relay = TokenRelay.for_activity(publisher, RUN_ID, sink)
+            output = await llm_call._stream_completion(CALL, relay)
+            await relay.finish()
+            return output
+
+        return await self.env.run(stream)
+
+
+@pytest.fixture
+def use_provider(monkeypatch):
+    def use(provider: LLMProvider) -> None:
+        monkeypatch.setattr(llm_call, "get_provider", lambda: provider)
+
+    return use
+
+
+def digest(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+async def test_stream_publishes_deltas_then_one_done_event(use_provider):
+    use_provider(FakeProvider(text_chunks("Hel", "lo ", "world")))
+    publisher = FakePublisher()
+    attempt = Attempt()
+
+    output = await attempt.run(publisher)
+
+    assert output.content == "Hello world"
+    assert publisher.of_attempt(1) == [
+        (DELTA_EVENT, {"text": "Hel", "offset": 0}),
+        (DELTA_EVENT, {"text": "lo ", "offset": 3}),
+        (DELTA_EVENT, {"text": "world", "offset": 6}),
+        (DONE_EVENT, {"length": 11}),
+    ]
+    assert attempt.heartbeats[-1] == ((11, digest("Hello world")),)
+
+
+async def test_retry_skips_chunks_clients_already_have(use_provider):
+    publisher = FakePublisher()
+    first = Attempt()
+    use_provider(FakeProvider(text_chunks("Hel", "lo ", "wor", "ld"), fail_after=3))
+    with pytest.raises(ProviderFailed):
+        await first.run(publisher)
+    assert first.heartbeats[-1] == ((9, digest("Hello wor")),)
+
+    use_provider(FakeProvider(text_chunks("Hel", "lo ", "wor", "ld")))
+    second = Attempt(attempt=2, heartbeat_details=list(first.heartbeats[-1]))
+    output = await second.run(publisher)
+
+    assert output.content == "Hello world"
+    assert publisher.of_attempt(2) == [
+        (DELTA_EVENT, {"text": "ld", "offset": 9}),
+        (DONE_EVENT, {"length": 11}),
+    ]
+    deltas = [event.data["text"] for event in publisher.events if event.event_type == DELTA_EVENT]
+    assert "".join(deltas) == "Hello world"
+
+
+async def test_retry_that_diverges_resets_clients(use_provider):
+    publisher = FakePublisher()
+    first = Attempt()
+    use_provider(FakeProvider(text_chunks("Hel", "lo ", "wor", "ld"), fail_after=3))
+    with pytest.raises(ProviderFailed):
+        await first.run(publisher)
+
+    use_provider(FakeProvider(text_chunks("Goo", "dbye ", "world", "!")))
+    second = Attempt(attempt=2, heartbeat_details=list(first.heartbeats[-1]))
+    output = await second.run(publisher)
+
+    assert output.content == "Goodbye world!"
+    assert publisher.of_attempt(2) == [
+        (RESET_EVENT, {"text": "Goodbye world"}),
+        (DELTA_EVENT, {"text": "!", "offset": 13}),
+        (DONE_EVENT, {"length": 14}),
+    ]
+
+
+async def test_retry_heartbeats_keep_earlier_progress_until_caught_up(use_provider):
+    publisher = FakePublisher()
+    details = [(9, digest("Hello wor"))]
+    # Heartbeats on a timer while the retry is still behind what clients have
+    use_provider(FakeProvider(text_chunks("Hel", "lo", " wor"), delay=0.2, fail_after=2))
+    attempt = Attempt(attempt=2, heartbeat_details=details)
+    attempt.env.info = dataclasses.replace(attempt.env.info, heartbeat_timeout=timedelta(seconds=0.2))
+    with pytest.raises(ProviderFailed):
+        await attempt.run(publisher)
+
+    assert attempt.heartbeats
+    assert all(heartbeat == (details[0],) for heartbeat in attempt.heartbeats)
+    assert publisher.events == []
+
+
+async def test_heartbeats_while_waiting_for_tool_calls(use_provider):
+    call = ToolCall(id="call-0", name="echo", arguments={})
+    use_provider(FakeProvider([StreamChunk(tool_calls=[call])], delay=0.5))
+    publisher = FakePublisher()
+    attempt = Attempt()
+    attempt.env.info = dataclasses.replace(attempt.env.info, heartbeat_timeout=timedelta(seconds=0.2))
+
+    output = await attempt.run(publisher)
+
+    assert output.tool_calls == [call]
+    # Every 50ms with no text flowing at all
+    assert len(attempt.heartbeats) >= 5
+    assert publisher.of_attempt(1) == [(DONE_EVENT, {"length": 0})]
+
+
+async def test_finish_publishes_one_done_event():
+    publisher = FakePublisher()
+
+    async def stream():
+        relay = TokenRelay.for_activity(publisher, RUN_ID)
+        await relay.push("hi")
+        await relay.finish()
+        await relay.finish()
+
+    await ActivityEnvironment().run(stream)
+
+    assert [event.event_type for event in publisher.events] == [DELTA_EVENT, DONE_EVENT]
+
+
+async def test_published_events_are_also_stored(use_provider):
+    use_provider(FakeProvider(text_chunks("Hel", "lo")))
+    publisher, sink = FakePublisher(), FakeSink()
+
+    await Attempt().run(publisher, sink)
+
+    assert [event.event_type for event in sink.events] == [DELTA_EVENT, DELTA_EVENT, DONE_EVENT]
+    assert sink.events == publisher.events
+
+
+async def test_events_are_stored_when_live_publishing_fails(use_provider):
+    use_provider(FakeProvider(text_chunks("Hel", "lo")))
+    sink = FakeSink()
+
+    output = await Attempt().run(BrokenPublisher(), sink)
+
+    assert output.content == "Hello"
+    assert "".join(event.data.get("text", "") for event in sink.events) == "Hello"
+    assert sink.events[-1].event_type == DONE_EVENT
@@ -0,0 +1,91 @@
+"""The memory tools: one memory per tenant, whichever tenant the model names."""
+
+import shutil
+import uuid
+from pathlib import Path
+
+import pytest
+from temporalio.testing import ActivityEnvironment
+
+pytest.importorskip("numpy")
+
+from agent_runtime_core.memory import MemorySnapshotter, store
+from agent_runtime_core.storage import get_object_store
+from agent_runtime_core.utils import get_settings
+from agent_runtime_worker.activities import ToolExecInput, execute_tool
+from agent_runtime_worker.sandbox import SandboxPool, pool
+from agent_runtime_worker.tools.memory import memory_search, memory_store
+
+
+def reset() -> None:
+    get_settings.cache_clear()
+    get_object_store.cache_clear()
+    store._memories.clear()
+
+
+@pytest.fixture
+def memory_root(tmp_path, monkeypatch) -> Path:
+    monkeypatch.setenv("MEMORY_LOCAL_PATH", str(tmp_path / "memory"))
+    monkeypatch.setenv("OBJECT_STORE_BACKEND", "local")
+    monkeypatch.setenv("OBJECT_STORE_LOCAL_PATH", str(tmp_path / "objects"))
+    reset()
+    yield tmp_path / "memory"
+    reset()
+
+
+async def test_each_tenant_searches_only_its_own_memory(memory_root):
+    ours, theirs = str(uuid.uuid4()), str(uuid.uuid4())
+    stored = await memory_store(ours, "the deploy key rotates every friday", {"source": "runbook"})
+    await memory_store(theirs, "the deploy key is kept in the vault")
+
+    [hit] = await memory_search(ours, "when does the deploy key rotate")
+    assert hit["id"] == stored["id"]
+    assert hit["text"] == "the deploy key rotates every friday"
+    assert hit["metadata"] == {"source": "runbook"}
+    assert [h["text"] for h in await memory_search(theirs, "deploy key", k=10)] == [
+        "the deploy key is kept in the vault"
+    ]
+    assert sorted(p.name for p in memory_root.iterdir()) == sorted([ours, theirs])
+    assert await memory_search(str(uuid.uuid4()), "deploy key") == []
+
+
+async def test_tenant_ids_must_be_uuids(memory_root):
+    with pytest.raises(ValueError):
+        await memory_store("../shared", "escaped")
+    assert not memory_root.exists() or not any(memory_root.iterdir())
+
+
+async def test_memory_missing_locally_is_restored_from_its_snapshot(memory_root):
+    tenant = str(uuid.uuid4())
+    await memory_store(tenant, "the staging database is called hermes")
+    assert await MemorySnapshotter(memory_root, interval=0).snapshot_all() == 1
+
+    # As on a fresh node
+    shutil.rmtree(memory_root / tenant)
+    store._memories.clear()
+    [hit] = await memory_search(tenant, "staging database")
+    assert hit["text"] == "the staging database is called hermes"
+
+
+@pytest.fixture
+async def sandbox(monkeypatch):
+    sandbox = SandboxPool(1, preload_modules=["sandbox_tools"])
+    monkeypatch.setattr(pool, "_pool", sandbox)
+    yield sandbox
+    await sandbox.close()
+
+
+async def test_tenant_scoped_tools_get_the_runs_tenant(sandbox):
+    env = ActivityEnvironment()
+    ours = str(uuid.uuid4())
+
+    # Whatever tenant the model passes is replaced by the run's
+    output = await env.run(
+        execute_tool, ToolExecInput("sandbox_tenant", {"tenant_id": str(uuid.uuid4())}, tenant_id=ours)
+    )
+    assert output.success
+    assert output.result == ours
+
+    output = await env.run(execute_tool, ToolExecInput("sandbox_tenant", {}))
+    assert not output.success
+    assert output.error == "sandbox_tenant needs the run's tenant"
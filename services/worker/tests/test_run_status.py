@@ -0,0 +1,74 @@
+"""record_run_status: where a transition is written, and admission slots."""
+
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from temporalio.testing import ActivityEnvironment
+
+from agent_runtime_core.utils import get_settings
+from agent_runtime_worker.activities import RunStatusInput, record_run_status, run_status
+
+
+class Recorder:
+    """Stands in for the status store, event sink and admission controller."""
+
+    def __init__(self) -> None:
+        self.updates = []
+        self.events = []
+        self.released = []
+
+    async def record(self, update) -> None:
+        self.updates.append(update)
+
+    async def emit(self, event) -> None:
+        self.events.append(event)
+
+    async def release(self, *run_ids) -> None:
+        self.released.extend(run_ids)
+
+
+@pytest.fixture
+def recorder(monkeypatch) -> Recorder:
+    recorder = Recorder()
+    for name in ("get_run_status_store", "get_event_sink", "get_admission_controller"):
+        monkeypatch.setattr(run_status, name, lambda: recorder)
+    return recorder
+
+
+@pytest.fixture
+def admission(monkeypatch):
+    def set_enabled(enabled: bool) -> None:
+        monkeypatch.setenv("ADMISSION_ENABLED", str(enabled).lower())
+        get_settings.cache_clear()
+
+    yield set_enabled
+    get_settings.cache_clear()
+
+
+async def record(run_id: uuid.UUID, status: str, version: int) -> None:
+    at = datetime(2026, 1, 1, tzinfo=timezone.utc).isoformat()
+    await ActivityEnvironment().run(record_run_status, RunStatusInput(str(run_id), status, version, at))
+
+
+async def test_final_status_releases_the_admission_slot(recorder, admission):
+    admission(True)
+    run_id = uuid.uuid4()
+
+    await record(run_id, "running", 1)
+    assert recorder.released == []
+    await record(run_id, "completed", 2)
+
+    assert recorder.released == [run_id]
+    assert [u.status.value for u in recorder.updates] == ["running", "completed"]
+    assert [e.event_type for e in recorder.events] == ["run.running", "run.completed"]
+
+
+async def test_no_release_with_admission_control_disabled(recorder, admission):
+    admission(False)
+    run_id = uuid.uuid4()
+
+    await record(run_id, "failed", 1)
+
+    assert recorder.released == []
+    assert [e.event_type for e in recorder.events] == ["run.failed"]
@@ -0,0 +1,110 @@
+"""Sandbox pool: timeouts, recycling, and rlimits in the child processes."""
+
+import asyncio
+import os
+import resource
+
+import pytest
+
+from agent_runtime_worker.sandbox import SandboxPool, SandboxTimeoutError
+
+MB = 1024 * 1024
+
+
+@pytest.fixture
+async def make_pool():
+    pools: list[SandboxPool] = []
+
+    async def make(size: int = 1, **kwargs) -> SandboxPool:
+        pool = SandboxPool(size, preload_modules=["sandbox_tools"], **kwargs)
+        await pool.start()
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        await pool.close()
+
+
+async def pid(pool: SandboxPool, sleep: float = 0) -> int:
+    result = await pool.run("sandbox_pid", {"sleep": sleep}, timeout=10)
+    assert result.success, result.error
+    return result.result
+
+
+async def pool_pids(pool: SandboxPool) -> set[int]:
+    """The PIDs of every process, each held busy until all have answered."""
+    return set(await asyncio.gather(*(pid(pool, sleep=0.3) for _ in range(pool.size))))
+
+
+def is_running(process_id: int) -> bool:
+    try:
+        os.kill(process_id, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+async def test_timeout_kills_and_replaces_only_its_own_process(make_pool):
+    pool = await make_pool(2)
+    before = await pool_pids(pool)
+
+    slow = asyncio.create_task(pool.run("sandbox_pid", {"sleep": 10}, timeout=0.3))
+    survivor = await pid(pool, sleep=0.6)
+    with pytest.raises(SandboxTimeoutError):
+        await slow
+
+    after = await pool_pids(pool)
+    [killed] = before - {survivor}
+    assert survivor in after
+    assert killed not in after
+    assert not is_running(killed)
+    assert pool.size == len(after) == 2
+
+
+async def test_processes_are_recycled_after_max_calls(make_pool):
+    pool = await make_pool(max_calls_per_process=3)
+
+    first = [await pid(pool) for _ in range(3)]
+    assert len(set(first)) == 1
+    assert await pid(pool) != first[0]
+
+
+async def test_processes_are_recycled_once_their_memory_grows(make_pool):
+    pool = await make_pool(max_rss_growth=64 * MB)
+    baseline = await pid(pool)
+
+    # Under the growth limit: kept
+    assert (await pool.run("sandbox_hold", {"megabytes": 16}, timeout=10)).result == baseline
+    assert await pid(pool) == baseline
+    # Over it: replaced once the call returns
+    assert (await pool.run("sandbox_hold", {"megabytes": 96}, timeout=10)).result == baseline
+    assert await pid(pool) != baseline
+
+
+async def test_rlimits_apply_to_each_call_in_the_child(make_pool):
+    pool = await make_pool()
+
+    limited = await pool.run("sandbox_limits", {}, timeout=10, cpu_seconds=2, memory_bytes=64 * MB)
+    unlimited = await pool.run("sandbox_limits", {}, timeout=10)
+
+    cpu, address_space = limited.result
+    assert cpu != resource.RLIM_INFINITY
+    assert address_space != resource.RLIM_INFINITY
+    # Limits are lifted again once the call returns
+    parent = (resource.getrlimit(resource.RLIMIT_CPU)[0], resource.getrlimit(resource.RLIMIT_AS)[0])
+    assert tuple(unlimited.result) == parent
+    # The parent's own limits are never touched
+    assert parent[1] != address_space
+
+
+async def test_rlimits_stop_calls_that_exceed_them(make_pool):
+    pool = await make_pool()
+
+    memory = await pool.run("sandbox_allocate", {"megabytes": 256}, timeout=10, memory_bytes=64 * MB)
+    cpu = await pool.run("sandbox_spin", {}, timeout=10, cpu_seconds=1)
+    after = await pool.run("sandbox_allocate", {"megabytes": 256}, timeout=10)
+
+    assert memory.error == "Memory limit exceeded"
+    assert cpu.error == "CPU time limit exceeded"
+    assert after.result == 256 * MB